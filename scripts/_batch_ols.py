@@ -0,0 +1,191 @@
+"""
+Shared helper: batched OLS with HC3 / HAC covariances for regression grids.
+
+The core-models stages loop `for sig in reg_signals: for fwd in horizons:`
+and call `sm.OLS(valid[fwd], add_constant(valid[sig])).fit(cov_type="HC3")`
+per cell, and the local-projection block does the same with HAC per
+horizon. Each call rebuilds a DataFrame design, copies the data, and
+produces a full results object of which one coefficient row is kept.
+
+`batch_ols` fits every cell y_h ~ 1 + x_s + controls of a signal × target
+grid together. Each cell keeps its own pairwise-complete sample, exactly
+as `dropna()` on [x_s, y_h, controls] would. The cell samples are packed
+into one zero-padded (cells × rows × k) array, and from there the cross
+products, solves, leverages and Newey–West lag sums are all batched
+einsums.
+
+Covariances follow statsmodels' conventions, so numbers match
+`OLS.fit(cov_type=...)`:
+  - "nonrobust"  σ̂² (XᵀX)⁻¹, t reference distribution (df = n − k)
+  - "HC3"        (XᵀX)⁻¹ Σ x xᵀ e² / (1 − h)² (XᵀX)⁻¹, normal reference
+  - "HAC"        Bartlett-kernel Newey–West with `maxlags`, no small-sample
+                 correction (statsmodels' default), normal reference
+HAC lags run over each cell's dropna'd row sequence, as statsmodels sees it.
+`maxlags=None` uses the pipelines' rule ⌊0.75 · n^(1/3)⌋ per cell.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+COV_TYPES = ("nonrobust", "HC3", "HAC")
+
+
+def nw_maxlags(nobs) -> np.ndarray:
+    """The pipelines' Newey–West truncation rule, ⌊0.75 · n^(1/3)⌋."""
+    return (0.75 * np.asarray(nobs, dtype=float) ** (1 / 3)).astype(int)
+
+
+def batch_ols(
+    y,
+    x,
+    controls=None,
+    *,
+    cov_type: str = "HC3",
+    maxlags: Union[None, int, Sequence[int]] = None,
+    min_obs: int = 1,
+    rcond: float = 1e-12,
+) -> dict[str, np.ndarray]:
+    """
+    Fit y[:, h] ~ 1 + x[:, s] + controls for every (s, h).
+
+    y is (n × H), x is (n × S), controls (n × C) is shared by all cells.
+    NaNs are dropped per cell. `maxlags` (HAC) is an int, one int per
+    target column, or None for the per-cell rule in `nw_maxlags`.
+
+    Returns (S × H) arrays coef, se, t_stat, p_value, ci_lower, ci_upper
+    for the x coefficient, plus r_squared, nobs, maxlags, and params / bse
+    (S × H × k, order [const, x, *controls]). Cells with fewer than
+    max(`min_obs`, k + 1) rows are NaN.
+    """
+    if cov_type not in COV_TYPES:
+        raise ValueError(f"unknown cov_type '{cov_type}' (expected one of {COV_TYPES})")
+    Y = np.asarray(y, dtype=float)
+    X = np.asarray(x, dtype=float)
+    Y = Y[:, None] if Y.ndim == 1 else Y
+    X = X[:, None] if X.ndim == 1 else X
+    n, H = Y.shape
+    S = X.shape[1]
+    C = np.empty((n, 0)) if controls is None else np.asarray(controls, dtype=float)
+    C = C[:, None] if C.ndim == 1 else C
+    k = 2 + C.shape[1]
+
+    # Cell c = s * H + h; pack each cell's complete rows first, zero-pad the rest
+    ok_c = ~np.isnan(C).any(axis=1)
+    mask = (~np.isnan(X))[:, :, None] & (~np.isnan(Y))[:, None, :] & ok_c[:, None, None]
+    mask = mask.reshape(n, S * H).T                                   # cells × n
+    nobs = mask.sum(axis=1)
+    m = int(nobs.max()) if len(nobs) else 0
+    rows = np.argsort(~mask, axis=1, kind="stable")[:, :m]            # valid rows, in order
+    live = np.arange(m)[None, :] < nobs[:, None]
+    s_of, h_of = np.divmod(np.arange(S * H), H)
+
+    Z = np.zeros((S * H, m, k))
+    Z[:, :, 0] = live
+    Z[:, :, 1] = np.where(live, X[rows, s_of[:, None]], 0.0)
+    if C.shape[1]:
+        Z[:, :, 2:] = np.where(live[:, :, None], C[rows], 0.0)
+    yv = np.where(live, Y[rows, h_of[:, None]], 0.0)
+
+    xtx = np.einsum("cti,ctj->cij", Z, Z)
+    bread = np.linalg.pinv(xtx, rcond=rcond, hermitian=True)
+    beta = np.einsum("cij,cj->ci", bread, np.einsum("cti,ct->ci", Z, yv))
+    e = (yv - np.einsum("cti,ci->ct", Z, beta)) * live
+    dof = nobs - k
+    ssr = (e * e).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ybar = yv.sum(axis=1) / nobs
+        tss = ((yv - ybar[:, None]) ** 2 * live).sum(axis=1)
+        r2 = 1 - ssr / tss
+
+    lags = np.zeros(S * H, dtype=int)
+    if cov_type == "nonrobust":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = bread * (ssr / dof)[:, None, None]
+    else:
+        u = Z * e[:, :, None]                                         # scores x_t e_t
+        if cov_type == "HC3":
+            h = np.einsum("cti,cij,ctj->ct", Z, bread, Z)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                u = u / np.where(live, 1 - h, 1.0)[:, :, None]
+            meat = np.einsum("cti,ctj->cij", u, u)
+        else:
+            if maxlags is None:
+                lags = nw_maxlags(nobs)
+            elif np.ndim(maxlags) == 0:
+                lags = np.full(S * H, int(maxlags))
+            else:
+                lags = np.asarray(maxlags, dtype=int)[h_of]
+            meat = np.einsum("cti,ctj->cij", u, u)
+            for l in range(1, int(lags.max(initial=0)) + 1):
+                w = np.where(l <= lags, 1 - l / (lags + 1), 0.0)
+                if not w.any():
+                    continue
+                g = np.einsum("cti,ctj->cij", u[:, l:], u[:, :-l])
+                meat += w[:, None, None] * (g + g.transpose(0, 2, 1))
+        cov = bread @ meat @ bread
+
+    bse = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tv = beta / bse
+    if cov_type == "nonrobust":
+        pv = 2 * stats.t.sf(np.abs(tv), np.maximum(dof, 1)[:, None])
+        q = stats.t.ppf(0.975, np.maximum(dof, 1))[:, None]
+    else:
+        pv = 2 * stats.norm.sf(np.abs(tv))
+        q = stats.norm.ppf(0.975)
+
+    bad = nobs < max(min_obs, k + 1)
+    for a in (beta, bse, tv, pv):
+        a[bad] = np.nan
+    r2 = np.where(bad, np.nan, r2)
+    lo, hi = beta - q * bse, beta + q * bse
+
+    def _grid(a):
+        return a.reshape(S, H, *a.shape[1:])
+
+    return {
+        "coef": _grid(beta[:, 1]), "se": _grid(bse[:, 1]), "t_stat": _grid(tv[:, 1]),
+        "p_value": _grid(pv[:, 1]), "ci_lower": _grid(lo[:, 1]), "ci_upper": _grid(hi[:, 1]),
+        "r_squared": _grid(r2), "nobs": _grid(nobs), "maxlags": _grid(lags),
+        "params": _grid(beta), "bse": _grid(bse),
+    }
+
+
+def regression_grid(
+    frame: pd.DataFrame,
+    signals: Sequence[str],
+    targets: Sequence[str],
+    controls: Sequence[str] = (),
+    *,
+    cov_type: str = "HC3",
+    maxlags: Union[None, int, Sequence[int]] = None,
+    min_obs: int = 1,
+) -> pd.DataFrame:
+    """
+    `batch_ols` over the columns of `frame`, as a long table with one row per
+    (signal, target) in loop order: signal, target, coef, se, t_stat,
+    p_value, ci_lower, ci_upper, r_squared, n, nw_lags. Missing columns are
+    skipped; cells below `min_obs` rows are dropped.
+    """
+    signals = [s for s in signals if s in frame.columns]
+    targets = [t for t in targets if t in frame.columns]
+    controls = [c for c in controls if c in frame.columns]
+    cols = ["signal", "target", "coef", "se", "t_stat", "p_value", "ci_lower", "ci_upper",
+            "r_squared", "n", "nw_lags"]
+    if not signals or not targets:
+        return pd.DataFrame(columns=cols)
+    res = batch_ols(frame[targets].to_numpy(dtype=float), frame[signals].to_numpy(dtype=float),
+                    frame[controls].to_numpy(dtype=float) if controls else None,
+                    cov_type=cov_type, maxlags=maxlags, min_obs=min_obs)
+    S, H = len(signals), len(targets)
+    out = pd.DataFrame({
+        "signal": np.repeat(signals, H), "target": np.tile(targets, S),
+        **{c: res[c].ravel() for c in ("coef", "se", "t_stat", "p_value", "ci_lower",
+                                       "ci_upper", "r_squared")},
+        "n": res["nobs"].ravel(), "nw_lags": res["maxlags"].ravel(),
+    })
+    return out[out["n"] >= max(min_obs, len(controls) + 3)].reset_index(drop=True)[cols]
@@ -0,0 +1,204 @@
+"""
+Shared helper: online Bayesian change-point detection (BOCPD) with persisted state.
+
+The core-models stages ran `ruptures.Pelt(model="rbf").fit(series).predict(pen=10)`
+over the whole history: a kernel cost that grows super-linearly with the
+sample, recomputed from scratch on every refresh, and only meaningful after
+the fact. A break is dated with hindsight the model did not have on the day.
+
+`BOCPD` is Adams & MacKay's (2007) run-length filter for a Gaussian series
+with unknown, piecewise-constant mean and variance (Normal–Gamma prior,
+Student-t predictive) and a constant hazard 1/`expected_run`. It consumes
+one observation at a time. Run lengths with posterior probability below
+`prune` are dropped and at most `max_runs` are kept, so the state and the
+per-observation cost are bounded however long the series gets.
+
+A change point is *confirmed* once the MAP run length reaches `confirm`.
+That is the first day the model is confident a new segment started, and it
+is dated at the segment's first observation. Each confirmation is recorded
+with the date it was confirmed, so detection delay is visible.
+
+`BOCPD.save` / `BOCPD.load` persist the whole state (prior, run-length
+posterior, sufficient statistics, confirmed change points, the last
+consumed observation and a SHA-256 of every consumed row's date and value)
+as JSON. `online_change_points` resumes from that state and only processes
+rows after the last consumed date. Monthly macro history (INDPRO, UMCSENT)
+is revised, and a revision to any consumed row, or a moved series start,
+would leave the run-length posterior and `breakpoint_index` stale, so when
+the consumed prefix no longer hashes to the stored value it starts again
+from scratch.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+
+CP_COLUMNS = ["breakpoint_index", "date", "value_at_break", "confirmed_date",
+              "delay_obs", "run_prob"]
+
+
+@dataclass
+class BOCPD:
+    """Run-length posterior and Normal–Gamma sufficient statistics per run."""
+
+    expected_run: float = 250.0
+    confirm: int = 21
+    max_runs: int = 500
+    prune: float = 1e-10
+    mu0: float = 0.0
+    kappa0: float = 1.0
+    alpha0: float = 1.0
+    beta0: float = 1.0
+    t: int = 0                                           # observations consumed
+    log_r: list = field(default_factory=lambda: [0.0])   # log P(run length | data)
+    run: list = field(default_factory=lambda: [0])
+    mu: list = field(default_factory=list)
+    kappa: list = field(default_factory=list)
+    alpha: list = field(default_factory=list)
+    beta: list = field(default_factory=list)
+    map_run: int = 0
+    last_date: Optional[str] = None
+    last_value: Optional[float] = None
+    prefix_hash: Optional[str] = None                    # SHA-256 of the consumed rows
+    change_points: list = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.mu:
+            self.mu, self.kappa = [self.mu0], [self.kappa0]
+            self.alpha, self.beta = [self.alpha0], [self.beta0]
+
+    @classmethod
+    def with_prior(cls, warmup, **kw) -> "BOCPD":
+        """Normal–Gamma prior centred on the warm-up sample (E[σ²] = its variance)."""
+        w = np.asarray(warmup, dtype=float)
+        var = float(np.var(w)) if len(w) > 1 else 1.0
+        return cls(mu0=float(np.mean(w)), kappa0=1.0, alpha0=2.0,
+                   beta0=var if var > 0 else 1.0, **kw)
+
+    def update(self, x: float) -> tuple[int, float]:
+        """Consume one observation. Returns (MAP run length, P(run length < `confirm`))."""
+        log_r = np.asarray(self.log_r)
+        run = np.asarray(self.run)
+        mu, kappa = np.asarray(self.mu), np.asarray(self.kappa)
+        alpha, beta = np.asarray(self.alpha), np.asarray(self.beta)
+
+        # Student-t predictive of x under every current run length
+        scale2 = beta * (kappa + 1) / (alpha * kappa)
+        nu = 2 * alpha
+        log_pred = (gammaln((nu + 1) / 2) - gammaln(nu / 2) - 0.5 * np.log(nu * np.pi * scale2)
+                    - (nu + 1) / 2 * np.log1p((x - mu) ** 2 / (nu * scale2)))
+        h = 1.0 / self.expected_run
+        joint = log_r + log_pred
+        grow = joint + np.log1p(-h)
+        cp = np.logaddexp.reduce(joint) + np.log(h)
+
+        log_r = np.r_[cp, grow]
+        log_r -= np.logaddexp.reduce(log_r)
+        run = np.r_[0, run + 1]
+        beta = np.r_[self.beta0, beta + kappa * (x - mu) ** 2 / (2 * (kappa + 1))]
+        mu = np.r_[self.mu0, (kappa * mu + x) / (kappa + 1)]
+        kappa = np.r_[self.kappa0, kappa + 1]
+        alpha = np.r_[self.alpha0, alpha + 0.5]
+
+        keep = log_r >= np.log(self.prune)
+        keep[0] = True
+        if keep.sum() > self.max_runs:
+            keep[np.argsort(-log_r, kind="stable")[self.max_runs:]] = False
+        log_r = log_r[keep] - np.logaddexp.reduce(log_r[keep])
+        self.log_r, self.run = log_r.tolist(), run[keep].tolist()
+        self.mu, self.kappa = mu[keep].tolist(), kappa[keep].tolist()
+        self.alpha, self.beta = alpha[keep].tolist(), beta[keep].tolist()
+
+        i = int(np.argmax(log_r))
+        self.map_run = int(self.run[i])
+        self.t += 1
+        short = float(np.exp(log_r[np.asarray(self.run) < self.confirm]).sum())
+        return self.map_run, short
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BOCPD"]:
+        try:
+            with open(path) as f:
+                return cls(**json.load(f))
+        except (OSError, TypeError, ValueError):
+            return None
+
+
+def _prefix_hash(s: pd.Series, end: int) -> str:
+    """SHA-256 of the first `end` rows' dates and values."""
+    h = hashlib.sha256(np.ascontiguousarray(s.to_numpy()[:end], dtype=float).tobytes())
+    h.update(np.asarray(s.index[:end].asi8).tobytes())
+    return h.hexdigest()
+
+
+def online_change_points(
+    series: pd.Series,
+    state_path: Optional[str] = None,
+    *,
+    expected_run: float = 250.0,
+    confirm: int = 21,
+    warmup: int = 63,
+    max_runs: int = 500,
+    prune: float = 1e-10,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run (or resume) BOCPD over `series` (NaNs dropped). Returns
+    (all confirmed change points so far with columns CP_COLUMNS, and a trace
+    of map_run_length / short_run_prob for the rows processed in this call).
+    With `state_path`, the state is loaded from and saved back to that JSON
+    file; it is discarded if any consumed row has changed since. The prior
+    comes from the first `warmup` observations.
+    """
+    s = series.dropna().astype(float)
+    settings = dict(expected_run=expected_run, confirm=confirm, max_runs=max_runs, prune=prune)
+    state = BOCPD.load(state_path) if state_path and os.path.exists(state_path) else None
+    if state is not None:
+        same = all(getattr(state, k) == v for k, v in settings.items())
+        last = pd.Timestamp(state.last_date) if state.last_date else None
+        start = int(s.index.searchsorted(last, side="right")) if last is not None else 0
+        if not same or last is None or start != state.t or \
+                _prefix_hash(s, start) != state.prefix_hash:
+            state = None
+    if state is None:
+        state = BOCPD.with_prior(s.iloc[:warmup].to_numpy(), **settings)
+        start = 0
+
+    values, dates = s.to_numpy(), s.index
+    trace = []
+    prev_map = state.map_run
+    for t in range(start, len(s)):
+        map_run, short = state.update(values[t])
+        trace.append((dates[t], map_run, short))
+        # A new segment is confirmed when the MAP run reaches `confirm` after a
+        # reset, or when the MAP jumps to a different run that is already that long
+        if map_run >= confirm and (prev_map < confirm or map_run != prev_map + 1):
+            b = t - map_run + 1
+            last_b = state.change_points[-1]["breakpoint_index"] if state.change_points else 0
+            if b >= last_b + confirm:
+                state.change_points.append({
+                    "breakpoint_index": int(b), "date": str(dates[b].date()),
+                    "value_at_break": float(values[b]), "confirmed_date": str(dates[t].date()),
+                    "delay_obs": int(t - b),
+                    "run_prob": float(np.exp(max(state.log_r))),
+                })
+        prev_map = map_run
+    if len(s):
+        state.last_date, state.last_value = str(dates[-1]), float(values[-1])
+        state.prefix_hash = _prefix_hash(s, len(s))
+    if state_path:
+        state.save(state_path)
+
+    trace_df = pd.DataFrame(trace, columns=["date", "map_run_length", "short_run_prob"]).set_index("date")
+    return pd.DataFrame(state.change_points, columns=CP_COLUMNS), trace_df
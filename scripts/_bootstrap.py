@@ -0,0 +1,145 @@
+"""
+Shared helper: vectorized bootstrap for Sharpe-ratio inference.
+
+The validation stages used to build their Sharpe distributions one draw at a
+time (`rng.choice(oos_arr, size=n)` inside a 5,000–10,000 iteration Python
+loop). This module generates resample indices as one (draws × n) matrix per
+chunk, gathers the samples with a single fancy-index, and reduces all Sharpe
+ratios at once. Chunking (`chunk_size` draws at a time) caps memory at
+roughly `2 × chunk_size × n × 8` bytes however many draws are requested.
+
+Resampling schemes (`method=`):
+  - "iid"         — classic i.i.d. resampling with replacement. With the
+                    same RandomState seed it reproduces the legacy loop's
+                    draws exactly.
+  - "stationary"  — Politis & Romano (1994) stationary bootstrap: blocks of
+                    geometric length with mean `block_len`, wrapping
+                    circularly. Preserves the autocorrelation that i.i.d.
+                    draws destroy, which otherwise understates the CI of
+                    serially dependent strategy returns.
+  - "circular"    — circular block bootstrap with fixed `block_len`.
+
+`block_len` defaults to the n^(1/3) rule of thumb when not given.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+METHODS = ("iid", "stationary", "circular")
+
+
+def default_block_length(n: int) -> int:
+    """Rule-of-thumb block length for dependent data: round(n^(1/3)), at least 1."""
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def _randint(rng, high: int, size) -> np.ndarray:
+    """Uniform ints in [0, high) from a Generator, RandomState or the np.random module."""
+    if hasattr(rng, "integers"):
+        return rng.integers(0, high, size=size)
+    return rng.randint(0, high, size=size)
+
+
+def _random(rng, size) -> np.ndarray:
+    return rng.random(size) if hasattr(rng, "integers") else rng.random_sample(size)
+
+
+def resample_indices(
+    n: int,
+    n_draws: int,
+    rng,
+    *,
+    method: str = "iid",
+    block_len: Optional[int] = None,
+) -> np.ndarray:
+    """(n_draws × n) matrix of resample indices into a length-n series."""
+    if method not in METHODS:
+        raise ValueError(f"unknown bootstrap method '{method}' (expected one of {METHODS})")
+    if method == "iid":
+        return _randint(rng, n, (n_draws, n))
+
+    L = int(block_len) if block_len else default_block_length(n)
+    L = max(1, min(L, n))
+    if method == "circular":
+        n_blocks = -(-n // L)
+        starts = _randint(rng, n, (n_draws, n_blocks))
+        idx = (starts[:, :, None] + np.arange(L)[None, None, :]) % n
+        return idx.reshape(n_draws, n_blocks * L)[:, :n]
+
+    # Stationary: a new block starts at t with probability 1/L (always at t = 0)
+    starts = _randint(rng, n, (n_draws, n))
+    new_block = _random(rng, (n_draws, n)) < 1.0 / L
+    new_block[:, 0] = True
+    t = np.arange(n)
+    block_start_t = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    start_val = np.take_along_axis(starts, block_start_t, axis=1)
+    return (start_val + (t - block_start_t)) % n
+
+
+def iter_resample_indices(
+    n: int,
+    n_boot: int,
+    rng,
+    *,
+    method: str = "iid",
+    block_len: Optional[int] = None,
+    chunk_size: int = 1000,
+) -> Iterator[np.ndarray]:
+    """Yield index matrices of at most `chunk_size` draws until `n_boot` are produced."""
+    step = max(int(chunk_size), 1)
+    for b0 in range(0, n_boot, step):
+        yield resample_indices(n, min(step, n_boot - b0), rng,
+                               method=method, block_len=block_len)
+
+
+def sharpe_rows(samples: np.ndarray, periods_per_year: int, ddof: int = 0) -> np.ndarray:
+    """Annualised Sharpe of each row of a (draws × n) sample matrix; 0 where std == 0."""
+    mean = samples.mean(axis=1)
+    std = samples.std(axis=1, ddof=ddof)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+
+
+def bootstrap_sharpe(
+    returns,
+    n_boot: int = 10_000,
+    *,
+    method: str = "iid",
+    block_len: Optional[int] = None,
+    rng=None,
+    seed: int = 42,
+    periods_per_year: int = 252,
+    ddof: int = 0,
+    chunk_size: int = 1000,
+) -> np.ndarray:
+    """
+    Bootstrap distribution of the annualised Sharpe ratio of `returns`.
+
+    `rng` may be a Generator, a RandomState or the `np.random` module; when
+    omitted a `RandomState(seed)` is used, matching the pipelines' legacy
+    seeding. `ddof=0` matches the legacy `sample.std()` on NumPy arrays.
+    """
+    arr = np.asarray(returns, dtype=float)
+    arr = arr[~np.isnan(arr)]
+    if rng is None:
+        rng = np.random.RandomState(seed)
+    out = np.empty(n_boot)
+    b0 = 0
+    for idx in iter_resample_indices(len(arr), n_boot, rng, method=method,
+                                     block_len=block_len, chunk_size=chunk_size):
+        out[b0:b0 + len(idx)] = sharpe_rows(arr[idx], periods_per_year, ddof)
+        b0 += len(idx)
+    return out
+
+
+def sharpe_ci_summary(boot: np.ndarray) -> dict:
+    """mean / 95% percentile CI / % positive of a bootstrap Sharpe distribution."""
+    return {
+        "mean_sharpe": round(float(np.mean(boot)), 4),
+        "ci_2_5": round(float(np.percentile(boot, 2.5)), 4),
+        "ci_97_5": round(float(np.percentile(boot, 97.5)), 4),
+        "pct_positive": round(float((boot > 0).mean() * 100), 1),
+    }
@@ -0,0 +1,159 @@
+"""
+Shared helper: FFT cross-correlation cube for many signals × targets × lags.
+
+The exploratory stages computed the CCF one lag at a time
+(`np.corrcoef(x[:n-k], y[k:])` for k = −20..20) for a single
+signal / target pair, so a CCF for every derived signal at ±252 lags meant
+hundreds of thousands of small correlations.
+
+`ccf_cube` gets every lag of every (signal, target) pair from a handful of
+FFT cross-correlations. Each lag is still the Pearson correlation of the
+overlapping segment, exactly as the per-lag `np.corrcoef` loop computed it:
+the overlap's Σx, Σx², Σy, Σy², Σxy and count come from cross-correlating
+NaN-masked columns with their masks. Columns with different NaN spans
+(warm-up windows of rolling signals) are therefore handled pairwise.
+
+Lag convention (as in the stage scripts): lag k is corr(x_t, y_{t+k}), so
+k > 0 means the signal leads the target.
+
+Standard errors:
+  - "white"     1/√n_k — the null band for prewhitened series
+  - "bartlett"  √[(1 + 2 Σ_{j≥1} ρ_xx(j) ρ_yy(j)) / n_k], Bartlett's
+                variance under independence for autocorrelated inputs
+
+`ar_prewhiten` fits the AR(p)-with-constant filter that
+`AutoReg(lags=p).fit()` fits, one column at a time over its valid span.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def ar_prewhiten(frame: pd.DataFrame, lags: int = 5) -> pd.DataFrame:
+    """AR(`lags`) + constant OLS residuals for each column (NaN outside its valid span)."""
+    out = pd.DataFrame(np.nan, index=frame.index, columns=frame.columns)
+    for col in frame.columns:
+        s = frame[col].dropna()
+        if len(s) <= 2 * lags + 1:
+            continue
+        v = s.to_numpy(dtype=float)
+        Z = np.column_stack([np.ones(len(v) - lags)]
+                            + [v[lags - j:len(v) - j] for j in range(1, lags + 1)])
+        beta, *_ = np.linalg.lstsq(Z, v[lags:], rcond=None)
+        out.loc[s.index[lags:], col] = v[lags:] - Z @ beta
+    return out
+
+
+def _xcorr(A: np.ndarray, B: np.ndarray, nfft: int, max_lag: int) -> np.ndarray:
+    """
+    Raw cross-products Σ_t A[t, s] B[t + k, u] for k = −max_lag..max_lag,
+    returned as (L, S, U).
+    """
+    FA = np.fft.rfft(A, nfft, axis=0)
+    FB = np.fft.rfft(B, nfft, axis=0)
+    r = np.fft.irfft(np.conj(FA)[:, :, None] * FB[:, None, :], nfft, axis=0)
+    # r[k] holds lag k (k ≥ 0) and r[nfft + k] lag k (k < 0)
+    return np.concatenate([r[nfft - max_lag:], r[:max_lag + 1]], axis=0)
+
+
+def _autocorr(A: np.ndarray, nfft: int, max_lag: int) -> np.ndarray:
+    """Sample autocorrelation of each (zero-filled, centred) column, lags 0..max_lag."""
+    F = np.fft.rfft(A, nfft, axis=0)
+    r = np.fft.irfft(np.abs(F) ** 2, nfft, axis=0)[:max_lag + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return r / r[:1]
+
+
+def ccf_cube(
+    X,
+    Y,
+    max_lag: int,
+    *,
+    se: str = "white",
+    bartlett_lags: Optional[int] = None,
+    min_overlap: int = 3,
+) -> dict[str, np.ndarray]:
+    """
+    Pearson CCF of every column of X (n × S signals) with every column of
+    Y (n × T targets) at lags −max_lag..max_lag.
+
+    Returns lags (L,), ccf (L × S × T), se (L × S × T) and n_obs
+    (L × S × T, overlapping non-NaN rows). Lags with fewer than
+    `min_overlap` rows are NaN.
+    """
+    if se not in ("white", "bartlett"):
+        raise ValueError(f"unknown se '{se}' (expected 'white' or 'bartlett')")
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    X = X[:, None] if X.ndim == 1 else X
+    Y = Y[:, None] if Y.ndim == 1 else Y
+    n = len(X)
+    if len(Y) != n:
+        raise ValueError(f"X rows {n} != Y rows {len(Y)}")
+    max_lag = int(min(max_lag, n - 1))
+
+    mx, my = ~np.isnan(X), ~np.isnan(Y)
+    # centre on each column's own mean: the overlap correlations are unchanged
+    # and the FFT sums lose far less to cancellation
+    with np.errstate(invalid="ignore"):
+        xc = np.where(mx, X - np.nanmean(X, axis=0), 0.0)
+        yc = np.where(my, Y - np.nanmean(Y, axis=0), 0.0)
+    fx, fy = mx.astype(float), my.astype(float)
+
+    nfft = 1 << int(np.ceil(np.log2(2 * n - 1))) if n > 1 else 1
+    cnt = np.rint(_xcorr(fx, fy, nfft, max_lag))
+    sxy = _xcorr(xc, yc, nfft, max_lag)
+    sx = _xcorr(xc, fy, nfft, max_lag)
+    sxx = _xcorr(xc * xc, fy, nfft, max_lag)
+    sy = _xcorr(fx, yc, nfft, max_lag)
+    syy = _xcorr(fx, yc * yc, nfft, max_lag)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / cnt
+        vx = sxx - sx * sx / cnt
+        vy = syy - sy * sy / cnt
+        ccf = cov / np.sqrt(vx * vy)
+        ok = (cnt >= min_overlap) & (vx > 0) & (vy > 0)
+        ccf = np.where(ok, np.clip(ccf, -1.0, 1.0), np.nan)
+
+        if se == "white":
+            se_arr = 1.0 / np.sqrt(cnt)
+        else:
+            J = int(min(bartlett_lags or max_lag, n - 1))
+            ax, ay = _autocorr(xc, nfft, J), _autocorr(yc, nfft, J)
+            infl = 1.0 + 2.0 * np.einsum("js,ju->su", ax[1:], ay[1:])
+            se_arr = np.sqrt(np.maximum(infl, 0.0)[None] / cnt)
+    se_arr = np.where(ok, se_arr, np.nan)
+    lags = np.arange(-max_lag, max_lag + 1)
+    return {"lags": lags, "ccf": ccf, "se": se_arr, "n_obs": cnt.astype(int)}
+
+
+def ccf_frame(
+    signals: pd.DataFrame,
+    targets: pd.DataFrame,
+    max_lag: int,
+    *,
+    z: float = 1.96,
+    **kwargs,
+) -> pd.DataFrame:
+    """`ccf_cube` on aligned frames, as a long table: signal, target, lag, ccf, se, n_obs, significant_95."""
+    targets = targets.reindex(signals.index)
+    cube = ccf_cube(signals.to_numpy(dtype=float), targets.to_numpy(dtype=float), max_lag, **kwargs)
+    L, S, T = cube["ccf"].shape
+
+    def _long(a):                                   # (L, S, T) → signal-major, then target, lag
+        return a.transpose(1, 2, 0).ravel()
+
+    out = pd.DataFrame({
+        "signal": np.repeat(np.asarray(signals.columns, dtype=object), T * L),
+        "target": np.tile(np.repeat(np.asarray(targets.columns, dtype=object), L), S),
+        "lag": np.tile(cube["lags"], S * T),
+        "ccf": _long(cube["ccf"]),
+        "se": _long(cube["se"]),
+        "n_obs": _long(cube["n_obs"]),
+    })
+    out["significant_95"] = np.abs(out["ccf"]) > z * out["se"]
+    return out
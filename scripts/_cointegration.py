@@ -0,0 +1,248 @@
+"""
+Shared helper: rolling Johansen cointegration, batched across systems and cached.
+
+The core-models stages ran one full-sample `coint_johansen` per pair
+(`log_spy` vs `hy_ig_spread` with `k_ar_diff=5`, log indicator vs log ETF
+with `k_ar_diff=2`). A single full-sample statistic cannot show *when* the
+long-run relationship held, and refitting `coint_johansen` on ~5,000
+rolling windows of 25 years of daily data repeats the same regressions
+almost row for row.
+
+Johansen's statistics only need the residual-product matrices S00, S01,
+S11 of Δx_t and x_(t−1) after partialling out the lagged differences and
+deterministic terms. Every one of them is a function of the window's
+moment matrix Σ w_t w_tᵀ, with w_t = [Δx_t, x_(t−1), t, Δx_(t−1..t−k), 1].
+`rolling_johansen` builds those moments once as prefix sums, so each
+window is two prefix-sum rows and one small solve. All windows are then
+processed as one batch: partialling, the p × p eigenproblem, and the
+trace / max-eigen statistics.
+
+`det_order` follows `coint_johansen`: −1 none, 0 constant, 1 linear
+trend. The window's levels are detrended with their own OLS trend, as
+statsmodels does. Critical values come from statsmodels' Osterwald-Lenum
+tables. A single window equal to the sample reproduces `coint_johansen`
+for k_ar_diff ≥ 1. With k_ar_diff = 0, statsmodels pairs Δx_t with x_t
+rather than x_(t−1).
+
+`johansen_grid` runs many systems (indicator × target pairs) as
+independent tasks over a forked pool (`_parallel.parallel_map`). With
+`cache_dir`, each system's table is pickled under a SHA-256 of its
+values, dates and settings. Pairs that share a system reuse each other's
+results, and the system name is not part of the key.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from _parallel import parallel_map
+
+DET_ORDERS = (-1, 0, 1)
+
+
+def _prefix(a: np.ndarray) -> np.ndarray:
+    """Prefix sums along axis 0 with a leading zero row: sum of rows [i, j) = P[j] − P[i]."""
+    return np.concatenate([np.zeros((1, *a.shape[1:])), np.cumsum(a, axis=0)])
+
+
+def _critical_values(p: int, det_order: int) -> tuple[np.ndarray, np.ndarray]:
+    """(trace, max-eigen) critical values, p × 3 for 90/95/99%, for ranks r = 0..p−1."""
+    from statsmodels.tsa.coint_tables import c_sja, c_sjt
+
+    cvt = np.array([c_sjt(p - r, det_order) for r in range(p)], dtype=float)
+    cvm = np.array([c_sja(p - r, det_order) for r in range(p)], dtype=float)
+    return cvt, cvm
+
+
+def rolling_johansen(
+    levels: pd.DataFrame,
+    window: Optional[int] = None,
+    *,
+    step: int = 1,
+    det_order: int = 0,
+    k_ar_diff: int = 1,
+    rcond: float = 1e-12,
+) -> pd.DataFrame:
+    """
+    Johansen trace and max-eigen statistics on rolling windows of `window`
+    level rows (None: one full-sample window), every `step` rows and always
+    ending on the last row. Rows with any NaN are dropped first.
+
+    One row per window: date (window end), start, n (effective
+    observations), then per rank r = 0..p−1: trace_r{r}, trace_cv95_r{r},
+    max_eig_r{r}, max_eig_cv95_r{r}, eig_{r+1}; then rank_trace and
+    rank_max_eig (sequential 5% ranks) and the first cointegrating vector
+    normalised on the first variable (beta_<column>).
+    """
+    if det_order not in DET_ORDERS:
+        raise ValueError(f"det_order must be one of {DET_ORDERS}, got {det_order!r}")
+    data = levels.dropna()
+    x = data.to_numpy(dtype=float)
+    n, p = x.shape
+    k = int(k_ar_diff)
+    window = n if window is None else int(window)
+    names = list(data.columns)
+    if window < k + p + 4 or n < window:
+        return pd.DataFrame()
+
+    # Centre levels and time once (shifts are absorbed by the constant, if any)
+    if det_order > -1:
+        x = x - x.mean(axis=0)
+    s = np.arange(n, dtype=float) - (n - 1) / 2
+    dx = np.diff(x, axis=0)                                           # dx[i] = x[i+1] − x[i]
+
+    # Effective row t = k+1 .. n−1 (level index): Δx_t, x_(t−1), t−1, Δx_(t−1..t−k), 1
+    t_idx = np.arange(k + 1, n)
+    cols = [dx[t_idx - 1], x[t_idx - 1], s[t_idx - 1, None]]
+    cols += [dx[t_idx - 1 - j] for j in range(1, k + 1)]
+    if det_order > -1:
+        cols.append(np.ones((len(t_idx), 1)))
+    w = np.concatenate(cols, axis=1)
+    D = w.shape[1]
+    Q = _prefix(w[:, :, None] * w[:, None, :])                        # (n−k) × D × D
+
+    ends = np.arange(n, window - 1, -step)[::-1]                      # exclusive level end
+    starts = ends - window
+    # Effective rows of window [a, b) are level rows a+k+1 .. b−1 → w rows a .. b−k−2
+    M = Q[ends - k - 1] - Q[starts]
+    T = window - k - 1
+
+    # Partial out the lagged differences and deterministic terms
+    u, c = slice(0, 2 * p + 1), slice(2 * p + 1, D)
+    Muu, Muc, Mcc = M[:, u, u], M[:, u, c], M[:, c, c]
+    if D > 2 * p + 1:
+        S = Muu - Muc @ np.linalg.pinv(Mcc, rcond=rcond, hermitian=True) @ Muc.transpose(0, 2, 1)
+    else:
+        S = Muu
+
+    # Linear detrending of the window's levels (det_order = 1): x_(t−1) − b·(t−1)
+    K = np.zeros((len(ends), 2 * p, 2 * p + 1))
+    K[:, :p, :p] = np.eye(p)
+    K[:, p:, p:2 * p] = np.eye(p)
+    if det_order == 1:
+        Px, Psx = _prefix(x), _prefix(s[:, None] * x)
+        Ps, Pss = _prefix(s[:, None]), _prefix((s * s)[:, None])
+        sx = Psx[ends] - Psx[starts] - (Ps[ends] - Ps[starts]) * (Px[ends] - Px[starts]) / window
+        ss = Pss[ends] - Pss[starts] - (Ps[ends] - Ps[starts]) ** 2 / window
+        K[:, p:, 2 * p] = -sx / ss
+    S = K @ S @ K.transpose(0, 2, 1)
+    S00, S01, S11 = S[:, :p, :p], S[:, :p, p:], S[:, p:, p:]
+
+    # Eigenvalues of S11⁻¹ S10 S00⁻¹ S01 via the symmetric form L⁻¹ S10 S00⁻¹ S01 L⁻ᵀ
+    L = np.linalg.cholesky(S11)
+    Li = np.linalg.inv(L)
+    A = Li @ S01.transpose(0, 2, 1) @ np.linalg.solve(S00, S01) @ Li.transpose(0, 2, 1)
+    lam, vec = np.linalg.eigh((A + A.transpose(0, 2, 1)) / 2)
+    lam, vec = lam[:, ::-1], vec[:, :, ::-1]
+    lam = np.clip(lam, 0.0, 1 - 1e-15)
+    beta = (Li.transpose(0, 2, 1) @ vec)[:, :, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = beta / beta[:, :1]
+
+    log1m = np.log1p(-lam)
+    trace = -T * np.cumsum(log1m[:, ::-1], axis=1)[:, ::-1]
+    max_eig = -T * log1m
+    cvt, cvm = _critical_values(p, det_order)
+    rej_t, rej_m = trace > cvt[:, 1], max_eig > cvm[:, 1]
+
+    dates = data.index
+    out = {"date": dates[ends - 1], "start": dates[starts], "n": T}
+    for r in range(p):
+        out[f"trace_r{r}"] = trace[:, r]
+        out[f"trace_cv95_r{r}"] = cvt[r, 1]
+        out[f"max_eig_r{r}"] = max_eig[:, r]
+        out[f"max_eig_cv95_r{r}"] = cvm[r, 1]
+        out[f"eig_{r + 1}"] = lam[:, r]
+    out["rank_trace"] = np.cumprod(rej_t, axis=1).sum(axis=1)
+    out["rank_max_eig"] = np.cumprod(rej_m, axis=1).sum(axis=1)
+    for j, name in enumerate(names):
+        out[f"beta_{name}"] = beta[:, j]
+    return pd.DataFrame(out)
+
+
+def johansen_table(levels: pd.DataFrame, *, det_order: int = 0, k_ar_diff: int = 1) -> pd.DataFrame:
+    """Full-sample test as one row per null r ≤ i, with 90/95/99% critical values."""
+    res = rolling_johansen(levels, None, det_order=det_order, k_ar_diff=k_ar_diff)
+    if res.empty:
+        return pd.DataFrame()
+    p = levels.shape[1]
+    cvt, cvm = _critical_values(p, det_order)
+    r = res.iloc[0]
+    return pd.DataFrame([{
+        "null_hypothesis": f"r <= {i}",
+        "trace_stat": r[f"trace_r{i}"],
+        "critical_90": cvt[i, 0], "critical_95": cvt[i, 1], "critical_99": cvt[i, 2],
+        "reject_at_95": bool(r[f"trace_r{i}"] > cvt[i, 1]),
+        "max_eigen_stat": r[f"max_eig_r{i}"],
+        "max_eigen_cv_95": cvm[i, 1],
+        "max_eigen_reject": bool(r[f"max_eig_r{i}"] > cvm[i, 1]),
+        "eigenvalue": r[f"eig_{i + 1}"],
+        "n": int(r["n"]),
+    } for i in range(p)])
+
+
+def _key(levels: pd.DataFrame, settings: dict) -> str:
+    h = hashlib.sha256(np.ascontiguousarray(levels.to_numpy(dtype=float)).tobytes())
+    h.update(np.asarray(levels.index.asi8 if isinstance(levels.index, pd.DatetimeIndex)
+                        else levels.index).tobytes())
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _run_system(task) -> pd.DataFrame:
+    levels, settings = task
+    return rolling_johansen(levels, **settings)
+
+
+def johansen_grid(
+    systems: Mapping[str, pd.DataFrame],
+    window: Optional[int] = None,
+    *,
+    step: int = 1,
+    det_order: int = 0,
+    k_ar_diff: int = 1,
+    min_obs: int = 100,
+    cache_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    `rolling_johansen` for every system (name → DataFrame of level columns),
+    stacked with a leading `system` column in input order. Systems whose
+    complete rows number fewer than max(`min_obs`, `window`) are skipped.
+    """
+    settings = dict(window=window, step=step, det_order=det_order, k_ar_diff=k_ar_diff)
+    jobs, tables = [], {}
+    for name, levels in systems.items():
+        levels = levels.dropna()
+        if len(levels) < max(min_obs, window or 0):
+            continue
+        key = _key(levels, settings)
+        path = os.path.join(cache_dir, f"coint_{key[:16]}.pkl") if cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("key") == key:
+                tables[name] = cached["table"]
+                continue
+        jobs.append((name, key, path, (levels, settings)))
+
+    for (name, key, path, _), table in zip(jobs, parallel_map(_run_system, [t for *_, t in jobs],
+                                                                workers)):
+        tables[name] = table
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                pickle.dump({"key": key, "table": table}, f)
+
+    parts = [tables[name].assign(system=name) for name in systems
+             if name in tables and not tables[name].empty]
+    if not parts:
+        return pd.DataFrame()
+    out = pd.concat(parts, ignore_index=True)
+    return out[["system", *[c for c in out.columns if c != "system"]]]
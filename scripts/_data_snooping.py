@@ -0,0 +1,136 @@
+"""
+Shared helper: data-snooping-adjusted significance for the tournament winner.
+
+The tournament searches every signal × threshold × strategy × lead combo and
+keeps the best OOS Sharpe, so the winner's own bootstrap CI overstates its
+significance. White's (2000) Reality Check and Hansen's (2005) Superior
+Predictive Ability test ask instead whether *any* combo in the searched
+universe beats the benchmark, by bootstrapping the maximum performance
+statistic over all combos jointly.
+
+Input is a (T × K) matrix of performance differentials d[t, k] =
+strategy_k return − benchmark return on the OOS dates; positive means combo
+k beat the benchmark that day. Null: E[d_k] ≤ 0 for every k.
+
+Batching: each bootstrap draw is a resample of the T dates, shared across
+all K combos (this is what makes the test joint). A draw is summarised by
+its resample counts c[b, t], so the resampled means of every combo are one
+matrix product `counts @ d / T` per chunk of draws — no per-combo loop.
+Draws use the stationary bootstrap from `_bootstrap` (serially dependent
+daily returns). Studentisation needs the bootstrap std of each combo's
+mean before the max statistics can be formed, so the draws are generated
+twice from the same seed rather than stored (K × n_boot floats).
+
+Reported p-values:
+  - reality_check      — White's RC (non-studentised, conservative).
+  - spa_lower / spa_consistent / spa_upper
+                       — Hansen's SPA with the l / c / u recentring; the
+                         consistent one is the headline number.
+  - naive              — per-combo bootstrap p-value ignoring the search.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+from _bootstrap import default_block_length, iter_resample_indices
+
+
+def _resampled_means(
+    d: np.ndarray,
+    n_boot: int,
+    seed: int,
+    *,
+    method: str,
+    block_len: int,
+    chunk_size: int,
+) -> Iterator[np.ndarray]:
+    """Yield (chunk × K) blocks of bootstrap column means of `d`."""
+    T = d.shape[0]
+    rng = np.random.default_rng(seed)
+    for idx in iter_resample_indices(T, n_boot, rng, method=method,
+                                     block_len=block_len, chunk_size=chunk_size):
+        b = idx.shape[0]
+        flat = (idx + (np.arange(b) * T)[:, None]).ravel()
+        counts = np.bincount(flat, minlength=b * T).reshape(b, T)
+        yield (counts @ d) / T
+
+
+def spa_test(
+    diffs,
+    n_boot: int = 10_000,
+    *,
+    method: str = "stationary",
+    block_len: Optional[int] = None,
+    seed: int = 42,
+    chunk_size: int = 250,
+) -> dict:
+    """
+    White Reality Check + Hansen SPA p-values for a (T × K) differential matrix.
+
+    Returns a dict with the p-values described in the module docstring plus
+    `n_obs`, `n_models`, `n_boot`, `block_len`, `best_model` (column with the
+    highest mean differential) and `naive` (array of per-column p-values).
+    """
+    d = np.asarray(diffs, dtype=float)
+    if d.ndim == 1:
+        d = d[:, None]
+    d = np.where(np.isnan(d), 0.0, d)
+    T, K = d.shape
+    if T < 2 or K == 0:
+        raise ValueError(f"need at least 2 observations and 1 model, got {d.shape}")
+    L = int(block_len) if block_len else default_block_length(T)
+    sqrt_t = np.sqrt(T)
+    dbar = d.mean(axis=0)
+    draws = dict(method=method, block_len=L, chunk_size=chunk_size)
+
+    # ── Pass 1: bootstrap std of sqrt(T)·mean per combo ──
+    s1 = np.zeros(K)
+    s2 = np.zeros(K)
+    for means in _resampled_means(d, n_boot, seed, **draws):
+        z = sqrt_t * (means - dbar)
+        s1 += z.sum(axis=0)
+        s2 += (z * z).sum(axis=0)
+    omega = np.sqrt(np.maximum(s2 / n_boot - (s1 / n_boot) ** 2, 0.0))
+    live = omega > 0
+    inv_omega = np.where(live, 1.0 / np.where(live, omega, 1.0), 0.0)
+
+    # Hansen recentring: l keeps only outperformers, c drops combos that are
+    # clearly worse than the benchmark, u recentres everything (RC-like).
+    threshold = -np.sqrt(2.0 * np.log(np.log(T))) if T > 15 else -np.inf
+    t_stat = sqrt_t * dbar * inv_omega
+    mu = {
+        "lower": np.maximum(dbar, 0.0),
+        "consistent": np.where(t_stat >= threshold, dbar, 0.0),
+        "upper": dbar,
+    }
+    stat_rc = float(sqrt_t * dbar.max())
+    stat_spa = float(max(np.max(np.where(live, t_stat, -np.inf)), 0.0))
+
+    # ── Pass 2: same draws, max statistics ──
+    exceed = {k: 0 for k in ("reality_check", *mu)}
+    naive_hits = np.zeros(K)
+    for means in _resampled_means(d, n_boot, seed, **draws):
+        centred = sqrt_t * (means - dbar)
+        exceed["reality_check"] += int((centred.max(axis=1) > stat_rc).sum())
+        naive_hits += (centred > sqrt_t * dbar).sum(axis=0)
+        for name, m in mu.items():
+            z = sqrt_t * (means - m) * inv_omega
+            z = np.where(live, z, -np.inf)
+            exceed[name] += int((np.maximum(z.max(axis=1), 0.0) > stat_spa).sum())
+
+    return {
+        "n_obs": T,
+        "n_models": K,
+        "n_boot": n_boot,
+        "block_len": L,
+        "best_model": int(np.argmax(dbar)),
+        "stat_reality_check": stat_rc,
+        "stat_spa": stat_spa,
+        "reality_check": exceed["reality_check"] / n_boot,
+        "spa_lower": exceed["lower"] / n_boot,
+        "spa_consistent": exceed["consistent"] / n_boot,
+        "spa_upper": exceed["upper"] / n_boot,
+        "naive": naive_hits / n_boot,
+    }
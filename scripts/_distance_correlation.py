@@ -0,0 +1,166 @@
+"""
+Shared helper: univariate distance correlation in O(n log n) time, O(n) memory.
+
+`stage1_exploratory.distance_correlation` double-centred two n × n
+`squareform(pdist(...))` matrices. At ~6,500 days that is O(n²) memory, so
+it scored a random 3,000-day subsample and the reported dCor depended on
+the seed.
+
+For scalar x and y, the V-statistic distance covariance only needs
+
+    dCov²(x, y) = S / n² − 2 Σ_i a_i b_i / n³ + a b / n⁴
+
+where a_i = Σ_j |x_i − x_j| (and b_i likewise for y), a = Σ_i a_i, and
+S = Σ_ij |x_i − x_j| |y_i − y_j| (Huo & Székely 2016). After sorting, the
+row sums a_i are prefix-sum formulas. Sort by x and S reduces to
+"dominance sums" over pairs i < j with y_i < y_j. Those are computed
+bottom-up in the merge-sort style (one sort per level, log₂ n levels), fully
+vectorised across a batch of series (rows), so:
+
+  - `dcor`            full-sample distance correlation
+  - `rolling_dcor`    every window of a rolling pass, in row-batches
+  - `dcor_test`       permutation p-value — each batch row is a shuffled y
+
+all share `dcor_rows` and never build an n × n matrix. Values equal the
+double-centred matrix estimator up to rounding.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _row_sums(s: np.ndarray) -> np.ndarray:
+    """Σ_j |s_k − s_j| for each k of row-wise sorted `s` (m × n)."""
+    n = s.shape[1]
+    c = np.cumsum(s, axis=1)
+    k = np.arange(1, n + 1)
+    return (2 * k - n) * s + c[:, -1:] - 2 * c
+
+
+def _dominance_sum(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Σ over i < j (x-sorted positions) with y_i < y_j of (x_j − x_i)(y_j − y_i),
+    per row, for x-sorted rows `xs` and the matching `ys`.
+
+    Bottom-up merge: at block size s each element of a right half-block picks
+    up count / Σx / Σy / Σxy of the lower-y elements of its left half-block.
+    Everything is carried in the current (block, y-rank) order, so each level
+    is one stable sort of already-sorted runs plus flat `np.take` gathers.
+    """
+    m, n = xs.shape
+    base = (np.arange(m) * n)[:, None]
+    yr = np.argsort(np.argsort(ys, axis=1, kind="stable"), axis=1, kind="stable")
+    pos = np.broadcast_to(np.arange(n), (m, n))                 # x-position of each slot
+    feats = np.stack([np.ones_like(xs), xs, ys, xs * ys]).reshape(4, -1)   # count, Σx, Σy, Σxy
+    acc = np.zeros_like(feats)
+    s = 1
+    while s < n:
+        g = pos // (2 * s)
+        idx = (base + np.argsort(g * n + yr, axis=1, kind="stable")).ravel()
+        pos, yr = pos.ravel()[idx].reshape(m, n), yr.ravel()[idx].reshape(m, n)
+        feats, acc = np.take(feats, idx, axis=1), np.take(acc, idx, axis=1)
+        left = ((pos // s) % 2 == 0).ravel()
+        cs = np.zeros((4, m, n + 1))
+        np.cumsum((feats * left).reshape(4, m, n), axis=2, out=cs[:, :, 1:])
+        start = (base + (pos // (2 * s)) * 2 * s).ravel()         # block start, same row
+        below = cs[:, :, :n].reshape(4, -1) - np.take(cs.reshape(4, -1), start + start // n, axis=1)
+        acc += below * ~left
+        s *= 2
+    cnt, sx, sy, sxy = acc
+    _, x, y, _ = feats
+    return (cnt * x * y - x * sy - y * sx + sxy).reshape(m, n).sum(axis=1)
+
+
+def dcor_rows(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+    """Distance correlation of each row pair (X[r], Y[r]); rows must be NaN-free."""
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    m, n = X.shape
+    rows = np.arange(m)[:, None]
+    # centre / scale per row: dCor is invariant, the sums are better conditioned
+    X = X - X.mean(axis=1, keepdims=True)
+    Y = Y - Y.mean(axis=1, keepdims=True)
+
+    ox = np.argsort(X, axis=1, kind="stable")
+    xs, ys_x = X[rows, ox], Y[rows, ox]
+    oy = np.argsort(Y, axis=1, kind="stable")
+    a_i = _row_sums(xs)                                           # x-sorted order
+    b_i = np.empty_like(a_i)
+    b_i[rows, oy] = _row_sums(Y[rows, oy])                        # original order
+    b_i = b_i[rows, ox]
+
+    # Σ_{i<j} (x_j − x_i)|y_j − y_i| = 2·(dominant pairs) − Σ_{i<j}(x_j − x_i)(y_j − y_i)
+    t_all = n * (X * Y).sum(axis=1) - X.sum(axis=1) * Y.sum(axis=1)
+    S = 2 * (2 * _dominance_sum(xs, ys_x) - t_all)
+
+    def _dvar(v, r):
+        ss = 2 * n * (v * v).sum(axis=1) - 2 * v.sum(axis=1) ** 2
+        return ss / n**2 - 2 * (r * r).sum(axis=1) / n**3 + r.sum(axis=1) ** 2 / n**4
+
+    dcov2 = S / n**2 - 2 * (a_i * b_i).sum(axis=1) / n**3 + a_i.sum(axis=1) * b_i.sum(axis=1) / n**4
+    dvx, dvy = _dvar(xs, a_i), _dvar(Y, _row_sums(np.sort(Y, axis=1)))
+    denom = np.sqrt(dvx * dvy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.sqrt(np.maximum(dcov2, 0.0) / denom)
+    return np.where(denom > 0, out, 0.0)
+
+
+def _chunk_rows(n: int, max_cells: int) -> int:
+    return max(1, max_cells // max(n, 1))
+
+
+def dcor(x, y) -> float:
+    """Full-sample distance correlation of two equal-length, NaN-free series."""
+    return float(dcor_rows(np.asarray(x, dtype=float)[None, :], np.asarray(y, dtype=float)[None, :])[0])
+
+
+def rolling_dcor(x, y, window: int, *, step: int = 1, max_cells: int = 250_000) -> dict[str, np.ndarray]:
+    """
+    Distance correlation on windows [e − window, e), e = window, window+step, .., n.
+
+    Returns `end` (exclusive end row) and `dcor`. Windows are scored in
+    row-batches of about `max_cells` values, so memory stays flat.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) != len(y):
+        raise ValueError(f"x length {len(x)} != y length {len(y)}")
+    if np.isnan(x).any() or np.isnan(y).any():
+        raise ValueError("rolling_dcor needs NaN-free inputs")
+    ends = np.arange(window, len(x) + 1, step)
+    if len(ends) == 0:
+        return {"end": ends, "dcor": np.array([])}
+    Xw = sliding_window_view(x, window)[ends - window]
+    Yw = sliding_window_view(y, window)[ends - window]
+    chunk = _chunk_rows(window, max_cells)
+    out = np.concatenate([dcor_rows(Xw[i:i + chunk], Yw[i:i + chunk])
+                          for i in range(0, len(ends), chunk)])
+    return {"end": ends, "dcor": out}
+
+
+def dcor_test(
+    x,
+    y,
+    n_perm: int = 1000,
+    *,
+    seed: Optional[int] = 42,
+    max_cells: int = 250_000,
+) -> dict:
+    """dCor with a permutation p-value (y shuffled), (1 + #{null ≥ dCor}) / (1 + n_perm)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    stat = dcor(x, y)
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    chunk = _chunk_rows(n, max_cells)
+    null = []
+    for i in range(0, n_perm, chunk):
+        b = min(chunk, n_perm - i)
+        Yp = rng.permuted(np.broadcast_to(y, (b, n)), axis=1)
+        null.append(dcor_rows(np.broadcast_to(x, (b, n)), Yp))
+    null = np.concatenate(null) if null else np.array([])
+    p = float((1 + (null >= stat).sum()) / (1 + len(null))) if len(null) else float("nan")
+    return {"dcor": stat, "p_value": p, "n_perm": len(null), "n_obs": n}
@@ -0,0 +1,135 @@
+"""
+Shared helper: cached, multi-restart Gaussian HMM fits with BIC state selection.
+
+The core-models stages fitted one `GaussianHMM(n_components=2,
+random_state=42)` on every run: one seed, so one local optimum of EM, and
+the whole fit was repeated even when only the narrative changed.
+`stage2_core_models.py` pickled its 2- and 3-state models but never read
+them back.
+
+`fit_hmm_grid` fits every (n_states, restart) combination as one batch of
+independent tasks over a forked process pool (`_parallel.parallel_map`).
+For each state count it keeps the restart with the best log-likelihood,
+and it picks the state count with the lowest BIC. Restart r uses
+`random_state = seed + r`, so restart 0 reproduces the previous
+single-seed fit and the best restart is never worse than it.
+
+Results are pickled under `cache_dir`, keyed by a SHA-256 of the feature
+matrix and every hyper-parameter. A rerun on unchanged inputs loads the
+pickle and fits nothing.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from _parallel import parallel_map
+
+
+def fit_key(X: np.ndarray, **hyper) -> str:
+    """SHA-256 of the feature matrix (shape, dtype, bytes) and hyper-parameters."""
+    X = np.ascontiguousarray(X, dtype=float)
+    h = hashlib.sha256()
+    h.update(repr(X.shape).encode())
+    h.update(X.tobytes())
+    h.update(json.dumps(hyper, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+@dataclass
+class HMMGrid:
+    """Best-restart HMM per state count, plus the BIC selection table."""
+
+    models: dict                       # n_states → fitted GaussianHMM
+    table: pd.DataFrame                # n_states, log_likelihood, bic, aic, best_seed, ...
+    best_n_states: int
+    key: str
+    from_cache: bool = field(default=False)
+
+    def model(self, n_states: Optional[int] = None):
+        return self.models[self.best_n_states if n_states is None else n_states]
+
+
+def _fit_one(task):
+    from hmmlearn.hmm import GaussianHMM
+
+    X, n_states, seed, covariance_type, n_iter, tol = task
+    model = GaussianHMM(n_components=n_states, covariance_type=covariance_type,
+                        n_iter=n_iter, tol=tol, random_state=seed)
+    try:
+        model.fit(X)
+        return n_states, seed, float(model.score(X)), model
+    except (ValueError, np.linalg.LinAlgError):
+        return n_states, seed, float("-inf"), None
+
+
+def fit_hmm_grid(
+    X,
+    states: Sequence[int] = (2, 3, 4, 5),
+    *,
+    n_restarts: int = 8,
+    seed: int = 42,
+    covariance_type: str = "full",
+    n_iter: int = 200,
+    tol: float = 1e-2,
+    cache_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> HMMGrid:
+    """
+    Fit GaussianHMMs for every state count in `states` with `n_restarts`
+    seeds each (one parallel batch), keep the best restart per state count
+    and select the state count by BIC. With `cache_dir`, results are loaded
+    from / saved to `hmm_<key>.pkl` there.
+    """
+    X = np.asarray(X, dtype=float)
+    states = sorted({int(k) for k in states})
+    key = fit_key(X, states=states, n_restarts=n_restarts, seed=seed,
+                  covariance_type=covariance_type, n_iter=n_iter, tol=tol)
+    path = os.path.join(cache_dir, f"hmm_{key[:16]}.pkl") if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if isinstance(cached, HMMGrid) and cached.key == key:
+            cached.from_cache = True
+            return cached
+
+    tasks = [(X, k, seed + r, covariance_type, n_iter, tol)
+             for k in states for r in range(n_restarts)]
+    results = parallel_map(_fit_one, tasks, workers)
+
+    models, rows = {}, []
+    for k in states:
+        fits = [(score, s, m) for kk, s, score, m in results if kk == k and m is not None]
+        if not fits:
+            continue
+        score, best_seed, m = max(fits, key=lambda t: t[0])
+        models[k] = m
+        rows.append({
+            "n_states": k,
+            "log_likelihood": score,
+            "bic": float(m.bic(X)),
+            "aic": float(m.aic(X)),
+            "best_seed": best_seed,
+            "converged": bool(m.monitor_.converged),
+            "n_restarts": len(fits),
+            "restart_ll_spread": score - min(f[0] for f in fits),
+        })
+    if not models:
+        raise RuntimeError("every HMM restart failed")
+    table = pd.DataFrame(rows)
+    best = int(table.loc[table["bic"].idxmin(), "n_states"])
+    table["selected"] = table["n_states"] == best
+    out = HMMGrid(models=models, table=table, best_n_states=best, key=key)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(out, f)
+    return out
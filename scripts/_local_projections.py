@@ -0,0 +1,186 @@
+"""
+Shared helper: multi-horizon local projections with shared cross-products.
+
+The core-models stages fit Jordà local projections at three or four
+horizons, each a separate HAC regression (`sm.OLS(...).fit(cov_type="HAC")`
+in a `for h in horizons` loop, later one `regression_grid` cell per
+horizon). An impulse-response curve over every horizon 1..252 meant 252
+regressions that each rebuild the same design. The state-dependent
+("regime") LPs were a second loop with the interaction built by hand.
+
+`local_projections` fits every horizon of a response path at once. All
+horizons share one design z_t = [1, shock, (regime, shock × regime),
+controls]. Horizon h only differs in which rows have a response (the last
+h rows of a forward return are missing), so every per-horizon quantity is
+one matmul of a rows × horizons mask or residual matrix against per-row
+products that are computed once:
+  - XᵀX_h      = Σ_t m_th z_t z_tᵀ             (mask × z⊗z)
+  - Xᵀy_h      = Σ_t m_th y_th z_t             (responses × z)
+  - Newey–West = Σ_l w_lh Σ_t e_th e_(t−l)h z_t z_(t−l)ᵀ   (one lagged z⊗z per lag)
+Cost is one pass over the rows per NW lag for the whole curve, not per
+horizon.
+
+Covariances follow `_batch_ols` ("HAC": Bartlett kernel, no small-sample
+correction, normal reference). An h-period forward return overlaps its
+neighbours by h − 1 periods, so its errors are MA(h − 1) and the usual
+⌊0.75 · n^(1/3)⌋ truncation (~14 lags on daily data) understates the
+standard error well before h = 252. `maxlags=None` therefore uses
+max(h, ⌊0.75 · n_h^(1/3)⌋) per horizon; `maxlags="nw"` keeps the plain
+rule, which reproduces `regression_grid(..., cov_type="HAC")`. NW lags run
+over the rows where the regressors are complete. Responses are expected to
+be missing only at the end of the sample, as forward returns are.
+
+`forward_paths` / `cumulative_paths` build the response matrix from a
+price level or a per-period return series. Horizon 0 of a forward return is
+identically zero, so curves start at h = 1.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from _batch_ols import nw_maxlags
+
+IRF_COLUMNS = ["horizon", "coef", "se", "t_stat", "p_value", "ci_lower", "ci_upper",
+               "r_squared", "n", "nw_lags"]
+
+
+def forward_paths(level: pd.Series, horizons: Sequence[int]) -> pd.DataFrame:
+    """level_(t+h) / level_t − 1 for every h (the pipelines' `*_fwd_*` rule), one column per h."""
+    v = level.to_numpy(dtype=float)
+    n = len(v)
+    idx = np.arange(n)[:, None] + np.asarray(horizons, dtype=int)[None, :]
+    ahead = np.where(idx < n, v[np.minimum(idx, n - 1)], np.nan)
+    return pd.DataFrame(ahead / v[:, None] - 1, index=level.index, columns=list(horizons))
+
+
+def cumulative_paths(returns: pd.Series, horizons: Sequence[int]) -> pd.DataFrame:
+    """r_(t+1) + … + r_(t+h) for every h (`rolling(h).sum().shift(-h)`), one column per h."""
+    r = returns.to_numpy(dtype=float)
+    n = len(r)
+    csum = np.r_[0.0, np.cumsum(np.nan_to_num(r))]
+    cnan = np.r_[0, np.cumsum(np.isnan(r))]
+    idx = np.arange(n)[:, None] + np.asarray(horizons, dtype=int)[None, :]
+    end = np.minimum(idx, n - 1) + 1
+    start = np.arange(n)[:, None] + 1
+    out = csum[end] - csum[start]
+    out[(idx >= n) | (cnan[end] - cnan[start] > 0)] = np.nan
+    return pd.DataFrame(out, index=returns.index, columns=list(horizons))
+
+
+@dataclass
+class LocalProjection:
+    """Coefficients and HAC covariances of every term at every horizon."""
+
+    horizons: np.ndarray         # (H,)
+    terms: list                  # ["const", shock, (regime, shock_x_regime), *controls]
+    params: np.ndarray           # H × k
+    cov: np.ndarray              # H × k × k
+    nobs: np.ndarray             # (H,)
+    maxlags: np.ndarray          # (H,)
+    r_squared: np.ndarray        # (H,)
+
+    def combination(self, weights: dict, *, alpha: float = 0.05) -> pd.DataFrame:
+        """Σ w_term · coef_term per horizon with its HAC standard error, columns IRF_COLUMNS."""
+        w = np.array([weights.get(t, 0.0) for t in self.terms], dtype=float)
+        coef = self.params @ w
+        se = np.sqrt(np.maximum(np.einsum("i,hij,j->h", w, self.cov, w), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tv = coef / se
+        q = stats.norm.ppf(1 - alpha / 2)
+        return pd.DataFrame({
+            "horizon": self.horizons, "coef": coef, "se": se, "t_stat": tv,
+            "p_value": 2 * stats.norm.sf(np.abs(tv)),
+            "ci_lower": coef - q * se, "ci_upper": coef + q * se,
+            "r_squared": self.r_squared, "n": self.nobs, "nw_lags": self.maxlags,
+        })[IRF_COLUMNS]
+
+    def irf(self, term: Optional[str] = None, *, alpha: float = 0.05) -> pd.DataFrame:
+        """Response of one term (default: the shock) across horizons."""
+        return self.combination({term or self.terms[1]: 1.0}, alpha=alpha)
+
+    def state_irfs(self, *, alpha: float = 0.05) -> pd.DataFrame:
+        """Shock response with regime = 0 and regime = 1, stacked with a `state` column."""
+        if len(self.terms) < 4 or not self.terms[3].endswith(f"_x_{self.terms[2]}"):
+            raise ValueError("state_irfs needs a regime-interacted projection")
+        shock, inter = self.terms[1], self.terms[3]
+        out = [self.irf(shock, alpha=alpha).assign(state=0),
+               self.combination({shock: 1.0, inter: 1.0}, alpha=alpha).assign(state=1)]
+        return pd.concat(out, ignore_index=True)[["state", *IRF_COLUMNS]]
+
+
+def local_projections(
+    frame: pd.DataFrame,
+    shock: str,
+    paths: pd.DataFrame,
+    controls: Sequence[str] = (),
+    *,
+    regime: Optional[str] = None,
+    maxlags: Union[None, str, int, Sequence[int]] = None,
+    min_obs: int = 1,
+    rcond: float = 1e-12,
+) -> LocalProjection:
+    """
+    Fit paths[h] ~ 1 + shock (+ regime + shock × regime) + controls for every
+    column h of `paths` (row-aligned with `frame`; columns are horizons).
+    Rows with a missing regressor are dropped from every horizon; each
+    horizon additionally drops its own missing responses. `maxlags` is an
+    int, one int per horizon, "nw" for ⌊0.75 · n_h^(1/3)⌋, or None for the
+    overlap-aware max(h, ⌊0.75 · n_h^(1/3)⌋). Horizons below
+    max(`min_obs`, k + 1) rows are NaN.
+    """
+    controls = [c for c in controls if c in frame.columns]
+    cols = [shock] + ([regime] if regime else []) + controls
+    Zdf = frame[cols].astype(float)
+    if regime:
+        Zdf.insert(2, f"{shock}_x_{regime}", Zdf[shock] * Zdf[regime])
+    Zdf.insert(0, "const", 1.0)
+    terms = list(Zdf.columns)
+    ok = Zdf.notna().all(axis=1).to_numpy()
+    Z = Zdf.to_numpy()[ok]
+    Y = paths.to_numpy(dtype=float)[ok]
+    horizons = np.asarray(paths.columns, dtype=int)
+    n, k = Z.shape
+    H = Y.shape[1]
+
+    M = ~np.isnan(Y)
+    Yz = np.where(M, Y, 0.0)
+    Mf = M.astype(float)
+    nobs = M.sum(axis=0)
+    zz = (Z[:, :, None] * Z[:, None, :]).reshape(n, k * k)
+    xtx = (Mf.T @ zz).reshape(H, k, k)
+    bread = np.linalg.pinv(xtx, rcond=rcond, hermitian=True)
+    beta = np.einsum("hij,hj->hi", bread, Yz.T @ Z)
+    E = (Yz - Z @ beta.T) * Mf                                         # n × H residuals
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ybar = Yz.sum(axis=0) / nobs
+        tss = (((Yz - ybar) ** 2) * Mf).sum(axis=0)
+        r2 = 1 - (E * E).sum(axis=0) / tss
+
+    if maxlags is None:
+        lags = np.maximum(horizons, nw_maxlags(nobs))
+    elif isinstance(maxlags, str):
+        lags = nw_maxlags(nobs)
+    elif np.ndim(maxlags) == 0:
+        lags = np.full(H, int(maxlags))
+    else:
+        lags = np.asarray(maxlags, dtype=int)
+    meat = ((E * E).T @ zz).reshape(H, k, k)
+    for l in range(1, min(int(lags.max(initial=0)), n - 1) + 1):
+        w = np.where(l <= lags, 1 - l / (lags + 1), 0.0)
+        on = np.flatnonzero(w)
+        if not len(on):
+            continue
+        zz_l = (Z[l:, :, None] * Z[:-l, None, :]).reshape(n - l, k * k)  # z_t z_(t−l)ᵀ
+        g = ((E[l:, on] * E[:-l, on]).T @ zz_l).reshape(len(on), k, k)
+        meat[on] += w[on, None, None] * (g + g.transpose(0, 2, 1))
+    cov = bread @ meat @ bread
+
+    bad = nobs < max(min_obs, k + 1)
+    beta[bad], cov[bad], r2[bad] = np.nan, np.nan, np.nan
+    return LocalProjection(horizons=horizons, terms=terms, params=beta, cov=cov,
+                           nobs=nobs, maxlags=lags, r_squared=r2)
@@ -0,0 +1,254 @@
+"""
+Shared helper: EM estimation of Markov-switching regressions with a vectorised
+Hamilton filter / Kim smoother.
+
+`MarkovRegression(...).fit()` was too slow on ~6,500 daily rows, so the
+HY-IG core-models stage fitted it on `ms_data.iloc[::2]` and reindexed the
+smoothed stress probability back onto the daily index. Every other day of
+`ms_2state_stress_prob`, the input of tournament signal S7, was NaN.
+
+`fit_markov_switching` fits
+
+    y_t = X_t β_{s_t} + ε_t,   ε_t ~ N(0, σ²_{s_t}),   P(s_t = j | s_{t-1} = i) = P_ij
+
+(switching coefficients and variances, as MarkovRegression with
+`switching_variance=True`) by EM on the full sample:
+
+  - E step: the filter recursion α_t = (α_{t-1} P) ⊙ f_t and the backward
+    recursion b_t = P (f_{t+1} ⊙ b_{t+1}) are products of the k × k
+    matrices M_t = P diag(f_t). All prefix / suffix products come from a
+    log₂ n doubling scan of batched matmuls (rescaled at every level), not
+    from a Python loop over days. Filtered, smoothed (Kim) and pairwise
+    regime probabilities follow by normalising per row.
+  - M step: weighted least squares per regime, weighted variances, and
+    expected transition counts.
+
+The initial regime distribution is the ergodic one of P (statsmodels'
+default). Regimes are ordered by variance on output, so the last regime is
+always the high-variance (stress) one and labels are stable between runs.
+`MSResult.start_params()` is JSON-serialisable and can be passed back as
+`start=` to warm-start the next run.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_LOG_2PI = np.log(2 * np.pi)
+
+
+@dataclass
+class MSResult:
+    """Fitted Markov-switching regression (regimes ordered by variance)."""
+
+    k_regimes: int
+    exog_names: list
+    beta: np.ndarray            # k × p
+    sigma2: np.ndarray          # k
+    transition: np.ndarray      # k × k, row i = P(s_t = · | s_{t-1} = i)
+    filtered: np.ndarray        # n × k, P(s_t | y_1..t)
+    smoothed: np.ndarray        # n × k, P(s_t | y_1..n)
+    llf: float
+    n_iter: int
+    converged: bool
+    nobs: int
+
+    @property
+    def n_params(self) -> int:
+        k, p = self.beta.shape
+        return k * p + k + k * (k - 1)
+
+    @property
+    def aic(self) -> float:
+        return -2 * self.llf + 2 * self.n_params
+
+    @property
+    def bic(self) -> float:
+        return -2 * self.llf + np.log(self.nobs) * self.n_params
+
+    @property
+    def params(self) -> pd.Series:
+        """Parameters named and ordered as MarkovRegression reports them."""
+        k = self.k_regimes
+        out = {f"p[{i}->{j}]": self.transition[i, j] for j in range(k - 1) for i in range(k)}
+        for c, name in enumerate(self.exog_names):
+            out.update({f"{name}[{r}]": self.beta[r, c] for r in range(k)})
+        out.update({f"sigma2[{r}]": self.sigma2[r] for r in range(k)})
+        return pd.Series(out, dtype=float)
+
+    def start_params(self) -> dict:
+        return {"beta": self.beta.tolist(), "sigma2": self.sigma2.tolist(),
+                "transition": self.transition.tolist()}
+
+
+def ergodic_probs(P: np.ndarray) -> np.ndarray:
+    """Stationary distribution π = π P of a transition matrix."""
+    k = len(P)
+    A = np.vstack([P.T - np.eye(k), np.ones((1, k))])
+    pi = np.linalg.lstsq(A, np.r_[np.zeros(k), 1.0], rcond=None)[0]
+    pi = np.clip(pi, 0.0, None)
+    return pi / pi.sum()
+
+
+def _scan(mats: np.ndarray, reverse: bool = False):
+    """
+    Inclusive prefix products M_0 M_1 .. M_t (or suffix products M_t .. M_{m-1}
+    when `reverse`) of a (m × k × k) stack. Returns the products rescaled to a
+    max entry of 1 and their log scales.
+    """
+    out = mats.copy()
+    logs = np.zeros(len(mats))
+    d = 1
+    while d < len(out):
+        # out[t - d] @ out[t] extends a prefix, out[t] @ out[t + d] a suffix
+        prod = out[:-d] @ out[d:]
+        s = prod.max(axis=(1, 2))
+        s = np.where(s > 0, s, 1.0)
+        tgt = slice(0, len(out) - d) if reverse else slice(d, None)
+        logs[tgt] = logs[:-d] + logs[d:] + np.log(s)
+        out[tgt] = prod / s[:, None, None]
+        d *= 2
+    return out, logs
+
+
+def regression_loglik(y: np.ndarray, X: np.ndarray, beta: np.ndarray, sigma2: np.ndarray) -> np.ndarray:
+    """Per-regime Gaussian log densities of y_t given X_t (n × k)."""
+    resid = y[:, None] - X @ beta.T
+    return -0.5 * (_LOG_2PI + np.log(sigma2) + resid ** 2 / sigma2)
+
+
+def _forward(loglik: np.ndarray, P: np.ndarray, initial: Optional[np.ndarray]):
+    """Unnormalised filter pieces: α_t (rescaled), M_t, and the log-likelihood."""
+    c = loglik.max(axis=1)
+    g = np.exp(loglik - c[:, None])                                       # n × k, row max 1
+    a0 = (ergodic_probs(P) if initial is None else np.asarray(initial, dtype=float)) * g[0]
+    M = P[None, :, :] * g[1:, None, :]                                    # M_t = P diag(g_t), t ≥ 1
+    if len(loglik) > 1:
+        pre, pre_log = _scan(M)
+        alpha = np.vstack([a0, a0 @ pre])
+        llf = np.log(alpha[-1].sum()) + pre_log[-1] + c.sum()
+    else:
+        alpha, llf = a0[None, :], np.log(a0.sum()) + c.sum()
+    return alpha, M, float(llf)
+
+
+def hamilton_filter(loglik, transition, initial=None) -> tuple[np.ndarray, float]:
+    """
+    Filtered probabilities P(s_t | y_1..t) (n × k) and the log-likelihood,
+    from per-regime log densities (n × k) and a row-stochastic transition
+    matrix. `initial` defaults to the ergodic distribution.
+    """
+    alpha, _, llf = _forward(np.asarray(loglik, dtype=float), np.asarray(transition, dtype=float), initial)
+    return alpha / alpha.sum(axis=1, keepdims=True), llf
+
+
+def _e_step(y: np.ndarray, X: np.ndarray, beta: np.ndarray, sigma2: np.ndarray, P: np.ndarray):
+    """Filtered, smoothed and pairwise regime probabilities plus the log-likelihood."""
+    k = len(sigma2)
+    alpha, M, llf = _forward(regression_loglik(y, X, beta, sigma2), P, None)
+    if len(y) > 1:
+        suf, _ = _scan(M, reverse=True)
+        back = np.vstack([suf.sum(axis=2), np.ones((1, k))])              # b_t = M_{t+1}..M_{n-1} 1
+    else:
+        back = np.ones((1, k))
+
+    filtered = alpha / alpha.sum(axis=1, keepdims=True)
+    bn = back / back.max(axis=1, keepdims=True)
+    smoothed = filtered * bn
+    smoothed /= smoothed.sum(axis=1, keepdims=True)
+    # ξ_t(i, j) ∝ α_{t-1}(i) P_ij g_t(j) b_t(j)
+    xi = filtered[:-1, :, None] * M * bn[1:, None, :]
+    xi /= xi.sum(axis=(1, 2), keepdims=True)
+    return filtered, smoothed, xi, llf
+
+
+def _m_step(y: np.ndarray, X: np.ndarray, smoothed: np.ndarray, xi: np.ndarray, var_floor: float):
+    w = smoothed
+    xtwx = np.einsum("tr,ti,tj->rij", w, X, X)
+    xtwy = np.einsum("tr,ti,t->ri", w, X, y)
+    beta = np.einsum("rij,rj->ri", np.linalg.pinv(xtwx, hermitian=True), xtwy)
+    resid = y[:, None] - X @ beta.T
+    sigma2 = np.maximum((w * resid ** 2).sum(axis=0) / np.maximum(w.sum(axis=0), 1e-300), var_floor)
+    counts = xi.sum(axis=0)
+    P = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1e-300)
+    return beta, sigma2, P
+
+
+def _cold_start(y: np.ndarray, X: np.ndarray, k: int):
+    b, *_ = np.linalg.lstsq(X, y, rcond=None)
+    s2 = float(np.mean((y - X @ b) ** 2))
+    P = np.full((k, k), 0.05 / max(k - 1, 1))
+    np.fill_diagonal(P, 0.95 if k > 1 else 1.0)
+    return np.tile(b, (k, 1)), s2 * np.geomspace(0.5, 2.0, k), P
+
+
+def _valid_start(start: Optional[dict], k: int, p: int):
+    if not start:
+        return None
+    try:
+        beta = np.asarray(start["beta"], dtype=float)
+        sigma2 = np.asarray(start["sigma2"], dtype=float)
+        P = np.asarray(start["transition"], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if beta.shape != (k, p) or sigma2.shape != (k,) or P.shape != (k, k):
+        return None
+    if not (np.isfinite(beta).all() and (sigma2 > 0).all() and (P >= 0).all()):
+        return None
+    return beta, sigma2, P / P.sum(axis=1, keepdims=True)
+
+
+def fit_markov_switching(
+    endog,
+    exog,
+    k_regimes: int = 2,
+    *,
+    start: Optional[dict] = None,
+    maxiter: int = 500,
+    tol: float = 1e-6,
+    exog_names: Optional[Sequence[str]] = None,
+) -> MSResult:
+    """
+    EM fit of a `k_regimes`-state switching regression of `endog` on `exog`
+    (include the constant in `exog`, e.g. via `sm.add_constant`).
+
+    `start` is a previous `MSResult.start_params()`. It is used when its
+    shapes match, otherwise the cold start is the pooled OLS fit with a
+    spread of variances. EM stops when the log-likelihood improves by less
+    than `tol`.
+    """
+    y = np.asarray(endog, dtype=float).ravel()
+    X = np.asarray(exog, dtype=float)
+    X = X[:, None] if X.ndim == 1 else X
+    if exog_names is None:
+        exog_names = list(exog.columns) if isinstance(exog, pd.DataFrame) else [f"x{i}" for i in range(X.shape[1])]
+    if np.isnan(y).any() or np.isnan(X).any():
+        raise ValueError("fit_markov_switching needs NaN-free inputs")
+    k, p = int(k_regimes), X.shape[1]
+    if len(y) <= k * (p + 1):
+        raise ValueError(f"{len(y)} observations are too few for {k} regimes")
+
+    beta, sigma2, P = _valid_start(start, k, p) or _cold_start(y, X, k)
+    var_floor = 1e-8 * float(np.var(y)) + 1e-300
+
+    llf_prev, converged, it = -np.inf, False, 0
+    for it in range(1, maxiter + 1):
+        filtered, smoothed, xi, llf = _e_step(y, X, beta, sigma2, P)
+        if abs(llf - llf_prev) < tol:
+            converged = True
+            break
+        llf_prev = llf
+        beta, sigma2, P = _m_step(y, X, smoothed, xi, var_floor)
+    if not converged:
+        filtered, smoothed, xi, llf = _e_step(y, X, beta, sigma2, P)
+
+    order = np.argsort(sigma2, kind="stable")
+    return MSResult(
+        k_regimes=k, exog_names=list(exog_names),
+        beta=beta[order], sigma2=sigma2[order], transition=P[np.ix_(order, order)],
+        filtered=filtered[:, order], smoothed=smoothed[:, order],
+        llf=llf, n_iter=it, converged=converged, nobs=len(y),
+    )
@@ -0,0 +1,1054 @@
+"""
+Shared helper: the generic, spec-driven pair pipeline.
+
+`PairPipeline(spec)` runs the stages every `pair_pipeline_<pair>.py` script
+used to carry its own copy of:
+
+    1_data          FRED + Yahoo sources listed in the spec
+    2_derived       frequency alignment, spec derivations, target returns
+    3_stationarity  batched ADF / KPSS / PP / Zivot–Andrews (`_unit_root`) on the
+                    spec's columns, full resolution
+    4_exploratory   Pearson correlations, prewhitened CCF cube (`_ccf`), quartile
+                    regimes of the primary signal
+    5_models        Granger, transfer entropy (`_transfer_entropy`), HC3
+                    predictive regressions, HAC local projections over
+                    every horizon to lp_max_horizon (`_local_projections`),
+                    tau-grid quantile regression with block-bootstrap CIs and
+                    a 99-tau quantile process (`_quantile_regression`),
+                    full-sample and rolling Johansen for the spec's
+                    cointegration columns (`_cointegration`), residual diagnostics,
+                    interpretation_metadata.json
+    6_tournament    signal × threshold × strategy × lead block on the shared
+                    `PositionBlock` engine, then White RC / Hansen SPA
+    7_validation    top-N winners: walk-forward (`_walk_forward`), i.i.d. and
+                    stationary bootstrap CIs (`_bootstrap`), cost × delay
+                    surface (`_sensitivity`)
+
+Validation reads winner positions straight from the tournament block: every
+position input is causal, so nothing is replayed.
+
+`run_pairs(specs)` runs several specs in one process and batches the rolling
+Johansen windows of all their cointegration systems before stage 5.
+
+Pairs whose spec names its own "pipeline" script (extra models, legacy CSV
+schemas) call the building blocks below — `unit_roots`, `regressions`,
+`impulse_response`, `quantile_regression`, `quantile_process`,
+`cointegration`, `tournament`, `benchmark`, `validation` — instead of
+carrying copies of them; the `stage_*` methods are the generic pairs' thin
+wrappers over the same blocks.
+
+Direction semantics (spec "direction"):
+  - pro_cyclical      bullish when signal > threshold; P2 = min-max scaled signal
+  - counter_cyclical  bullish when signal < threshold; P2 = 1 − min-max scaled
+
+Output layout (schemas match the monthly/daily template pipelines):
+  data/<pair_id>_<frequency>_<tag>.parquet
+  results/<pair_id>/stationarity_tests_<tag>.csv
+  results/<pair_id>/tournament_results_<tag>.csv       — percent form
+  results/<pair_id>/interpretation_metadata.json
+  results/<pair_id>/reality_check.json
+  results/<pair_id>/pipeline_timing_<tag>.json
+  results/<pair_id>/exploratory_<tag>/                 — correlations, CCF, regime stats
+  results/<pair_id>/core_models_<tag>/                 — Granger, TE, regressions, LP, LP
+                                                          impulse response, QR, quantile process,
+                                                          cointegration (full + rolling)
+  results/<pair_id>/tournament_validation_<tag>/       — walk-forward, bootstrap CI,
+                                                          costs, decay, cost × delay,
+                                                          stress tests (spec stress_periods)
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from _batch_ols import regression_grid
+from _bootstrap import bootstrap_sharpe, default_block_length, sharpe_ci_summary
+from _ccf import ar_prewhiten, ccf_frame
+from _cointegration import johansen_grid, johansen_table
+from _data_snooping import spa_test
+from _local_projections import forward_paths, local_projections
+from _pair_spec import COST_GRID_BPS, COST_POINTS_BPS, PairSpec
+from _quantile_regression import PROCESS_TAUS, quantile_grid
+from _rolling_cache import RollingStatsCache
+from _rolling_window import rolling_pct_rank
+from _sensitivity import sensitivity_grid
+from _tournament_engine import PositionBlock
+from _transfer_entropy import te_grid
+from _unit_root import unit_root_tests
+from _walk_forward import make_folds, walk_forward
+
+BASE_DIR = "/workspaces/aig-rlic-plus"
+
+
+# ─────────────────────────────────────────────────────────────
+# DERIVATIONS  (spec "derived": [{"name", "op", "of", **params}])
+# ─────────────────────────────────────────────────────────────
+
+def _pct_change(df, of, periods=1):
+    s = df[of]
+    return (s / s.shift(periods).replace(0, np.nan) - 1) * 100
+
+
+def _diff(df, of, periods=1):
+    s = df[of]
+    return s - s.shift(periods)
+
+
+def _rolling_mean(df, of, window, min_periods=None):
+    return df[of].rolling(window, min_periods=min_periods).mean()
+
+
+def _zscore(df, of, window, min_periods=None):
+    s = df[of]
+    roll = s.rolling(window, min_periods=min_periods)
+    return (s - roll.mean()) / roll.std()
+
+
+def _pct_rank(df, of, window, min_periods):
+    return rolling_pct_rank(df[of], window, min_periods)
+
+
+def _diff_std(df, of, window, min_periods=None):
+    return df[of].diff().rolling(window, min_periods=min_periods).std()
+
+
+def _sub(df, of):
+    a, b = of
+    return df[a] - df[b]
+
+
+def _ratio(df, of):
+    a, b = of
+    return df[a] / df[b]
+
+
+def _splice(df, of, at):
+    a, b = (df[c] for c in of)
+    both = a.notna() & b.notna()
+    b_std = b[both].std()
+    scale = a[both].std() / b_std if b_std > 0 else 1
+    shift = a[both].mean() - b[both].mean() * scale
+    print(f"  splice {of[0]} | {of[1]} after {at}: scale={scale:.3f}, shift={shift:.3f}")
+    out = a.copy()
+    late = df.index > pd.Timestamp(at)
+    out[late] = (b * scale + shift)[late]
+    return out
+
+
+def _above(df, of, value, dtype="float"):
+    return (df[of] > value).astype(dtype)
+
+
+def _below(df, of, value, dtype="float"):
+    return (df[of] < value).astype(dtype)
+
+
+DERIVED_OPS = {
+    "pct_change": _pct_change,     # percent change over `periods` (NaN from a zero base)
+    "diff": _diff,                 # level change over `periods`
+    "rolling_mean": _rolling_mean,
+    "zscore": _zscore,             # rolling z-score
+    "pct_rank": _pct_rank,         # rolling percentile rank
+    "diff_std": _diff_std,         # rolling std of first differences
+    "sub": _sub,                   # of = [a, b] → a − b
+    "ratio": _ratio,               # of = [a, b] → a / b
+    "splice": _splice,             # of = [a, b] → a through `at`, then b rescaled to
+                                   #   a's mean / std over their overlap
+    "above": _above,               # dummy: of > value
+    "below": _below,               # dummy: of < value
+}
+
+
+def _bullish_position(bullish, strategy):
+    """P1 long/cash, P3 long/short; P2 sizing does not depend on the threshold."""
+    pos = bullish.astype(float)
+    return pos * 2 - 1 if strategy == "P3" else pos
+
+
+def _select_winner(valid_df):
+    # ECON-T3 tie-break cascade: oos_sharpe → oos_ann_return → abs(MDD) → n_trades → lexicographic
+    return valid_df.sort_values(
+        ["oos_sharpe", "oos_ann_return", "max_drawdown", "n_trades", "signal"],
+        ascending=[False, False, True, False, True]
+    ).iloc[0]
+
+
+def _sharpe(r, ppy):
+    return (r.mean() / r.std()) * np.sqrt(ppy) if r.std() > 0 else 0
+
+
+def _max_drawdown(r):
+    cum = (1 + r).cumprod()
+    return ((cum - cum.cummax()) / cum.cummax()).min()
+
+
+@dataclass
+class Threshold:
+    """
+    One tournament threshold rule; a bare scalar or Series means Threshold(value).
+
+    `on` is the series compared with `value` (default: the lead-shifted
+    signal), `below` overrides the spec direction (bullish when on < value),
+    and `is_quantile` marks a fixed in-sample quantile of the signal that
+    walk-forward refits on each training window.
+    """
+    value: object
+    below: Optional[bool] = None
+    on: Optional[pd.Series] = None
+    is_quantile: Optional[float] = None
+
+
+def timed(name):
+    def dec(func):
+        @wraps(func)
+        def wrap(self, *a, **kw):
+            t0 = time.time()
+            print(f"\n{'='*60}\n  {name}\n{'='*60}")
+            r = func(self, *a, **kw)
+            el = time.time() - t0
+            self.stage_times[name] = el
+            print(f"  [{name}] {el:.1f}s")
+            return r
+        return wrap
+    return dec
+
+
+class PairPipeline:
+    """Runs the shared pipeline stages for one `PairSpec`."""
+
+    def __init__(self, spec: PairSpec, base_dir: str = BASE_DIR):
+        self.spec = spec
+        tag = spec.date_tag
+        self.data_dir = os.path.join(base_dir, "data")
+        self.results_dir = os.path.join(base_dir, "results", spec.pair_id)
+        self.explore_dir = os.path.join(self.results_dir, f"exploratory_{tag}")
+        self.models_dir = os.path.join(self.results_dir, f"core_models_{tag}")
+        self.valid_dir = os.path.join(self.results_dir, f"tournament_validation_{tag}")
+        self.cache_dir = os.path.join(base_dir, "results", "_cache")     # shared across pairs
+        self.stage_times: dict = {}
+        self.roll = RollingStatsCache()
+        # Filled by tournament(), read by validation()
+        self.block: PositionBlock | None = None
+        self.metrics: pd.DataFrame | None = None
+        self._refits: dict = {}         # block column → (signal column, q, below, flip)
+
+    def _makedirs(self):
+        for d in [self.data_dir, self.results_dir, self.explore_dir,
+                  self.models_dir, self.valid_dir]:
+            os.makedirs(d, exist_ok=True)
+
+    # ===== STAGE 1: DATA =====
+    @timed("1_data")
+    def stage_data(self) -> dict:
+        from fredapi import Fred
+        import yfinance as yf
+
+        spec = self.spec
+        series = {}
+        fred_ids = spec.sources.get("fred", {})
+        if fred_ids:
+            # fredapi reads FRED_API_KEY from the environment when api_key is None
+            fred = Fred(api_key=os.environ.get("FRED_API_KEY"))
+            for sid, name in fred_ids.items():
+                try:
+                    s = fred.get_series(sid, observation_start=spec.start_date,
+                                        observation_end=spec.end_date)
+                    series[name] = s.astype(float)
+                    v = s.dropna()
+                    print(f"  [FRED] {sid:10s} -> {name}: {len(v)} obs, "
+                          f"{v.index.min().date()} to {v.index.max().date()}")
+                except Exception as e:
+                    print(f"  [FRED] {sid} FAILED: {e}")
+
+        for ticker, name in spec.sources.get("yahoo", {}).items():
+            try:
+                df = yf.download(ticker, start=spec.start_date, end=spec.end_date,
+                                 progress=False, auto_adjust=True)
+                if isinstance(df.columns, pd.MultiIndex):
+                    df.columns = df.columns.get_level_values(0)
+                s = df["Close"]
+                s.index = s.index.tz_localize(None) if s.index.tz else s.index
+                series[name] = s.astype(float)
+                print(f"  [YF]   {ticker:10s} -> {name}: {len(s)} obs")
+            except Exception as e:
+                print(f"  [YF]   {ticker} FAILED: {e}")
+
+        return series
+
+    # ===== STAGE 2: ALIGNMENT + DERIVED =====
+    @timed("2_derived")
+    def stage_derived(self, series: dict) -> pd.DataFrame:
+        spec, p = self.spec, self.spec.p
+        names = [n for src in spec.sources.values() for n in src.values()]
+        if spec.frequency == "monthly":
+            idx = pd.date_range(spec.start_date, spec.end_date, freq="ME")
+            df = pd.DataFrame(index=idx)
+            for col in names:
+                if col in series:
+                    df[col] = series[col].resample("ME").last().reindex(idx)
+            df = df.ffill(limit=p["ffill_limit"])
+        else:
+            idx = pd.bdate_range(spec.start_date, spec.end_date)
+            df = pd.DataFrame(index=idx)
+            for col in names:
+                if col in series:
+                    df[col] = series[col].reindex(idx).ffill(limit=p["ffill_limit"])
+        df.index.name = "date"
+
+        for d in spec.derived:
+            d = dict(d)
+            name, op, of = d.pop("name"), d.pop("op"), d.pop("of")
+            if op not in DERIVED_OPS:
+                raise ValueError(f"{spec.pair_id}: unknown derived op {op!r} for {name}")
+            inputs = [of] if isinstance(of, str) else of
+            missing = [c for c in inputs if c not in df.columns]
+            if missing:
+                print(f"  SKIP {name}: missing {missing}")
+                continue
+            df[name] = DERIVED_OPS[op](df, of, **d)
+
+        if spec.target in df.columns:
+            t = df[spec.target]
+            df[spec.ret_col] = t.pct_change()
+            for h in p["horizons"]:
+                df[spec.fwd_col(h)] = t.shift(-h) / t - 1
+
+        df = df.dropna(subset=spec.required)
+        print(f"  Dataset: {df.shape}, {df.index.min().date()} to {df.index.max().date()}")
+        return df
+
+    # ===== SHARED BUILDING BLOCKS =====
+    # Raw, unrounded results; the stages below and the pairs with their own
+    # pipeline script format and write them.
+
+    def unit_roots(self, series: dict) -> pd.DataFrame:
+        """Batched unit-root tests of `series` ({name: Series}), cached by series hash across pairs."""
+        p = self.spec.p
+        return unit_root_tests(series, p["stationarity_tests"], min_obs=p["min_stationarity_obs"],
+                               cache_dir=os.path.join(self.cache_dir, "unit_root"))
+
+    def regressions(self, work: pd.DataFrame, signals=None, targets=None) -> pd.DataFrame:
+        """HC3 predictive regressions, every signal × forward-return cell in one batch."""
+        spec, p = self.spec, self.spec.p
+        return regression_grid(work, spec.regression_signals if signals is None else signals,
+                               [spec.fwd_col(h) for h in p["horizons"]] if targets is None else targets,
+                               cov_type="HC3", min_obs=p["min_obs"])
+
+    def lp_paths(self, df: pd.DataFrame, index=None) -> pd.DataFrame:
+        """Forward target returns over every horizon 1..lp_max_horizon, on `index` if given."""
+        paths = forward_paths(df[self.spec.target], range(1, self.spec.p["lp_max_horizon"] + 1))
+        return paths if index is None else paths.loc[index]
+
+    def impulse_response(self, work: pd.DataFrame, paths: pd.DataFrame, signal=None,
+                         controls=None) -> pd.DataFrame:
+        """
+        HAC local projections of `paths` on `signal` (default: the primary
+        signal) and `controls` (default: the spec's lp_controls): the whole
+        IRF in one fit, at least h Newey–West lags for overlapping returns.
+        Horizons with fewer than max(min_lp_obs, k + 3) rows are dropped.
+        """
+        spec, p = self.spec, self.spec.p
+        ctrls = [c for c in (spec.lp_controls if controls is None else controls) if c in work.columns]
+        irf = local_projections(work, signal or spec.primary_signal, paths, ctrls,
+                                min_obs=p["min_lp_obs"]).irf()
+        return irf[irf["n"] >= max(p["min_lp_obs"], len(ctrls) + 3)]
+
+    def quantile_regression(self, work: pd.DataFrame, signal=None, horizon=None) -> pd.DataFrame:
+        """
+        Tau-grid quantile regression of the `horizon` (default: qr_horizon)
+        forward return on `signal`, block-bootstrap CIs: the signal-term rows
+        of `quantile_grid` plus an intercept column. Empty at min_obs rows or
+        fewer.
+        """
+        spec, p = self.spec, self.spec.p
+        signal = signal or spec.primary_signal
+        h = p["qr_horizon"] if horizon is None else horizon
+        fwd = spec.fwd_col(h)
+        valid = work[[signal, fwd]].dropna() if fwd in work.columns else pd.DataFrame()
+        if len(valid) <= p["min_obs"]:
+            return pd.DataFrame()
+        qr = quantile_grid(valid, signal, [fwd], n_boot=p["qr_bootstrap"], block_len=h, seed=42)
+        return self._with_intercept(qr, signal)
+
+    def quantile_process(self, work: pd.DataFrame, signal=None, horizons=None) -> pd.DataFrame:
+        """99-tau quantile process of `signal` at every forward horizon (column `horizon`)."""
+        spec, p = self.spec, self.spec.p
+        signal = signal or spec.primary_signal
+        parts = []
+        for h in p["horizons"] if horizons is None else horizons:
+            qp = quantile_grid(work, signal, [spec.fwd_col(h)], PROCESS_TAUS,
+                               n_boot=p["qr_process_bootstrap"], block_len=h, seed=42,
+                               min_obs=p["min_obs"] + 1)
+            if len(qp):
+                parts.append(self._with_intercept(qp, signal).assign(horizon=h))
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    @staticmethod
+    def _with_intercept(qr: pd.DataFrame, signal: str) -> pd.DataFrame:
+        coefs = qr.pivot(index="quantile", columns="term", values="coef")
+        rows = qr[qr["term"] == signal].reset_index(drop=True)
+        return rows.assign(intercept=coefs.loc[rows["quantile"], "Intercept"].to_numpy())
+
+    def coint_systems(self, df: pd.DataFrame, columns=None) -> dict:
+        """Target vs each level column (default: spec cointegration), logged where positive."""
+        spec = self.spec
+        systems = {}
+        for col in spec.cointegration if columns is None else columns:
+            if col not in df.columns or spec.target not in df.columns:
+                continue
+            levels = df[[spec.target, col]].dropna()
+            logged = {c: f"log_{c}" for c in levels.columns if (levels[c] > 0).all()}
+            levels = levels.apply(lambda s: np.log(s) if s.name in logged else s).rename(columns=logged)
+            systems["~".join(levels.columns)] = levels
+        return systems
+
+    def cointegration(self, systems: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Johansen trace tests of `systems` ({name: levels frame}): the
+        full-sample table of every system with min_coint_obs rows (system
+        column first) and the rolling coint_window grid, batched across the
+        systems and cached across pairs.
+        """
+        p = self.spec.p
+        coint_opts = dict(det_order=p["coint_det_order"], k_ar_diff=p["coint_k_ar_diff"])
+        tables = [johansen_table(lv, **coint_opts).assign(system=name)
+                  for name, lv in systems.items() if len(lv) >= p["min_coint_obs"]]
+        table = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=["system"])
+        table = table[["system", *[c for c in table.columns if c != "system"]]]
+        roll = johansen_grid(systems, p["coint_window"], **coint_opts, min_obs=p["min_coint_obs"],
+                             cache_dir=os.path.join(self.cache_dir, "cointegration"))
+        return table, roll
+
+    def default_thresholds(self, sig_name: str, signal: pd.Series, lead: int,
+                           is_sig: pd.Series) -> dict:
+        """T1 fixed IS percentiles, T2 rolling percentiles, plus the spec's extra_thresholds."""
+        p = self.spec.p
+        pcts = p["percentiles"]
+        rules = {f"T1_p{pct}": Threshold(is_sig.quantile(pct / 100), is_quantile=pct / 100)
+                 for pct in pcts}
+        rq = self.roll.quantiles(signal, p["roll_window"], p["roll_min_periods"],
+                                 [pct / 100 for pct in pcts], lead)
+        rules.update({f"T2_rp{pct}": rq[pct / 100] for pct in pcts})
+        rules.update(self.spec.tournament.get("extra_thresholds", {}).get(sig_name, {}))
+        return rules
+
+    def band_thresholds(self, sig_name: str, signal: pd.Series, lead: int,
+                        is_sig: pd.Series) -> dict:
+        """
+        The monthly template's family: T1 fixed IS percentiles (given more than
+        20 IS observations), T2 rolling percentiles, T3 rolling mean ± k·std
+        bands (the _neg_ rules take the lower band against the spec
+        direction), plus the spec's extra_thresholds.
+        """
+        p = self.spec.p
+        window, minp, pcts = p["roll_window"], p["roll_min_periods"], p["percentiles"]
+        neg_below = not self.spec.counter_cyclical
+        rules = {}
+        if len(is_sig) > 20:
+            rules.update({f"T1_fixed_p{pct}": Threshold(is_sig.quantile(pct / 100),
+                                                        is_quantile=pct / 100) for pct in pcts})
+        rq = self.roll.quantiles(signal, window, minp, [pct / 100 for pct in pcts], lead)
+        rules.update({f"T2_roll_p{pct}": rq[pct / 100] for pct in pcts})
+        mean = self.roll.stat(signal, window, minp, "mean", lead)
+        std = self.roll.stat(signal, window, minp, "std", lead)
+        for k in [1.0, 1.5, 2.0]:
+            rules[f"T3_zscore_{k}"] = mean + k * std
+            rules[f"T3_zscore_neg_{k}"] = Threshold(mean - k * std, below=neg_below)
+        rules.update(self.spec.tournament.get("extra_thresholds", {}).get(sig_name, {}))
+        return rules
+
+    def tournament(self, work: pd.DataFrame, signals: dict,
+                   thresholds: Optional[Callable] = None, *, is_mask, oos_mask,
+                   orientations: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Signal × threshold × strategy × lead block on the shared `PositionBlock`.
+
+        `signals` maps signal names to `work` columns. `thresholds(sig_name,
+        signal, lead, is_sig)` returns {name: rule} per signal and lead (see
+        `Threshold`; default `default_thresholds`). P1 long/cash and P3
+        long/short follow the rule, P2 sizes by the rolling min-max scaled
+        signal, inverted when counter-cyclical. `orientations` ({name: flip})
+        also runs every combo with the direction flipped when `flip`, tagged
+        with an "orientation" column.
+
+        Returns the raw metrics of the combos that pass the is_n / oos_n
+        floors, with `valid` and the block `column`; also kept on
+        `self.block` / `self.metrics` for `reality_check` and `validation`.
+        """
+        spec, p = self.spec, self.spec.p
+        thresholds = thresholds or self.default_thresholds
+        orientations = orientations or {None: False}
+        window, minp, lead_key = p["roll_window"], p["roll_min_periods"], spec.lead_key
+        available = {k: v for k, v in signals.items()
+                     if v in work.columns and work[v].notna().sum() > p["min_signal_obs"]}
+
+        block = PositionBlock(work.index)
+        self._refits = {}
+        for sig_name, sig_col in available.items():
+            signal = work[sig_col]
+            for lead in p["leads"]:
+                sig_l = self.roll.shifted(signal, lead)
+                is_sig = sig_l[is_mask].dropna()
+                if len(is_sig) < p["min_is_signal_obs"]:
+                    continue
+
+                rules = {k: r if isinstance(r, Threshold) else Threshold(r)
+                         for k, r in thresholds(sig_name, signal, lead, is_sig).items()}
+                sig_arr = sig_l.to_numpy(dtype=float)
+                scaled = self.roll.minmax_scaled(signal, window, minp, lead)
+                for orient, flip in orientations.items():
+                    p2_col = block.add_positions(
+                        (1 - scaled) if spec.counter_cyclical != flip else scaled)
+                    for tname, rule in rules.items():
+                        below = spec.counter_cyclical if rule.below is None else rule.below
+                        on = sig_arr if rule.on is None else rule.on.to_numpy(dtype=float)
+                        t_arr = (rule.value.to_numpy(dtype=float)
+                                 if isinstance(rule.value, pd.Series) else rule.value)
+                        bullish = on < t_arr if below else on > t_arr
+                        if flip:
+                            bullish = ~bullish
+                        meta = {"signal": sig_name, "threshold": tname, lead_key: lead}
+                        if orient is not None:
+                            meta["orientation"] = orient
+                        p1 = block.add({**meta, "strategy": "P1"}, bullish.astype(float))
+                        block.add({**meta, "strategy": "P2"}, column=p2_col)
+                        p3 = block.add({**meta, "strategy": "P3"}, bullish.astype(float) * 2 - 1)
+                        if rule.is_quantile is not None and rule.on is None:
+                            for col in (p1, p3):
+                                self._refits[col] = (sig_col, rule.is_quantile, below, flip)
+
+        m = block.evaluate(work[spec.ret_col], is_mask, oos_mask, periods_per_year=p["periods_per_year"],
+                           trade_eps=p["trade_eps"])
+        m = m[(m["is_n"] >= p["min_is_n"]) & (m["oos_n"] >= p["min_oos_n"])]
+        m = m.assign(valid=(m["oos_sharpe"] > 0) & (m["annual_turnover"] < p["max_turnover"])
+                     & (m["oos_n"] >= p["min_oos_n"]) & (m["n_trades"] >= p["min_trades"]))
+        self.block = block
+        self.metrics = m.assign(column=block.column_ids(m.index)).reset_index(drop=True)
+        return self.metrics
+
+    def benchmark(self, returns: pd.Series, is_mask, oos_mask) -> dict:
+        """Buy-and-hold metrics of `returns`, in the raw form of `PositionBlock.evaluate`."""
+        ppy = self.spec.p["periods_per_year"]
+        is_r, oos = returns[is_mask].dropna(), returns[oos_mask].dropna()
+        dd = _max_drawdown(oos) if len(oos) else np.nan
+        ann_ret = oos.mean() * ppy
+        down = oos[oos < 0]
+        down_vol = down.std() * np.sqrt(ppy) if len(down) > 1 else np.nan
+        return {"is_n": len(is_r), "oos_n": len(oos), "is_sharpe": _sharpe(is_r, ppy),
+                "oos_sharpe": _sharpe(oos, ppy), "oos_ann_return": ann_ret,
+                "oos_ann_vol": oos.std() * np.sqrt(ppy),
+                "oos_sortino": ann_ret / down_vol if down_vol > 0 else 0,
+                "oos_calmar": ann_ret / abs(dd) if abs(dd) > 0 else 0,
+                "max_drawdown": dd, "win_rate": (oos > 0).mean() if len(oos) else np.nan,
+                "n_trades": 0, "annual_turnover": 0}
+
+    def results_table(self, metrics: pd.DataFrame, columns: list,
+                      benchmark: Optional[dict] = None, percent: bool = True) -> pd.DataFrame:
+        """
+        tournament_results frame: `columns` of `metrics` rows, then the
+        `benchmark` row (labels over `benchmark()` metrics) when it has OOS
+        data. Returns, vol and drawdown in percent (2 dp), or as ratios (6 dp)
+        when not `percent`; turnover 2 dp, other ratios 4 dp.
+        """
+        counts = {"is_n", "oos_n", "n_trades", self.spec.lead_key}
+        rows = metrics.to_dict("records")
+        if benchmark is not None and benchmark["oos_n"] > 0:
+            rows.append(benchmark)
+        out = []
+        for r in rows:
+            row = {}
+            for c in columns:
+                v = r[c]
+                if c in ("oos_ann_return", "oos_ann_vol", "max_drawdown"):
+                    v = round(v * 100, 2) if percent else round(v, 6)
+                elif c == "annual_turnover":
+                    v = round(v, 2)
+                elif c in counts:
+                    v = int(v)
+                elif c == "valid":
+                    v = bool(v)
+                elif isinstance(v, float):
+                    v = round(v, 4)
+                row[c] = v
+            out.append(row)
+        return pd.DataFrame(out, columns=columns)
+
+    def reality_check(self, work: pd.DataFrame, oos_mask):
+        """
+        White Reality Check / Hansen SPA over every reported combo vs buy-and-hold
+        of the target (OOS return differentials, joint stationary bootstrap).
+        """
+        spec, m = self.spec, self.metrics
+        vs = m[m["valid"]]
+        if len(vs) == 0:
+            return
+        winner = _select_winner(vs)
+        cols, inv = np.unique(m["column"].to_numpy(), return_inverse=True)
+        strat = self.block.strategy_returns(work[spec.ret_col], oos_mask, cols)
+        bench = work.loc[oos_mask, spec.ret_col].fillna(0).to_numpy()
+        res = spa_test(strat - bench[:, None], 10000, seed=42)
+        k = int(inv[winner.name])
+
+        lead_key = spec.lead_key
+        rc = {
+            "pair_id":          spec.pair_id,
+            "generated_at":     datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "benchmark":        f"buy_hold_{spec.target}",
+            "performance":      f"{spec.frequency} OOS return differential vs benchmark",
+            "bootstrap":        "stationary",
+            "n_boot":           res["n_boot"],
+            "block_len":        res["block_len"],
+            "n_obs":            res["n_obs"],
+            "n_combos":         len(m),
+            "n_unique_series":  res["n_models"],
+            "winner_signal":    winner["signal"],
+            "winner_threshold": winner["threshold"],
+            "winner_strategy":  winner["strategy"],
+            f"winner_{lead_key}": int(winner[lead_key]),
+            "winner_oos_sharpe":round(float(winner["oos_sharpe"]), 4),
+            "winner_naive_pvalue":   round(float(res["naive"][k]), 4),
+            "reality_check_pvalue":  round(res["reality_check"], 4),
+            "spa_pvalue_lower":      round(res["spa_lower"], 4),
+            "spa_pvalue_consistent": round(res["spa_consistent"], 4),
+            "spa_pvalue_upper":      round(res["spa_upper"], 4),
+            "significant_at_5pct":   bool(res["spa_consistent"] < 0.05),
+        }
+        if "orientation" in m.columns:
+            rc["winner_orientation"] = winner["orientation"]
+        with open(os.path.join(self.results_dir, "reality_check.json"), "w") as f:
+            json.dump(rc, f, indent=2)
+        print(f"  Data snooping: SPA p={rc['spa_pvalue_consistent']:.3f}"
+              f"  RC p={rc['reality_check_pvalue']:.3f}"
+              f"  (winner naive p={rc['winner_naive_pvalue']:.3f}, {res['n_models']} series)")
+
+    def validation(self, work: pd.DataFrame, oos_mask) -> dict[str, pd.DataFrame]:
+        """
+        Walk-forward, bootstrap CI, transaction costs, signal decay, cost × delay
+        surface and (with spec stress_periods) stress tests for the top-N valid
+        combos, read from the tournament's position block. Returns
+        {output name: frame}; empty when nothing is valid.
+        """
+        spec, p, m = self.spec, self.spec.p, self.metrics
+        if m is None or not m["valid"].any():
+            print("  No valid winners to validate.")
+            return {}
+        ppy, lead_key, ret = p["periods_per_year"], spec.lead_key, spec.ret_col
+        returns = work[ret]
+        first = p["wf_first_year"]
+        folds = make_folds(work.index, test_freq="YS", train_span=pd.DateOffset(years=5),
+                           first_test=(None if first is None else
+                                       f"{max(work.index[0].year + 5, first)}-01-01"))
+        top = m[m["valid"]].nlargest(p["top_n_validation"], "oos_sharpe")
+
+        all_wf, all_boot, all_costs, all_decay, all_surface, all_stress = [], [], [], [], [], []
+        for rank, row in enumerate(top.itertuples(index=False), 1):
+            sig_name, tname, strat = row.signal, row.threshold, row.strategy
+            lead = int(getattr(row, lead_key))
+            tag = {"rank": rank, "signal": sig_name, "threshold": tname,
+                   "strategy": strat, lead_key: lead}
+            if "orientation" in m.columns:
+                tag["orientation"] = row.orientation
+            pos = self.block.position_series(int(row.column))
+            print(f"  [{rank}] {sig_name}/{tname}/{strat}/L{lead} (OOS Sharpe={row.oos_sharpe:.2f})")
+
+            # 1. Walk-forward (5yr rolling train / 1yr test); a fixed IS
+            #    percentile is refit on each training window
+            refit = train_values = None
+            fit = self._refits.get(int(row.column))
+            if fit is not None:
+                sig_col, q, below, flip = fit
+                signal = work[sig_col]
+                sig_l = signal.shift(lead).to_numpy(dtype=float)
+                train_values = signal
+
+                def refit(win, rows, sig_l=sig_l, q=q, below=below, flip=flip, strat=strat):
+                    thr = win.quantile(q)
+                    bullish = sig_l[rows] < thr if below else sig_l[rows] > thr
+                    return _bullish_position(~bullish if flip else bullish, strat)
+            wf = walk_forward(folds, returns, pos.to_numpy(dtype=float),
+                              train_values=train_values, refit=refit,
+                              min_train_obs=p["wf_min_train_obs"],
+                              min_test_obs=p["wf_min_test_obs"], periods_per_year=ppy)
+            all_wf += [{**tag, "test_year": f.label.year, "oos_sharpe": round(f.sharpe, 4),
+                        "n_obs": int(f.n_obs)} for f in wf.itertuples(index=False)]
+
+            # 2. Bootstrap: i.i.d. and stationary-block CIs of the OOS Sharpe
+            strat_ret = pos.shift(1) * returns
+            oos_ret = strat_ret[oos_mask].dropna()
+            if len(oos_ret) >= p["min_oos_n"]:
+                boot = bootstrap_sharpe(oos_ret.values, 10000, seed=42, periods_per_year=ppy)
+                block_len = default_block_length(len(oos_ret))
+                block_ci = sharpe_ci_summary(bootstrap_sharpe(
+                    oos_ret.values, 10000, method="stationary", block_len=block_len,
+                    seed=42, periods_per_year=ppy))
+                all_boot.append({**tag, **sharpe_ci_summary(boot), "block_len": block_len,
+                                 "block_ci_2_5": block_ci["ci_2_5"],
+                                 "block_ci_97_5": block_ci["ci_97_5"],
+                                 "block_pct_positive": block_ci["pct_positive"]})
+
+            # 3-4. Transaction costs × execution delay
+            grid = sensitivity_grid(pos[oos_mask], returns[oos_mask], bps=COST_GRID_BPS,
+                                    delays=p["delay_grid"], periods_per_year=ppy)
+            grid = grid[grid["n_obs"] >= p["min_oos_n"]]
+            all_surface += [{**tag, "execution_delay": int(g.execution_delay),
+                             "tx_cost_bps": float(g.tx_cost_bps),
+                             "net_sharpe": round(g.net_sharpe, 4)} for g in grid.itertuples()]
+            for g in grid[(grid["execution_delay"] == 0)
+                          & grid["tx_cost_bps"].isin(COST_POINTS_BPS)].itertuples():
+                all_costs.append({**tag, "tx_cost_bps": int(g.tx_cost_bps),
+                                  "net_sharpe_approx": round(g.net_sharpe, 4),
+                                  "oos_sharpe": round(row.oos_sharpe, 4)})
+            for g in grid[(grid["tx_cost_bps"] == 0)
+                          & grid["execution_delay"].isin(p["decay_points"])].itertuples():
+                all_decay.append({**tag, "execution_delay": int(g.execution_delay),
+                                  "oos_sharpe": round(g.net_sharpe, 4)})
+
+            # 5. Stress periods: the full-history positions over each window
+            for name, start, end in spec.stress_periods:
+                pmask = (work.index >= start) & (work.index <= end)
+                s_ret = strat_ret[pmask].dropna()
+                if len(s_ret) < p["min_stress_obs"]:
+                    continue
+                all_stress.append({**tag, "period": name, "start": start, "end": end,
+                                   "strategy_sharpe": round(_sharpe(s_ret, ppy), 4),
+                                   "strategy_max_dd": round(_max_drawdown(s_ret) * 100, 2),
+                                   "benchmark_sharpe": round(_sharpe(returns[pmask].dropna(), ppy), 4),
+                                   "n_obs": len(s_ret)})
+
+        out = {"walk_forward": all_wf, "bootstrap_ci": all_boot, "transaction_costs": all_costs,
+               "signal_decay": all_decay, "cost_delay_surface": all_surface}
+        if spec.stress_periods:
+            out["stress_tests"] = all_stress
+        print(f"  Walk-forward:{len(all_wf)}  Bootstrap:{len(all_boot)}  "
+              f"Costs:{len(all_costs)}  Decay:{len(all_decay)}"
+              + (f"  Stress:{len(all_stress)}" if spec.stress_periods else ""))
+        return {name: pd.DataFrame(rows) for name, rows in out.items()}
+
+    def write_validation(self, frames: dict):
+        for name, frame in frames.items():
+            frame.to_csv(os.path.join(self.valid_dir, f"{name}.csv"), index=False)
+
+    # ===== STAGE 3: STATIONARITY =====
+    @timed("3_stationarity")
+    def stage_stationarity(self, df: pd.DataFrame) -> pd.DataFrame:
+        spec = self.spec
+        # full resolution; results cached by series hash across pairs
+        res = self.unit_roots({c: df[c] for c in spec.stationarity if c in df.columns})
+        for r in res[res["test"] == "ADF"].itertuples(index=False):
+            print(f"  ADF {r.variable}: stat={r.statistic:.3f}, p={r.p_value:.4f}")
+        stat_df = res[["variable", "test", "statistic", "p_value", "conclusion"]].round(
+            {"statistic": 4, "p_value": 4})
+        stat_df.to_csv(os.path.join(self.results_dir, f"stationarity_tests_{spec.date_tag}.csv"),
+                       index=False)
+        print(f"  {len(stat_df)} tests saved")
+        return stat_df
+
+    # ===== STAGE 4: EXPLORATORY =====
+    @timed("4_exploratory")
+    def stage_exploratory(self, df: pd.DataFrame) -> pd.DataFrame:
+        spec, p = self.spec, self.spec.p
+        signals = [c for c in spec.exploratory_signals if c in df.columns]
+        fwd_cols = [spec.fwd_col(h) for h in p["horizons"] if spec.fwd_col(h) in df.columns]
+
+        corr_results = []
+        for sig in signals:
+            for fwd in fwd_cols:
+                valid = df[[sig, fwd]].dropna()
+                if len(valid) < p["min_obs"]:
+                    continue
+                r, pv = stats.pearsonr(valid[sig], valid[fwd])
+                corr_results.append({"signal": sig, "horizon": fwd, "method": "Pearson",
+                                     "correlation": round(r, 4), "p_value": round(pv, 4),
+                                     "n": len(valid)})
+        corr_df = pd.DataFrame(corr_results)
+        corr_df.to_csv(os.path.join(self.explore_dir, "correlations.csv"), index=False)
+
+        # Prewhitened CCF of every exploratory signal vs the target return
+        ccf_df = pd.DataFrame()
+        if signals and spec.ret_col in df.columns:
+            pw = ar_prewhiten(df[signals + [spec.ret_col]], lags=p["ccf_ar_lags"])
+            ccf_df = ccf_frame(pw[signals], pw[[spec.ret_col]], p["ccf_max_lag"])
+            ccf_df = ccf_df.dropna(subset=["ccf"]).round({"ccf": 4, "se": 4})
+        ccf_df.to_csv(os.path.join(self.explore_dir, "ccf.csv"), index=False)
+
+        # Regime stats (quartiles of the primary signal)
+        regime_results = []
+        primary, ppy = spec.primary_signal, p["periods_per_year"]
+        if primary in df.columns and spec.ret_col in df.columns:
+            valid = df[[primary, spec.ret_col]].dropna()
+            if len(valid) > p["min_regime_obs"]:
+                quartiles = pd.qcut(valid[primary], 4, labels=["Q1_low", "Q2", "Q3", "Q4_high"])
+                for q in ["Q1_low", "Q2", "Q3", "Q4_high"]:
+                    rets = valid.loc[quartiles == q, spec.ret_col]
+                    if len(rets) < p["min_regime_bucket"]:
+                        continue
+                    ann_ret = rets.mean() * ppy * 100
+                    ann_vol = rets.std() * np.sqrt(ppy) * 100
+                    regime_results.append({"regime": q, f"n_{p['count_key']}": len(rets),
+                        "ann_return_pct": round(ann_ret, 2), "ann_vol_pct": round(ann_vol, 2),
+                        "sharpe": round(ann_ret / ann_vol, 3) if ann_vol > 0 else 0})
+        pd.DataFrame(regime_results).to_csv(
+            os.path.join(self.explore_dir, "regime_descriptive_stats.csv"), index=False)
+
+        sig_count = len(corr_df[corr_df["p_value"] < 0.05]) if len(corr_df) > 0 else 0
+        print(f"  Correlations: {len(corr_df)} ({sig_count} sig)")
+        if len(ccf_df):
+            print(f"  CCF: {len(ccf_df)} signal-lags ({int(ccf_df['significant_95'].sum())} sig)")
+        if regime_results:
+            print(f"  Regime Sharpes: {dict((r['regime'], r['sharpe']) for r in regime_results)}")
+        return corr_df
+
+    # ===== STAGE 5: CORE MODELS =====
+    @timed("5_models")
+    def stage_models(self, df: pd.DataFrame) -> pd.DataFrame:
+        import statsmodels.api as sm
+        from statsmodels.stats.stattools import durbin_watson
+        from statsmodels.tsa.stattools import grangercausalitytests
+
+        spec, p = self.spec, self.spec.p
+        primary, ret = spec.primary_signal, spec.ret_col
+        work = df.dropna(subset=[primary, ret])
+        print(f"  Working: {work.shape}")
+
+        # Granger
+        gc_results = []
+        label = spec.granger_label or primary
+        tgt = spec.target.upper()
+        maxlag = p["granger_maxlag"]
+        try:
+            gc_data = work[[ret, primary]].dropna()
+            if len(gc_data) > p["min_granger_obs"]:
+                for cols, direction in [([ret, primary], f"{label}->{tgt}"),
+                                        ([primary, ret], f"{tgt}->{label}")]:
+                    gc = grangercausalitytests(gc_data[cols], maxlag=maxlag, verbose=False)
+                    for lag, r in gc.items():
+                        gc_results.append({"direction": direction, "lag": lag,
+                            "f_stat": round(r[0]["ssr_ftest"][0], 4),
+                            "p_value": round(r[0]["ssr_ftest"][1], 4)})
+        except Exception as e:
+            print(f"  Granger failed: {e}")
+        pd.DataFrame(gc_results).to_csv(os.path.join(self.models_dir, "granger_causality.csv"),
+                                        index=False)
+        print(f"  Granger: {len(gc_results)} tests")
+
+        # Transfer entropy, both directions, with permutation p-values
+        te_results = []
+        te_data = work[[primary, ret]].dropna()
+        if len(te_data) > p["min_te_obs"]:
+            sig_v, ret_v = te_data[primary].to_numpy(), te_data[ret].to_numpy()
+            for src, dst, direction in [(sig_v, ret_v, f"{label}->{tgt}"),
+                                        (ret_v, sig_v, f"{tgt}->{label}")]:
+                for r in te_grid(src, dst, p["te_lags"], p["te_bins"],
+                                 n_perm=p["te_permutations"], seed=42, min_obs=p["min_te_obs"]):
+                    te_results.append({"direction": direction, "lag": r["lag"],
+                        "n_bins": r["n_bins"], "te": round(r["te"], 6),
+                        "null_mean": round(r["null_mean"], 6), "p_value": round(r["p_value"], 4),
+                        "n": r["n_obs"]})
+        pd.DataFrame(te_results).to_csv(os.path.join(self.models_dir, "transfer_entropy.csv"),
+                                        index=False)
+        print(f"  Transfer entropy: {len(te_results)} tests")
+
+        # Regressions (HC3), every signal × horizon cell in one batch
+        reg_results = []
+        for r in self.regressions(work).itertuples(index=False):
+            reg_results.append({"signal": r.signal, "horizon": r.target,
+                "coef": round(r.coef, 6), "t_stat": round(r.t_stat, 3),
+                "p_value": round(r.p_value, 4), "r_squared": round(r.r_squared, 4),
+                "n": int(r.n)})
+        reg_df = pd.DataFrame(reg_results)
+        reg_df.to_csv(os.path.join(self.models_dir, "predictive_regressions.csv"), index=False)
+        print(f"  Regressions: {len(reg_df)}")
+
+        # Local projections: the full 1..lp_max_horizon curve in one fit;
+        # local_projections.csv keeps lp_horizons
+        hkey = f"horizon_{p['count_key']}"
+        irf = self.impulse_response(work, self.lp_paths(df, work.index))
+        irf_out = pd.DataFrame({hkey: irf["horizon"],
+            "coef": irf["coef"].round(6), "se": irf["se"].round(6),
+            "t_stat": irf["t_stat"].round(3), "p_value": irf["p_value"].round(4),
+            "ci_lower": irf["ci_lower"].round(6), "ci_upper": irf["ci_upper"].round(6),
+            "r_squared": irf["r_squared"].round(4), "n": irf["n"].astype(int)})
+        irf_out.to_csv(os.path.join(self.models_dir, "lp_impulse_response.csv"), index=False)
+        lp_df = irf_out[irf_out[hkey].isin(p["lp_horizons"])]
+        lp_df.to_csv(os.path.join(self.models_dir, "local_projections.csv"), index=False)
+        print(f"  Local projections: {len(lp_df)} horizons, IRF over {len(irf_out)}")
+
+        # Quantile regression + residual diagnostics at the QR horizon
+        qr_results = [{"quantile": r.quantile,
+                       "coef": round(r.coef, 6), "p_value": round(r.p_value, 4),
+                       "ci_lower": round(r.ci_lower, 6), "ci_upper": round(r.ci_upper, 6)}
+                      for r in self.quantile_regression(work).itertuples(index=False)]
+        diag_results = []
+        qr_fwd = spec.fwd_col(p["qr_horizon"])
+        valid_qr = work[[primary, qr_fwd]].dropna() if qr_fwd in work.columns else pd.DataFrame()
+        if len(valid_qr) > p["min_obs"]:
+            X = sm.add_constant(valid_qr[primary])
+            resid = sm.OLS(valid_qr[qr_fwd], X).fit().resid
+            jb_s, jb_p = stats.jarque_bera(resid)
+            diag_results.append({"test": "Jarque-Bera", "statistic": round(jb_s, 4),
+                                 "p_value": round(jb_p, 4)})
+            diag_results.append({"test": "Durbin-Watson", "statistic": round(durbin_watson(resid), 4),
+                                 "p_value": np.nan})
+        pd.DataFrame(qr_results).to_csv(os.path.join(self.models_dir, "quantile_regression.csv"),
+                                        index=False)
+        pd.DataFrame(diag_results).to_csv(os.path.join(self.models_dir, "diagnostics_summary.csv"),
+                                          index=False)
+        print(f"  Quantile reg: {len(qr_results)} quantiles")
+
+        # Quantile process: 99 taus at every forward horizon
+        qp_results = [{f"horizon_{p['count_key']}": r.horizon, "quantile": r.quantile,
+                       "intercept": round(r.intercept, 6),
+                       "coef": round(r.coef, 6), "se": round(r.se, 6),
+                       "ci_lower": round(r.ci_lower, 6), "ci_upper": round(r.ci_upper, 6),
+                       "n": int(r.n)}
+                      for r in self.quantile_process(work).itertuples(index=False)]
+        pd.DataFrame(qp_results).to_csv(os.path.join(self.models_dir, "quantile_process.csv"),
+                                        index=False)
+        print(f"  Quantile process: {len(qp_results)} (horizon, tau) cells")
+
+        # Johansen cointegration, target vs each spec level column: full sample, then
+        # rolling windows batched across the systems and cached across pairs
+        systems = self.coint_systems(df)
+        coint_df, roll = self.cointegration(systems)
+        coint_df.round(4).to_csv(os.path.join(self.models_dir, "cointegration.csv"), index=False)
+        roll.to_csv(os.path.join(self.models_dir, "rolling_cointegration.csv"), index=False)
+        print(f"  Cointegration: {len(systems)} systems, {len(roll)} rolling windows")
+
+        # Interpretation metadata
+        it = spec.interpretation
+        interp = {
+            "indicator": it.get("indicator", spec.pair_id), "target": spec.target,
+            "expected_direction": spec.direction, "observed_direction": "unknown",
+            "direction_consistent": True,
+            "mechanism": it.get("mechanism", ""),
+            "confidence": it.get("confidence", "medium"), "key_finding": "",
+            "caveats": list(it.get("caveats", [])),
+        }
+        if len(reg_df) > 0:
+            best = reg_df.loc[reg_df["p_value"].idxmin()]
+            interp["key_finding"] = (f"{best['signal']} predicts {best['horizon']} "
+                                     f"(coef={best['coef']:.4f}, t={best['t_stat']:.2f}, "
+                                     f"p={best['p_value']:.4f})")
+            if spec.counter_cyclical:
+                interp["observed_direction"] = "counter_cyclical" if best["coef"] < 0 else "pro_cyclical"
+                interp["direction_consistent"] = bool(best["coef"] < 0)
+            else:
+                interp["observed_direction"] = "pro_cyclical" if best["coef"] > 0 else "counter_cyclical"
+                interp["direction_consistent"] = bool(best["coef"] > 0)
+        with open(os.path.join(self.results_dir, "interpretation_metadata.json"), "w") as f:
+            json.dump(interp, f, indent=2)
+
+        return reg_df
+
+    # ===== STAGE 6: TOURNAMENT =====
+    @timed("6_tournament")
+    def stage_tournament(self, df: pd.DataFrame) -> pd.DataFrame:
+        spec, p = self.spec, self.spec.p
+        lead_key, ret = spec.lead_key, spec.ret_col
+        work = df.copy()
+        is_end, oos_start = spec.split_dates(work.index)
+        is_mask = work.index <= is_end
+        oos_mask = work.index >= oos_start
+
+        m = self.tournament(work, spec.tournament["signals"], is_mask=is_mask, oos_mask=oos_mask)
+        bh = {"signal": "BENCHMARK", "threshold": "BUY_HOLD", "strategy": "BH", lead_key: 0,
+              "valid": True, **self.benchmark(work[ret], is_mask, oos_mask)}
+        rdf = self.results_table(m, ["signal", "threshold", "strategy", lead_key, "oos_sharpe",
+                                     "oos_ann_return", "max_drawdown", "annual_turnover",
+                                     "oos_n", "valid"], bh)
+        rdf.to_csv(os.path.join(self.results_dir, f"tournament_results_{spec.date_tag}.csv"),
+                   index=False)
+
+        valid_count = rdf["valid"].sum() if len(rdf) > 0 else 0
+        print(f"  Tournament: {len(rdf)} combos, {valid_count} valid")
+        if len(rdf) > 0:
+            vs = rdf[rdf["valid"] & (rdf["signal"] != "BENCHMARK")]
+            if len(vs) > 0:
+                best = vs.loc[vs["oos_sharpe"].idxmax()]
+                print(f"  Best: {best['signal']}/{best['threshold']}/{best['strategy']}/L{best[lead_key]} "
+                      f"Sharpe={best['oos_sharpe']:.2f} DD={best['max_drawdown']:.1f}%")
+            bm = rdf[rdf["signal"] == "BENCHMARK"]
+            if len(bm) > 0:
+                print(f"  B&H:  Sharpe={bm.iloc[0]['oos_sharpe']:.2f} DD={bm.iloc[0]['max_drawdown']:.1f}%")
+
+        self.reality_check(work, oos_mask)
+        return rdf
+
+    # ===== STAGE 7: VALIDATION =====
+    @timed("7_validation")
+    def stage_validation(self, df: pd.DataFrame):
+        """
+        Walk-forward, bootstrap CI, transaction costs and signal decay for the
+        top-N valid combos, read from the tournament's position block.
+        """
+        oos_mask = df.index >= self.spec.split_dates(df.index)[1]
+        self.write_validation(self.validation(df, oos_mask))
+
+    # ===== MAIN =====
+    def run(self, series: dict | None = None, df: pd.DataFrame | None = None) -> dict:
+        """
+        Run every stage; `series` skips stage 1 (pre-fetched raw series), `df`
+        stages 1-2 (a `stage_derived` frame).
+        """
+        spec = self.spec
+        self._makedirs()
+        t0 = time.time()
+        print(f"{'='*60}\n  {spec.indicator_name} -> {spec.target_name}\n{'='*60}")
+
+        if df is None:
+            df = self.stage_derived(self.stage_data() if series is None else series)
+        df.to_parquet(os.path.join(self.data_dir,
+                                   f"{spec.pair_id}_{spec.frequency}_{spec.date_tag}.parquet"),
+                      engine="pyarrow")
+
+        self.stage_stationarity(df)
+        self.stage_exploratory(df)
+        self.stage_models(df)
+        self.stage_tournament(df)
+        self.stage_validation(df)
+
+        elapsed = time.time() - t0
+        print(f"\n{'='*60}\n  DONE in {elapsed:.1f}s\n{'='*60}")
+
+        timing = {"pair_id": spec.pair_id, "total_seconds": round(elapsed, 1),
+                  "stage_times": {k: round(v, 1) for k, v in self.stage_times.items()}}
+        with open(os.path.join(self.results_dir, f"pipeline_timing_{spec.date_tag}.json"), "w") as f:
+            json.dump(timing, f, indent=2)
+        return timing
+
+
+def run_pairs(specs: list, base_dir: str = BASE_DIR) -> list[dict]:
+    """
+    Run several specs in one process. Stages 1-2 run for every pair first, so
+    the rolling Johansen windows of all pairs' cointegration systems go to
+    one `johansen_grid` call per (window, det_order, k_ar_diff, min_obs)
+    setting; each pair's stage 5 then reads its systems from the shared
+    cache. Returns each pair's timing record.
+    """
+    pipes = [PairPipeline(spec, base_dir) for spec in specs]
+    frames = []
+    for pipe in pipes:
+        pipe._makedirs()
+        frames.append(pipe.stage_derived(pipe.stage_data()))
+
+    groups: dict = {}
+    for pipe, df in zip(pipes, frames):
+        p = pipe.spec.p
+        key = (p["coint_window"], p["coint_det_order"], p["coint_k_ar_diff"],
+               p["min_coint_obs"], pipe.cache_dir)
+        groups.setdefault(key, {}).update(
+            {f"{pipe.spec.pair_id}:{name}": lv for name, lv in pipe.coint_systems(df).items()})
+    for (window, det_order, k_ar_diff, min_obs, cache_dir), systems in groups.items():
+        if systems:
+            johansen_grid(systems, window, det_order=det_order, k_ar_diff=k_ar_diff,
+                          min_obs=min_obs, cache_dir=os.path.join(cache_dir, "cointegration"))
+    return [pipe.run(df=df) for pipe, df in zip(pipes, frames)]
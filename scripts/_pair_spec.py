@@ -0,0 +1,273 @@
+"""
+Shared helper: declarative pair specs for the generic pair pipeline.
+
+A pair used to be a 450–1,800 line `pair_pipeline_<pair>.py` copied from
+the previous pair and edited in place, so every fix and speed-up had to be
+re-applied to each copy (and drifted when it was not). A spec captures what
+actually differs between pairs — sources, frequency, signal derivations,
+IS/OOS rule, direction, tournament signal map and interpretation text — and
+`_pair_pipeline.PairPipeline` runs the shared stages over it.
+
+Specs live in `scripts/pair_specs/<pair_id>.json`:
+
+    {
+      "pair_id": "permit_spy",
+      "indicator_name": "Building Permits", "target_name": "S&P 500",
+      "frequency": "monthly",                     # or "daily"
+      "start_date": "1990-01-01", "end_date": "2025-12-31",
+      "date_tag": "20260314",
+      "split": {"is_end": "2017-12-31", "oos_start": "2018-01-01"},
+                                                  # or {"rule": "econ_oos2"}
+      "direction": "pro_cyclical",                # bullish above threshold
+      "sources": {"fred": {"PERMIT": "permit"}, "yahoo": {"SPY": "spy"}},
+      "target": "spy",
+      "derived": [{"name": "permit_yoy", "op": "pct_change",
+                   "of": "permit", "periods": 12}, ...],
+      "primary_signal": "permit_yoy",
+      "tournament": {"signals": {"S2_yoy": "permit_yoy"},
+                     "extra_thresholds": {"S2_yoy": {"T4_zero": 0}}},
+      ...
+    }
+
+Everything that is a property of the sampling frequency rather than of the
+pair (periods per year, leads, rolling windows, minimum sample sizes,
+forward-return horizons) comes from FREQUENCY_DEFAULTS and can be
+overridden per pair under "params".
+
+"stress_periods" ([[name, start, end], ...]) adds per-winner stress tests to
+validation. A pair that needs more than the shared stages (regime models,
+persisted signals, legacy CSV schemas) names its own script under
+"pipeline"; that script runs the pair, calling the `PairPipeline` building
+blocks for the shared stages, and `pair_pipeline.py` refuses it.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import pandas as pd
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pair_specs")
+
+DIRECTIONS = ("pro_cyclical", "counter_cyclical")
+
+FREQUENCY_DEFAULTS: dict[str, dict[str, Any]] = {
+    "monthly": {
+        "periods_per_year": 12,
+        "horizon_unit": "m",                 # spy_fwd_3m
+        "count_key": "months",               # lead_months / n_months / horizon_months
+        "ffill_limit": 2,
+        "horizons": [1, 3, 6, 12],
+        "lp_horizons": [1, 3, 6, 12],
+        "lp_max_horizon": 24,                # lp_impulse_response.csv covers 1..24
+        "coint_window": 120,                 # rolling Johansen window (10 years)
+        "coint_det_order": 1,
+        "coint_k_ar_diff": 2,
+        "min_coint_obs": 60,
+        "qr_horizon": 3,
+        "qr_bootstrap": 200,                 # block-bootstrap draws for QR CIs
+        "qr_process_bootstrap": 0,           # 99-tau process: point estimates only
+        "leads": [0, 1, 2, 3, 6],
+        "percentiles": [25, 50, 75],
+        "roll_window": 60,
+        "roll_min_periods": 36,
+        "min_obs": 30,                       # correlations / regressions / QR
+        "min_lp_obs": 30,
+        "stationarity_tests": ["ADF", "KPSS", "PP", "ZA"],
+        "min_stationarity_obs": 50,
+        "granger_maxlag": 6,
+        "min_granger_obs": 50,
+        "te_lags": [1, 3, 6],
+        "te_bins": [3, 5],
+        "te_permutations": 1000,
+        "min_te_obs": 100,
+        "ccf_max_lag": 24,
+        "ccf_ar_lags": 6,
+        "min_regime_obs": 100,
+        "min_regime_bucket": 5,
+        "min_signal_obs": 50,
+        "min_is_signal_obs": 20,
+        "min_is_n": 24,
+        "min_oos_n": 12,
+        "max_turnover": 24,
+        "top_n_validation": 5,
+        "wf_min_train_obs": 36,
+        "wf_min_test_obs": 6,
+        "delay_grid": [0, 1, 2, 3, 6],
+        "decay_points": [0, 1, 2, 3, 6],
+        "min_trades": 0,                     # validity floor on n_trades
+        "trade_eps": 0.0,                    # |Δposition| that counts as a trade
+        "wf_first_year": None,               # earliest walk-forward test year (else data start + 5)
+        "min_stress_obs": 4,                 # strategy returns needed per stress period
+    },
+    "daily": {
+        "periods_per_year": 252,
+        "horizon_unit": "d",
+        "count_key": "days",
+        "ffill_limit": 5,
+        "horizons": [1, 5, 21, 63],
+        "lp_horizons": [5, 21, 63],
+        "lp_max_horizon": 252,
+        "coint_window": 1260,
+        "coint_det_order": 0,
+        "coint_k_ar_diff": 5,
+        "min_coint_obs": 504,
+        "qr_horizon": 21,
+        "qr_bootstrap": 200,
+        "qr_process_bootstrap": 0,
+        "leads": [0, 1, 5, 10, 21],
+        "percentiles": [25, 50, 75],
+        "roll_window": 252,
+        "roll_min_periods": 200,
+        "min_obs": 50,
+        "min_lp_obs": 100,
+        "stationarity_tests": ["ADF", "KPSS", "PP", "ZA"],
+        "min_stationarity_obs": 100,
+        "granger_maxlag": 5,
+        "min_granger_obs": 100,
+        "te_lags": [1, 5, 21],
+        "te_bins": [3, 5, 8],
+        "te_permutations": 1000,
+        "min_te_obs": 200,
+        "ccf_max_lag": 252,
+        "ccf_ar_lags": 5,
+        "min_regime_obs": 200,
+        "min_regime_bucket": 20,
+        "min_signal_obs": 200,
+        "min_is_signal_obs": 100,
+        "min_is_n": 100,
+        "min_oos_n": 50,
+        "max_turnover": 24,
+        "top_n_validation": 5,
+        "wf_min_train_obs": 200,
+        "wf_min_test_obs": 20,
+        "delay_grid": list(range(0, 11)),
+        "decay_points": [0, 1, 2, 3, 5],
+        "min_trades": 0,
+        "trade_eps": 0.0,
+        "wf_first_year": None,
+        "min_stress_obs": 20,
+    },
+}
+
+# Shared by both frequencies (transaction_costs.csv keeps the 0/5/10/20/50 points)
+COST_GRID_BPS = list(range(0, 105, 5))
+COST_POINTS_BPS = [0, 5, 10, 20, 50]
+
+
+def econ_oos2_split(index: pd.DatetimeIndex) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    ECON-OOS2: OOS span = min(max(36, round(N_months × 0.25)), 120) months,
+    ending at the last observation. Returns (is_end, oos_start) as dates in
+    `index`; the OOS window starts on the first observation of its first month.
+    """
+    idx = pd.DatetimeIndex(index).sort_values()
+    months = idx.to_period("M").unique()
+    span = min(max(36, round(len(months) * 0.25)), 120)
+    if span >= len(months):
+        raise ValueError(f"ECON-OOS2 span of {span} months leaves no IS sample "
+                         f"({len(months)} months of data)")
+    oos_start = idx[idx.to_period("M") >= months[-span]][0]
+    is_end = idx[idx < oos_start][-1]
+    return is_end, oos_start
+
+
+@dataclass
+class PairSpec:
+    pair_id: str
+    indicator_name: str
+    target_name: str
+    frequency: str
+    start_date: str
+    end_date: str
+    date_tag: str
+    direction: str
+    sources: dict[str, dict[str, str]]
+    target: str
+    derived: list[dict]
+    primary_signal: str
+    tournament: dict
+    split: dict = field(default_factory=lambda: {"rule": "econ_oos2"})
+    required_columns: Optional[list[str]] = None
+    stationarity: list[str] = field(default_factory=list)
+    exploratory_signals: list[str] = field(default_factory=list)
+    regression_signals: list[str] = field(default_factory=list)
+    lp_controls: list[str] = field(default_factory=list)
+    cointegration: list[str] = field(default_factory=list)
+    granger_label: Optional[str] = None
+    interpretation: dict = field(default_factory=dict)
+    stress_periods: list[list[str]] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    pipeline: Optional[str] = None
+    source_path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.frequency not in FREQUENCY_DEFAULTS:
+            raise ValueError(f"{self.pair_id}: frequency must be one of "
+                             f"{sorted(FREQUENCY_DEFAULTS)}, got {self.frequency!r}")
+        if self.direction not in DIRECTIONS:
+            raise ValueError(f"{self.pair_id}: direction must be one of {DIRECTIONS}, "
+                             f"got {self.direction!r}")
+        if not self.tournament.get("signals"):
+            raise ValueError(f"{self.pair_id}: tournament.signals is empty")
+        unknown = set(self.params) - set(FREQUENCY_DEFAULTS[self.frequency])
+        if unknown:
+            raise ValueError(f"{self.pair_id}: unknown params {sorted(unknown)}")
+        if "rule" in self.split:
+            if self.split["rule"] != "econ_oos2":
+                raise ValueError(f"{self.pair_id}: unknown split rule {self.split['rule']!r}")
+        elif not {"is_end", "oos_start"} <= set(self.split):
+            raise ValueError(f"{self.pair_id}: split needs is_end + oos_start or a rule")
+
+    # ── Frequency-derived settings ──
+    @property
+    def p(self) -> dict[str, Any]:
+        """FREQUENCY_DEFAULTS for this pair's frequency with its overrides applied."""
+        return {**FREQUENCY_DEFAULTS[self.frequency], **self.params}
+
+    @property
+    def counter_cyclical(self) -> bool:
+        return self.direction == "counter_cyclical"
+
+    @property
+    def ret_col(self) -> str:
+        return f"{self.target}_ret"
+
+    def fwd_col(self, h: int) -> str:
+        return f"{self.target}_fwd_{h}{self.p['horizon_unit']}"
+
+    @property
+    def lead_key(self) -> str:
+        return f"lead_{self.p['count_key']}"
+
+    @property
+    def required(self) -> list[str]:
+        return self.required_columns or [self.primary_signal]
+
+    def split_dates(self, index: pd.DatetimeIndex) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """(is_end, oos_start) from fixed dates or the ECON-OOS2 rule."""
+        if "rule" in self.split:
+            return econ_oos2_split(index)
+        return pd.Timestamp(self.split["is_end"]), pd.Timestamp(self.split["oos_start"])
+
+
+def spec_path(pair_id: str) -> str:
+    return os.path.join(SPEC_DIR, f"{pair_id}.json")
+
+
+def available_specs() -> list[str]:
+    """pair_ids with a spec file in SPEC_DIR."""
+    if not os.path.isdir(SPEC_DIR):
+        return []
+    return sorted(f[:-5] for f in os.listdir(SPEC_DIR) if f.endswith(".json"))
+
+
+def load_spec(pair_id_or_path: str) -> PairSpec:
+    """Load a spec by pair_id (from SPEC_DIR) or by path to a JSON file."""
+    path = pair_id_or_path if pair_id_or_path.endswith(".json") else spec_path(pair_id_or_path)
+    with open(path) as f:
+        raw = json.load(f)
+    raw.pop("$comment", None)
+    return PairSpec(**raw, source_path=os.path.abspath(path))
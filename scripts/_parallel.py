@@ -0,0 +1,32 @@
+"""
+Shared helper: process-pool map for independent model fits.
+
+Permutation nulls, HMM restarts and walk-forward folds are independent
+tasks. `parallel_map` spreads them over forked worker processes and falls
+back to a plain loop when only one worker is useful or `fork` is not
+available. Pipeline scripts do their work at import time, so spawned
+workers would re-run the whole script; forked ones inherit it.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Sequence
+
+
+def process_pool(workers: Optional[int], n_tasks: int) -> Optional[ProcessPoolExecutor]:
+    """A forked pool of min(`workers` or CPU count, `n_tasks`) processes, or None."""
+    workers = min(workers or os.cpu_count() or 1, n_tasks)
+    if workers <= 1 or "fork" not in mp.get_all_start_methods():
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("fork"))
+
+
+def parallel_map(fn: Callable, tasks: Sequence, workers: Optional[int] = None) -> list:
+    """`[fn(t) for t in tasks]`, in order, over a forked process pool when useful."""
+    pool = process_pool(workers, len(tasks))
+    if pool is None:
+        return [fn(t) for t in tasks]
+    with pool:
+        return list(pool.map(fn, tasks))
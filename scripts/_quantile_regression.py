@@ -0,0 +1,273 @@
+"""
+Shared helper: quantile regression over a whole tau grid, with block-bootstrap CIs.
+
+The core-models stages called `smf.quantreg(formula, data).fit(q=tau)` once
+per tau, seven times per pipeline. Each call re-parsed the formula, rebuilt
+the design and ran statsmodels' IRLS from scratch, and the CIs came from a
+kernel sandwich that treats overlapping 21-day forward returns as
+independent. A quantile-process chart (~99 taus × several horizons) was out
+of reach.
+
+`rq_grid` solves every tau of the grid at once with the Frisch–Newton
+interior-point method of Portnoy & Koenker (1997), the `fnb` solver of R's
+quantreg, written on a (designs × taus × n) batch. Each iteration costs one
+k × k solve per problem and every problem shares the design, so the grid
+converges in the ~20 iterations one tau needs. Solutions are exact LP
+optima (not IRLS approximations).
+
+`quantile_grid` adds paired bootstrap inference: rows (y_t, x_t) are
+resampled together with `_bootstrap.resample_indices`, stationary blocks by
+default so the overlap of forward returns survives, and every replicate's
+whole tau grid is one more batch for `rq_grid`. Replicates are split into
+chunks and solved across forked worker processes (`_parallel.parallel_map`).
+As in quantreg's `se="boot"`, the standard error is the bootstrap standard
+deviation, with a normal reference for p-values and CIs.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from _bootstrap import default_block_length, resample_indices
+from _parallel import parallel_map
+
+TAUS = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95)
+PROCESS_TAUS = tuple(round(t / 100, 2) for t in range(1, 100))
+COLUMNS = ["target", "quantile", "term", "coef", "se", "t_stat", "p_value",
+           "ci_lower", "ci_upper", "n"]
+
+
+def _step_bound(v: np.ndarray, dv: np.ndarray) -> np.ndarray:
+    """Largest step keeping v + f·dv ≥ 0, per problem (min over the last axis)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.where(dv < 0, -v / dv, np.inf)
+    return f.min(axis=-1)
+
+
+def _solve(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """Batched solve A·x = B; problems whose A is singular come back as NaN."""
+    try:
+        return np.linalg.solve(A, B)
+    except np.linalg.LinAlgError:
+        out = np.full(np.broadcast_shapes(A.shape[:-2], B.shape[:-2]) + B.shape[-2:], np.nan)
+        for i in range(len(out)):
+            try:
+                out[i] = np.linalg.solve(A[i], B[i])
+            except np.linalg.LinAlgError:
+                pass
+        return out
+
+
+def rq_grid(
+    X,
+    y,
+    taus: Sequence[float],
+    *,
+    tol: float = 1e-6,
+    max_iter: int = 50,
+    beta: float = 0.99995,
+) -> np.ndarray:
+    """
+    Quantile-regression coefficients for every tau (T) and every design (G).
+
+    X is (n × k) or (G × n × k), y is (n,) or (G × n); include the constant
+    in X. Returns (T × k), or (G × T × k) for stacked designs. Solves the
+    dual LP  max yᵀa  s.t.  Xᵀa = (1 − τ) Xᵀ1,  0 ≤ a ≤ 1  by Frisch–Newton
+    with Mehrotra's corrector; the coefficients are minus its dual prices.
+    Each iteration only touches the problems whose duality gap is still above
+    `tol`. Problems still open after `max_iter`, and problems whose Newton
+    system turns singular (e.g. a bootstrap draw of a discrete regressor that
+    misses a level), are re-solved exactly with HiGHS.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    single = X.ndim == 2
+    if single:
+        X, y = X[None], y[None]
+    G, n, k = X.shape
+    T = len(taus)
+    P = G * T
+    gi = np.repeat(np.arange(G), T)                                   # problem → design
+    tau = np.tile(np.asarray(taus, dtype=float), G)[:, None]          # P × 1
+
+    Xt = X.transpose(0, 2, 1)
+    c = -y[gi]                                                        # P × n
+    x = np.broadcast_to(1 - tau, (P, n)).copy()
+    s = 1 - x
+    b = (x[:, None, :] @ X[gi])[:, 0]                                 # Xᵀx, P × k
+    d = _solve(Xt @ X, (-y[:, None, :] @ X).transpose(0, 2, 1))[..., 0]  # OLS start, G × k
+    d = d[gi]                                                         # dual prices
+    r = c - (X[gi] @ d[..., None])[..., 0]
+    # Strictly interior dual slacks (z − w = r still holds). The textbook start
+    # z = max(r, 0) sits on the boundary and stalls at extreme taus on long samples.
+    z = np.maximum(r, 0.0) + 0.1 * np.abs(r).mean(-1, keepdims=True)
+    w = z - r
+    gap = (c * x).sum(-1) - (b * d).sum(-1) + w.sum(-1)
+    failed = ~np.isfinite(d).all(-1)
+
+    for _ in range(max_iter):
+        a = np.flatnonzero((gap > tol) & ~failed)
+        if not a.size:
+            break
+        Xa = X[gi[a]]
+        XaT = Xa.transpose(0, 2, 1)
+        xa, sa, za, wa, ca = x[a], s[a], z[a], w[a], c[a]
+        q = 1 / (za / xa + wa / sa)
+        r = za - wa
+        xqx = (XaT * q[:, None, :]) @ Xa
+        rhs = q * r
+        dd = _solve(xqx, XaT @ rhs[..., None])[..., 0]
+        dx = q * ((Xa @ dd[..., None])[..., 0] - r)
+        ds = -dx
+        dz = -za * (dx / xa + 1)
+        dw = -wa * (ds / sa + 1)
+        fp = np.minimum(beta * np.minimum(_step_bound(xa, dx), _step_bound(sa, ds)), 1.0)
+        fd = np.minimum(beta * np.minimum(_step_bound(wa, dw), _step_bound(za, dz)), 1.0)
+
+        if (np.minimum(fp, fd) < 1).any():
+            # Mehrotra corrector, applied wherever the affine step is not full
+            mu = (za * xa).sum(-1) + (wa * sa).sum(-1)
+            g = (((za + fd[:, None] * dz) * (xa + fp[:, None] * dx)).sum(-1)
+                 + ((wa + fd[:, None] * dw) * (sa + fp[:, None] * ds)).sum(-1))
+            mu = (mu * (g / mu) ** 3 / (2 * n))[:, None]
+            xinv, sinv = 1 / xa, 1 / sa
+            dxdz, dsdw = dx * dz * xinv, ds * dw * sinv
+            xi = mu * (xinv - sinv)
+            dd2 = _solve(xqx, XaT @ (rhs + q * (dxdz - dsdw - xi))[..., None])[..., 0]
+            dx2 = q * ((Xa @ dd2[..., None])[..., 0] + xi - r - dxdz + dsdw)
+            ds2 = -dx2
+            dz2 = mu * xinv - za - xinv * za * dx2 - dxdz
+            dw2 = mu * sinv - wa - sinv * wa * ds2 - dsdw
+            fp2 = np.minimum(beta * np.minimum(_step_bound(xa, dx2), _step_bound(sa, ds2)), 1.0)
+            fd2 = np.minimum(beta * np.minimum(_step_bound(wa, dw2), _step_bound(za, dz2)), 1.0)
+            full = (np.minimum(fp, fd) >= 1)
+            pick = full[:, None]
+            dx, ds = np.where(pick, dx, dx2), np.where(pick, ds, ds2)
+            dz, dw = np.where(pick, dz, dz2), np.where(pick, dw, dw2)
+            dd = np.where(pick, dd, dd2)
+            fp, fd = np.where(full, fp, fp2), np.where(full, fd, fd2)
+
+        ok = (np.isfinite(dd).all(-1) & np.isfinite(dx).all(-1)
+              & np.isfinite(dz).all(-1) & np.isfinite(dw).all(-1))
+        failed[a[~ok]] = True
+        a, fp, fd = a[ok], fp[ok, None], fd[ok, None]
+        x[a], s[a] = xa[ok] + fp * dx[ok], sa[ok] + fp * ds[ok]
+        d[a] = d[a] + fd * dd[ok]
+        z[a], w[a] = za[ok] + fd * dz[ok], wa[ok] + fd * dw[ok]
+        gap[a] = (ca[ok] * x[a]).sum(-1) - (b[a] * d[a]).sum(-1) + w[a].sum(-1)
+
+    coef = -d
+    for p in np.flatnonzero(~(gap <= tol) | failed):
+        coef[p] = _rq_highs(X[gi[p]], y[gi[p]], float(tau[p, 0]))
+    coef = coef.reshape(G, T, k)
+    return coef[0] if single else coef
+
+
+def _rq_highs(X: np.ndarray, y: np.ndarray, tau: float) -> np.ndarray:
+    """Primal LP with HiGHS, for the rare problem the interior point leaves open."""
+    from scipy import sparse
+    from scipy.optimize import linprog
+
+    n, k = X.shape
+    cost = np.r_[np.zeros(k), np.full(n, tau), np.full(n, 1 - tau)]
+    eye = sparse.identity(n, format="csr")
+    A = sparse.hstack([sparse.csr_matrix(X), eye, -eye], format="csr")
+    res = linprog(cost, A_eq=A, b_eq=y, bounds=[(None, None)] * k + [(0, None)] * (2 * n),
+                  method="highs")
+    return res.x[:k] if res.success else np.full(k, np.nan)
+
+
+def _boot_chunk(task) -> np.ndarray:
+    X, y, taus, idx, tol, max_iter = task
+    return rq_grid(X[idx], y[idx], taus, tol=tol, max_iter=max_iter)
+
+
+def rq_bootstrap(
+    X,
+    y,
+    taus: Sequence[float],
+    n_boot: int,
+    *,
+    method: str = "stationary",
+    block_len: Optional[int] = None,
+    seed: int = 42,
+    max_cells: int = 250_000,
+    tol: float = 1e-6,
+    max_iter: int = 50,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Paired-bootstrap replicates (n_boot × T × k) of `rq_grid`. Replicates are
+    solved in chunks of about `max_cells` (replicates × taus × n) entries,
+    spread over worker processes.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    idx = resample_indices(n, n_boot, np.random.default_rng(seed), method=method, block_len=block_len)
+    step = max(1, max_cells // (len(taus) * n))
+    tasks = [(X, y, list(taus), idx[i:i + step], tol, max_iter) for i in range(0, n_boot, step)]
+    return np.concatenate(parallel_map(_boot_chunk, tasks, workers), axis=0)
+
+
+def quantile_grid(
+    frame: pd.DataFrame,
+    signal: str,
+    targets: Sequence[str],
+    taus: Sequence[float] = TAUS,
+    controls: Sequence[str] = (),
+    *,
+    n_boot: int = 500,
+    alpha: float = 0.05,
+    method: str = "stationary",
+    block_len: Optional[int] = None,
+    seed: int = 42,
+    min_obs: int = 1,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Quantile regressions target ~ 1 + signal + controls for every target and
+    tau, as a long table with one row per (target, quantile, term):
+    target, quantile, term, coef, se, t_stat, p_value, ci_lower, ci_upper, n.
+    Terms are "Intercept", `signal`, then `controls`. Each target uses its own
+    complete rows; targets below `min_obs` rows are skipped. `block_len`
+    defaults to the n^(1/3) rule; pass at least the forward horizon for
+    overlapping returns. `n_boot=0` gives point estimates only.
+    """
+    controls = [c for c in controls if c in frame.columns]
+    terms = ["Intercept", signal, *controls]
+    z = stats.norm.ppf(1 - alpha / 2)
+    parts = []
+    for target in targets:
+        if signal not in frame.columns or target not in frame.columns:
+            continue
+        data = frame[[signal, *controls, target]].dropna()
+        n = len(data)
+        if n < max(min_obs, len(terms) + 1):
+            continue
+        X = np.column_stack([np.ones(n), data[[signal, *controls]].to_numpy(dtype=float)])
+        y = data[target].to_numpy(dtype=float)
+        coef = rq_grid(X, y, taus)
+        se = np.full_like(coef, np.nan)
+        if n_boot:
+            L = max(block_len or 0, default_block_length(n))
+            boot = rq_bootstrap(X, y, taus, n_boot, method=method, block_len=L,
+                                seed=seed, workers=workers)
+            se = boot.std(axis=0, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tv = coef / se
+        parts.append(pd.DataFrame({
+            "target": target,
+            "quantile": np.repeat(list(taus), len(terms)),
+            "term": np.tile(terms, len(taus)),
+            "coef": coef.ravel(), "se": se.ravel(), "t_stat": tv.ravel(),
+            "p_value": (2 * stats.norm.sf(np.abs(tv))).ravel(),
+            "ci_lower": (coef - z * se).ravel(), "ci_upper": (coef + z * se).ravel(),
+            "n": n,
+        }))
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(parts, ignore_index=True)[COLUMNS]
@@ -0,0 +1,145 @@
+"""
+Shared helper: point-in-time (expanding-window) regime probabilities.
+
+`hmm_2state_prob_stress` and `ms_2state_stress_prob` in `signals_*.parquet`
+came from one full-sample fit each: parameters estimated on all of the
+data, then `predict_proba` / smoothed probabilities, which condition on the
+whole path. Tournament signals S6 / S7 therefore traded on information that
+was not available on the day.
+
+Here the model is refitted at the end of every period (`freq`, monthly by
+default) on the expanding window up to that day. The probability for each
+later day up to the next refit is the *filtered* one, P(s_t | y_1..t),
+under the parameters of the last refit. The first fit uses the full
+optimiser (multi-restart for HMMs). Every refit after it warm-starts EM
+from the previous parameters and runs only a few iterations. Days inside
+the first `min_train` rows have no honest estimate and are NaN.
+
+States are re-ordered at every refit so labels do not switch: Markov-
+switching regimes by variance, HMM states by the mean of `order_col`.
+The last column is the stress state in both cases.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from _hmm_regimes import fit_hmm_grid
+from _markov_switching import fit_markov_switching, hamilton_filter, regression_loglik
+
+
+def refit_ends(index: pd.DatetimeIndex, min_train: int, freq: str = "ME") -> np.ndarray:
+    """Exclusive end rows of each period's last day, once `min_train` rows are available."""
+    last = pd.Series(np.arange(len(index)), index=index).resample(freq).last().dropna()
+    ends = last.to_numpy(dtype=int) + 1
+    return ends[ends >= min_train]
+
+
+def expanding_ms_probs(
+    endog: pd.Series,
+    exog: pd.DataFrame,
+    k_regimes: int = 2,
+    *,
+    min_train: int = 504,
+    freq: str = "ME",
+    maxiter: int = 500,
+    tol: float = 1e-6,
+    refit_maxiter: int = 50,
+    refit_tol: float = 1e-4,
+    start: Optional[dict] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Filtered Markov-switching regime probabilities from expanding-window
+    refits. Returns (probs with columns regime_0_prob.., refit log).
+    """
+    y = endog.to_numpy(dtype=float)
+    X = np.asarray(exog, dtype=float)
+    n = len(y)
+    ends = refit_ends(endog.index, min_train, freq)
+    out = np.full((n, k_regimes), np.nan)
+    log, fit = [], None
+    for i, e in enumerate(ends):
+        fit = fit_markov_switching(
+            y[:e], X[:e], k_regimes,
+            start=fit.start_params() if fit is not None else start,
+            maxiter=maxiter if fit is None else refit_maxiter,
+            tol=tol if fit is None else refit_tol)
+        nxt = ends[i + 1] if i + 1 < len(ends) else n
+        if nxt > e:
+            filt, _ = hamilton_filter(regression_loglik(y[:nxt], X[:nxt], fit.beta, fit.sigma2),
+                                      fit.transition)
+            out[e:nxt] = filt[e:nxt]
+        log.append({"refit_date": endog.index[e - 1], "n_train": int(e),
+                    "n_iter": fit.n_iter, "llf": fit.llf})
+    probs = pd.DataFrame(out, index=endog.index,
+                         columns=[f"regime_{r}_prob" for r in range(k_regimes)])
+    return probs, pd.DataFrame(log)
+
+
+def _hmm_loglik(model, X: np.ndarray) -> np.ndarray:
+    return np.column_stack([
+        stats.multivariate_normal.logpdf(X, mean=model.means_[s], cov=model.covars_[s], allow_singular=True)
+        for s in range(model.n_components)
+    ]).reshape(len(X), model.n_components)
+
+
+def _warm_hmm(prev, X: np.ndarray, n_iter: int, tol: float, seed: int):
+    from hmmlearn.hmm import GaussianHMM
+
+    m = GaussianHMM(n_components=prev.n_components, covariance_type="full",
+                    n_iter=n_iter, tol=tol, init_params="", random_state=seed)
+    m.startprob_ = prev.startprob_
+    m.transmat_ = prev.transmat_
+    m.means_ = prev.means_
+    m.covars_ = prev.covars_
+    return m.fit(X)
+
+
+def expanding_hmm_probs(
+    features: pd.DataFrame,
+    n_states: int = 2,
+    *,
+    min_train: int = 504,
+    freq: str = "ME",
+    order_col: int = 0,
+    n_iter: int = 200,
+    refit_n_iter: int = 20,
+    tol: float = 1e-2,
+    n_restarts: int = 8,
+    seed: int = 42,
+    cache_dir: Optional[str] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Filtered Gaussian-HMM state probabilities from expanding-window refits.
+    Features are standardised with the first training window's moments.
+    Returns (probs with columns state_0_prob.., refit log).
+    """
+    X = features.to_numpy(dtype=float)
+    n = len(X)
+    ends = refit_ends(features.index, min_train, freq)
+    out = np.full((n, n_states), np.nan)
+    cols = [f"state_{s}_prob" for s in range(n_states)]
+    if len(ends) == 0:
+        return pd.DataFrame(out, index=features.index, columns=cols), pd.DataFrame()
+    mu, sd = X[:ends[0]].mean(axis=0), X[:ends[0]].std(axis=0)
+    sd[sd == 0] = 1
+    Xs = (X - mu) / sd
+
+    log, model = [], None
+    for i, e in enumerate(ends):
+        if model is None:
+            model = fit_hmm_grid(Xs[:e], states=(n_states,), n_restarts=n_restarts, seed=seed,
+                                 n_iter=n_iter, tol=tol, cache_dir=cache_dir).model(n_states)
+        else:
+            model = _warm_hmm(model, Xs[:e], refit_n_iter, tol, seed)
+        order = np.argsort(model.means_[:, order_col], kind="stable")
+        nxt = ends[i + 1] if i + 1 < len(ends) else n
+        if nxt > e:
+            filt, _ = hamilton_filter(_hmm_loglik(model, Xs[:nxt]), model.transmat_, model.startprob_)
+            out[e:nxt] = filt[e:nxt][:, order]
+        log.append({"refit_date": features.index[e - 1], "n_train": int(e),
+                    "n_iter": int(model.monitor_.iter), "llf": float(model.monitor_.history[-1])})
+    return pd.DataFrame(out, index=features.index, columns=cols), pd.DataFrame(log)
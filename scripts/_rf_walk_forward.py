@@ -0,0 +1,179 @@
+"""
+Shared helper: parallel, cached random-forest walk-forward with per-fold TreeSHAP.
+
+`stage2_core_models.py` retrained a 200-tree `RandomForestClassifier` in a
+sequential `for test_start_year` loop on every run, and ran SHAP on the
+last fold only because every fold was too slow. Its SHAP importance
+therefore described one year of test data.
+
+`rf_walk_forward` treats each fold as an independent task over a forked
+process pool (`_parallel.parallel_map`): fit on the training rows, predict
+the test rows, and compute TreeSHAP for the test rows in the same worker.
+Forests use `n_jobs=1` because the folds are the parallel axis.
+
+With `cache_dir`, every fold is pickled under a SHA-256 of its training
+features, labels and forest parameters (`fold_key`). A rerun loads the
+fitted forest and refits nothing. Predictions and SHAP values are reused as
+well when the fold's test rows are unchanged. When a year of data is
+appended, only the new fold is trained. The previously last fold, whose
+test period grew, is re-scored with its cached model.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from _parallel import parallel_map
+from _walk_forward import Fold
+
+RF_PARAMS = {"n_estimators": 200, "max_depth": 5, "min_samples_leaf": 20, "random_state": 42}
+
+
+def fold_key(X: pd.DataFrame, y: pd.Series, **params) -> str:
+    """SHA-256 of a fold's training features (with column names), labels and model parameters."""
+    h = hashlib.sha256()
+    h.update(json.dumps(list(map(str, X.columns))).encode())
+    h.update(np.ascontiguousarray(X.to_numpy(dtype=float)).tobytes())
+    h.update(np.ascontiguousarray(np.asarray(y, dtype=float)).tobytes())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _test_key(X: pd.DataFrame) -> str:
+    h = hashlib.sha256(np.ascontiguousarray(X.to_numpy(dtype=float)).tobytes())
+    h.update(np.asarray(X.index.asi8 if isinstance(X.index, pd.DatetimeIndex) else X.index).tobytes())
+    return h.hexdigest()
+
+
+@dataclass
+class RFWalkForward:
+    """Out-of-sample results of every fold, in fold order."""
+
+    folds: pd.DataFrame          # test_start, test_end, n_train, n_test, accuracy, auc, pos rates, from_cache
+    probs: pd.Series             # out-of-sample P(y = 1), all folds
+    importance: pd.DataFrame     # fold × feature, impurity importances
+    shap: pd.DataFrame           # out-of-sample rows × feature, SHAP values for class 1
+    models: dict = field(default_factory=dict, repr=False)   # test_start → fitted forest
+
+    def mean_importance(self) -> pd.Series:
+        return self.importance.mean().sort_values(ascending=False)
+
+    def mean_abs_shap(self) -> pd.Series:
+        return self.shap.abs().mean().sort_values(ascending=False)
+
+
+def _class1_shap(values) -> np.ndarray:
+    """TreeSHAP output for class 1, across the list / 3-d array conventions of shap versions."""
+    if isinstance(values, list):
+        return np.asarray(values[1])
+    values = np.asarray(values)
+    return values[:, :, 1] if values.ndim == 3 else values
+
+
+def _run_fold(task) -> dict:
+    from sklearn.ensemble import RandomForestClassifier
+
+    X_train, y_train, X_test, params, with_shap, model = task
+    if model is None:
+        model = RandomForestClassifier(**params, n_jobs=1).fit(X_train, y_train)
+    probs = model.predict_proba(X_test)[:, 1]
+    shap_vals = None
+    if with_shap:
+        try:
+            import shap
+
+            shap_vals = _class1_shap(shap.TreeExplainer(model).shap_values(X_test))
+        except Exception as e:
+            print(f"  SHAP failed on fold starting {X_test.index[0].date()}: {e}")
+    return {"model": model, "probs": probs, "shap": shap_vals}
+
+
+def rf_walk_forward(
+    X: pd.DataFrame,
+    y: pd.Series,
+    folds: Sequence[Fold],
+    *,
+    params: Optional[dict] = None,
+    min_train: int = 500,
+    min_test: int = 50,
+    shap: bool = True,
+    cache_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> RFWalkForward:
+    """
+    Random-forest walk-forward over `folds` (row slices into X / y, e.g. from
+    `_walk_forward.make_folds`). Folds with fewer than `min_train` training or
+    `min_test` test rows are skipped. `params` defaults to `RF_PARAMS`.
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    params = dict(RF_PARAMS if params is None else params)
+    params.pop("n_jobs", None)
+    jobs, cached = [], {}
+    for f in folds:
+        X_tr, y_tr, X_te = X.iloc[f.train], y.iloc[f.train], X.iloc[f.test]
+        if len(X_tr) < min_train or len(X_te) < min_test:
+            continue
+        key, tkey = fold_key(X_tr, y_tr, **params), _test_key(X_te)
+        path = os.path.join(cache_dir, f"rf_{key[:16]}.pkl") if cache_dir else None
+        entry = None
+        if path and os.path.exists(path):
+            with open(path, "rb") as fh:
+                entry = pickle.load(fh)
+            if entry.get("key") != key:
+                entry = None
+        if entry is not None and entry["test_key"] == tkey and (entry["shap"] is not None or not shap):
+            cached[f.label] = entry
+            jobs.append((f, key, tkey, path, None))
+        else:
+            model = entry["model"] if entry is not None else None
+            jobs.append((f, key, tkey, path, (X_tr, y_tr, X_te, params, shap, model)))
+
+    fresh = parallel_map(_run_fold, [t for *_, t in jobs if t is not None], workers)
+    fresh = iter(fresh)
+
+    rows, probs, imps, shaps, models = [], [], {}, [], {}
+    for f, key, tkey, path, task in jobs:
+        if task is None:
+            out, from_cache = cached[f.label], True
+        else:
+            out, from_cache = next(fresh), task[-1] is not None
+            out = {**out, "key": key, "test_key": tkey}
+            if path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(path, "wb") as fh:
+                    pickle.dump(out, fh)
+        y_tr, X_te, y_te = y.iloc[f.train], X.iloc[f.test], y.iloc[f.test]
+        p = out["probs"]
+        try:
+            auc = roc_auc_score(y_te, p)
+        except ValueError:
+            auc = np.nan
+        rows.append({
+            "test_start": pd.Timestamp(f.label).strftime("%Y-%m-%d"),
+            "test_end": X_te.index[-1].strftime("%Y-%m-%d"),
+            "n_train": len(y_tr), "n_test": len(y_te),
+            "accuracy": accuracy_score(y_te, (p > 0.5).astype(int)), "auc": auc,
+            "pos_rate_train": y_tr.mean(), "pos_rate_test": y_te.mean(),
+            "from_cache": from_cache,
+        })
+        probs.append(pd.Series(p, index=X_te.index))
+        imps[f.label] = pd.Series(out["model"].feature_importances_, index=X.columns)
+        if out["shap"] is not None:
+            shaps.append(pd.DataFrame(out["shap"], index=X_te.index, columns=X.columns))
+        models[f.label] = out["model"]
+
+    return RFWalkForward(
+        folds=pd.DataFrame(rows),
+        probs=pd.concat(probs) if probs else pd.Series(dtype=float),
+        importance=pd.DataFrame(imps).T if imps else pd.DataFrame(columns=X.columns),
+        shap=pd.concat(shaps) if shaps else pd.DataFrame(columns=X.columns),
+        models=models,
+    )
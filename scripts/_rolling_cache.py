@@ -0,0 +1,150 @@
+"""
+Shared helper: memoized rolling-window statistics.
+
+The tournament and validation stages ask for the same
+`signal.shift(lead).rolling(window, min_periods).<stat>()` many times over:
+once per threshold and strategy under each lead in `stage_tournament`, and
+again from scratch in every `_replay_strategy` call during validation.
+`RollingStatsCache` computes each rolling statistic once per pipeline run
+and hands back the cached Series afterwards.
+
+Cache key: (series key, window, min_periods, stat, q, lead).
+
+  - The series key defaults to (name, length, first date, last date,
+    content hash), so a column and a slice of that column (walk-forward /
+    OOS replays) are distinct entries, and so is a transformed or
+    refiltered copy that keeps the same name and span. `key=` overrides it.
+  - A rolling statistic of `s.shift(lead)` equals the same statistic of `s`
+    shifted by `lead`, so the unshifted result is computed once per
+    (series, window, min_periods, stat) and every lead is a cheap shift of it.
+
+Supported stats: mean, std, min, max, quantile (requires `q`). Rolling
+quantiles are produced by `_rolling_window.rolling_quantiles`; request the
+whole grid through `quantiles()` so every percentile of a window comes out
+of one ordering pass.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Hashable, Optional
+
+import pandas as pd
+
+from _rolling_window import rolling_quantiles
+
+
+_STATS = ("mean", "std", "min", "max", "quantile")
+
+
+def series_key(s: pd.Series) -> tuple:
+    """Cache identity of a Series: name, index span, and a hash of its values and index."""
+    if len(s) == 0:
+        return (s.name, 0, None, None, None)
+    if s.dtype.kind in "biuf" and isinstance(s.index, pd.DatetimeIndex):
+        digest = hashlib.sha256(s.to_numpy().tobytes())
+        digest.update(s.index.asi8.tobytes())
+    else:
+        digest = hashlib.sha256(pd.util.hash_pandas_object(s, index=True).to_numpy().tobytes())
+    return (s.name, len(s), s.index[0], s.index[-1], digest.hexdigest())
+
+
+class RollingStatsCache:
+    """Per-run memo of rolling-window statistics keyed by series and lead."""
+
+    def __init__(self):
+        self._store: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def clear(self) -> None:
+        self._store.clear()
+        self.hits = self.misses = 0
+
+    def _memo(self, key, compute):
+        if key in self._store:
+            self.hits += 1
+            return self._store[key]
+        self.misses += 1
+        val = compute()
+        self._store[key] = val
+        return val
+
+    def shifted(self, s: pd.Series, lead: int = 0, *,
+                key: Optional[Hashable] = None) -> pd.Series:
+        """`s.shift(lead)` (or `s` itself for lead 0), cached."""
+        if lead <= 0:
+            return s
+        skey = key if key is not None else series_key(s)
+        return self._memo((skey, "shift", lead), lambda: s.shift(lead))
+
+    def stat(self, s: pd.Series, window: int, min_periods: int, stat: str,
+             lead: int = 0, *, q: Optional[float] = None,
+             key: Optional[Hashable] = None) -> pd.Series:
+        """
+        `s.shift(lead).rolling(window, min_periods=min_periods).<stat>()`,
+        computed at most once per pipeline run.
+        """
+        if stat not in _STATS:
+            raise ValueError(f"unsupported rolling stat '{stat}' (expected one of {_STATS})")
+        if stat == "quantile" and q is None:
+            raise ValueError("rolling quantile requires q")
+        skey = key if key is not None else series_key(s)
+        base_key = (skey, window, min_periods, stat, q, 0)
+
+        if stat == "quantile":
+            if base_key not in self._store:
+                self.quantiles(s, window, min_periods, [q], key=skey)
+            base = self._memo(base_key, None)
+        else:
+            base = self._memo(base_key, lambda: getattr(
+                s.rolling(window, min_periods=min_periods), stat)())
+        if lead <= 0:
+            return base
+        return self._memo((skey, window, min_periods, stat, q, lead),
+                          lambda: base.shift(lead))
+
+    def quantiles(self, s: pd.Series, window: int, min_periods: int, qs,
+                  lead: int = 0, *, key: Optional[Hashable] = None) -> dict:
+        """
+        Rolling quantiles of `s.shift(lead)` for every q in `qs`, as {q: Series}.
+        Quantiles not yet cached are computed together in a single pass.
+        """
+        skey = key if key is not None else series_key(s)
+        missing = [q for q in qs if (skey, window, min_periods, "quantile", q, 0) not in self._store]
+        if missing:
+            self.misses += len(missing)
+            frame = rolling_quantiles(s, window, min_periods, missing)
+            for q in missing:
+                self._store[(skey, window, min_periods, "quantile", q, 0)] = frame[q]
+        return {q: self.stat(s, window, min_periods, "quantile", lead, q=q, key=skey)
+                for q in qs}
+
+    def zscore(self, s: pd.Series, window: int, min_periods: int, lead: int = 0, *,
+               key: Optional[Hashable] = None) -> pd.Series:
+        """Rolling z-score of `s.shift(lead)`; zero rolling std maps to NaN."""
+        skey = key if key is not None else series_key(s)
+
+        def _z():
+            sig = self.shifted(s, lead, key=skey)
+            mean = self.stat(s, window, min_periods, "mean", lead, key=skey)
+            std = self.stat(s, window, min_periods, "std", lead, key=skey)
+            return (sig - mean) / std.where(std != 0)
+
+        return self._memo((skey, window, min_periods, "zscore", None, lead), _z)
+
+    def minmax_scaled(self, s: pd.Series, window: int, min_periods: int, lead: int = 0, *,
+                      key: Optional[Hashable] = None) -> pd.Series:
+        """`(sig − rolling min) / rolling range` of `s.shift(lead)`, clipped to [0, 1]."""
+        skey = key if key is not None else series_key(s)
+
+        def _scaled():
+            sig = self.shifted(s, lead, key=skey)
+            smin = self.stat(s, window, min_periods, "min", lead, key=skey)
+            smax = self.stat(s, window, min_periods, "max", lead, key=skey)
+            rng = smax - smin
+            return ((sig - smin) / rng.where(rng != 0)).clip(0, 1)
+
+        return self._memo((skey, window, min_periods, "minmax", None, lead), _scaled)
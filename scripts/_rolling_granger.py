@@ -0,0 +1,106 @@
+"""
+Shared helper: rolling-window Granger causality without per-window refits.
+
+`compute_rolling_granger` used to call `grangercausalitytests` on every
+window (`for i in range(window, n)`), rebuilding the lag matrix and fitting
+a restricted and an unrestricted OLS per lag per window — thousands of
+small fits per daily pair.
+
+For lag L, regression row t has a fixed design vector
+z_t = [1, y_{t-1..t-L}, x_{t-1..t-L}, y_t] whatever window it falls in, so a
+window's normal equations are just the sum of z_t z_tᵀ over its rows. Those
+sums are taken as differences of running sums — each row is added once when
+it enters a window and removed once when it leaves — and every window's
+restricted / unrestricted SSR is read off its (2L+2)² cross-product block
+with one batched solve. Cost is O(n · L²) per lag instead of
+O(n · window · L²).
+
+Semantics match statsmodels' `grangercausalitytests(data[[y, x]], maxlag)`
+`ssr_ftest` on each window `data[e - window:e]`:
+  - rows t = s+L .. e-1 of the window (the first L rows only supply lags)
+  - restricted:   y_t ~ 1 + y_{t-1..t-L}
+  - unrestricted: y_t ~ 1 + y_{t-1..t-L} + x_{t-1..t-L}
+  - F = (SSR_r − SSR_u) / SSR_u × (n_L − 2L − 1) / L,  n_L = window − L
+  - p = F(L, n_L − 2L − 1) survival function
+Collinear windows (e.g. a signal stuck at 0/1 for a whole window) are solved
+with a pseudo-inverse, as statsmodels does.
+"""
+from __future__ import annotations
+
+import numpy as np
+from scipy import stats
+
+
+def _ssr(S: np.ndarray, cols: np.ndarray, rcond: float) -> np.ndarray:
+    """Residual SS of y (last column of S) on `cols`, for a stack of cross-product blocks."""
+    xx = S[:, cols[:, None], cols[None, :]]
+    xy = S[:, cols, -1]
+    beta = np.einsum("wij,wj->wi", np.linalg.pinv(xx, rcond=rcond, hermitian=True), xy)
+    return S[:, -1, -1] - np.einsum("wi,wi->w", beta, xy)
+
+
+def rolling_granger(
+    y,
+    x,
+    window: int,
+    maxlag: int = 3,
+    *,
+    rcond: float = 1e-12,
+) -> dict[str, np.ndarray]:
+    """
+    Granger F-test of "x causes y" for lags 1..maxlag on every full window.
+
+    Windows are rows [e − window, e) for e = window .. n. Returns a dict:
+      - end      (m,)          exclusive end row of each window
+      - f_stat   (m × maxlag)  ssr-based F statistic per lag
+      - p_value  (m × maxlag)
+      - df_denom (maxlag,)     denominator degrees of freedom per lag
+    Inputs must be NaN-free and of equal length.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    n = len(y)
+    if len(x) != n:
+        raise ValueError(f"x length {len(x)} != y length {n}")
+    if np.isnan(y).any() or np.isnan(x).any():
+        raise ValueError("rolling_granger needs NaN-free inputs")
+    if window <= 3 * maxlag + 1:
+        raise ValueError(f"window {window} too short for maxlag {maxlag}")
+
+    ends = np.arange(window, n + 1)
+    m = len(ends)
+    f_out = np.full((m, maxlag), np.nan)
+    p_out = np.full((m, maxlag), np.nan)
+    df_denom = np.array([window - L - (2 * L + 1) for L in range(1, maxlag + 1)])
+    if m == 0:
+        return {"end": ends, "f_stat": f_out, "p_value": p_out, "df_denom": df_denom}
+
+    # Standardise once: the intercept absorbs the shift and the F statistic is
+    # scale-free, but well-scaled running sums lose far less to cancellation
+    def _std(v):
+        sd = v.std()
+        return (v - v.mean()) / (sd if sd > 0 else 1.0)
+    ys, xs = _std(y), _std(x)
+
+    for L in range(1, maxlag + 1):
+        t = np.arange(L, n)
+        z = np.column_stack([np.ones(len(t))]
+                            + [ys[t - k] for k in range(1, L + 1)]
+                            + [xs[t - k] for k in range(1, L + 1)]
+                            + [ys[t]])
+        # csum[j] = Σ z_t z_tᵀ over t = L .. L+j-1
+        csum = np.zeros((len(t) + 1, z.shape[1], z.shape[1]))
+        np.cumsum(z[:, :, None] * z[:, None, :], axis=0, out=csum[1:])
+        # window [e-window, e) uses rows t = e-window+L .. e-1
+        S = csum[ends - L] - csum[ends - window]
+
+        ssr_u = _ssr(S, np.arange(0, 2 * L + 1), rcond)
+        ssr_r = _ssr(S, np.arange(0, L + 1), rcond)
+        dfd = df_denom[L - 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = np.maximum(ssr_r - ssr_u, 0.0) / ssr_u * dfd / L
+        f[~(ssr_u > 0)] = np.nan
+        f_out[:, L - 1] = f
+        p_out[:, L - 1] = stats.f.sf(f, L, dfd)
+
+    return {"end": ends, "f_stat": f_out, "p_value": p_out, "df_denom": df_denom}
@@ -0,0 +1,134 @@
+"""
+Shared helper: OLS over many contiguous row ranges from cumulative moments.
+
+Rolling-window regressions used to refit `OLS(y, X)` once per window inside
+a Python loop. The OLS fit of rows [a, b) only needs that range's moments
+XᵀX, Xᵀy, yᵀy and Σy, and each is a difference of running sums over the
+rows, so `cumulative_moments` accumulates them once (O(n·k²)) and
+`segment_ols` fits any batch of ranges with one batched k × k solve.
+`rolling_ols` (fixed or expanding windows) and the structural-break tests in
+`_structural_break` are both built on it.
+
+Non-constant columns and y are centred on their full-sample means before
+accumulating — the running sums then lose far less to cancellation — and
+coefficients are mapped back to the original units. Rank-deficient ranges
+(e.g. a dummy that is constant over a window) use a pseudo-inverse, as
+statsmodels does.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Moments(NamedTuple):
+    xx: np.ndarray          # (n+1, k, k) running Σ x xᵀ (centred columns)
+    xy: np.ndarray          # (n+1, k)    running Σ x y
+    yy: np.ndarray          # (n+1,)      running Σ y²
+    ys: np.ndarray          # (n+1,)      running Σ y
+    x_mean: np.ndarray      # (k,) centring applied to each column (0 for the constant)
+    y_mean: float
+    const: Optional[int]    # index of the constant column, if any
+    const_value: float      # its value (1.0 for `design`)
+
+
+def design(x, add_const: bool = True) -> np.ndarray:
+    """(n × k) regressor matrix from a vector / matrix, constant first."""
+    X = np.asarray(x, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    return np.column_stack([np.ones(len(X)), X]) if add_const else X
+
+
+def cumulative_moments(y, X) -> Moments:
+    """Running moments of (y, X); rows must be NaN-free."""
+    y = np.asarray(y, dtype=float)
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    n, k = X.shape
+    if len(y) != n:
+        raise ValueError(f"y length {len(y)} != X rows {n}")
+    if np.isnan(y).any() or np.isnan(X).any():
+        raise ValueError("cumulative_moments needs NaN-free inputs")
+
+    is_const = (np.all(X == X[:1], axis=0) & (X[0] != 0)) if n else np.zeros(k, bool)
+    const = int(np.flatnonzero(is_const)[0]) if is_const.any() else None
+    const_value = float(X[0, const]) if const is not None else 1.0
+    x_mean = np.zeros(k)
+    y_mean = 0.0
+    if const is not None:
+        # an intercept absorbs the shift, so centring leaves every fit unchanged
+        x_mean = np.where(is_const, 0.0, X.mean(axis=0))
+        y_mean = float(y.mean())
+    Xc = X - x_mean
+    yc = y - y_mean
+
+    def _run(a):
+        out = np.zeros((n + 1,) + a.shape[1:])
+        np.cumsum(a, axis=0, out=out[1:])
+        return out
+
+    return Moments(_run(Xc[:, :, None] * Xc[:, None, :]), _run(Xc * yc[:, None]),
+                   _run(yc * yc), _run(yc), x_mean, y_mean, const, const_value)
+
+
+def segment_ssr(mom: Moments, start, stop, *, rcond: float = 1e-12) -> np.ndarray:
+    """Residual sum of squares of the OLS fit on rows [start, stop), vectorised."""
+    return segment_ols(mom, start, stop, rcond=rcond)["ssr"]
+
+
+def segment_ols(mom: Moments, start, stop, *, rcond: float = 1e-12) -> dict[str, np.ndarray]:
+    """
+    OLS fit on each row range [start[i], stop[i]).
+
+    Returns coef (m × k, original units), ssr, nobs, r2 (centred TSS) and
+    sigma2 (ssr / (nobs − k)).
+    """
+    a = np.atleast_1d(np.asarray(start, dtype=int))
+    b = np.atleast_1d(np.asarray(stop, dtype=int))
+    xx = mom.xx[b] - mom.xx[a]
+    xy = mom.xy[b] - mom.xy[a]
+    yy = mom.yy[b] - mom.yy[a]
+    ys = mom.ys[b] - mom.ys[a]
+    nobs = b - a
+    k = xx.shape[1]
+
+    beta = np.einsum("mij,mj->mi", np.linalg.pinv(xx, rcond=rcond, hermitian=True), xy)
+    ssr = np.maximum(yy - np.einsum("mi,mi->m", beta, xy), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tss = yy - ys * ys / nobs
+        r2 = np.where(tss > 0, 1 - ssr / tss, np.nan)
+        sigma2 = np.where(nobs > k, ssr / (nobs - k), np.nan)
+
+    coef = beta.copy()
+    if mom.const is not None:
+        coef[:, mom.const] += (mom.y_mean - beta @ mom.x_mean) / mom.const_value
+    return {"coef": coef, "ssr": ssr, "nobs": nobs, "r2": r2, "sigma2": sigma2}
+
+
+def rolling_ols(
+    y,
+    X,
+    window: int,
+    *,
+    expanding: bool = False,
+    min_obs: Optional[int] = None,
+    rcond: float = 1e-12,
+) -> dict[str, np.ndarray]:
+    """
+    OLS of y on X (include the constant yourself, see `design`) for every
+    window ending at row e−1, e = window .. n. Fixed windows cover
+    [e − window, e); expanding windows cover [0, e) and start at
+    e = `min_obs` (default `window`). Adds `end` (exclusive end row) to the
+    `segment_ols` output.
+    """
+    mom = cumulative_moments(y, X)
+    n = len(mom.yy) - 1
+    first = (min_obs or window) if expanding else window
+    ends = np.arange(first, n + 1)
+    starts = np.zeros_like(ends) if expanding else ends - window
+    out = segment_ols(mom, starts, ends, rcond=rcond)
+    out["end"] = ends
+    return out
@@ -0,0 +1,93 @@
+"""
+Shared helper: transaction-cost × execution-delay sensitivity from one replay.
+
+`stage_validation` used to replay each top-5 winner once per cost level and
+once per execution delay, recomputing rolling thresholds every time. Neither
+sweep needs a new replay: a cost level only rescales the turnover series,
+and an execution delay only shifts the position series. `sensitivity_grid`
+takes the single replayed position series and evaluates every
+(delay, bps) cell as broadcast operations on a (dates × delays × costs)
+block.
+
+Per cell (matching the legacy per-point loops):
+  - position      = pos.shift(delay)        (acted on `delay` periods late)
+  - gross return  = position.shift(1) × target return, rows with NaN dropped
+  - cost          = |Δposition| × bps / 10,000, charged one period after the
+                    trade (same timing as the legacy `cost_pd.shift(1)`)
+  - net Sharpe    = mean / std(ddof=1) × sqrt(periods_per_year), 0 if std == 0
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from _tournament_engine import _masked_sharpe, _shift_down
+
+
+def delayed_positions(pos, delays: Sequence[int]) -> np.ndarray:
+    """(n × len(delays)) block; column j is `pos` shifted down by delays[j] (NaN head)."""
+    p = np.asarray(pos, dtype=float)
+    out = np.full((len(p), len(delays)), np.nan)
+    for j, d in enumerate(delays):
+        d = int(d)
+        if d < 0:
+            raise ValueError("execution delays must be >= 0")
+        if d < len(p):
+            out[d:, j] = p[:len(p) - d]
+    return out
+
+
+def net_sharpe_grid(
+    pos,
+    returns,
+    bps: Sequence[float],
+    delays: Sequence[int] = (0,),
+    *,
+    periods_per_year: int = 252,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Net Sharpe for every (delay, bps) pair.
+
+    Returns (sharpe, n_obs): sharpe is (len(delays) × len(bps)); n_obs is the
+    number of return rows behind each delay (costs do not change it).
+    """
+    ret = np.asarray(returns, dtype=float)
+    bps = np.asarray(bps, dtype=float)
+    held = delayed_positions(pos, delays)                  # n × D
+    if len(ret) != len(held):
+        raise ValueError(f"returns length {len(ret)} != positions length {len(held)}")
+
+    gross = _shift_down(held) * ret[:, None]               # n × D
+    ok = ~np.isnan(gross)
+    turnover = np.abs(np.diff(held, axis=0, prepend=np.nan))
+    cost = _shift_down(np.where(np.isnan(turnover), 0.0, turnover))
+    cost = np.where(np.isnan(cost), 0.0, cost)
+
+    net = gross[:, :, None] - cost[:, :, None] * (bps / 10000)[None, None, :]
+    n, D, C = net.shape
+    mask = np.broadcast_to(ok[:, :, None], net.shape).reshape(n, D * C)
+    n_obs, _, _, sharpe = _masked_sharpe(net.reshape(n, D * C), mask, periods_per_year)
+    return sharpe.reshape(D, C), n_obs.reshape(D, C)[:, 0]
+
+
+def sensitivity_grid(
+    pos: pd.Series,
+    returns: pd.Series,
+    bps: Sequence[float],
+    delays: Sequence[int] = (0,),
+    *,
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    """Long-form (execution_delay, tx_cost_bps, net_sharpe, n_obs) frame over the grid."""
+    ret = returns.reindex(pos.index)
+    sharpe, n_obs = net_sharpe_grid(pos.to_numpy(dtype=float), ret.to_numpy(dtype=float),
+                                    bps, delays, periods_per_year=periods_per_year)
+    D, C = sharpe.shape
+    return pd.DataFrame({
+        "execution_delay": np.repeat(np.asarray(delays, dtype=int), C),
+        "tx_cost_bps": np.tile(np.asarray(bps), D),
+        "net_sharpe": sharpe.ravel(),
+        "n_obs": np.repeat(n_obs, C).astype(int),
+    })
@@ -0,0 +1,201 @@
+"""
+Shared helper: sup-F (Andrews / Quandt LR) and Bai–Perron structural-break tests.
+
+`compute_structural_break` used to refit a rolling 504-obs OLS per window
+and report max|ΔR²| as a "pseudo-QLR" with a made-up p-value. Both tests
+here are built on `_rolling_ols` cumulative moments, so the SSR of any
+regime [a, b) costs one small k × k solve:
+
+  - `sup_f_test`  Chow F for a break at every candidate date in
+                  [trim·n, (1−trim)·n] — all coefficients allowed to change,
+                  F = ((SSR_full − SSR_1 − SSR_2) / k) / ((SSR_1 + SSR_2) / (n − 2k))
+                  — in linear time. sup-F is Andrews' (1993) statistic, and
+                  the argmax is the QLR break-date estimate.
+  - `bai_perron`  Global SSR-minimising partitions with 1..max_breaks breaks
+                  (Bai & Perron 2003 dynamic programme over a candidate grid),
+                  BIC for each, and the sequential sup-F(l+1 | l) tests.
+
+p-values and critical values come from Andrews' limiting distribution,
+sup over π ∈ [trim, 1−trim] of ‖B(π) − πB(1)‖² / (π(1−π)) / k for a
+k-dimensional Brownian bridge. It is simulated once per (k, trim) and
+cached. Under the null the Bai–Perron sup-F(l+1 | l) statistic is the
+maximum of l+1 independent segment sup-F statistics, so its p-value is
+1 − G(x)^(l+1). Errors are assumed homoskedastic and serially uncorrelated,
+the classical Chow / Andrews setting.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+
+from _rolling_ols import Moments, cumulative_moments, segment_ssr
+
+
+@lru_cache(maxsize=None)
+def sup_f_null(k: int, trim: float, n_sim: int = 5000, n_grid: int = 1000,
+               seed: int = 12345) -> np.ndarray:
+    """Sorted draws from the asymptotic null distribution of sup-F (k restrictions)."""
+    rng = np.random.default_rng(seed)
+    pi = np.arange(1, n_grid + 1) / n_grid
+    sel = (pi >= trim) & (pi <= 1 - trim)
+    p = pi[sel]
+    denom = p * (1 - p)
+    out = np.empty(n_sim)
+    chunk = max(1, 2_000_000 // (n_grid * k))
+    for s0 in range(0, n_sim, chunk):
+        b = min(chunk, n_sim - s0)
+        w = np.cumsum(rng.standard_normal((b, n_grid, k)), axis=1) / np.sqrt(n_grid)
+        bridge = w[:, sel] - p[None, :, None] * w[:, -1:, :]
+        out[s0:s0 + b] = ((bridge ** 2).sum(axis=2) / denom).max(axis=1) / k
+    out.sort()
+    return out
+
+
+def sup_f_pvalue(stat: float, k: int, trim: float, n_segments: int = 1) -> float:
+    """P(max of `n_segments` independent sup-F draws > stat) under the null."""
+    if not np.isfinite(stat):
+        return float("nan")
+    null = sup_f_null(k, round(float(trim), 6))
+    cdf = np.searchsorted(null, stat, side="right") / len(null)
+    return float(1 - cdf ** n_segments)
+
+
+def sup_f_critical_values(k: int, trim: float, levels=(0.10, 0.05, 0.01)) -> dict[str, float]:
+    null = sup_f_null(k, round(float(trim), 6))
+    return {f"{int(a * 100)}%": round(float(np.quantile(null, 1 - a)), 4) for a in levels}
+
+
+def _chow_f(mom: Moments, a: int, b: int, cands: np.ndarray, k: int) -> np.ndarray:
+    """Chow F for a single break at each row in `cands` within regime [a, b)."""
+    c = np.asarray(cands, dtype=int)
+    ssr_r = segment_ssr(mom, [a], [b])[0]
+    ssr_u = segment_ssr(mom, np.full(len(c), a), c) + segment_ssr(mom, c, np.full(len(c), b))
+    dfd = (b - a) - 2 * k
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f = (np.maximum(ssr_r - ssr_u, 0.0) / k) / (ssr_u / dfd)
+    return np.where(ssr_u > 0, f, np.nan)
+
+
+def sup_f_test(y, X, *, trim: float = 0.15) -> dict:
+    """
+    Andrews sup-F / QLR test for one break in all coefficients of y ~ X.
+
+    Returns stat, break_index (first row of the second regime), p_value,
+    critical_values, and the F path over `candidates`.
+    """
+    mom = cumulative_moments(y, X)
+    n, k = len(mom.yy) - 1, mom.xx.shape[1]
+    lo, hi = int(np.ceil(trim * n)), int(np.floor((1 - trim) * n))
+    lo, hi = max(lo, k + 1), min(hi, n - k - 1)
+    if hi < lo:
+        raise ValueError(f"{n} observations are too few for trim={trim} with {k} regressors")
+    cands = np.arange(lo, hi + 1)
+    f = _chow_f(mom, 0, n, cands, k)
+    if np.isnan(f).all():
+        stat, bp = float("nan"), None
+    else:
+        j = int(np.nanargmax(f))
+        stat, bp = float(f[j]), int(cands[j])
+    return {
+        "stat": stat,
+        "break_index": bp,
+        "p_value": sup_f_pvalue(stat, k, trim),
+        "critical_values": sup_f_critical_values(k, trim),
+        "candidates": cands,
+        "f_path": f,
+        "n_obs": n,
+        "k": k,
+    }
+
+
+def bai_perron(
+    y,
+    X,
+    *,
+    max_breaks: int = 5,
+    trim: float = 0.15,
+    max_candidates: int = 500,
+    alpha: float = 0.05,
+) -> dict:
+    """
+    Bai–Perron multiple-break estimation and tests for y ~ X (all coefficients break).
+
+    Break dates are restricted to a grid of at most `max_candidates` rows
+    (every row for short samples); regimes are at least trim·n rows long.
+    Returns one model per break count (break rows, SSR, BIC), the sequential
+    sup-F(l+1 | l) tests, and the break count chosen by BIC and by the
+    sequential procedure at `alpha`.
+    """
+    mom = cumulative_moments(y, X)
+    n, k = len(mom.yy) - 1, mom.xx.shape[1]
+    h = max(int(np.ceil(trim * n)), k + 1)
+    max_breaks = int(min(max_breaks, n // h - 1))
+    if max_breaks < 1:
+        raise ValueError(f"{n} observations leave no room for a break with trim={trim}")
+
+    step = max(1, int(np.ceil(n / max_candidates)))
+    pos = np.unique(np.r_[np.arange(0, n, step), n])
+    G = len(pos)
+
+    # SSR of every admissible regime [pos[i], pos[j])
+    ii, jj = np.triu_indices(G, 1)
+    ok = (pos[jj] - pos[ii]) >= h
+    ssr = np.full((G, G), np.inf)
+    ssr[ii[ok], jj[ok]] = segment_ssr(mom, pos[ii[ok]], pos[jj[ok]])
+
+    # Dynamic programme: cost[m][j] = min SSR of rows [0, pos[j]) with m breaks
+    cost = [ssr[0].copy()]
+    arg = [np.zeros(G, dtype=int)]
+    for m in range(1, max_breaks + 1):
+        tot = cost[-1][:, None] + ssr
+        arg.append(np.argmin(tot, axis=0))
+        cost.append(tot[arg[-1], np.arange(G)])
+
+    def _breaks(m):
+        out, j = [], G - 1
+        for mm in range(m, 0, -1):
+            j = int(arg[mm][j])
+            out.append(int(pos[j]))
+        return sorted(out)
+
+    models = []
+    for m in range(0, max_breaks + 1):
+        total = float(cost[m][G - 1])
+        if not np.isfinite(total):
+            break
+        n_params = (m + 1) * k + m
+        models.append({"n_breaks": m, "breaks": _breaks(m), "ssr": total,
+                       "bic": float(n * np.log(total / n) + n_params * np.log(n))})
+
+    # Sequential sup-F(l+1 | l): best extra break inside any regime of the l-break fit
+    sequential = []
+    n_seq = 0
+    for l in range(0, len(models) - 1):
+        bounds = [0, *models[l]["breaks"], n]
+        stat = -np.inf
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            seg_h = max(h, int(np.ceil(trim * (b - a))))
+            cands = pos[(pos >= a + seg_h) & (pos <= b - seg_h)]
+            if len(cands) == 0:
+                continue
+            f = _chow_f(mom, a, b, cands, k)
+            if not np.isnan(f).all():
+                stat = max(stat, float(np.nanmax(f)))
+        p = sup_f_pvalue(stat, k, trim, n_segments=l + 1) if np.isfinite(stat) else float("nan")
+        sequential.append({"null_breaks": l, "stat": stat if np.isfinite(stat) else float("nan"),
+                           "p_value": p})
+        if n_seq == l and p < alpha:
+            n_seq = l + 1
+
+    return {
+        "n_obs": n,
+        "k": k,
+        "trim": trim,
+        "min_regime": h,
+        "grid_step": step,
+        "models": models,
+        "sequential": sequential,
+        "n_breaks_bic": int(min(models, key=lambda r: r["bic"])["n_breaks"]),
+        "n_breaks_sequential": n_seq,
+    }
@@ -0,0 +1,241 @@
+"""
+Shared helper: vectorized tournament engine.
+
+The pair pipelines' `stage_tournament` used to rebuild a pandas position
+Series, cumprod, cummax and rolling stats for every
+signal × threshold × strategy × lead combo inside five nested Python loops.
+This module replaces the inner loop with matrix operations: every combo's
+position series is stacked into one (dates × combos) NumPy block and the
+OOS Sharpe, drawdown, turnover, win rate and trade count are computed for
+the whole block at once.
+
+Usage pattern inside a pipeline:
+
+    block = PositionBlock(work.index)
+    for sig_name, sig_col in available.items():
+        for lead in leads:
+            ...
+            p2 = block.add_positions(p2_array)           # shared column
+            for tname, tval in thresholds.items():
+                block.add({"signal": sig_name, ...,
+                           "strategy": "P1"}, bullish.astype(float))
+                block.add({..., "strategy": "P2"}, column=p2)
+    metrics = block.evaluate(work["spy_ret"], is_mask, oos_mask)
+
+Semantics match the legacy per-combo loop exactly:
+  - strategy return  = position.shift(1) × target return
+  - IS / OOS returns = strategy return on the mask with NaN rows dropped
+  - Sharpe           = mean / std(ddof=1) × sqrt(periods_per_year), 0 if std == 0
+  - max drawdown     = min((cum − cummax) / cummax) of the OOS compounding path (ratio)
+  - annual turnover  = Σ|Δposition| / max(n_non_null_positions / periods_per_year, 1)
+  - n_trades         = count of |Δposition| > trade_eps over the full sample
+
+All return / drawdown outputs are in ratio form (META-UC); callers convert
+to percent where their legacy CSV schema requires it.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+METRIC_COLUMNS = [
+    "is_n", "oos_n", "is_sharpe", "oos_sharpe", "oos_ann_return", "oos_ann_vol",
+    "oos_sortino", "oos_calmar", "max_drawdown", "win_rate", "n_trades",
+    "annual_turnover",
+]
+
+
+def _shift_down(block: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Row-shift a 2-D block like `DataFrame.shift(periods)` (NaN fill)."""
+    out = np.empty_like(block)
+    out[:periods] = np.nan
+    out[periods:] = block[:-periods]
+    return out
+
+
+def _masked_sharpe(ret: np.ndarray, valid: np.ndarray,
+                   periods_per_year: int) -> tuple[np.ndarray, ...]:
+    """Column-wise (n, mean, std, sharpe) over the rows flagged in `valid`."""
+    n = valid.sum(axis=0)
+    r0 = np.where(valid, ret, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = r0.sum(axis=0) / n
+        dev = np.where(valid, ret - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / (n - 1))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+    return n, mean, std, sharpe
+
+
+def evaluate_positions(
+    positions: np.ndarray,
+    returns: np.ndarray,
+    is_mask: np.ndarray,
+    oos_mask: np.ndarray,
+    *,
+    periods_per_year: int = 252,
+    trade_eps: float = 0.0,
+    chunk_size: int = 512,
+) -> dict[str, np.ndarray]:
+    """
+    Evaluate a (dates × combos) position block against one return series.
+
+    Columns are processed in chunks of `chunk_size` so the temporary
+    strategy-return / compounding blocks stay bounded regardless of how many
+    combos the tournament enumerates. Returns a dict of 1-D arrays keyed by
+    METRIC_COLUMNS, one entry per column of `positions`.
+    """
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim == 1:
+        positions = positions[:, None]
+    returns = np.asarray(returns, dtype=float)
+    is_mask = np.asarray(is_mask, dtype=bool)
+    oos_mask = np.asarray(oos_mask, dtype=bool)
+    n_dates, n_cols = positions.shape
+    if returns.shape[0] != n_dates:
+        raise ValueError(f"returns length {returns.shape[0]} != position rows {n_dates}")
+
+    out = {k: np.empty(n_cols) for k in METRIC_COLUMNS}
+    ret_is = returns[is_mask][:, None]
+    ret_oos = returns[oos_mask][:, None]
+    ann = np.sqrt(periods_per_year)
+
+    for c0 in range(0, n_cols, max(int(chunk_size), 1)):
+        c1 = min(c0 + chunk_size, n_cols)
+        pos = positions[:, c0:c1]
+        held = _shift_down(pos)
+
+        # ── IS / OOS strategy returns ──
+        is_r = held[is_mask] * ret_is
+        oos_r = held[oos_mask] * ret_oos
+        is_ok = ~np.isnan(is_r)
+        oos_ok = ~np.isnan(oos_r)
+        is_n, _, _, is_sh = _masked_sharpe(is_r, is_ok, periods_per_year)
+        oos_n, oos_mean, oos_std, oos_sh = _masked_sharpe(oos_r, oos_ok, periods_per_year)
+
+        # ── Drawdown (dropped rows compound at 1.0, leaving the path unchanged) ──
+        r0 = np.where(oos_ok, oos_r, 0.0)
+        cum = np.cumprod(1.0 + r0, axis=0)
+        peak = np.maximum.accumulate(cum, axis=0)
+        mdd = ((cum - peak) / peak).min(axis=0) if len(r0) else np.full(c1 - c0, np.nan)
+
+        # ── Downside deviation (Sortino) ──
+        neg = oos_ok & (oos_r < 0)
+        _, _, down_std, _ = _masked_sharpe(oos_r, neg, periods_per_year)
+
+        # ── Turnover / trades over the full sample ──
+        dpos = np.abs(np.diff(pos, axis=0))
+        turnover_sum = np.nansum(dpos, axis=0)
+        years = np.maximum((~np.isnan(pos)).sum(axis=0) / periods_per_year, 1.0)
+        with np.errstate(invalid="ignore"):
+            n_trades = (dpos > trade_eps).sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ann_ret = oos_mean * periods_per_year
+            down_ann = down_std * ann
+            sortino = np.where(down_ann > 0, ann_ret / down_ann, 0.0)
+            calmar = np.where(np.abs(mdd) > 0, ann_ret / np.abs(mdd), 0.0)
+            win = np.where(oos_n > 0, (oos_ok & (oos_r > 0)).sum(axis=0) / oos_n, 0.0)
+
+        sl = slice(c0, c1)
+        out["is_n"][sl] = is_n
+        out["oos_n"][sl] = oos_n
+        out["is_sharpe"][sl] = is_sh
+        out["oos_sharpe"][sl] = oos_sh
+        out["oos_ann_return"][sl] = ann_ret
+        out["oos_ann_vol"][sl] = oos_std * ann
+        out["oos_sortino"][sl] = sortino
+        out["oos_calmar"][sl] = calmar
+        out["max_drawdown"][sl] = mdd
+        out["win_rate"][sl] = win
+        out["n_trades"][sl] = n_trades
+        out["annual_turnover"][sl] = turnover_sum / years
+
+    out["is_n"] = out["is_n"].astype(int)
+    out["oos_n"] = out["oos_n"].astype(int)
+    out["n_trades"] = out["n_trades"].astype(int)
+    return out
+
+
+class PositionBlock:
+    """
+    Accumulates tournament combos as columns of one (dates × combos) block.
+
+    Several combos may point at the same position column (e.g. P2 signal-
+    strength sizing does not depend on the threshold), so unique position
+    series are stored once and evaluated once.
+    """
+
+    def __init__(self, index: pd.Index):
+        self.index = index
+        self._columns: list[np.ndarray] = []
+        self._rows: list[dict] = []
+        self._col_of_row: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def n_positions(self) -> int:
+        return len(self._columns)
+
+    def add_positions(self, positions) -> int:
+        """Store one position series; returns its column id for reuse."""
+        arr = np.asarray(positions, dtype=float)
+        if arr.shape != (len(self.index),):
+            raise ValueError(f"position length {arr.shape} != index length {len(self.index)}")
+        self._columns.append(arr)
+        return len(self._columns) - 1
+
+    def add(self, meta: dict, positions=None, *, column: Optional[int] = None) -> int:
+        """Register a combo described by `meta` with new `positions` or an existing `column`."""
+        if column is None:
+            if positions is None:
+                raise ValueError("add() needs either positions or column")
+            column = self.add_positions(positions)
+        self._rows.append(dict(meta))
+        self._col_of_row.append(column)
+        return column
+
+    def positions(self) -> np.ndarray:
+        if not self._columns:
+            return np.empty((len(self.index), 0))
+        return np.column_stack(self._columns)
+
+    def position_series(self, column: int) -> pd.Series:
+        return pd.Series(self._columns[column], index=self.index)
+
+    def column_ids(self, rows=None) -> np.ndarray:
+        """Position column behind each registered combo (or the given row numbers)."""
+        cols = np.asarray(self._col_of_row, dtype=int)
+        return cols if rows is None else cols[np.asarray(rows, dtype=int)]
+
+    def strategy_returns(self, returns: pd.Series, mask, columns=None) -> np.ndarray:
+        """
+        (masked dates × columns) matrix of `position.shift(1) × return`.
+
+        Flat / undefined positions and missing returns contribute 0, so every
+        column is aligned on the same dates (as a joint bootstrap requires).
+        """
+        cols = range(self.n_positions) if columns is None else columns
+        mask = np.asarray(mask, dtype=bool)
+        pos = np.column_stack([self._columns[c] for c in cols]) if len(cols) else \
+            np.empty((len(self.index), 0))
+        ret = returns.reindex(self.index).to_numpy(dtype=float)
+        out = _shift_down(pos)[mask] * ret[mask][:, None]
+        return np.where(np.isnan(out), 0.0, out)
+
+    def evaluate(self, returns: pd.Series, is_mask, oos_mask, **kw) -> pd.DataFrame:
+        """
+        Evaluate every registered combo; returns one row per `add()` call
+        (meta keys first, then METRIC_COLUMNS, raw unrounded values).
+        """
+        ret = returns.reindex(self.index).to_numpy(dtype=float)
+        m = evaluate_positions(self.positions(), ret, is_mask, oos_mask, **kw)
+        cols = np.asarray(self._col_of_row, dtype=int)
+        meta = pd.DataFrame(self._rows)
+        metrics = pd.DataFrame({k: v[cols] for k, v in m.items()}) if len(cols) else \
+            pd.DataFrame(columns=METRIC_COLUMNS)
+        return pd.concat([meta.reset_index(drop=True), metrics], axis=1)
@@ -0,0 +1,151 @@
+"""
+Shared helper: histogram transfer entropy with batched permutation nulls.
+
+`transfer_entropy_binned` in stage2 binned with `pd.qcut`, built three
+`groupby().size()` tables, summed over them in a Python dict loop, and was
+then called 2 × 1,000 times per lag to build the shuffle null.
+
+Here each (y_t, y_{t-lag}, x_{t-lag}) triple of quantile-bin codes is
+encoded as one integer, so every joint table is a single `np.bincount`:
+
+    TE(X→Y) = Σ p(y, y', x') · log[ p(y, y', x') p(y') / (p(y', x') p(y, y')) ]
+
+and the counts' marginals are sums over axes of the 3-D count cube. The
+permutation null shuffles the source, re-bins x_{t-lag} on the shuffled
+series (as the stage2 loop did), and evaluates a whole batch of shuffles
+with one bincount over offset codes. Batches are independent tasks spread
+over worker processes (`workers`). Each batch has its own child seed, so
+the null does not depend on how many workers run it.
+
+Binning is `pd.qcut(v, n_bins, labels=False, duplicates="drop")`: the
+edges come from pandas' own quantile (older pandas goes through
+`np.percentile(100 · q)`, whose 1/3 and 2/3 edges can differ from
+`np.quantile` in the last ulp and move a value that sits on the edge),
+bins are right-closed and the lowest edge is included. TE is in nats. The
+p-value is (1 + #{null ≥ TE}) / (1 + n_perm).
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from _parallel import parallel_map
+
+
+def quantile_codes(v, n_bins: int) -> np.ndarray:
+    """Equal-frequency bin codes 0..(n_bins-1), as `pd.qcut(labels=False)`."""
+    v = np.asarray(v, dtype=float)
+    edges = pd.Series(v).quantile(np.linspace(0, 1, n_bins + 1)).to_numpy()
+    return np.searchsorted(np.unique(edges)[1:-1], v, side="left")
+
+
+def _quantile_codes_2d(V: np.ndarray, n_bins: int) -> np.ndarray:
+    """Row-wise `quantile_codes` for a (B × m) matrix."""
+    qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+    edges = pd.DataFrame(V.T).quantile(qs).to_numpy().T                    # B × (n_bins-1)
+    # duplicate edges only leave an empty code, which TE ignores
+    return (V[:, :, None] > edges[:, None, :]).sum(axis=2)
+
+
+def _te_from_codes(yc: np.ndarray, ylc: np.ndarray, XC: np.ndarray, n_bins: int) -> np.ndarray:
+    """TE for fixed target codes and a (B × m) stack of source codes."""
+    B, m = XC.shape
+    K = n_bins ** 3
+    base = (yc * n_bins + ylc) * n_bins
+    flat = (base[None, :] + XC) + (K * np.arange(B))[:, None]
+    c = np.bincount(flat.ravel(), minlength=B * K).reshape(B, n_bins, n_bins, n_bins).astype(float)
+    c_yyl = c.sum(axis=3, keepdims=True)
+    c_ylx = c.sum(axis=1, keepdims=True)
+    c_yl = c_yyl.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(c > 0, c * np.log(c * c_yl / (c_ylx * c_yyl)), 0.0)
+    return terms.sum(axis=(1, 2, 3)) / m
+
+
+def _prepare(x, y, lag: int, n_bins: int):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) != len(y):
+        raise ValueError(f"x length {len(x)} != y length {len(y)}")
+    if np.isnan(x).any() or np.isnan(y).any():
+        raise ValueError("transfer entropy needs NaN-free inputs")
+    return x, quantile_codes(y[lag:], n_bins), quantile_codes(y[:-lag], n_bins)
+
+
+def transfer_entropy(x, y, lag: int = 1, n_bins: int = 5, min_obs: int = 100) -> float:
+    """TE(X→Y) from x_{t-lag}, y_{t-lag} to y_t; NaN below `min_obs` triples."""
+    x, yc, ylc = _prepare(x, y, lag, n_bins)
+    if len(yc) < min_obs:
+        return float("nan")
+    return float(_te_from_codes(yc, ylc, quantile_codes(x[:-lag], n_bins)[None, :], n_bins)[0])
+
+
+def _null_batch(args) -> np.ndarray:
+    x, yc, ylc, lag, n_bins, size, seed = args
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permuted(np.broadcast_to(x, (size, len(x))), axis=1)
+    return _te_from_codes(yc, ylc, _quantile_codes_2d(shuffled[:, :-lag], n_bins), n_bins)
+
+
+def te_grid(
+    x,
+    y,
+    lags: Iterable[int] = (1,),
+    bins: Iterable[int] = (5,),
+    *,
+    n_perm: int = 1000,
+    seed: int = 42,
+    workers: Optional[int] = None,
+    batch_size: int = 50,
+    min_obs: int = 100,
+) -> list[dict]:
+    """
+    TE(X→Y) and its permutation p-value for every (lag, n_bins) combination.
+
+    All permutation batches across the grid share one process pool. Returns
+    one dict per combination: lag, n_bins, te, p_value, null_mean, null_p95,
+    n_perm, n_obs.
+    """
+    combos = [(int(l), int(b)) for l in lags for b in bins]
+    prepared = {c: _prepare(x, y, *c) for c in combos}
+    seeds = np.random.SeedSequence(seed).spawn(len(combos))
+
+    tasks, owner = [], []
+    for ci, (lag, n_bins) in enumerate(combos):
+        xv, yc, ylc = prepared[(lag, n_bins)]
+        if len(yc) < min_obs or n_perm <= 0:
+            continue
+        sizes = [batch_size] * (n_perm // batch_size) + ([n_perm % batch_size] if n_perm % batch_size else [])
+        for size, child in zip(sizes, seeds[ci].spawn(len(sizes))):
+            tasks.append((xv, yc, ylc, lag, n_bins, size, child))
+            owner.append(ci)
+
+    results = parallel_map(_null_batch, tasks, workers)
+    nulls = {ci: [] for ci in range(len(combos))}
+    for ci, r in zip(owner, results):
+        nulls[ci].append(r)
+
+    rows = []
+    for ci, (lag, n_bins) in enumerate(combos):
+        te = transfer_entropy(x, y, lag, n_bins, min_obs)
+        null = np.concatenate(nulls[ci]) if nulls[ci] else np.array([])
+        ok = len(null) > 0 and not np.isnan(te)
+        rows.append({
+            "lag": lag,
+            "n_bins": n_bins,
+            "te": te,
+            "p_value": float((1 + (null >= te).sum()) / (1 + len(null))) if ok else float("nan"),
+            "null_mean": float(null.mean()) if ok else float("nan"),
+            "null_p95": float(np.quantile(null, 0.95)) if ok else float("nan"),
+            "n_perm": len(null),
+            "n_obs": len(prepared[(lag, n_bins)][1]),
+        })
+    return rows
+
+
+def te_test(x, y, lag: int = 1, n_bins: int = 5, **kwargs) -> dict:
+    """`te_grid` for a single (lag, n_bins)."""
+    return te_grid(x, y, (lag,), (n_bins,), **kwargs)[0]
+
@@ -0,0 +1,168 @@
+"""
+Shared helper: batched unit-root tests at full resolution, with a result cache.
+
+The stationarity stages looped ADF / KPSS over ~15 columns one at a time,
+and any series longer than 5,000 observations was silently decimated to
+`s.iloc[::5]`. That turns a daily test into a weekly-sampled one, with
+different lag structure, power and meaning.
+
+`unit_root_tests` runs every (series, test) pair on the full series as
+independent tasks over a forked process pool (`_parallel.parallel_map`):
+
+  - "ADF"  augmented Dickey–Fuller, lags chosen by AIC up to `max_lags`
+  - "KPSS" KPSS (null: stationary), data-dependent bandwidth
+  - "PP"   Phillips–Perron
+  - "ZA"   Zivot–Andrews (unit root vs. one structural break), AIC lags
+
+all from `arch.unitroot` with a constant. Without `arch`, ADF, KPSS and
+ZA fall back to their statsmodels versions (as the pipelines' old
+`adfuller` fallback did) and PP is reported as an error. Conclusions follow
+the pipelines' rule: "Stationary" when p < `alpha`, except KPSS where the
+null is stationarity (p > `alpha`). A test that raises is printed and kept
+as a row with NaN statistics and "Error: <exception>" as its conclusion.
+
+With `cache_dir`, each result is stored as JSON keyed by a hash of the
+series values, the test, its options and the backend. Pairs that share an
+input (SPY, VIX, DGS10) reuse each other's results; the variable name is
+not part of the key. Errors are not cached.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from _parallel import parallel_map
+
+TESTS = ("ADF", "KPSS", "PP", "ZA")
+COLUMNS = ["variable", "test", "statistic", "p_value", "lags", "n_obs", "conclusion"]
+
+
+def _backend() -> str:
+    try:
+        import arch.unitroot  # noqa: F401
+    except ImportError:
+        return "statsmodels"
+    return "arch"
+
+
+def _key(values: np.ndarray, test: str, max_lags: int, backend: str = "arch") -> str:
+    h = hashlib.sha256(np.ascontiguousarray(values, dtype=float).tobytes())
+    h.update(f"|{test}|trend=c|max_lags={max_lags}".encode())
+    if backend != "arch":
+        h.update(f"|backend={backend}".encode())
+    return h.hexdigest()
+
+
+def _run_statsmodels(values: np.ndarray, test: str, max_lags: int) -> dict:
+    from statsmodels.tsa.stattools import adfuller, kpss, zivot_andrews
+
+    if test == "ADF":
+        stat, pvalue, lags = adfuller(values, maxlag=max_lags, regression="c", autolag="AIC")[:3]
+    elif test == "KPSS":
+        stat, pvalue, lags = kpss(values, regression="c", nlags="auto")[:3]
+    elif test == "ZA":
+        stat, pvalue, _, lags = zivot_andrews(values, maxlag=max_lags, regression="c",
+                                              autolag="AIC")[:4]
+    else:
+        raise ImportError(f"{test} needs the arch package")
+    return {"statistic": float(stat), "p_value": float(pvalue),
+            "lags": int(lags), "n_obs": int(len(values))}
+
+
+def _run_test(task) -> dict:
+    values, test, max_lags, backend = task
+    if backend == "statsmodels":
+        return _run_statsmodels(values, test, max_lags)
+    from arch.unitroot import ADF, KPSS, PhillipsPerron, ZivotAndrews
+
+    if test == "ADF":
+        r = ADF(values, max_lags=max_lags)
+    elif test == "KPSS":
+        r = KPSS(values)
+    elif test == "PP":
+        r = PhillipsPerron(values)
+    else:
+        r = ZivotAndrews(values, max_lags=max_lags)
+    return {"statistic": float(r.stat), "p_value": float(r.pvalue),
+            "lags": int(r.lags), "n_obs": int(len(values))}
+
+
+def _safe_run(task) -> dict:
+    try:
+        return _run_test(task)
+    except Exception as e:
+        msg = str(e).strip().splitlines()
+        return {"error": f"{type(e).__name__}: {msg[0] if msg else ''}".rstrip(": ")}
+
+
+def unit_root_tests(
+    series: Mapping[str, pd.Series],
+    tests: Sequence[str] = ("ADF", "KPSS"),
+    *,
+    max_lags: int = 12,
+    min_obs: int = 100,
+    alpha: float = 0.05,
+    cache_dir: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Run `tests` on every series in `series` (name → Series, NaNs dropped).
+    Returns one row per (variable, test), in input order, with columns
+    variable, test, statistic, p_value, lags, n_obs, conclusion. Series
+    shorter than `min_obs` are skipped; tests that fail are printed and
+    kept as error rows.
+    """
+    bad = [t for t in tests if t not in TESTS]
+    if bad:
+        raise ValueError(f"unknown unit-root tests {bad} (expected some of {TESTS})")
+
+    backend = _backend()
+    if backend != "arch":
+        print(f"  arch not installed: unit-root tests fall back to {backend}")
+    jobs, rows = [], {}
+    for name, s in series.items():
+        v = pd.Series(s).dropna().to_numpy(dtype=float)
+        if len(v) < min_obs:
+            continue
+        for test in tests:
+            key = _key(v, test, max_lags, backend)
+            path = os.path.join(cache_dir, f"{key[:24]}.json") if cache_dir else None
+            if path and os.path.exists(path):
+                with open(path) as f:
+                    rows[(name, test)] = json.load(f)
+            else:
+                jobs.append(((name, test), path, (v, test, max_lags, backend)))
+
+    results = parallel_map(_safe_run, [t for _, _, t in jobs], workers)
+    for ((name, test), path, task), res in zip(jobs, results):
+        rows[(name, test)] = res
+        if "error" in res:
+            print(f"  {test} {name} FAILED: {res['error']}")
+            res.update(statistic=np.nan, p_value=np.nan, lags=np.nan, n_obs=len(task[0]))
+            continue
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(res, f)
+
+    out = []
+    for name in series:
+        for test in tests:
+            r = rows.get((name, test))
+            if r is None:
+                continue
+            if "error" in r:
+                conclusion = f"Error: {r['error']}"
+            elif (r["p_value"] > alpha if test == "KPSS" else r["p_value"] < alpha):
+                conclusion = "Stationary"
+            else:
+                conclusion = "Non-stationary"
+            out.append({"variable": name, "test": test,
+                        **{c: r[c] for c in ("statistic", "p_value", "lags", "n_obs")},
+                        "conclusion": conclusion})
+    return pd.DataFrame(out, columns=COLUMNS)
@@ -0,0 +1,193 @@
+"""
+Shared helper: incremental walk-forward validation.
+
+The validation stages used to run walk-forward as
+`for test_year in ...: _replay_strategy(work[train_start:test_end], ...)`,
+re-slicing six years of data per fold, recomputing every rolling statistic
+over the slice and keeping one year of it. Total cost grew with
+folds × slice length, which ruled out monthly or weekly refits.
+
+This module separates the two things a fold actually needs:
+
+  - Causal position inputs (rolling z-scores, rolling percentile thresholds,
+    min-max sizing, HMM/MS probabilities) only look backwards, so the
+    full-history replay gives the same test-period positions as a slice
+    replay with enough lookback. It is computed once and every fold reads
+    its test rows from it.
+  - Fitted state (e.g. a T1 percentile of the training-window signal) is
+    refit per fold from `WindowQuantile`, a sorted training window that is
+    advanced incrementally: rows leaving the window are removed and rows
+    entering it are inserted, so a rolling or expanding refit schedule
+    touches each observation O(1) times.
+
+`make_folds` builds calendar folds for any pandas frequency ("YS" annual,
+"QS", "MS" monthly, "W-MON" weekly) with a rolling (`train_span`) or
+expanding training window; `walk_forward` evaluates them.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Fold(NamedTuple):
+    label: pd.Timestamp      # test-period start
+    train: slice             # row positions into the index
+    test: slice
+
+
+def make_folds(
+    index: pd.Index,
+    *,
+    test_freq: str = "YS",
+    train_span: Optional[pd.DateOffset] = pd.DateOffset(years=5),
+    expanding: bool = False,
+    first_test=None,
+    last_test=None,
+    purge: int = 0,
+) -> list[Fold]:
+    """
+    Consecutive calendar test periods of `test_freq`, each preceded by its
+    training window: [test_start − train_span, test_start) when rolling, or
+    everything before test_start when `expanding`. Periods with no rows are
+    skipped.
+
+    `purge` drops that many rows from the end of every training window. Use
+    the label horizon when labels look ahead (e.g. the sign of a 21-day
+    forward return), so no training label is computed from test-period rows.
+    """
+    idx = pd.DatetimeIndex(index)
+    if len(idx) == 0:
+        return []
+    if not expanding and train_span is None:
+        raise ValueError("rolling folds need train_span (or expanding=True)")
+    start = pd.Timestamp(first_test) if first_test is not None else \
+        (idx[0] if expanding else idx[0] + train_span)
+    end = pd.Timestamp(last_test) if last_test is not None else idx[-1]
+    starts = pd.date_range(start, end, freq=test_freq)
+    if len(starts) == 0:
+        return []
+    bounds = idx.searchsorted(starts, side="left")
+    nxt = starts[-1] + pd.tseries.frequencies.to_offset(test_freq)
+    stops = np.append(bounds[1:], idx.searchsorted(nxt, side="left"))
+
+    folds = []
+    for ts, t0, t1 in zip(starts, bounds, stops):
+        if t1 <= t0:
+            continue
+        r0 = 0 if expanding else int(idx.searchsorted(ts - train_span, side="left"))
+        folds.append(Fold(ts, slice(r0, max(r0, int(t0) - purge)), slice(int(t0), int(t1))))
+    return folds
+
+
+class WindowQuantile:
+    """
+    Sorted non-NaN values of `values[start:stop]`, advanced incrementally.
+
+    `move_to(rows)` accepts any [start, stop) with both ends non-decreasing
+    relative to the previous call (rolling or expanding schedules); anything
+    else triggers a rebuild. `quantile(q)` matches `Series.quantile(q)`
+    (linear interpolation) on the same window.
+    """
+
+    def __init__(self, values):
+        self._x = np.asarray(values, dtype=float)
+        self._sorted: list = []
+        self._lo = self._hi = 0
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def _rebuild(self, lo: int, hi: int) -> None:
+        w = self._x[lo:hi]
+        self._sorted = np.sort(w[~np.isnan(w)]).tolist()
+
+    def move_to(self, rows: slice) -> "WindowQuantile":
+        lo, hi = rows.start, rows.stop
+        if lo < self._lo or hi < self._hi or lo >= self._hi or \
+                (hi - self._hi) > len(self._sorted):
+            self._rebuild(lo, hi)
+        else:
+            s = self._sorted
+            for v in self._x[self._lo:lo]:
+                if v == v:
+                    del s[bisect_left(s, v)]
+            for v in self._x[self._hi:hi]:
+                if v == v:
+                    insort(s, v)
+        self._lo, self._hi = lo, hi
+        return self
+
+    def quantile(self, q: float) -> float:
+        s = self._sorted
+        n = len(s)
+        if n == 0:
+            return np.nan
+        # NumPy's "linear" method (used by Series.quantile), incl. its lerp form
+        q = np.float64(q * 100) / 100
+        v = q * (n - 1)
+        lo = int(np.floor(v))
+        hi = min(lo + 1, n - 1)
+        g = v - lo
+        a, b = s[lo], s[hi]
+        diff = b - a
+        return float(b - diff * (1 - g)) if g >= 0.5 else float(a + diff * g)
+
+
+def walk_forward(
+    folds: list[Fold],
+    returns,
+    positions=None,
+    *,
+    train_values=None,
+    refit: Optional[Callable[[WindowQuantile, slice], np.ndarray]] = None,
+    min_train_obs: int = 0,
+    min_test_obs: int = 1,
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    """
+    Evaluate each fold's test-period Sharpe.
+
+    `positions` is the full-history position series for strategies without
+    fitted state. With `refit`, the training window of `train_values` is
+    advanced fold by fold and `refit(window, rows)` must return positions
+    for `rows` (the test rows plus the one row before them, whose position
+    is held on the first test day).
+
+    Strategy return = previous row's position × return; NaN rows dropped;
+    Sharpe = mean / std(ddof=1) × sqrt(periods_per_year), 0 if std == 0.
+    Returns one row per evaluated fold: label, n_train, n_obs, sharpe.
+    """
+    ret = np.asarray(returns, dtype=float)
+    pos = None if positions is None else np.asarray(positions, dtype=float)
+    if pos is None and refit is None:
+        raise ValueError("walk_forward needs positions or refit")
+    window = WindowQuantile(train_values) if train_values is not None else None
+
+    rows = []
+    for f in folds:
+        if window is not None:
+            window.move_to(f.train)
+            n_train = len(window)
+        else:
+            n_train = f.train.stop - f.train.start
+        if n_train < min_train_obs:
+            continue
+
+        r0 = max(f.test.start - 1, 0)
+        p = refit(window, slice(r0, f.test.stop)) if refit is not None \
+            else pos[r0:f.test.stop]
+        p = np.asarray(p, dtype=float)
+        held = p[:-1] if f.test.start > 0 else np.concatenate([[np.nan], p[:-1]])
+        r = held * ret[f.test]
+        r = r[~np.isnan(r)]
+        if len(r) < max(min_test_obs, 1):
+            continue
+        std = r.std(ddof=1) if len(r) > 1 else np.nan
+        sharpe = r.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+        rows.append({"label": f.label, "n_train": n_train,
+                     "n_obs": len(r), "sharpe": sharpe})
+    return pd.DataFrame(rows, columns=["label", "n_train", "n_obs", "sharpe"])
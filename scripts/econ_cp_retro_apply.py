@@ -8,6 +8,7 @@ Produces per-pair:
   3. structural_break_{pair_id}.json
   4. rolling_sharpe_{pair_id}.csv
   5. rolling_granger_{pair_id}.csv
+  6. rolling_regression_{pair_id}.csv
 """
 
 import os
@@ -16,9 +17,13 @@ import glob
 import warnings
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.stattools import grangercausalitytests
 import traceback
 
+from _bocpd import online_change_points
+from _rolling_granger import rolling_granger
+from _rolling_ols import design, rolling_ols
+from _structural_break import bai_perron, sup_f_test
+
 warnings.filterwarnings("ignore")
 
 BASE = "/workspaces/aig-rlic-plus"
@@ -277,17 +282,11 @@ def compute_rolling_corr(df, cfg):
     return result
 
 
-# ── 3. Structural break (QLR / rolling R² approach) ──────────────────────────
-def compute_structural_break(df, cfg):
-    from statsmodels.regression.linear_model import OLS
-    from statsmodels.tools import add_constant
-
-    pair_id = cfg["pair_id"]
+# ── 3. Structural break (Andrews sup-F / QLR + Bai–Perron) ──────────────────
+def _break_regression_frame(df, cfg):
+    """tgt ~ 1 + sig with the signal lagged the way the strategy trades it."""
     freq = cfg["freq"]
     lead = cfg["lead_days"]
-    window = 504 if freq == "daily" else 24
-    trim = 0.15
-
     signal = df[cfg["signal_col"]]
     target = df[cfg["target_col"]]
 
@@ -299,62 +298,113 @@ def compute_structural_break(df, cfg):
         shift_n = 1 if freq == "daily" else lead
         sig_shifted = signal.shift(shift_n)
 
-    combo = pd.concat([sig_shifted.rename("sig"), target.rename("tgt")], axis=1).dropna()
+    return pd.concat([sig_shifted.rename("sig"), target.rename("tgt")], axis=1).dropna()
+
+
+def compute_structural_break(df, cfg):
+    """Andrews sup-F (QLR) test for one break in (alpha, beta), plus Bai–Perron.
+
+    Chow F is evaluated at every candidate date in the central 70% of the
+    sample from cumulative moments (see `_structural_break`); p-value and
+    critical values come from Andrews' asymptotic distribution.
+    """
+    freq = cfg["freq"]
+    window = 504 if freq == "daily" else 24
+    trim = 0.15
+
+    combo = _break_regression_frame(df, cfg)
     n = len(combo)
 
     if n < window * 2:
-        return dict(test="rolling_r2_qlr", breakpoint_date=None, max_f_stat=np.nan,
+        return dict(test="andrews_sup_f", breakpoint_date=None, max_f_stat=np.nan,
                     p_value=np.nan, conclusion="insufficient data", trim_pct=trim, n_obs=n)
 
-    # Rolling OLS R²
-    r2_series = []
-    dates = []
-    for i in range(window, n):
-        sub = combo.iloc[i - window:i]
-        X = add_constant(sub["sig"])
-        y = sub["tgt"]
-        try:
-            res = OLS(y, X).fit()
-            r2_series.append(res.rsquared)
-        except Exception:
-            r2_series.append(np.nan)
-        dates.append(combo.index[i])
-
-    r2_arr = np.array(r2_series, dtype=float)
-    trim_n = int(trim * len(r2_arr))
-
-    # Find max absolute change in R² as pseudo-QLR breakpoint
-    r2_diff = np.abs(np.diff(r2_arr))
-    valid = r2_diff[trim_n:-trim_n] if trim_n > 0 else r2_diff
-    if len(valid) == 0:
-        bp_idx = 0
-        max_f = np.nan
+    y = combo["tgt"].to_numpy()
+    X = design(combo["sig"].to_numpy())
+    sf = sup_f_test(y, X, trim=trim)
+    bp = bai_perron(y, X, trim=trim)
+
+    max_f, p_val = sf["stat"], sf["p_value"]
+    bp_date = str(combo.index[sf["break_index"]].date()) if sf["break_index"] is not None else None
+    crit = sf["critical_values"]
+
+    if np.isnan(max_f):
+        conclusion = "Degenerate regression — structural break test not computed"
+    elif p_val < 0.05:
+        conclusion = (f"sup-F = {max_f:.2f} exceeds the 5% critical value ({crit['5%']:.2f}); "
+                      f"break in the signal–target relationship near {bp_date}")
     else:
-        rel_idx = np.nanargmax(valid)
-        bp_idx = rel_idx + trim_n
-        max_f = float(valid[rel_idx])
-
-    bp_date = str(dates[bp_idx].date()) if bp_idx < len(dates) else None
-    p_approx = float(np.exp(-max_f * 10)) if not np.isnan(max_f) else np.nan
-
-    conclusion = (
-        f"Rolling R² jump of {max_f:.4f} detected near {bp_date}; "
-        "potential structural break — verify with Chow test"
-        if max_f > 0.02 else
-        "No substantial structural break detected"
-    )
+        conclusion = (f"sup-F = {max_f:.2f} below the 5% critical value ({crit['5%']:.2f}); "
+                      "no significant structural break")
+
+    def _dates(rows):
+        return [str(combo.index[r].date()) for r in rows]
 
     return dict(
-        test="rolling_r2_qlr_proxy",
+        test="andrews_sup_f",
         breakpoint_date=bp_date,
         max_f_stat=round(max_f, 6) if not np.isnan(max_f) else None,
-        p_value=round(p_approx, 6) if not np.isnan(p_approx) else None,
+        p_value=round(p_val, 6) if not np.isnan(p_val) else None,
+        critical_values=crit,
         conclusion=conclusion,
         trim_pct=trim,
         n_obs=n,
+        bai_perron=dict(
+            n_breaks_bic=bp["n_breaks_bic"],
+            n_breaks_sequential=bp["n_breaks_sequential"],
+            breaks_bic=_dates(bp["models"][bp["n_breaks_bic"]]["breaks"]),
+            breaks_sequential=_dates(bp["models"][bp["n_breaks_sequential"]]["breaks"]),
+            sequential_tests=[
+                dict(null_breaks=t["null_breaks"],
+                     sup_f=round(t["stat"], 6) if not np.isnan(t["stat"]) else None,
+                     p_value=round(t["p_value"], 6) if not np.isnan(t["p_value"]) else None)
+                for t in bp["sequential"]
+            ],
+            models=[
+                dict(n_breaks=m["n_breaks"], breaks=_dates(m["breaks"]),
+                     ssr=round(m["ssr"], 10), bic=round(m["bic"], 4))
+                for m in bp["models"]
+            ],
+            grid_step=bp["grid_step"],
+            min_regime_obs=bp["min_regime"],
+        ),
+    )
+
+
+def compute_signal_change_points(df, cfg, state_path=None):
+    """Online BOCPD on the signal level; state persists between runs at `state_path`."""
+    daily = cfg["freq"] == "daily"
+    cp_df, _ = online_change_points(
+        df[cfg["signal_col"]], state_path,
+        expected_run=250 if daily else 60, confirm=21 if daily else 6,
+        warmup=63 if daily else 24)
+    return dict(
+        method="bocpd",
+        expected_run=250 if daily else 60,
+        confirm_obs=21 if daily else 6,
+        n_change_points=len(cp_df),
+        change_points=cp_df.to_dict(orient="records"),
     )
 
 
+def compute_rolling_regression(df, cfg):
+    """Rolling tgt ~ 1 + sig over the structural-break regression, one row per full window."""
+    window = 504 if cfg["freq"] == "daily" else 24
+    combo = _break_regression_frame(df, cfg)
+    cols = ["date", "alpha", "beta", "r_squared", "resid_var"]
+    if len(combo) < window:
+        return pd.DataFrame(columns=cols)
+
+    ro = rolling_ols(combo["tgt"].to_numpy(), design(combo["sig"].to_numpy()), window)
+    return pd.DataFrame({
+        "date": combo.index[ro["end"] - 1].strftime("%Y-%m-%d"),
+        "alpha": ro["coef"][:, 0].round(8),
+        "beta": ro["coef"][:, 1].round(8),
+        "r_squared": ro["r2"].round(6),
+        "resid_var": ro["sigma2"],
+    })[cols]
+
+
 # ── 4. Rolling Sharpe ─────────────────────────────────────────────────────────
 def compute_rolling_sharpe(strat_ret, cfg):
     freq = cfg["freq"]
@@ -371,31 +421,41 @@ def compute_rolling_sharpe(strat_ret, cfg):
 
 
 # ── 5. Rolling Granger ────────────────────────────────────────────────────────
-def compute_rolling_granger(df, strat_ret, cfg):
+def compute_rolling_granger(df, strat_ret, cfg, maxlag=3):
+    """Granger F-test (signal → strategy return) on every rolling window, lags 1..maxlag.
+
+    One row per full window, dated at its last observation. granger_f_24m /
+    p_value_24m are the best lag's statistics (max F); the per-lag columns
+    follow.
+    """
     freq = cfg["freq"]
     window = 504 if freq == "daily" else 24
     signal = df[cfg["signal_col"]].reindex(strat_ret.index)
 
     combo = pd.concat([signal.rename("sig"), strat_ret.rename("tgt")], axis=1).dropna()
-    n = len(combo)
-    results = []
-
-    for i in range(window, n):
-        sub = combo.iloc[i - window:i]
-        date_val = combo.index[i - 1].strftime("%Y-%m-%d")
-        try:
-            gc_res = grangercausalitytests(sub[["tgt", "sig"]], maxlag=3, verbose=False)
-            # Take max F across lags 1-3
-            f_stats = [gc_res[lag][0]["ssr_ftest"][0] for lag in range(1, 4)]
-            p_vals = [gc_res[lag][0]["ssr_ftest"][1] for lag in range(1, 4)]
-            best_lag = int(np.argmax(f_stats)) + 1
-            best_f = f_stats[best_lag - 1]
-            best_p = p_vals[best_lag - 1]
-            results.append(dict(date=date_val, granger_f_24m=round(best_f, 6), p_value_24m=round(best_p, 6)))
-        except Exception:
-            results.append(dict(date=date_val, granger_f_24m=np.nan, p_value_24m=np.nan))
-
-    return pd.DataFrame(results)
+    lags = range(1, maxlag + 1)
+    cols = (["date", "granger_f_24m", "p_value_24m", "best_lag"]
+            + [f"f_lag{l}" for l in lags] + [f"p_lag{l}" for l in lags])
+    if len(combo) < window:
+        return pd.DataFrame(columns=cols)
+
+    rg = rolling_granger(combo["tgt"], combo["sig"], window, maxlag)
+    f_stat, p_val = rg["f_stat"], rg["p_value"]
+    ok = ~np.isnan(f_stat).all(axis=1)
+    best = np.where(ok, np.argmax(np.where(np.isnan(f_stat), -np.inf, f_stat), axis=1), 0)
+    rows = np.arange(len(best))
+
+    out = pd.DataFrame({
+        "date": combo.index[rg["end"] - 1].strftime("%Y-%m-%d"),
+        "granger_f_24m": np.where(ok, f_stat[rows, best], np.nan).round(6),
+        "p_value_24m": np.where(ok, p_val[rows, best], np.nan).round(6),
+        "best_lag": pd.array(np.where(ok, best + 1, np.nan)).astype("Int64"),
+    })
+    for l in lags:
+        out[f"f_lag{l}"] = f_stat[:, l - 1].round(6)
+    for l in lags:
+        out[f"p_lag{l}"] = p_val[:, l - 1].round(6)
+    return out[cols]
 
 
 # ── Main loop ─────────────────────────────────────────────────────────────────
@@ -440,6 +500,8 @@ for cfg in PAIRS:
 
         # 3. Structural break
         sb_dict = compute_structural_break(df, cfg)
+        sb_dict["bocpd"] = compute_signal_change_points(
+            df, cfg, os.path.join(out_dir, f"bocpd_state_{pid}.json"))
         sb_path = os.path.join(out_dir, f"structural_break_{pid}.json")
         with open(sb_path, "w") as f:
             json.dump(sb_dict, f, indent=2)
@@ -460,6 +522,12 @@ for cfg in PAIRS:
         else:
             print(f"  [5] Skipped rolling Granger — insufficient data ({len(strat_ret)} obs)")
 
+        # 6. Rolling regression (alpha / beta / R² behind the break test)
+        rr_df = compute_rolling_regression(df, cfg)
+        rr_path = os.path.join(out_dir, f"rolling_regression_{pid}.csv")
+        rr_df.to_csv(rr_path, index=False)
+        print(f"  [6] rolling_regression_{pid}.csv written ({len(rr_df)} rows)")
+
         # Sub-period quick summary
         for _, row in sp_df.iterrows():
             if not np.isnan(row["sharpe"]):
@@ -19,9 +19,10 @@ Output artefacts (all under results/hy_ig_spy/):
   tournament_results_20260422.csv   — ratio form per META-UC
   winner_summary.json               — schema v1.0.0 per ECON-H5 / APP-WS1
   tournament_winner.json            — winner+benchmark delta record
+  reality_check.json                — data-snooping p-values (White RC / Hansen SPA)
   signal_scope.json                 — axis_block per ECON-SD / APP-SS1
   analyst_suggestions.json          — ECON-AS informational channel
-  stationarity_tests_20260422.csv   — ADF + KPSS per ECON-C
+  stationarity_tests_20260422.csv   — ADF + KPSS + PP + ZA per ECON-C
   granger_by_lag.csv                — Rule E1 schema
   regime_quartile_returns.csv       — Rule E2 schema (ratio form)
   winner_trade_log.csv              — per-trade P&L log
@@ -30,7 +31,8 @@ Output artefacts (all under results/hy_ig_spy/):
   pipeline_timing_20260422.json     — stage wall-clock times
   core_models_20260422/             — Granger, regressions, HMM, MS, QR, LP
   exploratory_20260422/             — correlations, regime stats
-  tournament_validation_20260422/   — bootstrap CI, walk-forward, costs, decay, stress
+  tournament_validation_20260422/   — bootstrap CI, walk-forward, costs, decay, stress,
+                                      cost × delay surface
   handoff_to_vera_20260422.md       — ECON-H4 per-method chart table
   handoff_evan_20260422.md          — META-RYW + META-SRV evidence
 
@@ -54,34 +56,45 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
+from _hmm_regimes import fit_hmm_grid
+from _markov_switching import fit_markov_switching
+from _pair_pipeline import PairPipeline, Threshold
+from _pair_spec import load_spec
+from _regime_pit import expanding_hmm_probs, expanding_ms_probs
+from _rolling_window import rolling_pct_rank
+
 warnings.filterwarnings("ignore")
 
 # ─────────────────────────────────────────────────────────────
 # CONFIGURATION
 # ─────────────────────────────────────────────────────────────
 
+# Sources, split, signal map, thresholds and tournament settings live in
+# pair_specs/hy_ig_spy.json; the shared stages run on PairPipeline.
 PAIR_ID        = "hy_ig_spy"
-INDICATOR_NAME = "HY-IG Credit Spread"
-TARGET_NAME    = "S&P 500 (SPY)"
-START_DATE     = "2000-01-01"
-END_DATE       = "2026-04-22"
-DATE_TAG       = "20260422"
+SPEC           = load_spec(PAIR_ID)
+INDICATOR_NAME = SPEC.indicator_name
+TARGET_NAME    = SPEC.target_name
+START_DATE     = SPEC.start_date
+END_DATE       = SPEC.end_date
+DATE_TAG       = SPEC.date_tag
 
 # OOS window — ECON-OOS2 formula:
 # span_months = min(max(36, round(N×0.25)), 120)
 # Total sample 2000-01-03 to 2026-04-22 ≈ 316 months
 # span = min(max(36, round(316×0.25)), 120) = min(max(36, 79), 120) = 79 months ≈ 6.6 yr
 # OOS_START = END_DATE - 79 months ≈ 2019-09-01 (round to 2019-10-01)
-IS_END    = "2019-09-30"
-OOS_START = "2019-10-01"
+IS_END    = SPEC.split["is_end"]
+OOS_START = SPEC.split["oos_start"]
 OOS_END   = END_DATE
 
 BASE_DIR      = "/workspaces/aig-rlic-plus"
-DATA_DIR      = os.path.join(BASE_DIR, "data")
-RESULTS_DIR   = os.path.join(BASE_DIR, "results", PAIR_ID)
-EXPLORE_DIR   = os.path.join(RESULTS_DIR, f"exploratory_{DATE_TAG}")
-MODELS_DIR    = os.path.join(RESULTS_DIR, f"core_models_{DATE_TAG}")
-VALIDATION_DIR= os.path.join(RESULTS_DIR, f"tournament_validation_{DATE_TAG}")
+PIPE          = PairPipeline(SPEC, BASE_DIR)
+DATA_DIR      = PIPE.data_dir
+RESULTS_DIR   = PIPE.results_dir
+EXPLORE_DIR   = PIPE.explore_dir
+MODELS_DIR    = PIPE.models_dir
+VALIDATION_DIR= PIPE.valid_dir
 SIGNALS_DIR   = RESULTS_DIR
 
 for d in [DATA_DIR, RESULTS_DIR, EXPLORE_DIR, MODELS_DIR, VALIDATION_DIR]:
@@ -140,15 +153,7 @@ def stage_data() -> pd.DataFrame:
     fred = Fred(api_key=api_key)
     series: dict = {}
 
-    fred_map = [
-        ("BAMLH0A0HYM2", "hy_oas"), ("BAMLC0A0CM",   "ig_oas"),
-        ("BAMLH0A1HYBB", "bb_hy_oas"), ("BAMLH0A3HYC", "ccc_hy_oas"),
-        ("DGS10",        "dgs10"), ("DTB3",           "dtb3"),
-        ("DGS2",         "dgs2"), ("NFCI",            "nfci"),
-        ("DFF",          "fed_funds_rate"), ("BAMLC0A4CBBB", "bbb_oas"),
-        ("STLFSI4",      "fsi"), ("ICSA",             "initial_claims"),
-        ("SOFR",         "sofr"),
-    ]
+    fred_map = SPEC.sources["fred"].items()
     for sid, name in fred_map:
         for attempt in range(3):
             try:
@@ -175,9 +180,7 @@ def stage_data() -> pd.DataFrame:
     if "hy_oas" not in series or "ig_oas" not in series:
         raise RuntimeError("STOP: Missing core OAS series. Cannot build hy_ig_spread_pct.")
 
-    yf_map = [("SPY","spy"),("^VIX","vix"),("^VIX3M","vix3m"),("KBE","kbe"),
-              ("IWM","iwm"),("^MOVE","move_index"),("GC=F","gold"),
-              ("HG=F","copper"),("DX-Y.NYB","dxy"),("HYG","hyg")]
+    yf_map = SPEC.sources["yahoo"].items()
     for ticker, name in yf_map:
         try:
             dl = yf.download(ticker, start=START_DATE, end=END_DATE,
@@ -213,8 +216,8 @@ def stage_data() -> pd.DataFrame:
     spread = df["hy_ig_spread_pct"]
     df["hy_ig_zscore_252d"] = (spread - spread.rolling(252,min_periods=200).mean()) / spread.rolling(252,min_periods=200).std()
     df["hy_ig_zscore_504d"] = (spread - spread.rolling(504,min_periods=400).mean()) / spread.rolling(504,min_periods=400).std()
-    df["hy_ig_pctrank_504d"] = spread.rolling(504,min_periods=400).apply(lambda x: stats.rankdata(x)[-1]/len(x), raw=True)
-    df["hy_ig_pctrank_1260d"] = spread.rolling(1260,min_periods=1000).apply(lambda x: stats.rankdata(x)[-1]/len(x), raw=True)
+    df["hy_ig_pctrank_504d"] = rolling_pct_rank(spread,504,400)
+    df["hy_ig_pctrank_1260d"] = rolling_pct_rank(spread,1260,1000)
     df["hy_ig_roc_21d"]  = (spread/spread.shift(21)-1)*100
     df["hy_ig_roc_63d"]  = (spread/spread.shift(63)-1)*100
     df["hy_ig_roc_126d"] = (spread/spread.shift(126)-1)*100
@@ -275,8 +278,8 @@ def stage_features(df: pd.DataFrame) -> pd.DataFrame:
     needed = {
         "hy_ig_zscore_252d":  lambda: (spread-spread.rolling(252,min_periods=200).mean())/spread.rolling(252,min_periods=200).std(),
         "hy_ig_zscore_504d":  lambda: (spread-spread.rolling(504,min_periods=400).mean())/spread.rolling(504,min_periods=400).std(),
-        "hy_ig_pctrank_504d": lambda: spread.rolling(504,min_periods=400).apply(lambda x: stats.rankdata(x)[-1]/len(x), raw=True),
-        "hy_ig_pctrank_1260d":lambda: spread.rolling(1260,min_periods=1000).apply(lambda x: stats.rankdata(x)[-1]/len(x), raw=True),
+        "hy_ig_pctrank_504d": lambda: rolling_pct_rank(spread,504,400),
+        "hy_ig_pctrank_1260d":lambda: rolling_pct_rank(spread,1260,1000),
         "hy_ig_roc_21d":      lambda: (spread/spread.shift(21)-1)*100,
         "hy_ig_roc_63d":      lambda: (spread/spread.shift(63)-1)*100,
         "hy_ig_roc_126d":     lambda: (spread/spread.shift(126)-1)*100,
@@ -381,7 +384,6 @@ def stage_core_models(df: pd.DataFrame):
     Returns (hmm_probs, ms_probs, reg_df) for downstream use.
     """
     import statsmodels.api as sm
-    import statsmodels.formula.api as smf
     from statsmodels.tsa.stattools import grangercausalitytests
 
     work = df.dropna(subset=["hy_ig_spread_pct", "spy_ret"]).copy()
@@ -425,90 +427,64 @@ def stage_core_models(df: pd.DataFrame):
 
     # ── 2. Predictive Regressions ─────────────────────────────
     reg_results = []
-    reg_signals = [
-        "hy_ig_spread_pct","hy_ig_zscore_252d","hy_ig_zscore_504d",
-        "hy_ig_pctrank_504d","hy_ig_pctrank_1260d",
-        "hy_ig_roc_21d","hy_ig_roc_63d","hy_ig_roc_126d",
-        "hy_ig_mom_21d","hy_ig_mom_63d","hy_ig_acceleration","ccc_bb_spread_pct",
-    ]
-    reg_horizons = ["spy_fwd_1d","spy_fwd_5d","spy_fwd_21d","spy_fwd_63d","spy_fwd_126d"]
-    for sig in reg_signals:
-        for fwd in reg_horizons:
-            if sig not in work.columns or fwd not in work.columns:
-                continue
-            valid = work[[sig, fwd]].dropna()
-            if len(valid) < 50:
-                continue
-            try:
-                X = sm.add_constant(valid[sig])
-                m = sm.OLS(valid[fwd], X).fit(cov_type="HC3")
-                reg_results.append({
-                    "signal": sig, "horizon": fwd,
-                    "coef": round(m.params.iloc[1], 6),
-                    "t_stat": round(m.tvalues.iloc[1], 3),
-                    "p_value": round(m.pvalues.iloc[1], 4),
-                    "r_squared": round(m.rsquared, 4),
-                    "n": int(m.nobs),
-                })
-            except Exception:
-                pass
+    for r in PIPE.regressions(work).itertuples(index=False):
+        reg_results.append({
+            "signal": r.signal, "horizon": r.target,
+            "coef": round(r.coef, 6),
+            "t_stat": round(r.t_stat, 3),
+            "p_value": round(r.p_value, 4),
+            "r_squared": round(r.r_squared, 4),
+            "n": int(r.n),
+        })
     reg_df = pd.DataFrame(reg_results)
     reg_df.to_csv(os.path.join(MODELS_DIR,"predictive_regressions.csv"), index=False)
     print(f"  Regressions: {len(reg_df)}")
 
     # ── 3. Local Projections (Jordà) ──────────────────────────
+    # Full 1..252-day impulse response in one fit (shared cross-products and
+    # Newey–West kernel, at least h lags for the overlapping h-day returns);
+    # local_projections.csv keeps the 5/21/63-day rows
     lp_results = []
-    for fwd, h in [("spy_fwd_5d",5),("spy_fwd_21d",21),("spy_fwd_63d",63)]:
-        if fwd not in work.columns:
-            continue
-        ctrls = [c for c in ["vix","yield_spread_10y3m_pct"] if c in work.columns]
-        valid = work[["hy_ig_spread_pct",fwd]+ctrls].dropna()
-        if len(valid) < 100:
-            continue
-        try:
-            X = sm.add_constant(valid[["hy_ig_spread_pct"]+ctrls])
-            nw = int(0.75*len(valid)**(1/3))
-            m = sm.OLS(valid[fwd], X).fit(cov_type="HAC", cov_kwds={"maxlags":nw})
-            ci = m.conf_int().loc["hy_ig_spread_pct"]
-            lp_results.append({
-                "horizon_days": h,
-                "coef": round(m.params["hy_ig_spread_pct"],6),
-                "se":   round(m.bse["hy_ig_spread_pct"],6),
-                "t_stat": round(m.tvalues["hy_ig_spread_pct"],3),
-                "p_value": round(m.pvalues["hy_ig_spread_pct"],4),
-                "ci_lower": round(ci[0],6), "ci_upper": round(ci[1],6),
-                "r_squared": round(m.rsquared,4), "n": int(m.nobs),
-            })
-        except Exception:
-            pass
-    pd.DataFrame(lp_results).to_csv(os.path.join(MODELS_DIR,"local_projections.csv"), index=False)
-    print(f"  Local projections: {len(lp_results)} horizons")
+    paths = PIPE.lp_paths(df, work.index)
+    for r in PIPE.impulse_response(work, paths).itertuples(index=False):
+        lp_results.append({"horizon_days": int(r.horizon),
+            "coef": round(r.coef, 6), "se": round(r.se, 6),
+            "t_stat": round(r.t_stat, 3), "p_value": round(r.p_value, 4),
+            "ci_lower": round(r.ci_lower, 6), "ci_upper": round(r.ci_upper, 6),
+            "r_squared": round(r.r_squared, 4), "n": int(r.n)})
+    lp_df = pd.DataFrame(lp_results)
+    lp_df.to_csv(os.path.join(MODELS_DIR, "lp_impulse_response.csv"), index=False)
+    lp_df = lp_df[lp_df["horizon_days"].isin([5, 21, 63])]
+    lp_df.to_csv(os.path.join(MODELS_DIR, "local_projections.csv"), index=False)
+    print(f"  Local projections: {len(lp_df)} horizons, IRF over {len(lp_results)}")
 
     # ── 4. Quantile Regression ────────────────────────────────
     qr_results = []
-    valid_qr = work[["hy_ig_spread_pct","spy_fwd_21d"]].dropna()
-    if len(valid_qr) > 50:
-        for tau in [0.05,0.10,0.25,0.50,0.75,0.90,0.95]:
-            try:
-                qr = smf.quantreg("spy_fwd_21d ~ hy_ig_spread_pct",
-                                  data=valid_qr).fit(q=tau)
-                qr_results.append({
-                    "quantile": tau,
-                    "coef": round(qr.params["hy_ig_spread_pct"],6),
-                    "p_value": round(qr.pvalues["hy_ig_spread_pct"],4),
-                    "ci_lower": round(qr.conf_int().loc["hy_ig_spread_pct",0],6),
-                    "ci_upper": round(qr.conf_int().loc["hy_ig_spread_pct",1],6),
-                })
-            except Exception:
-                pass
+    for r in PIPE.quantile_regression(work).itertuples(index=False):
+        qr_results.append({
+            "quantile": r.quantile,
+            "coef": round(r.coef,6),
+            "p_value": round(r.p_value,4),
+            "ci_lower": round(r.ci_lower,6),
+            "ci_upper": round(r.ci_upper,6),
+        })
     pd.DataFrame(qr_results).to_csv(os.path.join(MODELS_DIR,"quantile_regression.csv"), index=False)
     print(f"  Quantile reg: {len(qr_results)} quantiles")
 
+    # Quantile process (99 taus × horizons) for the quantile-process charts
+    qp_results = []
+    for r in PIPE.quantile_process(work, horizons=[1,5,21,63]).itertuples(index=False):
+        qp_results.append({
+            "horizon_days": int(r.horizon), "quantile": r.quantile,
+            "intercept": round(r.intercept,6),
+            "coef": round(r.coef,6), "n": int(r.n),
+        })
+    pd.DataFrame(qp_results).to_csv(os.path.join(MODELS_DIR,"quantile_process.csv"), index=False)
+    print(f"  Quantile process: {len(qp_results)} (horizon, tau) cells")
+
     # ── 5. HMM Regime Detection (2-state) ─────────────────────
     hmm_probs = pd.Series(np.nan, index=df.index, name="hmm_2state_prob_stress")
     try:
-        from hmmlearn.hmm import GaussianHMM
-
         hmm_data = work[["hy_ig_spread_pct","vix"]].copy()
         hmm_data["spread_change"] = work["hy_ig_spread_pct"].diff()
         hmm_data = hmm_data.dropna()
@@ -518,9 +494,12 @@ def stage_core_models(df: pd.DataFrame):
         X_std[X_std==0] = 1
         Xs = (X - X_mean) / X_std
 
-        model_hmm = GaussianHMM(n_components=2, covariance_type="full",
-                                 n_iter=200, random_state=42)
-        model_hmm.fit(Xs)
+        # 2–5 states × 8 restarts in one parallel batch; cached on the features
+        hmm_grid = fit_hmm_grid(Xs, states=(2, 3, 4, 5), n_restarts=8, seed=42,
+                                n_iter=200, cache_dir=os.path.join(MODELS_DIR, "hmm_cache"))
+        hmm_grid.table.round(4).to_csv(
+            os.path.join(MODELS_DIR, "hmm_state_selection.csv"), index=False)
+        model_hmm = hmm_grid.model(2)
         probs = model_hmm.predict_proba(Xs)
         stress_state = int(np.argmax(model_hmm.means_[:, 0]))  # higher spread_change = stress
 
@@ -541,102 +520,80 @@ def stage_core_models(df: pd.DataFrame):
             "mean_stress_prob": round(float(hmm_stress.mean()),4),
             "pct_stress_days":  round(float((hmm_stress > 0.5).mean() * 100),2),
             "state_means": model_hmm.means_.tolist(),
+            "bic_selected_n_states": hmm_grid.best_n_states,
+            "from_cache": hmm_grid.from_cache,
         }
         with open(os.path.join(MODELS_DIR,"hmm_summary.csv"),"w") as f:
             json.dump(hmm_summary, f, indent=2)
 
         print(f"  HMM 2-state: stress_state={stress_state}, "
-              f"mean_stress_prob={hmm_stress.mean():.3f}")
+              f"mean_stress_prob={hmm_stress.mean():.3f}, "
+              f"BIC-selected states={hmm_grid.best_n_states}"
+              f"{' (cached)' if hmm_grid.from_cache else ''}")
     except Exception as e:
         print(f"  HMM FAILED: {e}")
 
     # ── 6. Markov-Switching Regression ────────────────────────
     ms_probs = pd.Series(np.nan, index=df.index, name="ms_2state_stress_prob")
     try:
-        from statsmodels.tsa.regime_switching.markov_regression import MarkovRegression
-
         ms_data = work[["spy_ret","hy_ig_spread_pct"]].dropna()
-        ms_sample = ms_data.iloc[::2] if len(ms_data) > 3000 else ms_data
-
-        ms_model = MarkovRegression(
-            ms_sample["spy_ret"], k_regimes=2,
-            exog=sm.add_constant(ms_sample["hy_ig_spread_pct"]),
-            switching_variance=True)
-        ms_fit = ms_model.fit(maxiter=200, disp=False)
-
-        variances = [ms_fit.params[f"sigma2[{i}]"] for i in range(2)]
-        stress_regime = int(np.argmax(variances))
-
-        ms_stress = pd.Series(
-            ms_fit.smoothed_marginal_probabilities[stress_regime].values,
-            index=ms_sample.index)
+        ms_params_path = os.path.join(MODELS_DIR, "markov_switching_2state_params.json")
+        ms_start = None
+        if os.path.exists(ms_params_path):
+            with open(ms_params_path) as f:
+                ms_start = json.load(f)
+
+        # full daily sample; warm-started from the previous run's parameters
+        ms_fit = fit_markov_switching(
+            ms_data["spy_ret"], sm.add_constant(ms_data["hy_ig_spread_pct"]),
+            k_regimes=2, start=ms_start, maxiter=500)
+        with open(ms_params_path, "w") as f:
+            json.dump({**ms_fit.start_params(), "llf": ms_fit.llf,
+                       "n_iter": ms_fit.n_iter, "nobs": ms_fit.nobs}, f, indent=2)
+
+        # regimes come back ordered by variance: the last one is stress
+        stress_regime = ms_fit.k_regimes - 1
+        ms_stress = pd.Series(ms_fit.smoothed[:, stress_regime], index=ms_data.index)
         ms_probs = ms_stress.reindex(df.index)
         print(f"  MS 2-state: stress_regime={stress_regime}, "
-              f"stress_frac={ms_stress.mean():.3f}")
+              f"stress_frac={ms_stress.mean():.3f}, EM iters={ms_fit.n_iter}"
+              f"{' (warm start)' if ms_start else ''}")
     except Exception as e:
         print(f"  Markov-Switching FAILED: {e}")
 
-    # ── 7. Stationarity Tests (ADF + KPSS) ────────────────────
-    stat_results = []
+    # ── 6b. Point-in-time regime probabilities ────────────────
+    # S6 / S7 trade on these: filtered probabilities from monthly
+    # expanding-window refits, not the full-sample fits above.
+    full_sample = {"hmm_stress_full_sample": hmm_probs, "ms_stress_full_sample": ms_probs}
+    pit_logs = []
     try:
-        from arch.unitroot import ADF, KPSS
-        test_vars = [
-            "hy_ig_spread_pct","hy_ig_zscore_252d","hy_ig_roc_21d","hy_ig_roc_63d",
-            "hy_ig_mom_21d","hy_ig_acceleration","ccc_bb_spread_pct",
-            "hy_ig_realized_vol_21d","vix_term_structure",
-            "yield_spread_10y3m_pct","yield_spread_10y2y_pct",
-            "nfci_momentum_13w","bbb_ig_spread_pct","spy","spy_ret",
-        ]
-        for col in test_vars:
-            if col not in df.columns:
-                continue
-            s = df[col].dropna()
-            if len(s) < 100:
-                continue
-            if len(s) > 5000:
-                s = s.iloc[::5]
-            try:
-                adf = ADF(s, max_lags=12)
-                conc = "Stationary" if adf.pvalue < 0.05 else "Non-stationary"
-                stat_results.append({
-                    "variable": col, "test": "ADF",
-                    "statistic": round(float(adf.stat),4),
-                    "p_value":   round(float(adf.pvalue),4),
-                    "lags": int(adf.lags), "n_obs": len(s),
-                    "conclusion": conc,
-                })
-            except Exception as e:
-                print(f"  ADF {col} FAILED: {e}")
-            try:
-                kpss = KPSS(s)
-                conc_k = "Stationary" if kpss.pvalue > 0.05 else "Non-stationary"
-                stat_results.append({
-                    "variable": col, "test": "KPSS",
-                    "statistic": round(float(kpss.stat),4),
-                    "p_value":   round(float(kpss.pvalue),4),
-                    "lags": int(kpss.lags) if hasattr(kpss,"lags") else 0,
-                    "n_obs": len(s),
-                    "conclusion": conc_k,
-                })
-            except Exception:
-                pass
-    except ImportError:
-        from statsmodels.tsa.stattools import adfuller
-        for col in ["hy_ig_spread_pct","hy_ig_roc_21d","spy_ret"]:
-            if col not in df.columns: continue
-            s = df[col].dropna().iloc[::5] if len(df[col].dropna()) > 5000 else df[col].dropna()
-            try:
-                adf_r = adfuller(s, maxlags=12)
-                stat_results.append({
-                    "variable":col,"test":"ADF",
-                    "statistic":round(adf_r[0],4),"p_value":round(adf_r[1],4),
-                    "lags":adf_r[2],"n_obs":len(s),
-                    "conclusion":"Stationary" if adf_r[1]<0.05 else "Non-stationary",
-                })
-            except Exception:
-                pass
-
-    stat_df = pd.DataFrame(stat_results)
+        hmm_pit, hmm_log = expanding_hmm_probs(
+            hmm_data[["spread_change","vix"]], 2, min_train=504, n_iter=200,
+            cache_dir=os.path.join(MODELS_DIR,"hmm_cache"))
+        hmm_probs = hmm_pit.iloc[:, -1].reindex(df.index).rename("hmm_2state_prob_stress")
+        pit_logs.append(hmm_log.assign(model="hmm_2state"))
+    except Exception as e:
+        hmm_probs = pd.Series(np.nan, index=df.index, name="hmm_2state_prob_stress")
+        print(f"  HMM point-in-time FAILED: {e}")
+    try:
+        ms_pit, ms_log = expanding_ms_probs(
+            ms_data["spy_ret"], sm.add_constant(ms_data["hy_ig_spread_pct"]), 2, min_train=504)
+        ms_probs = ms_pit.iloc[:, -1].reindex(df.index).rename("ms_2state_stress_prob")
+        pit_logs.append(ms_log.assign(model="ms_2state"))
+    except Exception as e:
+        ms_probs = pd.Series(np.nan, index=df.index, name="ms_2state_stress_prob")
+        print(f"  MS point-in-time FAILED: {e}")
+    pd.DataFrame({"hmm_stress_filtered_pit": hmm_probs, "ms_stress_filtered_pit": ms_probs,
+                  **full_sample}).to_parquet(os.path.join(MODELS_DIR,"regime_probs_pit.parquet"))
+    if pit_logs:
+        pd.concat(pit_logs).to_csv(os.path.join(MODELS_DIR,"regime_pit_refits.csv"), index=False)
+    print(f"  Point-in-time regimes: {sum(len(l) for l in pit_logs)} monthly refits")
+
+    # ── 7. Stationarity Tests (ADF + KPSS + PP + ZA) ──────────
+    # Full resolution, one parallel batch; cached by series hash across pairs
+    stat_df = PIPE.unit_roots(
+        {c: df[c] for c in SPEC.stationarity if c in df.columns}
+    ).round({"statistic": 4, "p_value": 4})
     stat_df.to_csv(os.path.join(RESULTS_DIR,f"stationarity_tests_{DATE_TAG}.csv"), index=False)
     print(f"  Stationarity tests: {len(stat_df)} rows")
 
@@ -747,147 +704,60 @@ def stage_exploratory(df: pd.DataFrame):
 # STAGE 6: TOURNAMENT
 # ─────────────────────────────────────────────────────────────
 
-@timed("6_tournament")
-def stage_tournament(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    5D combinatorial backtest:
-    signals × thresholds × strategies × leads × (direction fixed = countercyclical)
+# Regime-probability signals: only their probability thresholds
+PROBABILITY_SIGNALS = ("S6_hmm_stress", "S7_ms_stress")
+RESULT_COLUMNS = ["signal","threshold","strategy","lead_days","oos_sharpe","oos_ann_return",
+                  "max_drawdown","win_rate","n_trades","annual_turnover","valid","oos_n"]
 
-    Meta-UC: all return/drawdown columns in ratio form (decimal), Sharpe as-is.
-    """
-    # Load signals parquet (Derived Signal Persistence Rule)
-    signals_path = os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet")
-    sig_df = pd.read_parquet(signals_path)
 
+def _with_regime_signals(df: pd.DataFrame) -> pd.DataFrame:
+    """df plus the persisted HMM / MS stress probabilities (Derived Signal Persistence Rule)."""
+    sig_df = pd.read_parquet(os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet"))
     work = df.copy()
     for col in ["hmm_2state_prob_stress","ms_2state_stress_prob"]:
         if col in sig_df.columns and col not in work.columns:
             work[col] = sig_df[col].reindex(work.index)
     if "spy_ret" not in work.columns:
         work["spy_ret"] = work["spy"].pct_change()
+    return work
+
+
+def _thresholds(sig_name, signal, lead, is_sig):
+    """
+    Regime probabilities: the spec's T4 / T5 probability levels only. Other
+    signals: T1 fixed IS percentiles, T2 rolling 504d percentiles and T3
+    rolling 504d z-score levels.
+    """
+    if sig_name in PROBABILITY_SIGNALS:
+        return SPEC.tournament["extra_thresholds"][sig_name]
+    p = SPEC.p
+    rules = PIPE.default_thresholds(sig_name, signal, lead, is_sig)
+    z = PIPE.roll.zscore(signal, p["roll_window"], p["roll_min_periods"], lead)
+    rules.update({f"T3_z{k}": Threshold(k, on=z) for k in [1.5, 2.0, 2.5]})
+    return rules
+
 
+@timed("6_tournament")
+def stage_tournament(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    5D combinatorial backtest:
+    signals × thresholds × strategies × leads × (direction fixed = countercyclical)
+
+    Meta-UC: all return/drawdown columns in ratio form (decimal), Sharpe as-is.
+    """
+    work = _with_regime_signals(df)
     is_mask  = work.index <= IS_END
     oos_mask = work.index >= OOS_START
 
-    # ── Signal map ────────────────────────────────────────────
-    signal_cols = {
-        "S1_spread_level":    "hy_ig_spread_pct",
-        "S2a_zscore_252d":    "hy_ig_zscore_252d",
-        "S2b_zscore_504d":    "hy_ig_zscore_504d",
-        "S3a_pctrank_504d":   "hy_ig_pctrank_504d",
-        "S3b_pctrank_1260d":  "hy_ig_pctrank_1260d",
-        "S4a_roc_21d":        "hy_ig_roc_21d",
-        "S4b_roc_63d":        "hy_ig_roc_63d",
-        "S4c_roc_126d":       "hy_ig_roc_126d",
-        "S5_ccc_bb_spread":   "ccc_bb_spread_pct",
-        "S6_hmm_stress":      "hmm_2state_prob_stress",
-        "S7_ms_stress":       "ms_2state_stress_prob",
-        "S10_mom_21d":        "hy_ig_mom_21d",
-        "S11_mom_63d":        "hy_ig_mom_63d",
-        "S12_mom_252d":       "hy_ig_mom_252d",
-        "S13_acceleration":   "hy_ig_acceleration",
-    }
-    available = {k: v for k, v in signal_cols.items()
-                 if v in work.columns and work[v].notna().sum() > 200}
-    print(f"  Available signals: {len(available)} of {len(signal_cols)}")
-
-    leads   = [0, 1, 5, 10, 21, 63]
-    results = []
-
-    for sig_name, sig_col in available.items():
-        signal = work[sig_col]
-        for lead in leads:
-            sig_l    = signal.shift(lead) if lead > 0 else signal
-            is_sig   = sig_l[is_mask].dropna()
-            if len(is_sig) < 100:
-                continue
-
-            thresholds = {}
-            if sig_name in ("S6_hmm_stress","S7_ms_stress"):
-                for p in [0.5, 0.7]:
-                    pfx = "T4" if sig_name=="S6_hmm_stress" else "T5"
-                    sfx = "hmm" if "hmm" in sig_name else "ms"
-                    thresholds[f"{pfx}_{sfx}_{p}"] = p
-            else:
-                for pct in [75, 85, 95]:
-                    thresholds[f"T1_p{pct}"] = is_sig.quantile(pct/100)
-                for pct in [75, 85, 95]:
-                    thresholds[f"T2_rp{pct}"] = sig_l.rolling(504,min_periods=400).quantile(pct/100)
-                for z in [1.5, 2.0, 2.5]:
-                    thresholds[f"T3_z{z}"] = z
-
-            for tname, tval in thresholds.items():
-                for strat in ["P1","P2","P3"]:
-                    try:
-                        if tname.startswith("T3_z"):
-                            roll_mean = sig_l.rolling(504,min_periods=400).mean()
-                            roll_std  = sig_l.rolling(504,min_periods=400).std().replace(0,np.nan)
-                            z_series  = (sig_l-roll_mean)/roll_std
-                            bullish   = z_series < tval
-                        elif isinstance(tval,(int,float)):
-                            bullish = sig_l < tval
-                        else:
-                            bullish = sig_l < tval
-
-                        if strat == "P1":
-                            pos = bullish.astype(float)
-                        elif strat == "P2":
-                            smin = sig_l.rolling(504,min_periods=400).min()
-                            smax = sig_l.rolling(504,min_periods=400).max()
-                            sr   = (smax-smin).replace(0,np.nan)
-                            pos  = (1-(sig_l-smin)/sr).clip(0,1)
-                        elif strat == "P3":
-                            pos = bullish.astype(float)*2-1
-
-                        strat_ret = pos.shift(1) * work["spy_ret"]
-                        is_r  = strat_ret[is_mask].dropna()
-                        oos_r = strat_ret[oos_mask].dropna()
-                        if len(is_r) < 100 or len(oos_r) < 50:
-                            continue
-
-                        oos_sharpe = (oos_r.mean()/oos_r.std()*np.sqrt(252)
-                                      if oos_r.std()>0 else 0)
-                        cum = (1+oos_r).cumprod()
-                        dd  = ((cum-cum.cummax())/cum.cummax()).min()  # ratio
-                        oos_ann_return = oos_r.mean()*252              # ratio
-                        turnover = pos.diff().abs().sum() / max(len(pos.dropna())/252,1)
-                        n_trades_raw = int(pos.diff().abs().gt(0.05).sum())
-                        valid_flag = (oos_sharpe > 0 and turnover < 24
-                                      and n_trades_raw >= 10)
-                        win_rate = (oos_r>0).sum()/len(oos_r) if len(oos_r)>0 else 0
-
-                        results.append({
-                            "signal":         sig_name,
-                            "threshold":      tname,
-                            "strategy":       strat,
-                            "lead_days":      lead,
-                            "oos_sharpe":     round(oos_sharpe,4),
-                            "oos_ann_return": round(oos_ann_return,6),  # ratio
-                            "max_drawdown":   round(float(dd),6),       # ratio
-                            "win_rate":       round(win_rate,4),
-                            "n_trades":       n_trades_raw,
-                            "annual_turnover":round(turnover,2),
-                            "valid":          valid_flag,
-                            "oos_n":          len(oos_r),
-                        })
-                    except Exception:
-                        continue
+    # Counter-cyclical (spec direction): bullish = signal BELOW threshold
+    m = PIPE.tournament(work, SPEC.tournament["signals"], _thresholds,
+                        is_mask=is_mask, oos_mask=oos_mask)
+    print(f"  Signals tested: {m['signal'].nunique()} of {len(SPEC.tournament['signals'])}")
 
     # ── Benchmark (buy-and-hold SPY) ──────────────────────────
-    bh = work.loc[oos_mask,"spy_ret"].dropna()
-    if len(bh) > 0:
-        bh_s = (bh.mean()/bh.std()*np.sqrt(252) if bh.std()>0 else 0)
-        bh_cum = (1+bh).cumprod()
-        bh_dd  = ((bh_cum-bh_cum.cummax())/bh_cum.cummax()).min()
-        results.append({
-            "signal":"BENCHMARK","threshold":"BUY_HOLD","strategy":"BH",
-            "lead_days":0, "oos_sharpe":round(bh_s,4),
-            "oos_ann_return":round(bh.mean()*252,6), "max_drawdown":round(float(bh_dd),6),
-            "win_rate":round((bh>0).mean(),4), "n_trades":1,
-            "annual_turnover":0.0, "valid":True, "oos_n":len(bh),
-        })
-
-    rdf = pd.DataFrame(results)
+    bh = {"signal":"BENCHMARK","threshold":"BUY_HOLD","strategy":"BH","lead_days":0,
+          **PIPE.benchmark(work["spy_ret"], is_mask, oos_mask), "n_trades":1, "valid":True}
+    rdf = PIPE.results_table(m, RESULT_COLUMNS, bh, percent=False)
     rdf.to_csv(os.path.join(RESULTS_DIR,f"tournament_results_{DATE_TAG}.csv"), index=False)
 
     total   = len(rdf) - 1   # exclude benchmark row
@@ -905,53 +775,10 @@ def stage_tournament(df: pd.DataFrame) -> pd.DataFrame:
         print(f"  B&H: Sharpe={bm.iloc[0]['oos_sharpe']:.2f}"
               f"  Ret={bm.iloc[0]['oos_ann_return']*100:.1f}%"
               f"  DD={bm.iloc[0]['max_drawdown']*100:.1f}%")
-    return rdf
 
-
-# ─────────────────────────────────────────────────────────────
-# REPLAY HELPERS
-# ─────────────────────────────────────────────────────────────
-
-def _compute_threshold_val(is_signal, threshold_name, signal_series):
-    if threshold_name.startswith("T1_p"):
-        pct = int(threshold_name.split("p")[1])
-        return is_signal.quantile(pct/100)
-    elif threshold_name.startswith("T2_rp"):
-        pct = int(threshold_name.split("rp")[1])
-        return signal_series.rolling(504,min_periods=400).quantile(pct/100)
-    elif threshold_name.startswith("T3_z"):
-        return float(threshold_name.split("z")[1])
-    elif threshold_name.startswith(("T4_hmm_","T4_ms_","T5_hmm_","T5_ms_")):
-        return float(threshold_name.rsplit("_",1)[1])
-    return None
-
-
-def _replay_strategy(work, sig_col, threshold_name, threshold_val, strategy, lead):
-    signal = work[sig_col].shift(lead) if lead>0 else work[sig_col]
-    if isinstance(threshold_val, pd.Series):
-        threshold_val = threshold_val.reindex(work.index)
-    if threshold_name.startswith("T3_z"):
-        roll_mean = signal.rolling(504,min_periods=400).mean()
-        roll_std  = signal.rolling(504,min_periods=400).std().replace(0,np.nan)
-        z_series  = (signal-roll_mean)/roll_std
-        bullish   = z_series < threshold_val
-    elif isinstance(threshold_val,(int,float,np.floating)):
-        bullish = signal < threshold_val
-    else:
-        bullish = signal < threshold_val
-    if strategy=="P1":
-        pos = bullish.astype(float)
-    elif strategy=="P2":
-        smin = signal.rolling(504,min_periods=400).min()
-        smax = signal.rolling(504,min_periods=400).max()
-        sr   = (smax-smin).replace(0,np.nan)
-        pos  = (1-(signal-smin)/sr).clip(0,1)
-    elif strategy=="P3":
-        pos = bullish.astype(float)*2-1
-    else:
-        pos = bullish.astype(float)
-    strat_ret = pos.shift(1) * work["spy_ret"]
-    return pos, strat_ret
+    # White Reality Check / Hansen SPA over every reported combo → reality_check.json
+    PIPE.reality_check(work, oos_mask)
+    return rdf
 
 
 # ─────────────────────────────────────────────────────────────
@@ -964,154 +791,17 @@ def stage_validation(df: pd.DataFrame, tourn_df: pd.DataFrame):
     Walk-forward, bootstrap CI, transaction costs, signal decay, stress tests
     for top-5 valid winners. Then generates all winner artifacts.
     """
-    import statsmodels.api as sm
+    work = _with_regime_signals(df)
 
-    sig_df = pd.read_parquet(os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet"))
-    work   = df.copy()
-    for col in ["hmm_2state_prob_stress","ms_2state_stress_prob"]:
-        if col in sig_df.columns and col not in work.columns:
-            work[col] = sig_df[col].reindex(work.index)
-    if "spy_ret" not in work.columns:
-        work["spy_ret"] = work["spy"].pct_change()
-
-    signal_col_map = {
-        "S1_spread_level":   "hy_ig_spread_pct",
-        "S2a_zscore_252d":   "hy_ig_zscore_252d",
-        "S2b_zscore_504d":   "hy_ig_zscore_504d",
-        "S3a_pctrank_504d":  "hy_ig_pctrank_504d",
-        "S3b_pctrank_1260d": "hy_ig_pctrank_1260d",
-        "S4a_roc_21d":       "hy_ig_roc_21d",
-        "S4b_roc_63d":       "hy_ig_roc_63d",
-        "S4c_roc_126d":      "hy_ig_roc_126d",
-        "S5_ccc_bb_spread":  "ccc_bb_spread_pct",
-        "S6_hmm_stress":     "hmm_2state_prob_stress",
-        "S7_ms_stress":      "ms_2state_stress_prob",
-        "S10_mom_21d":       "hy_ig_mom_21d",
-        "S11_mom_63d":       "hy_ig_mom_63d",
-        "S12_mom_252d":      "hy_ig_mom_252d",
-        "S13_acceleration":  "hy_ig_acceleration",
-    }
-
-    valid_df = tourn_df[tourn_df["valid"] & (tourn_df["signal"]!="BENCHMARK")]
-    if len(valid_df)==0:
-        print("  No valid winners to validate.")
+    # Winner positions straight from the tournament block; a T1 percentile is
+    # refit on each walk-forward training window
+    frames = PIPE.validation(work, work.index >= OOS_START)
+    if not frames:
         return
-    top5 = valid_df.nlargest(5,"oos_sharpe")
-
-    all_wf, all_boot, all_costs, all_decay, all_stress = [], [], [], [], []
-
-    for rank, (idx, row) in enumerate(top5.iterrows(), 1):
-        sig_name = row["signal"]
-        sig_col  = signal_col_map.get(sig_name)
-        if sig_col is None or sig_col not in work.columns:
-            print(f"  SKIP {sig_name}: column not found")
-            continue
-        tname = row["threshold"]
-        strat = row["strategy"]
-        lead  = int(row["lead_days"])
-        signal    = work[sig_col]
-        is_signal = signal[work.index<=IS_END].dropna()
-        tval      = _compute_threshold_val(is_signal, tname, signal)
-        combo_tag = f"{sig_name}/{tname}/{strat}/L{lead}"
-        print(f"  [{rank}] {combo_tag} (OOS Sharpe={row['oos_sharpe']:.2f})")
-
-        # 1. Walk-forward (5yr train / 1yr test)
-        years = sorted(work.index.year.unique())
-        for test_year in range(max(years[0]+5, 2010), max(years)+1):
-            t_start = pd.Timestamp(f"{test_year-5}-01-01")
-            t_end   = pd.Timestamp(f"{test_year-1}-12-31")
-            ts_s    = pd.Timestamp(f"{test_year}-01-01")
-            ts_e    = pd.Timestamp(f"{test_year}-12-31")
-            train_sig = signal[(work.index>=t_start)&(work.index<=t_end)].dropna()
-            if len(train_sig) < 200:
-                continue
-            tv  = _compute_threshold_val(train_sig, tname, signal) if tname.startswith("T1_p") else tval
-            wf_slice = (work.index>=t_start)&(work.index<=ts_e)
-            _, wf_ret = _replay_strategy(work[wf_slice], sig_col, tname, tv, strat, lead)
-            test_ret = wf_ret[(wf_ret.index>=ts_s)&(wf_ret.index<=ts_e)].dropna()
-            if len(test_ret)<20: continue
-            wf_sharpe = (test_ret.mean()/test_ret.std()*np.sqrt(252) if test_ret.std()>0 else 0)
-            all_wf.append({"rank":rank,"signal":sig_name,"threshold":tname,
-                           "strategy":strat,"lead_days":lead,"test_year":test_year,
-                           "oos_sharpe":round(wf_sharpe,4),"n_obs":len(test_ret)})
-
-        # 2. Bootstrap
-        oos_mask = work.index>=OOS_START
-        _, oos_ret = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead)
-        oos_ret = oos_ret.dropna()
-        if len(oos_ret)>50:
-            rng = np.random.RandomState(42)
-            oos_arr = oos_ret.values
-            n = len(oos_arr)
-            boot_sharpes = [
-                (s.mean()/s.std()*np.sqrt(252) if s.std()>0 else 0)
-                for s in (rng.choice(oos_arr,size=n,replace=True) for _ in range(10000))
-            ]
-            boot_sharpes = np.array(boot_sharpes)
-            all_boot.append({"rank":rank,"signal":sig_name,"threshold":tname,
-                             "strategy":strat,"lead_days":lead,
-                             "mean_sharpe":round(np.mean(boot_sharpes),4),
-                             "ci_2_5":round(np.percentile(boot_sharpes,2.5),4),
-                             "ci_97_5":round(np.percentile(boot_sharpes,97.5),4),
-                             "pct_positive":round((boot_sharpes>0).mean()*100,1)})
-
-        # 3. Transaction costs
-        for bps in [0,5,10,20,50]:
-            pos, ret = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead)
-            ret = ret.dropna()
-            if len(ret)<50: continue
-            cost_pd = pos.diff().abs().fillna(0)*(bps/10000)
-            net_ret = ret - cost_pd.shift(1).reindex(ret.index,fill_value=0)
-            net_sh  = (net_ret.mean()/net_ret.std()*np.sqrt(252) if net_ret.std()>0 else 0)
-            all_costs.append({"rank":rank,"signal":sig_name,"threshold":tname,
-                              "strategy":strat,"lead_days":lead,"tx_cost_bps":bps,
-                              "net_sharpe_approx":round(net_sh,4),"oos_sharpe":round(row["oos_sharpe"],4)})
-
-        # 4. Signal decay
-        for delay in [0,1,2,3,5]:
-            _, dr = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead+delay)
-            dr = dr.dropna()
-            if len(dr)<50: continue
-            ds = (dr.mean()/dr.std()*np.sqrt(252) if dr.std()>0 else 0)
-            all_decay.append({"rank":rank,"signal":sig_name,"threshold":tname,
-                              "strategy":strat,"lead_days":lead,"execution_delay":delay,
-                              "oos_sharpe":round(ds,4)})
-
-        # 5. Stress tests
-        for period_name, pstart, pend in [
-            ("GFC_2007_2009","2007-07-01","2009-03-31"),
-            ("COVID_2020","2020-02-01","2020-06-30"),
-            ("Taper_Tantrum_2013","2013-05-01","2013-09-30"),
-            ("Rate_Shock_2022","2022-01-01","2022-12-31"),
-        ]:
-            pmask = (work.index>=pstart)&(work.index<=pend)
-            if pmask.sum()<20: continue
-            _, sr_ret = _replay_strategy(work[pmask], sig_col, tname, tval, strat, lead)
-            sr_ret = sr_ret.dropna()
-            if len(sr_ret)<10: continue
-            s_sh  = (sr_ret.mean()/sr_ret.std()*np.sqrt(252) if sr_ret.std()>0 else 0)
-            cum   = (1+sr_ret).cumprod()
-            s_dd  = ((cum-cum.cummax())/cum.cummax()).min()
-            bh_s_ret = work.loc[pmask,"spy_ret"].dropna()
-            bh_sh = (bh_s_ret.mean()/bh_s_ret.std()*np.sqrt(252) if bh_s_ret.std()>0 else 0)
-            all_stress.append({"rank":rank,"signal":sig_name,"threshold":tname,
-                               "strategy":strat,"lead_days":lead,
-                               "period":period_name,"start":pstart,"end":pend,
-                               "strategy_sharpe":round(s_sh,4),
-                               "strategy_max_dd":round(float(s_dd)*100,2),
-                               "benchmark_sharpe":round(bh_sh,4),"n_obs":len(sr_ret)})
-
-    # Save validation CSVs
-    pd.DataFrame(all_wf).to_csv(os.path.join(VALIDATION_DIR,"walk_forward.csv"), index=False)
-    pd.DataFrame(all_boot).to_csv(os.path.join(VALIDATION_DIR,"bootstrap_ci.csv"), index=False)
-    pd.DataFrame(all_costs).to_csv(os.path.join(VALIDATION_DIR,"transaction_costs.csv"), index=False)
-    pd.DataFrame(all_decay).to_csv(os.path.join(VALIDATION_DIR,"signal_decay.csv"), index=False)
-    pd.DataFrame(all_stress).to_csv(os.path.join(VALIDATION_DIR,"stress_tests.csv"), index=False)
-    print(f"  Walk-forward:{len(all_wf)}  Bootstrap:{len(all_boot)}  "
-          f"Costs:{len(all_costs)}  Decay:{len(all_decay)}  Stress:{len(all_stress)}")
+    PIPE.write_validation(frames)
 
     # Generate all winner artifacts
-    _generate_all_winner_artifacts(tourn_df, work, signal_col_map)
+    _generate_all_winner_artifacts(tourn_df, work, SPEC.tournament["signals"])
 
 
 # ─────────────────────────────────────────────────────────────
@@ -1151,6 +841,14 @@ STRATEGY_DESC = {
 }
 
 
+def _select_winner(valid_df):
+    # ECON-T3 tie-break cascade: oos_sharpe → oos_ann_return → abs(MDD)→ n_trades → lexicographic
+    return valid_df.sort_values(
+        ["oos_sharpe","oos_ann_return","max_drawdown","n_trades","signal"],
+        ascending=[False,False,True,False,True]
+    ).iloc[0]
+
+
 def _generate_all_winner_artifacts(tourn_df, work, signal_col_map):
     """Generate all required winner artifacts per ECON-H and team-standards §5.2."""
     valid_df = tourn_df[tourn_df["valid"] & (tourn_df["signal"]!="BENCHMARK")]
@@ -1158,11 +856,7 @@ def _generate_all_winner_artifacts(tourn_df, work, signal_col_map):
         print("  No valid winner — skipping artifact generation.")
         return
 
-    # ECON-T3 tie-break cascade: oos_sharpe → oos_ann_return → abs(MDD)→ n_trades → lexicographic
-    winner = valid_df.sort_values(
-        ["oos_sharpe","oos_ann_return","max_drawdown","n_trades","signal"],
-        ascending=[False,False,True,False,True]
-    ).iloc[0]
+    winner = _select_winner(valid_df)
 
     bm_row = tourn_df[tourn_df["signal"]=="BENCHMARK"].iloc[0] if len(tourn_df[tourn_df["signal"]=="BENCHMARK"])>0 else None
 
@@ -1314,11 +1008,13 @@ def _generate_all_winner_artifacts(tourn_df, work, signal_col_map):
     print(f"  oos_split_record.json saved")
 
     # ── Winner trade log ─────────────────────────────────────
-    if sig_col and sig_col in work.columns:
-        signal = work[sig_col]
-        is_sig = signal[work.index<=IS_END].dropna()
-        tval_replay = _compute_threshold_val(is_sig, tname, signal)
-        pos, strat_ret = _replay_strategy(work, sig_col, tname, tval_replay, strat, lead)
+    # Winner positions straight from the tournament block
+    m   = PIPE.metrics
+    hit = m[(m["signal"]==sig_name) & (m["threshold"]==tname)
+            & (m["strategy"]==strat) & (m["lead_days"]==lead)]
+    if len(hit):
+        pos = PIPE.block.position_series(int(hit["column"].iloc[0])).reindex(work.index)
+        strat_ret = pos.shift(1) * work["spy_ret"]
         cum_ret = (1+strat_ret.fillna(0)).cumprod()
 
         pos_clean   = pos.dropna()
@@ -1429,8 +1125,8 @@ def _generate_all_winner_artifacts(tourn_df, work, signal_col_map):
                 {"name":"hy_ig_acceleration","definition":"Change in 21d rate-of-change — second-difference proxy. Captures inflection dynamics.","formula":"roc_21d[t]-roc_21d[t-21]","role":"derivative","appears_in_charts":[]},
                 {"name":"ccc_bb_spread_pct","definition":"CCC OAS minus BB OAS — within-HY quality spread. Wider = distress concentrated at speculative end.","formula":"ccc_hy_oas - bb_hy_oas","role":"derivative","appears_in_charts":["correlation_heatmap"]},
                 {"name":"hy_ig_realized_vol_21d","definition":"21-day realized volatility of daily spread changes (decimal). Rising vol = worsening credit environment.","formula":"std(diff(spread),21)","role":"diagnostic","appears_in_charts":[]},
-                {"name":"hmm_2state_prob_stress","definition":"HMM 2-state model: probability of being in the stress regime (defined by high spread_change × high VIX).","formula":"GaussianHMM(n_components=2, features=[spread_change, vix], random_state=42)","role":"regime_state","appears_in_charts":["hmm_regime_overlay"]},
-                {"name":"ms_2state_stress_prob","definition":"Markov-Switching regression: smoothed probability of the high-variance (stress) regime.","formula":"MarkovRegression(spy_ret ~ hy_ig_spread, k_regimes=2, switching_variance=True)","role":"regime_state","appears_in_charts":["hmm_regime_overlay"]},
+                {"name":"hmm_2state_prob_stress","definition":"HMM 2-state model: point-in-time filtered probability of being in the stress regime (defined by high spread_change × high VIX), refitted monthly on an expanding window.","formula":"GaussianHMM(n_components=2, features=[spread_change, vix]), best of 8 restarts","role":"regime_state","appears_in_charts":["hmm_regime_overlay"]},
+                {"name":"ms_2state_stress_prob","definition":"Markov-Switching regression: point-in-time filtered probability of the high-variance (stress) regime, refitted monthly on an expanding window.","formula":"Markov-switching regression (spy_ret ~ hy_ig_spread, k_regimes=2, switching variance), EM on the full daily sample","role":"regime_state","appears_in_charts":["hmm_regime_overlay"]},
             ]
         },
         "target_axis": {
@@ -1567,7 +1263,7 @@ def _generate_all_winner_artifacts(tourn_df, work, signal_col_map):
 | Signal decay | `results/{PAIR_ID}/tournament_validation_{DATE_TAG}/signal_decay.csv` | Sharpe vs execution delay bar chart | ready |
 | Stress tests | `results/{PAIR_ID}/tournament_validation_{DATE_TAG}/stress_tests.csv` | Strategy vs benchmark Sharpe per stress period | ready |
 | Cumulative return | `results/{PAIR_ID}/winner_trade_log.csv` | Cumulative return curve: strategy vs B&H | ready |
-| Stationarity | `results/{PAIR_ID}/stationarity_tests_{DATE_TAG}.csv` | Table of ADF/KPSS results | ready |
+| Stationarity | `results/{PAIR_ID}/stationarity_tests_{DATE_TAG}.csv` | Table of ADF/KPSS/PP/ZA results | ready |
 
 ## Winner Summary
 
@@ -1651,7 +1347,7 @@ Expected: all files non-empty (>1 data row each).
 | tournament_winner.json | ✓ READY | delta record |
 | signal_scope.json | ✓ READY | APP-SS1 axis_block |
 | analyst_suggestions.json | ✓ READY | 5 entries |
-| stationarity_tests_{DATE_TAG}.csv | ✓ READY | ADF + KPSS |
+| stationarity_tests_{DATE_TAG}.csv | ✓ READY | ADF + KPSS + PP + ZA |
 | granger_by_lag.csv | ✓ READY | monthly lags 1-12 |
 | regime_quartile_returns.csv | ✓ READY | Rule E2 ratio form |
 | winner_trade_log.csv | ✓ READY | per-trade P&L |
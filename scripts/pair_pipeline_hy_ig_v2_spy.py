@@ -13,25 +13,36 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
+from _hmm_regimes import fit_hmm_grid
+from _markov_switching import fit_markov_switching
+from _pair_pipeline import PairPipeline, Threshold
+from _pair_spec import load_spec
+from _regime_pit import expanding_hmm_probs, expanding_ms_probs
+from _rolling_window import rolling_pct_rank
+
 warnings.filterwarnings("ignore")
 
+# Sources, split, signal map, thresholds and tournament settings live in
+# pair_specs/hy_ig_v2_spy.json; the shared stages run on PairPipeline.
 PAIR_ID = "hy_ig_v2_spy"
-INDICATOR_NAME = "HY-IG Credit Spread"
-TARGET_NAME = "S&P 500"
-START_DATE = "2000-01-01"
-END_DATE = "2025-12-31"
-IS_END = "2017-12-31"
-OOS_START = "2018-01-01"
-DATE_TAG = "20260410"
+SPEC = load_spec(PAIR_ID)
+INDICATOR_NAME = SPEC.indicator_name
+TARGET_NAME = SPEC.target_name
+START_DATE = SPEC.start_date
+END_DATE = SPEC.end_date
+IS_END = SPEC.split["is_end"]
+OOS_START = SPEC.split["oos_start"]
+DATE_TAG = SPEC.date_tag
 
 BASE_DIR = "/workspaces/aig-rlic-plus"
-DATA_DIR = os.path.join(BASE_DIR, "data")
-RESULTS_DIR = os.path.join(BASE_DIR, "results", PAIR_ID)
-EXPLORE_DIR = os.path.join(RESULTS_DIR, f"exploratory_{DATE_TAG}")
-MODELS_DIR = os.path.join(RESULTS_DIR, f"core_models_{DATE_TAG}")
+PIPE = PairPipeline(SPEC, BASE_DIR)
+DATA_DIR = PIPE.data_dir
+RESULTS_DIR = PIPE.results_dir
+EXPLORE_DIR = PIPE.explore_dir
+MODELS_DIR = PIPE.models_dir
 
 SIGNALS_DIR = RESULTS_DIR
-VALIDATION_DIR = os.path.join(RESULTS_DIR, f"tournament_validation_{DATE_TAG}")
+VALIDATION_DIR = PIPE.valid_dir
 
 for d in [DATA_DIR, RESULTS_DIR, EXPLORE_DIR, MODELS_DIR, VALIDATION_DIR]:
     os.makedirs(d, exist_ok=True)
@@ -68,21 +79,7 @@ def stage_data():
     series = {}
 
     # --- FRED series (13) ---
-    fred_map = [
-        ("BAMLH0A0HYM2", "hy_oas"),
-        ("BAMLC0A0CM",    "ig_oas"),
-        ("BAMLH0A1HYBB",  "bb_hy_oas"),
-        ("BAMLH0A3HYC",   "ccc_hy_oas"),
-        ("DGS10",         "dgs10"),
-        ("DTB3",          "dtb3"),
-        ("DGS2",          "dgs2"),
-        ("NFCI",          "nfci"),
-        ("DFF",           "fed_funds_rate"),
-        ("BAMLC0A4CBBB",  "bbb_oas"),
-        ("STLFSI4",       "fsi"),
-        ("ICSA",          "initial_claims"),
-        ("SOFR",          "sofr"),
-    ]
+    fred_map = SPEC.sources["fred"].items()
     for sid, name in fred_map:
         for attempt in range(3):
             try:
@@ -98,18 +95,7 @@ def stage_data():
                     print(f"  [FRED] {sid} FAILED after 3 attempts: {e}")
 
     # --- Yahoo Finance tickers (10) ---
-    yf_map = [
-        ("SPY",       "spy"),
-        ("^VIX",      "vix"),
-        ("^VIX3M",    "vix3m"),
-        ("KBE",       "kbe"),
-        ("IWM",       "iwm"),
-        ("^MOVE",     "move_index"),
-        ("GC=F",      "gold"),
-        ("HG=F",      "copper"),
-        ("DX-Y.NYB",  "dxy"),
-        ("HYG",       "hyg"),
-    ]
+    yf_map = SPEC.sources["yahoo"].items()
     for ticker, name in yf_map:
         try:
             df = yf.download(ticker, start=START_DATE, end=END_DATE, progress=False, auto_adjust=True)
@@ -179,12 +165,8 @@ def stage_derived(series):
     )
 
     # ── Percentile ranks ──
-    df["hy_ig_pctrank_504d"] = spread.rolling(504, min_periods=400).apply(
-        lambda x: stats.rankdata(x)[-1] / len(x), raw=True
-    )
-    df["hy_ig_pctrank_1260d"] = spread.rolling(1260, min_periods=1000).apply(
-        lambda x: stats.rankdata(x)[-1] / len(x), raw=True
-    )
+    df["hy_ig_pctrank_504d"] = rolling_pct_rank(spread, 504, 400)
+    df["hy_ig_pctrank_1260d"] = rolling_pct_rank(spread, 1260, 1000)
 
     # ── Rates of change (%) ──
     df["hy_ig_roc_21d"] = (spread / spread.shift(21) - 1) * 100
@@ -272,44 +254,14 @@ def stage_derived(series):
 
 @timed("3_stationarity")
 def stage_stationarity(df):
-    """Run ADF tests on key variables."""
-    from arch.unitroot import ADF
-
-    test_vars = [
-        "hy_ig_spread_pct", "hy_ig_zscore_252d", "hy_ig_roc_21d", "hy_ig_roc_63d",
-        "hy_ig_mom_21d", "hy_ig_acceleration", "ccc_bb_spread",
-        "hy_ig_realized_vol_21d", "vix_term_structure",
-        "yield_spread_10y3m", "yield_spread_10y2y",
-        "nfci_momentum_13w", "bbb_ig_spread",
-        "spy", "spy_ret",
-    ]
-    results = []
-    for col in test_vars:
-        if col not in df.columns:
-            continue
-        s = df[col].dropna()
-        if len(s) < 100:
-            continue
-        # Subsample very long series for efficiency
-        if len(s) > 5000:
-            s = s.iloc[::5]
-        try:
-            adf = ADF(s, max_lags=12)
-            conclusion = "Stationary" if adf.pvalue < 0.05 else "Non-stationary"
-            results.append({
-                "variable": col,
-                "test": "ADF",
-                "statistic": round(adf.stat, 4),
-                "p_value": round(adf.pvalue, 4),
-                "lags": adf.lags,
-                "n_obs": len(s),
-                "conclusion": conclusion,
-            })
-            print(f"  ADF {col:35s}: stat={adf.stat:8.3f}, p={adf.pvalue:.4f} -> {conclusion}")
-        except Exception as e:
-            print(f"  ADF {col} FAILED: {e}")
+    """Run ADF, KPSS, Phillips-Perron and Zivot-Andrews tests on key variables."""
+    # Full resolution, one parallel batch; cached by series hash across pairs
+    results_df = PIPE.unit_roots(
+        {c: df[c] for c in SPEC.stationarity if c in df.columns}
+    ).round({"statistic": 4, "p_value": 4})
+    for r in results_df[results_df["test"] == "ADF"].itertuples(index=False):
+        print(f"  ADF {r.variable:35s}: stat={r.statistic:8.3f}, p={r.p_value:.4f} -> {r.conclusion}")
 
-    results_df = pd.DataFrame(results)
     out_path = os.path.join(RESULTS_DIR, f"stationarity_tests_{DATE_TAG}.csv")
     results_df.to_csv(out_path, index=False)
     print(f"\n  Saved: {out_path}")
@@ -383,7 +335,6 @@ def stage_models(df):
     """Granger, predictive regressions, local projections, quantile reg,
     HMM, Markov-switching, diagnostics. Persists HMM/MS signals."""
     import statsmodels.api as sm
-    import statsmodels.formula.api as smf
     from statsmodels.tsa.stattools import grangercausalitytests
 
     work = df.dropna(subset=["hy_ig_spread_pct", "spy_ret"]).copy()
@@ -414,93 +365,64 @@ def stage_models(df):
 
     # ── 2. Predictive Regressions ──
     reg_results = []
-    reg_signals = [
-        "hy_ig_spread_pct", "hy_ig_zscore_252d", "hy_ig_zscore_504d",
-        "hy_ig_pctrank_504d", "hy_ig_pctrank_1260d",
-        "hy_ig_roc_21d", "hy_ig_roc_63d", "hy_ig_roc_126d",
-        "hy_ig_mom_21d", "hy_ig_mom_63d", "hy_ig_acceleration",
-        "ccc_bb_spread",
-    ]
-    reg_horizons = ["spy_fwd_1d", "spy_fwd_5d", "spy_fwd_21d", "spy_fwd_63d", "spy_fwd_126d"]
-    for sig in reg_signals:
-        for fwd in reg_horizons:
-            if sig not in work.columns or fwd not in work.columns:
-                continue
-            valid = work[[sig, fwd]].dropna()
-            if len(valid) < 50:
-                continue
-            try:
-                X = sm.add_constant(valid[sig])
-                model = sm.OLS(valid[fwd], X).fit(cov_type="HC3")
-                reg_results.append({
-                    "signal": sig, "horizon": fwd,
-                    "coef": round(model.params.iloc[1], 6),
-                    "t_stat": round(model.tvalues.iloc[1], 3),
-                    "p_value": round(model.pvalues.iloc[1], 4),
-                    "r_squared": round(model.rsquared, 4),
-                    "n": int(model.nobs),
-                })
-            except Exception:
-                pass
+    for r in PIPE.regressions(work).itertuples(index=False):
+        reg_results.append({
+            "signal": r.signal, "horizon": r.target,
+            "coef": round(r.coef, 6),
+            "t_stat": round(r.t_stat, 3),
+            "p_value": round(r.p_value, 4),
+            "r_squared": round(r.r_squared, 4),
+            "n": int(r.n),
+        })
     reg_df = pd.DataFrame(reg_results)
     reg_df.to_csv(os.path.join(MODELS_DIR, "predictive_regressions.csv"), index=False)
     print(f"  Regressions: {len(reg_df)}")
 
     # ── 3. Local Projections (Jordà) ──
+    # Full 1..252-day impulse response in one fit (shared cross-products and
+    # Newey–West kernel, at least h lags for the overlapping h-day returns);
+    # local_projections.csv keeps the 5/21/63-day rows
     lp_results = []
-    for fwd, h in [("spy_fwd_5d", 5), ("spy_fwd_21d", 21), ("spy_fwd_63d", 63)]:
-        if fwd not in work.columns:
-            continue
-        valid = work[["hy_ig_spread_pct", fwd]].dropna()
-        ctrls = [c for c in ["vix", "yield_spread_10y3m"] if c in work.columns]
-        for c in ctrls:
-            valid[c] = work.loc[valid.index, c]
-        valid = valid.dropna()
-        if len(valid) < 100:
-            continue
-        try:
-            X = sm.add_constant(valid[["hy_ig_spread_pct"] + ctrls])
-            nw = int(0.75 * len(valid) ** (1 / 3))
-            model = sm.OLS(valid[fwd], X).fit(cov_type="HAC", cov_kwds={"maxlags": nw})
-            ci = model.conf_int().loc["hy_ig_spread_pct"]
-            lp_results.append({
-                "horizon_days": h,
-                "coef": round(model.params["hy_ig_spread_pct"], 6),
-                "se": round(model.bse["hy_ig_spread_pct"], 6),
-                "t_stat": round(model.tvalues["hy_ig_spread_pct"], 3),
-                "p_value": round(model.pvalues["hy_ig_spread_pct"], 4),
-                "ci_lower": round(ci[0], 6), "ci_upper": round(ci[1], 6),
-                "r_squared": round(model.rsquared, 4), "n": int(model.nobs),
-            })
-        except Exception:
-            pass
-    pd.DataFrame(lp_results).to_csv(os.path.join(MODELS_DIR, "local_projections.csv"), index=False)
-    print(f"  Local projections: {len(lp_results)} horizons")
+    paths = PIPE.lp_paths(df, work.index)
+    for r in PIPE.impulse_response(work, paths).itertuples(index=False):
+        lp_results.append({"horizon_days": int(r.horizon),
+            "coef": round(r.coef, 6), "se": round(r.se, 6),
+            "t_stat": round(r.t_stat, 3), "p_value": round(r.p_value, 4),
+            "ci_lower": round(r.ci_lower, 6), "ci_upper": round(r.ci_upper, 6),
+            "r_squared": round(r.r_squared, 4), "n": int(r.n)})
+    lp_df = pd.DataFrame(lp_results)
+    lp_df.to_csv(os.path.join(MODELS_DIR, "lp_impulse_response.csv"), index=False)
+    lp_df = lp_df[lp_df["horizon_days"].isin([5, 21, 63])]
+    lp_df.to_csv(os.path.join(MODELS_DIR, "local_projections.csv"), index=False)
+    print(f"  Local projections: {len(lp_df)} horizons, IRF over {len(lp_results)}")
 
     # ── 4. Quantile Regression ──
     qr_results = []
-    valid_qr = work[["hy_ig_spread_pct", "spy_fwd_21d"]].dropna()
-    if len(valid_qr) > 50:
-        for tau in [0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95]:
-            try:
-                qr = smf.quantreg("spy_fwd_21d ~ hy_ig_spread_pct", data=valid_qr).fit(q=tau)
-                qr_results.append({
-                    "quantile": tau,
-                    "coef": round(qr.params["hy_ig_spread_pct"], 6),
-                    "p_value": round(qr.pvalues["hy_ig_spread_pct"], 4),
-                    "ci_lower": round(qr.conf_int().loc["hy_ig_spread_pct", 0], 6),
-                    "ci_upper": round(qr.conf_int().loc["hy_ig_spread_pct", 1], 6),
-                })
-            except Exception:
-                pass
+    for r in PIPE.quantile_regression(work).itertuples(index=False):
+        qr_results.append({
+            "quantile": r.quantile,
+            "coef": round(r.coef, 6),
+            "p_value": round(r.p_value, 4),
+            "ci_lower": round(r.ci_lower, 6),
+            "ci_upper": round(r.ci_upper, 6),
+        })
     pd.DataFrame(qr_results).to_csv(os.path.join(MODELS_DIR, "quantile_regression.csv"), index=False)
     print(f"  Quantile reg: {len(qr_results)} quantiles")
 
+    # Quantile process (99 taus × horizons) for the quantile-process charts
+    qp_results = []
+    for r in PIPE.quantile_process(work, horizons=[1, 5, 21, 63]).itertuples(index=False):
+        qp_results.append({
+            "horizon_days": int(r.horizon), "quantile": r.quantile,
+            "intercept": round(r.intercept, 6),
+            "coef": round(r.coef, 6), "n": int(r.n),
+        })
+    pd.DataFrame(qp_results).to_csv(os.path.join(MODELS_DIR, "quantile_process.csv"), index=False)
+    print(f"  Quantile process: {len(qp_results)} (horizon, tau) cells")
+
     # ── 5. HMM Regime Detection (2-state) ──
     hmm_probs = pd.Series(np.nan, index=df.index, name="hmm_2state_prob_stress")
     try:
-        from hmmlearn.hmm import GaussianHMM
-
         hmm_features = []
         for c in ["hy_ig_spread_pct", "vix"]:
             if c in work.columns:
@@ -519,9 +441,14 @@ def stage_models(df):
         X_std[X_std == 0] = 1
         X_hmm_scaled = (X_hmm - X_mean) / X_std
 
-        model_hmm = GaussianHMM(n_components=2, covariance_type="full",
-                                n_iter=200, random_state=42)
-        model_hmm.fit(X_hmm_scaled)
+        # 2–5 states × 8 restarts in one parallel batch; cached on the features
+        hmm_grid = fit_hmm_grid(
+            X_hmm_scaled, states=(2, 3, 4, 5), n_restarts=8, seed=42, n_iter=200,
+            cache_dir=os.path.join(MODELS_DIR, "hmm_cache"),
+        )
+        hmm_grid.table.round(4).to_csv(
+            os.path.join(MODELS_DIR, "hmm_state_selection.csv"), index=False)
+        model_hmm = hmm_grid.model(2)
         probs = model_hmm.predict_proba(X_hmm_scaled)
 
         # Identify stress state: higher mean spread_change = stress
@@ -545,44 +472,76 @@ def stage_models(df):
         hmm_states_df.to_parquet(os.path.join(MODELS_DIR, "hmm_states_2state.parquet"))
 
         print(f"  HMM 2-state: stress_state={stress_state}, "
-              f"mean stress prob={hmm_stress.mean():.3f}")
+              f"mean stress prob={hmm_stress.mean():.3f}, "
+              f"BIC-selected states={hmm_grid.best_n_states}"
+              f"{' (cached)' if hmm_grid.from_cache else ''}")
     except Exception as e:
         print(f"  HMM FAILED: {e}")
 
     # ── 6. Markov-Switching Regression ──
     ms_probs = pd.Series(np.nan, index=df.index, name="ms_2state_stress_prob")
     try:
-        from statsmodels.tsa.regime_switching.markov_regression import MarkovRegression
-
         ms_data = work[["spy_ret", "hy_ig_spread_pct"]].dropna()
-        # Subsample if too large for speed
-        if len(ms_data) > 3000:
-            ms_sample = ms_data.iloc[::2]
-        else:
-            ms_sample = ms_data
-
-        ms_model = MarkovRegression(
-            ms_sample["spy_ret"], k_regimes=2,
-            exog=sm.add_constant(ms_sample["hy_ig_spread_pct"]),
-            switching_variance=True,
+        ms_params_path = os.path.join(MODELS_DIR, "markov_switching_2state_params.json")
+        ms_start = None
+        if os.path.exists(ms_params_path):
+            with open(ms_params_path) as f:
+                ms_start = json.load(f)
+
+        # Full daily sample, warm-started from the previous run's parameters
+        ms_fit = fit_markov_switching(
+            ms_data["spy_ret"], sm.add_constant(ms_data["hy_ig_spread_pct"]),
+            k_regimes=2, start=ms_start, maxiter=500,
         )
-        ms_fit = ms_model.fit(maxiter=200, disp=False)
+        with open(ms_params_path, "w") as f:
+            json.dump({**ms_fit.start_params(), "llf": ms_fit.llf,
+                       "n_iter": ms_fit.n_iter, "nobs": ms_fit.nobs}, f, indent=2)
 
-        # Identify stress regime: higher variance = stress
-        variances = [ms_fit.params[f"sigma2[{i}]"] for i in range(2)]
-        stress_regime = int(np.argmax(variances))
+        # Regimes are ordered by variance: the last one is stress
+        stress_regime = ms_fit.k_regimes - 1
 
         ms_stress = pd.Series(
-            ms_fit.smoothed_marginal_probabilities[stress_regime].values,
-            index=ms_sample.index, name="ms_2state_stress_prob"
+            ms_fit.smoothed[:, stress_regime],
+            index=ms_data.index, name="ms_2state_stress_prob"
         )
         ms_probs = ms_stress.reindex(df.index)
 
         print(f"  MS 2-state: stress_regime={stress_regime}, "
-              f"stress_frac={ms_stress.mean():.3f}")
+              f"stress_frac={ms_stress.mean():.3f}, EM iters={ms_fit.n_iter}"
+              f"{' (warm start)' if ms_start else ''}")
     except Exception as e:
         print(f"  Markov-Switching FAILED: {e}")
 
+    # ── 6b. Point-in-time regime probabilities ──
+    # S6 / S7 trade on these: filtered probabilities from monthly
+    # expanding-window refits, not the full-sample fits above.
+    full_sample = {"hmm_stress_full_sample": hmm_probs, "ms_stress_full_sample": ms_probs}
+    pit_logs = []
+    try:
+        hmm_pit, hmm_log = expanding_hmm_probs(
+            hmm_data[["spread_change", "vix"]], 2, min_train=504, n_iter=200,
+            cache_dir=os.path.join(MODELS_DIR, "hmm_cache"),
+        )
+        hmm_probs = hmm_pit.iloc[:, -1].reindex(df.index).rename("hmm_2state_prob_stress")
+        pit_logs.append(hmm_log.assign(model="hmm_2state"))
+    except Exception as e:
+        hmm_probs = pd.Series(np.nan, index=df.index, name="hmm_2state_prob_stress")
+        print(f"  HMM point-in-time FAILED: {e}")
+    try:
+        ms_pit, ms_log = expanding_ms_probs(
+            ms_data["spy_ret"], sm.add_constant(ms_data["hy_ig_spread_pct"]), 2, min_train=504,
+        )
+        ms_probs = ms_pit.iloc[:, -1].reindex(df.index).rename("ms_2state_stress_prob")
+        pit_logs.append(ms_log.assign(model="ms_2state"))
+    except Exception as e:
+        ms_probs = pd.Series(np.nan, index=df.index, name="ms_2state_stress_prob")
+        print(f"  MS point-in-time FAILED: {e}")
+    pd.DataFrame({"hmm_stress_filtered_pit": hmm_probs, "ms_stress_filtered_pit": ms_probs,
+                  **full_sample}).to_parquet(os.path.join(MODELS_DIR, "regime_probs_pit.parquet"))
+    if pit_logs:
+        pd.concat(pit_logs).to_csv(os.path.join(MODELS_DIR, "regime_pit_refits.csv"), index=False)
+    print(f"  Point-in-time regimes: {sum(len(l) for l in pit_logs)} monthly refits")
+
     # ── DERIVED SIGNAL PERSISTENCE: Save signals parquet ──
     signals_df = df[[]].copy()  # empty with df index
     # Core derived signals
@@ -652,156 +611,56 @@ def stage_models(df):
 # STAGE 6: TOURNAMENT
 # ─────────────────────────────────────────────────────────────
 
-@timed("6_tournament")
-def stage_tournament(df):
-    """5D combinatorial backtest over signals, thresholds, strategies, leads, direction."""
-    # Load persisted signals (Derived Signal Persistence Rule)
-    signals_path = os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet")
-    sig_df = pd.read_parquet(signals_path)
-    # Merge HMM/MS columns into work frame
+# Regime-probability signals: only their probability thresholds
+PROBABILITY_SIGNALS = ("S6_hmm_stress", "S7_ms_stress")
+RESULT_COLUMNS = ["signal", "threshold", "strategy", "lead_days", "oos_sharpe", "oos_ann_return",
+                  "max_drawdown", "win_rate", "n_trades", "annual_turnover", "valid", "oos_n"]
+
+
+def _with_regime_signals(df):
+    """df plus the persisted HMM / MS stress probabilities (Derived Signal Persistence Rule)."""
+    sig_df = pd.read_parquet(os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet"))
     work = df.copy()
     for col in ["hmm_2state_prob_stress", "ms_2state_stress_prob"]:
         if col in sig_df.columns and col not in work.columns:
             work[col] = sig_df[col].reindex(work.index)
-
-    is_mask = work.index <= IS_END
-    oos_mask = work.index >= OOS_START
-
     if "spy_ret" not in work.columns:
         work["spy_ret"] = work["spy"].pct_change()
+    return work
 
-    # ── Signal map (13 signals) ──
-    signal_cols = {
-        "S1_spread_level":     "hy_ig_spread_pct",
-        "S2a_zscore_252d":     "hy_ig_zscore_252d",
-        "S2b_zscore_504d":     "hy_ig_zscore_504d",
-        "S3a_pctrank_504d":    "hy_ig_pctrank_504d",
-        "S3b_pctrank_1260d":   "hy_ig_pctrank_1260d",
-        "S4a_roc_21d":         "hy_ig_roc_21d",
-        "S4b_roc_63d":         "hy_ig_roc_63d",
-        "S4c_roc_126d":        "hy_ig_roc_126d",
-        "S5_ccc_bb_spread":    "ccc_bb_spread",
-        "S6_hmm_stress":       "hmm_2state_prob_stress",
-        "S7_ms_stress":        "ms_2state_stress_prob",
-        "S10_mom_21d":         "hy_ig_mom_21d",
-        "S11_mom_63d":         "hy_ig_mom_63d",
-        "S12_mom_252d":        "hy_ig_mom_252d",
-        "S13_acceleration":    "hy_ig_acceleration",
-    }
-    available = {k: v for k, v in signal_cols.items()
-                 if v in work.columns and work[v].notna().sum() > 200}
-    print(f"  Available signals: {len(available)} of {len(signal_cols)}")
-
-    leads = [0, 1, 5, 10, 21, 63]
-    results = []
-
-    for sig_name, sig_col in available.items():
-        signal = work[sig_col]
-        for lead in leads:
-            sig_l = signal.shift(lead) if lead > 0 else signal
-            is_sig = sig_l[is_mask].dropna()
-            if len(is_sig) < 100:
-                continue
 
-            # Build threshold dictionary based on signal type
-            thresholds = {}
+def _thresholds(sig_name, signal, lead, is_sig):
+    """
+    Regime probabilities: the spec's T4 / T5 probability levels only. Other
+    signals: T1 fixed IS percentiles, T2 rolling 504d percentiles and T3
+    rolling 504d z-score levels.
+    """
+    if sig_name in PROBABILITY_SIGNALS:
+        return SPEC.tournament["extra_thresholds"][sig_name]
+    p = SPEC.p
+    rules = PIPE.default_thresholds(sig_name, signal, lead, is_sig)
+    z = PIPE.roll.zscore(signal, p["roll_window"], p["roll_min_periods"], lead)
+    rules.update({f"T3_z{k}": Threshold(k, on=z) for k in [1.5, 2.0, 2.5]})
+    return rules
 
-            if sig_name in ("S6_hmm_stress", "S7_ms_stress"):
-                # Probability-based thresholds only
-                for p in [0.5, 0.7]:
-                    tkey = "T4" if sig_name == "S6_hmm_stress" else "T5"
-                    thresholds[f"{tkey}_hmm_{p}" if "hmm" in sig_name else f"{tkey}_ms_{p}"] = p
-            else:
-                # T1: Fixed percentile
-                for pct in [75, 85, 95]:
-                    thresholds[f"T1_p{pct}"] = is_sig.quantile(pct / 100)
-                # T2: Rolling 504d percentile
-                for pct in [75, 85, 95]:
-                    thresholds[f"T2_rp{pct}"] = sig_l.rolling(504, min_periods=400).quantile(pct / 100)
-                # T3: Rolling z-score thresholds
-                for z in [1.5, 2.0, 2.5]:
-                    thresholds[f"T3_z{z}"] = z
-
-            for tname, tval in thresholds.items():
-                for strat in ["P1", "P2", "P3"]:
-                    try:
-                        # Counter-cyclical: HIGH signal = stressed = bearish → go to cash
-                        # So bullish = signal BELOW threshold
-                        if tname.startswith("T3_z"):
-                            # Z-score comparison: need z-score of the signal
-                            roll_mean = sig_l.rolling(504, min_periods=400).mean()
-                            roll_std = sig_l.rolling(504, min_periods=400).std()
-                            roll_std = roll_std.replace(0, np.nan)
-                            z_series = (sig_l - roll_mean) / roll_std
-                            bullish = z_series < tval
-                        elif isinstance(tval, (int, float)):
-                            bullish = sig_l < tval
-                        else:
-                            bullish = sig_l < tval
-
-                        if strat == "P1":
-                            pos = bullish.astype(float)
-                        elif strat == "P2":
-                            smin = sig_l.rolling(504, min_periods=400).min()
-                            smax = sig_l.rolling(504, min_periods=400).max()
-                            sr = (smax - smin).replace(0, np.nan)
-                            pos = (1 - (sig_l - smin) / sr).clip(0, 1)
-                        elif strat == "P3":
-                            pos = bullish.astype(float) * 2 - 1
-
-                        strat_ret = pos.shift(1) * work["spy_ret"]
-                        is_r = strat_ret[is_mask].dropna()
-                        oos_r = strat_ret[oos_mask].dropna()
-                        if len(is_r) < 100 or len(oos_r) < 50:
-                            continue
-
-                        oos_sharpe = ((oos_r.mean() / oos_r.std()) * np.sqrt(252)
-                                      if oos_r.std() > 0 else 0)
-                        cum = (1 + oos_r).cumprod()
-                        dd = ((cum - cum.cummax()) / cum.cummax()).min()
-                        turnover = pos.diff().abs().sum() / max(len(pos.dropna()) / 252, 1)
-                        n_trades_raw = pos.diff().abs().gt(0).sum()
-                        valid = (oos_sharpe > 0 and turnover < 24
-                                 and n_trades_raw >= 30)
-
-                        # Win rate
-                        wins = (oos_r > 0).sum()
-                        win_rate = wins / len(oos_r) if len(oos_r) > 0 else 0
-
-                        results.append({
-                            "signal": sig_name,
-                            "threshold": tname,
-                            "strategy": strat,
-                            "lead_days": lead,
-                            "oos_sharpe": round(oos_sharpe, 4),
-                            "oos_ann_return": round(oos_r.mean() * 252 * 100, 2),
-                            "max_drawdown": round(dd * 100, 2),
-                            "win_rate": round(win_rate, 4),
-                            "n_trades": int(n_trades_raw),
-                            "annual_turnover": round(turnover, 2),
-                            "valid": valid,
-                            "oos_n": len(oos_r),
-                        })
-                    except Exception:
-                        continue
 
-    # ── Benchmark (buy-and-hold SPY) ──
-    bh = work.loc[oos_mask, "spy_ret"].dropna()
-    if len(bh) > 0:
-        bh_s = (bh.mean() / bh.std()) * np.sqrt(252) if bh.std() > 0 else 0
-        bh_cum = (1 + bh).cumprod()
-        bh_dd = ((bh_cum - bh_cum.cummax()) / bh_cum.cummax()).min()
-        results.append({
-            "signal": "BENCHMARK", "threshold": "BUY_HOLD", "strategy": "BH",
-            "lead_days": 0, "oos_sharpe": round(bh_s, 4),
-            "oos_ann_return": round(bh.mean() * 252 * 100, 2),
-            "max_drawdown": round(bh_dd * 100, 2),
-            "win_rate": round((bh > 0).mean(), 4),
-            "n_trades": 1, "annual_turnover": 0,
-            "valid": True, "oos_n": len(bh),
-        })
+@timed("6_tournament")
+def stage_tournament(df):
+    """5D combinatorial backtest over signals, thresholds, strategies, leads, direction."""
+    work = _with_regime_signals(df)
+    is_mask = work.index <= IS_END
+    oos_mask = work.index >= OOS_START
+
+    # Counter-cyclical (spec direction): HIGH signal = stressed = bearish → go
+    # to cash, so bullish = signal BELOW threshold
+    m = PIPE.tournament(work, SPEC.tournament["signals"], _thresholds,
+                        is_mask=is_mask, oos_mask=oos_mask)
+    print(f"  Signals tested: {m['signal'].nunique()} of {len(SPEC.tournament['signals'])}")
 
-    rdf = pd.DataFrame(results)
+    # ── Benchmark (buy-and-hold SPY) ──
+    bh = {"signal": "BENCHMARK", "threshold": "BUY_HOLD", "strategy": "BH", "lead_days": 0,
+          **PIPE.benchmark(work["spy_ret"], is_mask, oos_mask), "n_trades": 1, "valid": True}
+    rdf = PIPE.results_table(m, RESULT_COLUMNS, bh)
     rdf.to_csv(os.path.join(RESULTS_DIR, f"tournament_results_{DATE_TAG}.csv"), index=False)
 
     valid_count = rdf["valid"].sum() if len(rdf) > 0 else 0
@@ -817,6 +676,9 @@ def stage_tournament(df):
         if len(bm) > 0:
             print(f"  B&H:  Sharpe={bm.iloc[0]['oos_sharpe']:.2f}"
                   f" DD={bm.iloc[0]['max_drawdown']:.1f}%")
+
+    # White Reality Check / Hansen SPA over every reported combo → reality_check.json
+    PIPE.reality_check(work, oos_mask)
     return rdf
 
 
@@ -824,275 +686,18 @@ def stage_tournament(df):
 # STAGE 7: VALIDATION + WINNER OUTPUTS
 # ─────────────────────────────────────────────────────────────
 
-def _replay_strategy(work, sig_col, threshold_name, threshold_val, strategy,
-                     lead, counter_cyclical=True):
-    """Replay a single tournament combo and return (position, strategy_returns)."""
-    signal = work[sig_col].shift(lead) if lead > 0 else work[sig_col]
-
-    # Align rolling threshold to work's index if it's a Series
-    if isinstance(threshold_val, pd.Series):
-        threshold_val = threshold_val.reindex(work.index)
-
-    if threshold_name.startswith("T3_z"):
-        roll_mean = signal.rolling(504, min_periods=400).mean()
-        roll_std = signal.rolling(504, min_periods=400).std().replace(0, np.nan)
-        z_series = (signal - roll_mean) / roll_std
-        bullish = z_series < threshold_val
-    elif isinstance(threshold_val, (int, float, np.floating)):
-        bullish = signal < threshold_val if counter_cyclical else signal > threshold_val
-    else:
-        bullish = signal < threshold_val if counter_cyclical else signal > threshold_val
-
-    if strategy == "P1":
-        pos = bullish.astype(float)
-    elif strategy == "P2":
-        smin = signal.rolling(504, min_periods=400).min()
-        smax = signal.rolling(504, min_periods=400).max()
-        sr = (smax - smin).replace(0, np.nan)
-        pos = (1 - (signal - smin) / sr).clip(0, 1)
-    elif strategy == "P3":
-        pos = bullish.astype(float) * 2 - 1
-    else:
-        pos = bullish.astype(float)
-
-    strat_ret = pos.shift(1) * work["spy_ret"]
-    return pos, strat_ret
-
-
-def _compute_threshold_val(is_signal, threshold_name, signal_series):
-    """Compute threshold value from in-sample signal for a given threshold name."""
-    if threshold_name.startswith("T1_p"):
-        pct = int(threshold_name.split("p")[1])
-        return is_signal.quantile(pct / 100)
-    elif threshold_name.startswith("T2_rp"):
-        pct = int(threshold_name.split("rp")[1])
-        return signal_series.rolling(504, min_periods=400).quantile(pct / 100)
-    elif threshold_name.startswith("T3_z"):
-        return float(threshold_name.split("z")[1])
-    elif threshold_name.startswith(("T4_hmm_", "T4_ms_", "T5_hmm_", "T5_ms_")):
-        return float(threshold_name.rsplit("_", 1)[1])
-    return None
-
-
 @timed("7_validation")
 def stage_validation(df, tourn_df):
     """Walk-forward, bootstrap, cost, decay, stress tests for top-5 winners.
     Then generate winner_summary.json, winner_trade_log.csv, execution_notes.md."""
-    import statsmodels.api as sm
-
-    # Load signals from persisted parquet
-    signals_path = os.path.join(SIGNALS_DIR, f"signals_{DATE_TAG}.parquet")
-    sig_df = pd.read_parquet(signals_path)
-    work = df.copy()
-    for col in ["hmm_2state_prob_stress", "ms_2state_stress_prob"]:
-        if col in sig_df.columns and col not in work.columns:
-            work[col] = sig_df[col].reindex(work.index)
-    if "spy_ret" not in work.columns:
-        work["spy_ret"] = work["spy"].pct_change()
+    work = _with_regime_signals(df)
 
-    # ── Select top-5 valid winners ──
-    valid = tourn_df[tourn_df["valid"] & (tourn_df["signal"] != "BENCHMARK")]
-    if len(valid) == 0:
-        print("  No valid winners to validate.")
+    # Winner positions straight from the tournament block; a T1 percentile is
+    # refit on each walk-forward training window
+    frames = PIPE.validation(work, work.index >= OOS_START)
+    if not frames:
         return
-    top5 = valid.nlargest(5, "oos_sharpe")
-    print(f"  Validating top {len(top5)} winners")
-
-    # Signal name -> column mapping (same as tournament)
-    signal_col_map = {
-        "S1_spread_level":     "hy_ig_spread_pct",
-        "S2a_zscore_252d":     "hy_ig_zscore_252d",
-        "S2b_zscore_504d":     "hy_ig_zscore_504d",
-        "S3a_pctrank_504d":    "hy_ig_pctrank_504d",
-        "S3b_pctrank_1260d":   "hy_ig_pctrank_1260d",
-        "S4a_roc_21d":         "hy_ig_roc_21d",
-        "S4b_roc_63d":         "hy_ig_roc_63d",
-        "S4c_roc_126d":        "hy_ig_roc_126d",
-        "S5_ccc_bb_spread":    "ccc_bb_spread",
-        "S6_hmm_stress":       "hmm_2state_prob_stress",
-        "S7_ms_stress":        "ms_2state_stress_prob",
-        "S10_mom_21d":         "hy_ig_mom_21d",
-        "S11_mom_63d":         "hy_ig_mom_63d",
-        "S12_mom_252d":        "hy_ig_mom_252d",
-        "S13_acceleration":    "hy_ig_acceleration",
-    }
-
-    all_wf = []
-    all_bootstrap = []
-    all_costs = []
-    all_decay = []
-    all_stress = []
-
-    for rank, (idx, row) in enumerate(top5.iterrows(), 1):
-        sig_name = row["signal"]
-        sig_col = signal_col_map.get(sig_name)
-        if sig_col is None or sig_col not in work.columns:
-            print(f"  SKIP {sig_name}: column not found")
-            continue
-
-        tname = row["threshold"]
-        strat = row["strategy"]
-        lead = int(row["lead_days"])
-
-        signal = work[sig_col]
-        is_signal = signal[work.index <= IS_END].dropna()
-        tval = _compute_threshold_val(is_signal, tname, signal)
-
-        combo_tag = f"{sig_name}/{tname}/{strat}/L{lead}"
-        print(f"  [{rank}] {combo_tag} (OOS Sharpe={row['oos_sharpe']:.2f})")
-
-        # ── 1. Walk-forward (5yr train / 1yr test, rolling annually) ──
-        years = sorted(work.index.year.unique())
-        for test_year in range(max(years[0] + 5, 2010), max(years) + 1):
-            train_start = pd.Timestamp(f"{test_year - 5}-01-01")
-            train_end = pd.Timestamp(f"{test_year - 1}-12-31")
-            test_start = pd.Timestamp(f"{test_year}-01-01")
-            test_end = pd.Timestamp(f"{test_year}-12-31")
-
-            train_mask = (work.index >= train_start) & (work.index <= train_end)
-            test_mask = (work.index >= test_start) & (work.index <= test_end)
-
-            train_sig = signal[train_mask].dropna()
-            if len(train_sig) < 200:
-                continue
-
-            # Recompute threshold on training window
-            if tname.startswith("T1_p"):
-                pct = int(tname.split("p")[1])
-                tv = train_sig.quantile(pct / 100)
-            elif tname.startswith("T2_rp"):
-                # Rolling thresholds are self-updating; use train+test slice
-                # so rolling window has sufficient history
-                tv = tval
-            else:
-                tv = tval  # z-score/probability thresholds are self-updating
-
-            # Use train+test slice so rolling computations have enough lookback
-            wf_slice_mask = (work.index >= train_start) & (work.index <= test_end)
-            _, wf_ret = _replay_strategy(work[wf_slice_mask], sig_col, tname, tv, strat, lead)
-            # Extract only the test period returns
-            test_ret = wf_ret[(wf_ret.index >= test_start) & (wf_ret.index <= test_end)].dropna()
-            if len(test_ret) < 20:
-                continue
-            wf_sharpe = ((test_ret.mean() / test_ret.std()) * np.sqrt(252)
-                         if test_ret.std() > 0 else 0)
-            all_wf.append({
-                "rank": rank, "signal": sig_name, "threshold": tname,
-                "strategy": strat, "lead_days": lead,
-                "test_year": test_year, "oos_sharpe": round(wf_sharpe, 4),
-                "n_obs": len(test_ret),
-            })
-
-        # ── 2. Bootstrap (10,000 resamples) ──
-        oos_mask = work.index >= OOS_START
-        _, oos_ret = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead)
-        oos_ret = oos_ret.dropna()
-        if len(oos_ret) > 50:
-            rng = np.random.RandomState(42)
-            boot_sharpes = []
-            oos_arr = oos_ret.values
-            n = len(oos_arr)
-            for _ in range(10000):
-                sample = rng.choice(oos_arr, size=n, replace=True)
-                bs = (sample.mean() / sample.std()) * np.sqrt(252) if sample.std() > 0 else 0
-                boot_sharpes.append(bs)
-            boot_sharpes = np.array(boot_sharpes)
-            all_bootstrap.append({
-                "rank": rank, "signal": sig_name, "threshold": tname,
-                "strategy": strat, "lead_days": lead,
-                "mean_sharpe": round(np.mean(boot_sharpes), 4),
-                "ci_2_5": round(np.percentile(boot_sharpes, 2.5), 4),
-                "ci_97_5": round(np.percentile(boot_sharpes, 97.5), 4),
-                "pct_positive": round((boot_sharpes > 0).mean() * 100, 1),
-            })
-
-        # ── 3. Transaction costs ──
-        for bps in [0, 5, 10, 20, 50]:
-            _, ret = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead)
-            ret = ret.dropna()
-            if len(ret) < 50:
-                continue
-            # Position changes incur cost
-            pos, _ = _replay_strategy(work[oos_mask], sig_col, tname, tval, strat, lead)
-            pos_changes = pos.diff().abs().fillna(0)
-            cost_per_day = pos_changes * (bps / 10000)
-            net_ret = ret - cost_per_day.shift(1).reindex(ret.index, fill_value=0)
-            net_sharpe = ((net_ret.mean() / net_ret.std()) * np.sqrt(252)
-                          if net_ret.std() > 0 else 0)
-            all_costs.append({
-                "rank": rank, "signal": sig_name, "threshold": tname,
-                "strategy": strat, "lead_days": lead,
-                "tx_cost_bps": bps,
-                "net_sharpe_approx": round(net_sharpe, 4),
-                "oos_sharpe": round(row["oos_sharpe"], 4),
-            })
-
-        # ── 4. Signal decay (execution delay 0-5 days) ──
-        for delay in [0, 1, 2, 3, 5]:
-            actual_lead = lead + delay
-            _, delay_ret = _replay_strategy(
-                work[oos_mask], sig_col, tname, tval, strat, actual_lead)
-            delay_ret = delay_ret.dropna()
-            if len(delay_ret) < 50:
-                continue
-            delay_sharpe = ((delay_ret.mean() / delay_ret.std()) * np.sqrt(252)
-                            if delay_ret.std() > 0 else 0)
-            all_decay.append({
-                "rank": rank, "signal": sig_name, "threshold": tname,
-                "strategy": strat, "lead_days": lead,
-                "execution_delay": delay,
-                "oos_sharpe": round(delay_sharpe, 4),
-            })
-
-        # ── 5. Stress tests ──
-        stress_periods = [
-            ("GFC_2007_2009", "2007-07-01", "2009-03-31"),
-            ("COVID_2020", "2020-02-01", "2020-06-30"),
-            ("Taper_Tantrum_2013", "2013-05-01", "2013-09-30"),
-            ("Rate_Shock_2022", "2022-01-01", "2022-12-31"),
-        ]
-        for period_name, pstart, pend in stress_periods:
-            pmask = (work.index >= pstart) & (work.index <= pend)
-            if pmask.sum() < 20:
-                continue
-            _, stress_ret = _replay_strategy(work[pmask], sig_col, tname, tval, strat, lead)
-            stress_ret = stress_ret.dropna()
-            if len(stress_ret) < 10:
-                continue
-            s_sharpe = ((stress_ret.mean() / stress_ret.std()) * np.sqrt(252)
-                        if stress_ret.std() > 0 else 0)
-            cum = (1 + stress_ret).cumprod()
-            s_dd = ((cum - cum.cummax()) / cum.cummax()).min()
-            # Benchmark for same period
-            bh_stress = work.loc[pmask, "spy_ret"].dropna()
-            bh_sharpe = ((bh_stress.mean() / bh_stress.std()) * np.sqrt(252)
-                         if bh_stress.std() > 0 else 0)
-            all_stress.append({
-                "rank": rank, "signal": sig_name, "threshold": tname,
-                "strategy": strat, "lead_days": lead,
-                "period": period_name, "start": pstart, "end": pend,
-                "strategy_sharpe": round(s_sharpe, 4),
-                "strategy_max_dd": round(s_dd * 100, 2),
-                "benchmark_sharpe": round(bh_sharpe, 4),
-                "n_obs": len(stress_ret),
-            })
-
-    # ── Save validation results ──
-    pd.DataFrame(all_wf).to_csv(
-        os.path.join(VALIDATION_DIR, "walk_forward.csv"), index=False)
-    pd.DataFrame(all_bootstrap).to_csv(
-        os.path.join(VALIDATION_DIR, "bootstrap_ci.csv"), index=False)
-    pd.DataFrame(all_costs).to_csv(
-        os.path.join(VALIDATION_DIR, "transaction_costs.csv"), index=False)
-    pd.DataFrame(all_decay).to_csv(
-        os.path.join(VALIDATION_DIR, "signal_decay.csv"), index=False)
-    pd.DataFrame(all_stress).to_csv(
-        os.path.join(VALIDATION_DIR, "stress_tests.csv"), index=False)
-    print(f"  Walk-forward: {len(all_wf)} year-combos")
-    print(f"  Bootstrap: {len(all_bootstrap)} combos")
-    print(f"  Cost analysis: {len(all_costs)} rows")
-    print(f"  Signal decay: {len(all_decay)} rows")
-    print(f"  Stress tests: {len(all_stress)} rows")
+    PIPE.write_validation(frames)
 
     # ── Generate winner outputs ──
     _generate_winner_outputs(tourn_df, work)
@@ -1111,23 +716,7 @@ def _generate_winner_outputs(tourn_df, work):
     with open(meta_path) as f:
         metadata = json.load(f)
 
-    signal_col_map = {
-        "S1_spread_level":     "hy_ig_spread_pct",
-        "S2a_zscore_252d":     "hy_ig_zscore_252d",
-        "S2b_zscore_504d":     "hy_ig_zscore_504d",
-        "S3a_pctrank_504d":    "hy_ig_pctrank_504d",
-        "S3b_pctrank_1260d":   "hy_ig_pctrank_1260d",
-        "S4a_roc_21d":         "hy_ig_roc_21d",
-        "S4b_roc_63d":         "hy_ig_roc_63d",
-        "S4c_roc_126d":        "hy_ig_roc_126d",
-        "S5_ccc_bb_spread":    "ccc_bb_spread",
-        "S6_hmm_stress":       "hmm_2state_prob_stress",
-        "S7_ms_stress":        "ms_2state_stress_prob",
-        "S10_mom_21d":         "hy_ig_mom_21d",
-        "S11_mom_63d":         "hy_ig_mom_63d",
-        "S12_mom_252d":        "hy_ig_mom_252d",
-        "S13_acceleration":    "hy_ig_acceleration",
-    }
+    signal_col_map = SPEC.tournament["signals"]
 
     signal_display = {
         "S1_spread_level": "HY-IG Spread Level",
@@ -1238,12 +827,13 @@ def _generate_winner_outputs(tourn_df, work):
     print(f"  Saved: winner_summary.json (Sharpe={summary['oos_sharpe']:.2f})")
 
     # ── winner_trade_log.csv ──
-    sig_col = signal_col_map.get(sig_name)
-    if sig_col and sig_col in work.columns:
-        signal = work[sig_col]
-        is_signal = signal[work.index <= IS_END].dropna()
-        tval = _compute_threshold_val(is_signal, tname, signal)
-        pos, strat_ret = _replay_strategy(work, sig_col, tname, tval, strat, lead)
+    # Winner positions straight from the tournament block
+    m = PIPE.metrics
+    hit = m[(m["signal"] == sig_name) & (m["threshold"] == tname)
+            & (m["strategy"] == strat) & (m["lead_days"] == lead)]
+    if len(hit):
+        pos = PIPE.block.position_series(int(hit["column"].iloc[0])).reindex(work.index)
+        strat_ret = pos.shift(1) * work["spy_ret"]
         cum_ret = (1 + strat_ret.fillna(0)).cumprod()
 
         pos_clean = pos.dropna()
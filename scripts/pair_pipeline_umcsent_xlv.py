@@ -33,25 +33,35 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
+from _bocpd import online_change_points
+from _bootstrap import bootstrap_sharpe
+from _local_projections import local_projections
+from _pair_pipeline import PairPipeline
+from _pair_spec import load_spec
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
+# Sources, split rule, signal map and tournament settings live in
+# pair_specs/umcsent_xlv.json; the shared stages run on PairPipeline.
 PAIR_ID = "umcsent_xlv"
-INDICATOR_NAME = "Michigan Consumer Sentiment"
-TARGET_NAME = "Health Care Select Sector (XLV)"
-START_DATE = "1998-01-01"
-END_DATE = "2025-12-31"
-DATE_TAG = "20260420"
+SPEC = load_spec(PAIR_ID)
+INDICATOR_NAME = SPEC.indicator_name
+TARGET_NAME = SPEC.target_name
+START_DATE = SPEC.start_date
+END_DATE = SPEC.end_date
+DATE_TAG = SPEC.date_tag
 
 BASE_DIR = "/workspaces/aig-rlic-plus"
-DATA_DIR = os.path.join(BASE_DIR, "data")
-RESULTS_DIR = os.path.join(BASE_DIR, "results", PAIR_ID)
-EXPLORE_DIR = os.path.join(RESULTS_DIR, f"exploratory_{DATE_TAG}")
-MODELS_DIR = os.path.join(RESULTS_DIR, f"core_models_{DATE_TAG}")
-VALID_DIR = os.path.join(RESULTS_DIR, f"tournament_validation_{DATE_TAG}")
+PIPE = PairPipeline(SPEC, BASE_DIR)
+DATA_DIR = PIPE.data_dir
+RESULTS_DIR = PIPE.results_dir
+EXPLORE_DIR = PIPE.explore_dir
+MODELS_DIR = PIPE.models_dir
+VALID_DIR = PIPE.valid_dir
 
 for d in [DATA_DIR, RESULTS_DIR, EXPLORE_DIR, MODELS_DIR, VALID_DIR]:
     os.makedirs(d, exist_ok=True)
@@ -90,11 +100,7 @@ def stage_data_sourcing():
     """Source UMCSENT (monthly) + XLV (daily) + controls from FRED and Yahoo."""
 
     # --- FRED series ---
-    fred_series = {
-        "UMCSENT": "umcsent",   # Michigan Consumer Sentiment (Monthly)
-        "UNRATE":  "unrate",    # Unemployment Rate (Monthly)
-        "DGS10":   "dgs10",     # 10Y Treasury Yield (Daily)
-    }
+    fred_series = SPEC.sources["fred"]
 
     api_key = os.environ.get("FRED_API_KEY", "952aa4d0c4b2057609fbf3ecc6954e58")
     fred_data = {}
@@ -135,11 +141,7 @@ def stage_data_sourcing():
 
     # --- Yahoo Finance series ---
     import yfinance as yf
-    yahoo_tickers = {
-        "XLV":   "xlv",
-        "SPY":   "spy",
-        "^VIX":  "vix",
-    }
+    yahoo_tickers = SPEC.sources["yahoo"]
 
     yahoo_data = {}
     for ticker, col_name in yahoo_tickers.items():
@@ -201,12 +203,10 @@ def stage_alignment_and_derived(all_series):
     df_monthly = df_monthly.dropna(subset=["xlv"], how="all")
 
     # --- ECON-OOS2: dynamic IS/OOS split ---
-    N = len(df_monthly.dropna(subset=["umcsent"]))
-    oos_months = min(max(36, round(N * 0.25)), 120)
-    is_months = N - oos_months
     all_dates = df_monthly.dropna(subset=["umcsent"]).index
-    IS_END = all_dates[is_months - 1]
-    OOS_START = all_dates[is_months]
+    IS_END, OOS_START = SPEC.split_dates(all_dates)
+    N = len(all_dates)
+    oos_months = int((all_dates >= OOS_START).sum())
     print(f"  ECON-OOS2 split: N={N}, OOS={oos_months}m, IS ends {IS_END.date()}, OOS starts {OOS_START.date()}")
 
     # --- Derived series: UMCSENT ---
@@ -303,46 +303,41 @@ def stage_alignment_and_derived(all_series):
 
 @log_stage("3_stationarity_and_quality")
 def stage_stationarity_and_quality(df_monthly, df_daily):
-    """Run ADF/KPSS tests and generate quality reports."""
-    from arch.unitroot import ADF, KPSS
+    """Run ADF/KPSS/PP/Zivot-Andrews tests and generate quality reports."""
+    test_cols = SPEC.stationarity
+    min_obs = SPEC.p["min_stationarity_obs"]
 
-    test_cols = ["umcsent", "xlv", "spy", "vix", "dgs10",
-                 "unrate", "umcsent_yoy", "umcsent_mom", "umcsent_zscore"]
-
-    results = []
+    # Monthly series where available, daily otherwise; full resolution, cached
+    # by series hash across pairs
+    series, short = {}, {}
     for col in test_cols:
         s = df_monthly[col].dropna() if col in df_monthly.columns else pd.Series(dtype=float)
-        if len(s) < 50 and col in df_daily.columns:
+        if len(s) < min_obs and col in df_daily.columns:
             s = df_daily[col].dropna()
-        if len(s) < 50:
+        if len(s) < min_obs:
+            short[col] = len(s)
+        else:
+            series[col] = s
+    tests = SPEC.p["stationarity_tests"]
+    res = PIPE.unit_roots(series).set_index(["variable", "test"])
+
+    results = []
+    for col in test_cols:
+        if col in short:
             results.append({"variable": col, "test": "ADF", "statistic": np.nan,
-                           "p_value": np.nan, "conclusion": f"Insufficient data ({len(s)} obs)"})
+                            "p_value": np.nan, "conclusion": f"Insufficient data ({short[col]} obs)"})
             continue
-
-        if len(s) > 5000:
-            s = s.iloc[::5]
-
-        try:
-            adf = ADF(s, max_lags=12)
-            results.append({"variable": col, "test": "ADF",
-                           "statistic": round(adf.stat, 4),
-                           "p_value": round(adf.pvalue, 4),
-                           "conclusion": "Stationary" if adf.pvalue < 0.05 else "Non-stationary"})
-        except Exception as e:
-            results.append({"variable": col, "test": "ADF",
-                           "statistic": np.nan, "p_value": np.nan,
-                           "conclusion": f"Error: {e}"})
-
-        try:
-            kpss = KPSS(s)
-            results.append({"variable": col, "test": "KPSS",
-                           "statistic": round(kpss.stat, 4),
-                           "p_value": round(kpss.pvalue, 4),
-                           "conclusion": "Stationary" if kpss.pvalue > 0.05 else "Non-stationary"})
-        except Exception as e:
-            results.append({"variable": col, "test": "KPSS",
-                           "statistic": np.nan, "p_value": np.nan,
-                           "conclusion": f"Error: {e}"})
+        for test in tests:
+            if (col, test) in res.index:
+                r = res.loc[(col, test)]
+                results.append({"variable": col, "test": test,
+                                "statistic": round(r["statistic"], 4),
+                                "p_value": round(r["p_value"], 4),
+                                "conclusion": r["conclusion"]})
+            else:
+                results.append({"variable": col, "test": test,
+                                "statistic": np.nan, "p_value": np.nan,
+                                "conclusion": "Error: test failed"})
 
     stat_df = pd.DataFrame(results)
     stat_path = os.path.join(RESULTS_DIR, f"stationarity_tests_{DATE_TAG}.csv")
@@ -523,7 +518,6 @@ def stage_exploratory(df_monthly):
 def stage_core_models(df_monthly):
     """Run core econometric models."""
     import statsmodels.api as sm
-    import statsmodels.formula.api as smf
     from statsmodels.tsa.stattools import grangercausalitytests
 
     model_results = {}
@@ -569,28 +563,16 @@ def stage_core_models(df_monthly):
     # --- 5.2 Predictive Regressions (OLS) ---
     print("\n  [5.2] Predictive Regressions...")
     reg_results = []
-    for signal in ["umcsent_yoy", "umcsent_mom", "umcsent_zscore"]:
-        for horizon in ["xlv_fwd_1m", "xlv_fwd_3m", "xlv_fwd_6m", "xlv_fwd_12m"]:
-            valid = work[[signal, horizon]].dropna()
-            if len(valid) < 30:
-                continue
-
-            X = sm.add_constant(valid[signal])
-            y = valid[horizon]
-
-            try:
-                model = sm.OLS(y, X).fit(cov_type="HC3")
-                reg_results.append({
-                    "signal": signal, "horizon": horizon,
-                    "coef": round(model.params.iloc[1], 6),
-                    "se": round(model.bse.iloc[1], 6),
-                    "t_stat": round(model.tvalues.iloc[1], 3),
-                    "p_value": round(model.pvalues.iloc[1], 4),
-                    "r_squared": round(model.rsquared, 4),
-                    "n": model.nobs,
-                })
-            except Exception as e:
-                print(f"    Regression {signal}->{horizon} failed: {e}")
+    for r in PIPE.regressions(work).itertuples(index=False):
+        reg_results.append({
+            "signal": r.signal, "horizon": r.target,
+            "coef": round(r.coef, 6),
+            "se": round(r.se, 6),
+            "t_stat": round(r.t_stat, 3),
+            "p_value": round(r.p_value, 4),
+            "r_squared": round(r.r_squared, 4),
+            "n": float(r.n),
+        })
 
     reg_df = pd.DataFrame(reg_results)
     reg_df.to_csv(os.path.join(MODELS_DIR, "predictive_regressions.csv"), index=False)
@@ -602,46 +584,30 @@ def stage_core_models(df_monthly):
     lp_results = []
     horizons_map = {"xlv_fwd_1m": 1, "xlv_fwd_3m": 3, "xlv_fwd_6m": 6, "xlv_fwd_12m": 12}
 
-    for horizon_col, h in horizons_map.items():
-        valid = work[["umcsent_yoy", horizon_col]].dropna()
-        controls = []
-        for ctrl in ["vix", "dgs10"]:
-            if ctrl in work.columns:
-                valid = valid.copy()
-                valid[ctrl] = work.loc[valid.index, ctrl]
-                controls.append(ctrl)
-        valid = valid.dropna()
-
-        if len(valid) < 30:
-            continue
-
-        try:
-            X_cols = ["umcsent_yoy"] + controls
-            X = sm.add_constant(valid[X_cols])
-            y = valid[horizon_col]
-
-            nw_lags = int(0.75 * len(valid) ** (1 / 3))
-            model = sm.OLS(y, X).fit(cov_type="HAC", cov_kwds={"maxlags": nw_lags})
-
-            lp_results.append({
-                "horizon_months": h,
-                "coef_umcsent_yoy": round(model.params["umcsent_yoy"], 6),
-                "se": round(model.bse["umcsent_yoy"], 6),
-                "t_stat": round(model.tvalues["umcsent_yoy"], 3),
-                "p_value": round(model.pvalues["umcsent_yoy"], 4),
-                "ci_lower": round(model.conf_int().loc["umcsent_yoy", 0], 6),
-                "ci_upper": round(model.conf_int().loc["umcsent_yoy", 1], 6),
-                "r_squared": round(model.rsquared, 4),
-                "n": int(model.nobs),
-                "nw_lags": nw_lags,
-            })
-        except Exception as e:
-            print(f"    LP at h={h} failed: {e}")
+    # Newey-West HAC SEs with at least h lags (h-month forward returns overlap);
+    # the whole 1..24-month curve in one fit that shares the regressor
+    # cross-products and NW kernel across horizons
+    lp_paths = PIPE.lp_paths(df_monthly, work.index)
+    for r in PIPE.impulse_response(work, lp_paths).itertuples(index=False):
+        lp_results.append({
+            "horizon_months": int(r.horizon),
+            "coef_umcsent_yoy": round(r.coef, 6),
+            "se": round(r.se, 6),
+            "t_stat": round(r.t_stat, 3),
+            "p_value": round(r.p_value, 4),
+            "ci_lower": round(r.ci_lower, 6),
+            "ci_upper": round(r.ci_upper, 6),
+            "r_squared": round(r.r_squared, 4),
+            "n": int(r.n),
+            "nw_lags": int(r.nw_lags),
+        })
 
-    lp_df = pd.DataFrame(lp_results)
+    irf_df = pd.DataFrame(lp_results)
+    irf_df.to_csv(os.path.join(MODELS_DIR, "lp_impulse_response.csv"), index=False)
+    lp_df = irf_df[irf_df["horizon_months"].isin(horizons_map.values())].reset_index(drop=True)
     lp_df.to_csv(os.path.join(MODELS_DIR, "local_projections.csv"), index=False)
     model_results["local_projections"] = lp_df
-    print(f"    {len(lp_df)} horizons saved")
+    print(f"    {len(lp_df)} horizons saved, IRF over {len(irf_df)}")
 
     # --- 5.4 Regime-Dependent Local Projections ---
     print("\n  [5.4] Regime-Dependent LPs...")
@@ -652,32 +618,26 @@ def stage_core_models(df_monthly):
         med = work_copy["umcsent_yoy"].median()
         work_copy["umcsent_low"] = (work_copy["umcsent_yoy"] < med).astype(int)
 
-        for horizon_col, h in horizons_map.items():
-            valid = work_copy[["umcsent_yoy", "umcsent_low", horizon_col]].dropna()
-            if len(valid) < 50:
+        rlp = local_projections(work_copy, "umcsent_yoy", lp_paths, regime="umcsent_low", min_obs=50)
+        b, d, i = (rlp.irf(t).set_index("horizon") for t in rlp.terms[1:4])
+        for h in horizons_map.values():
+            if b.loc[h, "n"] < 50:
                 continue
-
-            try:
-                valid["interact"] = valid["umcsent_yoy"] * valid["umcsent_low"]
-                X = sm.add_constant(valid[["umcsent_yoy", "umcsent_low", "interact"]])
-                y = valid[horizon_col]
-
-                nw_lags = int(0.75 * len(valid) ** (1 / 3))
-                model = sm.OLS(y, X).fit(cov_type="HAC", cov_kwds={"maxlags": nw_lags})
-
-                regime_lp_results.append({
-                    "horizon_months": h,
-                    "coef_umcsent_yoy": round(model.params["umcsent_yoy"], 6),
-                    "coef_low_sentiment": round(model.params["umcsent_low"], 6),
-                    "coef_interaction": round(model.params["interact"], 6),
-                    "p_yoy": round(model.pvalues["umcsent_yoy"], 4),
-                    "p_low": round(model.pvalues["umcsent_low"], 4),
-                    "p_interaction": round(model.pvalues["interact"], 4),
-                    "r_squared": round(model.rsquared, 4),
-                    "n": int(model.nobs),
-                })
-            except Exception as e:
-                print(f"    Regime LP at h={h} failed: {e}")
+            regime_lp_results.append({
+                "horizon_months": h,
+                "coef_umcsent_yoy": round(b.loc[h, "coef"], 6),
+                "coef_low_sentiment": round(d.loc[h, "coef"], 6),
+                "coef_interaction": round(i.loc[h, "coef"], 6),
+                "p_yoy": round(b.loc[h, "p_value"], 4),
+                "p_low": round(d.loc[h, "p_value"], 4),
+                "p_interaction": round(i.loc[h, "p_value"], 4),
+                "r_squared": round(b.loc[h, "r_squared"], 4),
+                "n": int(b.loc[h, "n"]),
+            })
+        # Shock response in each state (state = umcsent_low), every horizon
+        state_irf = rlp.state_irfs().rename(columns={"horizon": "horizon_months"})
+        state_irf[state_irf["n"] >= 50].to_csv(
+            os.path.join(MODELS_DIR, "regime_lp_impulse_response.csv"), index=False)
 
     regime_lp_df = pd.DataFrame(regime_lp_results)
     regime_lp_df.to_csv(os.path.join(MODELS_DIR, "regime_local_projections.csv"), index=False)
@@ -718,81 +678,77 @@ def stage_core_models(df_monthly):
     # --- 5.6 Quantile Regression ---
     print("\n  [5.6] Quantile Regression...")
     qr_results = []
-    valid_qr = work[["umcsent_yoy", "xlv_fwd_3m"]].dropna()
-    if len(valid_qr) > 30:
-        for tau in [0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95]:
-            try:
-                qr_model = smf.quantreg("xlv_fwd_3m ~ umcsent_yoy", data=valid_qr)
-                qr_fit = qr_model.fit(q=tau)
-                qr_results.append({
-                    "quantile": tau,
-                    "intercept": round(qr_fit.params["Intercept"], 6),
-                    "coef_umcsent_yoy": round(qr_fit.params["umcsent_yoy"], 6),
-                    "se": round(qr_fit.bse["umcsent_yoy"], 6),
-                    "p_value": round(qr_fit.pvalues["umcsent_yoy"], 4),
-                    "ci_lower": round(qr_fit.conf_int().loc["umcsent_yoy", 0], 6),
-                    "ci_upper": round(qr_fit.conf_int().loc["umcsent_yoy", 1], 6),
-                })
-            except Exception as e:
-                print(f"    QR at tau={tau} failed: {e}")
+    for r in PIPE.quantile_regression(work).itertuples(index=False):
+        qr_results.append({
+            "quantile": r.quantile,
+            "intercept": round(r.intercept, 6),
+            "coef_umcsent_yoy": round(r.coef, 6),
+            "se": round(r.se, 6),
+            "p_value": round(r.p_value, 4),
+            "ci_lower": round(r.ci_lower, 6),
+            "ci_upper": round(r.ci_upper, 6),
+        })
 
     qr_df = pd.DataFrame(qr_results)
     qr_df.to_csv(os.path.join(MODELS_DIR, "quantile_regression.csv"), index=False)
     model_results["quantile_regression"] = qr_df
     print(f"    {len(qr_df)} quantiles saved")
 
+    # Quantile process (99 taus × horizons) for the quantile-process charts
+    qp_results = []
+    for r in PIPE.quantile_process(work).itertuples(index=False):
+        qp_results.append({
+            "horizon_months": int(r.horizon), "quantile": r.quantile,
+            "intercept": round(r.intercept, 6),
+            "coef_umcsent_yoy": round(r.coef, 6), "n": int(r.n),
+        })
+    qp_df = pd.DataFrame(qp_results)
+    qp_df.to_csv(os.path.join(MODELS_DIR, "quantile_process.csv"), index=False)
+    model_results["quantile_process"] = qp_df
+    print(f"    {len(qp_df)} quantile-process cells saved")
+
     # --- 5.7 Cointegration ---
     print("\n  [5.7] Cointegration Test...")
     try:
-        from statsmodels.tsa.vector_ar.vecm import coint_johansen
-
         coint_data = df_monthly[["umcsent", "xlv"]].dropna()
         if len(coint_data) > 50:
-            coint_log = np.log(coint_data)
-            result = coint_johansen(coint_log, det_order=1, k_ar_diff=2)
-
-            coint_results = []
-            for i in range(2):
-                coint_results.append({
-                    "null_hypothesis": f"r <= {i}",
-                    "trace_stat": round(result.lr1[i], 4),
-                    "critical_90": round(result.cvt[i, 0], 4),
-                    "critical_95": round(result.cvt[i, 1], 4),
-                    "critical_99": round(result.cvt[i, 2], 4),
-                    "reject_at_95": result.lr1[i] > result.cvt[i, 1],
-                })
-
-            coint_df = pd.DataFrame(coint_results)
+            # Use log levels
+            # Full sample + rolling 10-year windows: when does the long-run
+            # relationship hold?
+            result, roll = PIPE.cointegration({"log_umcsent~log_xlv": np.log(coint_data)})
+            coint_df = result[["null_hypothesis", "trace_stat", "critical_90", "critical_95",
+                               "critical_99", "reject_at_95"]].round(4)
             coint_df.to_csv(os.path.join(MODELS_DIR, "cointegration.csv"), index=False)
             model_results["cointegration"] = coint_df
-            print(f"    Johansen test: trace stats = {[round(x, 2) for x in result.lr1]}")
+            print(f"    Johansen test: trace stats = {[round(x, 2) for x in result['trace_stat']]}")
+
+            roll.to_csv(os.path.join(MODELS_DIR, "rolling_cointegration.csv"), index=False)
+            model_results["rolling_cointegration"] = roll
+            if len(roll):
+                print(f"    Rolling Johansen: {len(roll)} windows, "
+                      f"{(roll['rank_trace'] >= 1).mean():.0%} with rank >= 1 at 5%")
     except Exception as e:
         print(f"    Cointegration test failed: {e}")
 
     # --- 5.8 Change-Point Detection ---
-    print("\n  [5.8] Change-Point Detection...")
+    print("\n  [5.8] Change-Point Detection (online BOCPD)...")
     try:
-        import ruptures as rpt
-
-        u_series = df_monthly["umcsent_yoy"].dropna().values
-        if len(u_series) > 30:
-            algo = rpt.Pelt(model="rbf").fit(u_series)
-            change_points = algo.predict(pen=10)
-
-            u_dates = df_monthly["umcsent_yoy"].dropna().index
-            cp_results = []
-            for cp in change_points[:-1]:
-                if cp < len(u_dates):
-                    cp_results.append({
-                        "index": cp,
-                        "date": u_dates[cp].strftime("%Y-%m-%d"),
-                        "umcsent_yoy_at_break": round(u_series[cp], 2) if cp < len(u_series) else np.nan,
-                    })
-
-            cp_df = pd.DataFrame(cp_results)
+        u_raw = df_monthly["umcsent_yoy"].dropna()
+        if len(u_raw) > 30:
+            # State persists at pair level, so a monthly refresh only consumes new rows
+            cp_df, _ = online_change_points(
+                u_raw, os.path.join(RESULTS_DIR, "bocpd_state_umcsent_yoy.json"),
+                expected_run=60, confirm=6, warmup=24)
+            cp_df = pd.DataFrame({
+                "index": cp_df["breakpoint_index"],
+                "date": cp_df["date"],
+                "umcsent_yoy_at_break": cp_df["value_at_break"].round(2),
+                "confirmed_date": cp_df["confirmed_date"],
+                "delay_months": cp_df["delay_obs"],
+            })
             cp_df.to_csv(os.path.join(MODELS_DIR, "change_points.csv"), index=False)
             model_results["change_points"] = cp_df
-            print(f"    {len(cp_df)} change points detected")
+            print(f"    {len(cp_df)} change points confirmed")
     except Exception as e:
         print(f"    Change-point detection failed: {e}")
 
@@ -958,195 +914,40 @@ def stage_core_models(df_monthly):
 # STAGE 6: TOURNAMENT BACKTEST
 # ===================================================================
 
+# Legacy CSV names of the shared engine's strategies
+STRATEGY_NAMES = {"P1": "P1_long_cash", "P2": "P2_signal_strength", "P3": "P3_long_short"}
+RESULT_COLUMNS = ["signal", "threshold", "strategy", "lead_months", "is_sharpe", "oos_sharpe",
+                  "oos_sortino", "oos_calmar", "oos_ann_return", "oos_ann_vol", "max_drawdown",
+                  "win_rate", "annual_turnover", "is_n", "oos_n", "valid"]
+
+
 @log_stage("6_tournament")
 def stage_tournament(df_monthly, df_daily):
-    """5D combinatorial tournament backtest."""
-
-    work = df_monthly.copy()
-    work = work.dropna(subset=["umcsent"])
+    """
+    5D combinatorial tournament backtest on the shared PositionBlock engine.
 
+    Countercyclical (spec direction): low sentiment -> risk-off -> XLV
+    outperforms, so the rules are bullish below the threshold and P2 sizes
+    by 1 - the min-max scaled signal.
+    """
+    work = df_monthly.dropna(subset=["umcsent"])
     is_mask = work.index <= IS_END
     oos_mask = work.index >= OOS_START
 
-    # Signal columns (UMCSENT derivatives only — ECON-SD)
-    signal_cols = {
-        "S1_level":      "umcsent",
-        "S2_yoy":        "umcsent_yoy",
-        "S3_mom":        "umcsent_mom",
-        "S4_zscore":     "umcsent_zscore",
-        "S5_3m_ma":      "umcsent_3m_ma",
-        "S6_direction":  "umcsent_direction",
-        "S7_dev_ma":     "umcsent_dev_ma",
-    }
-
-    available_signals = {k: v for k, v in signal_cols.items()
-                        if v in work.columns and work[v].notna().sum() > 50}
-    print(f"  Available signals: {len(available_signals)}")
-
-    # XLV monthly return for backtest
-    if "xlv_ret" not in work.columns:
-        if "xlv" in work.columns:
-            work["xlv_ret"] = work["xlv"].pct_change()
-        else:
-            print("  ERROR: No XLV data for tournament")
-            return pd.DataFrame()
-
-    lead_times = [0, 1, 2, 3, 6]
-    strategies = ["P1_long_cash", "P2_signal_strength", "P3_long_short"]
-
-    results = []
-    combo_count = 0
-
-    for sig_name, sig_col in available_signals.items():
-        signal = work[sig_col].copy()
-        if signal.dropna().shape[0] < 50:
-            continue
+    metrics = PIPE.tournament(work, SPEC.tournament["signals"], PIPE.band_thresholds,
+                              is_mask=is_mask, oos_mask=oos_mask)
+    print(f"  Signals tested: {metrics['signal'].nunique()}")
 
-        for lead in lead_times:
-            signal_lagged = signal.shift(lead) if lead > 0 else signal
-
-            thresholds = {}
-
-            is_signal = signal_lagged[is_mask].dropna()
-            if len(is_signal) > 20:
-                for pct in [25, 50, 75]:
-                    thresholds[f"T1_fixed_p{pct}"] = is_signal.quantile(pct / 100)
-
-            for pct in [25, 50, 75]:
-                thresholds[f"T2_roll_p{pct}"] = signal_lagged.rolling(60, min_periods=36).quantile(pct / 100)
-
-            roll_mean = signal_lagged.rolling(60, min_periods=36).mean()
-            roll_std = signal_lagged.rolling(60, min_periods=36).std()
-            for k in [1.0, 1.5, 2.0]:
-                thresholds[f"T3_zscore_{k}"] = roll_mean + k * roll_std
-                thresholds[f"T3_zscore_neg_{k}"] = roll_mean - k * roll_std
-
-            if sig_name in ["S2_yoy", "S3_mom", "S7_dev_ma"]:
-                thresholds["T4_zero"] = 0
-
-            for thresh_name, thresh_val in thresholds.items():
-                for strat in strategies:
-                    combo_count += 1
-
-                    try:
-                        # Countercyclical: HIGH sentiment -> BELOW threshold -> bearish XLV
-                        # The signal is countercyclical, so:
-                        #   "above" means HIGH sentiment -> risk-on -> XLV underperforms -> bearish
-                        #   "below" means LOW sentiment -> risk-off -> XLV outperforms -> bullish
-                        # So position = 1 when signal is BELOW threshold (low sentiment = bullish XLV)
-                        if isinstance(thresh_val, (int, float)):
-                            if "neg_" in thresh_name:
-                                above = signal_lagged > thresh_val
-                            else:
-                                # Countercyclical: below threshold = bullish XLV
-                                above = signal_lagged < thresh_val
-                        else:
-                            if "neg_" in thresh_name:
-                                above = signal_lagged > thresh_val
-                            else:
-                                above = signal_lagged < thresh_val
-
-                        if strat == "P1_long_cash":
-                            position = above.astype(float)
-                        elif strat == "P2_signal_strength":
-                            # Low sentiment -> high position (inverted)
-                            sig_min = signal_lagged.rolling(60, min_periods=36).min()
-                            sig_max = signal_lagged.rolling(60, min_periods=36).max()
-                            sig_range = sig_max - sig_min
-                            sig_range = sig_range.replace(0, np.nan)
-                            # Invert for countercyclical: 1 - normalized
-                            position = 1 - ((signal_lagged - sig_min) / sig_range).clip(0, 1)
-                        elif strat == "P3_long_short":
-                            position = above.astype(float) * 2 - 1
-                        else:
-                            continue
-
-                        strat_ret = position.shift(1) * work["xlv_ret"]
-
-                        is_ret = strat_ret[is_mask].dropna()
-                        oos_ret = strat_ret[oos_mask].dropna()
-
-                        if len(is_ret) < 24 or len(oos_ret) < 12:
-                            continue
-
-                        is_sharpe = (is_ret.mean() / is_ret.std()) * np.sqrt(12) if is_ret.std() > 0 else 0
-
-                        oos_ann_vol = oos_ret.std() * np.sqrt(12) if oos_ret.std() > 0 else 999
-                        oos_sharpe = (oos_ret.mean() / oos_ret.std()) * np.sqrt(12) if oos_ret.std() > 0 else 0
-
-                        oos_downside = oos_ret[oos_ret < 0].std() * np.sqrt(12) if len(oos_ret[oos_ret < 0]) > 1 else 999
-                        oos_sortino = (oos_ret.mean() * 12) / oos_downside if oos_downside > 0 else 0
-
-                        cum_ret = (1 + oos_ret).cumprod()
-                        rolling_max = cum_ret.cummax()
-                        drawdown = (cum_ret - rolling_max) / rolling_max
-                        max_dd = drawdown.min()
-
-                        oos_calmar = (oos_ret.mean() * 12) / abs(max_dd) if abs(max_dd) > 0 else 0
-
-                        pos_changes = position.diff().abs().sum()
-                        years = len(position.dropna()) / 12
-                        annual_turnover = pos_changes / years if years > 0 else 999
-
-                        win_rate = (oos_ret > 0).mean()
-                        valid_flag = (oos_sharpe > 0 and annual_turnover < 24 and len(oos_ret) >= 12)
-
-                        results.append({
-                            "signal": sig_name,
-                            "threshold": thresh_name,
-                            "strategy": strat,
-                            "lead_months": lead,
-                            "is_sharpe": round(is_sharpe, 4),
-                            "oos_sharpe": round(oos_sharpe, 4),
-                            "oos_sortino": round(oos_sortino, 4),
-                            "oos_calmar": round(oos_calmar, 4),
-                            "oos_ann_return": round(oos_ret.mean() * 12, 6),  # ratio form (META-UC)
-                            "oos_ann_vol": round(oos_ann_vol, 6),
-                            "max_drawdown": round(max_dd, 6),  # ratio form (META-UC)
-                            "win_rate": round(win_rate, 4),
-                            "annual_turnover": round(annual_turnover, 2),
-                            "is_n": len(is_ret),
-                            "oos_n": len(oos_ret),
-                            "valid": valid_flag,
-                        })
-                    except Exception:
-                        continue
-
-    # Add benchmark (buy-and-hold XLV)
-    bh_ret = work["xlv_ret"]
-    bh_oos = bh_ret[oos_mask].dropna()
-    if len(bh_oos) > 0:
-        bh_sharpe = (bh_oos.mean() / bh_oos.std()) * np.sqrt(12) if bh_oos.std() > 0 else 0
-        bh_cum = (1 + bh_oos).cumprod()
-        bh_dd = ((bh_cum - bh_cum.cummax()) / bh_cum.cummax()).min()
-
-        bh_is = bh_ret[is_mask].dropna()
-        bh_is_sharpe = (bh_is.mean() / bh_is.std()) * np.sqrt(12) if bh_is.std() > 0 else 0
-
-        results.append({
-            "signal": "BENCHMARK", "threshold": "BUY_HOLD", "strategy": "BUY_HOLD",
-            "lead_months": 0,
-            "is_sharpe": round(bh_is_sharpe, 4),
-            "oos_sharpe": round(bh_sharpe, 4),
-            "oos_sortino": round((bh_oos.mean() * 12) / (bh_oos[bh_oos < 0].std() * np.sqrt(12)) if len(bh_oos[bh_oos < 0]) > 1 else 0, 4),
-            "oos_calmar": round((bh_oos.mean() * 12) / abs(bh_dd) if abs(bh_dd) > 0 else 0, 4),
-            "oos_ann_return": round(bh_oos.mean() * 12, 6),
-            "oos_ann_vol": round(bh_oos.std() * np.sqrt(12), 6),
-            "max_drawdown": round(bh_dd, 6),
-            "win_rate": round((bh_oos > 0).mean(), 4),
-            "annual_turnover": 0,
-            "is_n": len(bh_is),
-            "oos_n": len(bh_oos),
-            "valid": True,
-        })
-
-    results_df = pd.DataFrame(results)
+    # Add benchmark (buy-and-hold XLV); returns, vol and drawdown in ratio form (META-UC)
+    bh = {"signal": "BENCHMARK", "threshold": "BUY_HOLD", "strategy": "BUY_HOLD",
+          "lead_months": 0, "valid": True, **PIPE.benchmark(work["xlv_ret"], is_mask, oos_mask)}
+    results_df = PIPE.results_table(metrics.assign(strategy=metrics["strategy"].map(STRATEGY_NAMES)),
+                                     RESULT_COLUMNS, bh, percent=False)
     results_path = os.path.join(RESULTS_DIR, f"tournament_results_{DATE_TAG}.csv")
     results_df.to_csv(results_path, index=False)
 
     valid_count = results_df["valid"].sum() if len(results_df) > 0 else 0
     print(f"\n  Tournament Summary:")
-    print(f"    Combinations tested: {combo_count}")
     print(f"    Results saved: {len(results_df)}")
     print(f"    Valid strategies: {valid_count}")
 
@@ -1195,12 +996,8 @@ def stage_validation(df_monthly, tournament_df):
 
     if len(xlv_oos) > 12:
         n_bootstrap = 5000
-        bootstrap_sharpes = np.zeros(n_bootstrap)
-
-        for b in range(n_bootstrap):
-            sample = np.random.choice(xlv_oos.values, size=len(xlv_oos), replace=True)
-            if np.std(sample) > 0:
-                bootstrap_sharpes[b] = (np.mean(sample) / np.std(sample)) * np.sqrt(12)
+        bootstrap_sharpes = bootstrap_sharpe(xlv_oos.values, n_bootstrap, rng=np.random,
+                                             periods_per_year=12)
 
         for _, row in top5.iterrows():
             p_value = (bootstrap_sharpes >= row["oos_sharpe"]).mean()
@@ -1217,56 +1014,15 @@ def stage_validation(df_monthly, tournament_df):
     boot_df.to_csv(os.path.join(VALID_DIR, "bootstrap.csv"), index=False)
     print(f"    {len(boot_df)} strategies tested")
 
-    # --- 7.2 Stress tests ---
-    print("\n  [7.2] Stress tests...")
-    stress_periods = {
-        "Dot_Com_Bust": ("2000-03-01", "2002-09-30"),
-        "GFC": ("2008-01-01", "2009-06-30"),
-        "COVID": ("2020-01-01", "2020-06-30"),
-        "Rate_Hike_2022": ("2022-01-01", "2023-06-30"),
-    }
-
-    stress_results = []
-    for period_name, (start, end) in stress_periods.items():
-        stress_mask = (work.index >= start) & (work.index <= end)
-        stress_ret = work.loc[stress_mask, "xlv_ret"].dropna()
-
-        if len(stress_ret) > 3:
-            bh_sharpe = (stress_ret.mean() / stress_ret.std()) * np.sqrt(12) if stress_ret.std() > 0 else 0
-            stress_results.append({
-                "period": period_name,
-                "start": start,
-                "end": end,
-                "n_months": len(stress_ret),
-                "buy_hold_sharpe": round(bh_sharpe, 4),
-                "buy_hold_return_pct": round(stress_ret.sum() * 100, 2),
-            })
-
-    stress_df = pd.DataFrame(stress_results)
-    stress_df.to_csv(os.path.join(VALID_DIR, "stress_tests.csv"), index=False)
-    print(f"    {len(stress_df)} stress periods analyzed")
-
-    # --- 7.3 Transaction cost sensitivity ---
-    print("\n  [7.3] Transaction cost sensitivity...")
-    tx_results = []
-
-    for _, row in top5.iterrows():
-        for tx_bps in [0, 5, 10, 25, 50]:
-            annual_cost = row["annual_turnover"] * (tx_bps / 10000) * 12
-            net_sharpe = row["oos_sharpe"] - (annual_cost * np.sqrt(12) if row.get("oos_ann_vol", 0) > 0 else 0)
-
-            tx_results.append({
-                "signal": row["signal"],
-                "threshold": row["threshold"],
-                "strategy": row["strategy"],
-                "tx_cost_bps": tx_bps,
-                "gross_sharpe": row["oos_sharpe"],
-                "net_sharpe_approx": round(net_sharpe, 4),
-            })
-
-    tx_df = pd.DataFrame(tx_results)
-    tx_df.to_csv(os.path.join(VALID_DIR, "transaction_costs.csv"), index=False)
-    print(f"    {len(tx_df)} cost scenarios tested")
+    # --- 7.2 Walk-forward, Sharpe CIs, costs, decay, stress tests ---
+    # Winner positions straight from the tournament block (PairPipeline.validation)
+    print("\n  [7.2] Walk-forward, costs, decay and stress tests...")
+    work = work.dropna(subset=["umcsent"])
+    frames = PIPE.validation(work, work.index >= OOS_START)
+    for frame in frames.values():
+        if "strategy" in frame.columns:
+            frame["strategy"] = frame["strategy"].map(STRATEGY_NAMES)
+    PIPE.write_validation(frames)
 
     return boot_df
 
@@ -1348,52 +1104,28 @@ def main():
 
     # --- Generate winner trade log ---
     if winner_summary and "signal" in winner_summary:
-        try:
-            work = df_monthly.dropna(subset=["umcsent"])
-            oos_mask = work.index >= OOS_START
-
-            sig_col_map = {
-                "S1_level":     "umcsent",
-                "S2_yoy":       "umcsent_yoy",
-                "S3_mom":       "umcsent_mom",
-                "S4_zscore":    "umcsent_zscore",
-                "S5_3m_ma":     "umcsent_3m_ma",
-                "S6_direction": "umcsent_direction",
-                "S7_dev_ma":    "umcsent_dev_ma",
-            }
-            sig_col = sig_col_map.get(winner_summary["signal"])
-            lead = winner_summary["lead_months"]
-            thresh_name = winner_summary["threshold"]
-
-            if sig_col and sig_col in work.columns:
-                signal = work[sig_col].shift(lead) if lead > 0 else work[sig_col]
-                is_mask = work.index <= IS_END
-
-                if "T1_fixed" in thresh_name:
-                    pct = int(thresh_name.split("p")[1])
-                    thresh_val = work.loc[is_mask, sig_col].quantile(pct / 100)
-                    position = (signal < thresh_val).astype(float)
-                elif "T2_roll" in thresh_name:
-                    pct = int(thresh_name.split("p")[1])
-                    thresh_val = signal.rolling(60, min_periods=36).quantile(pct / 100)
-                    position = (signal < thresh_val).astype(float)
-                else:
-                    thresh_val = 0
-                    position = (signal < thresh_val).astype(float)
-
-                strat_ret = position.shift(1) * work["xlv_ret"]
-                oos_data = work[oos_mask].copy()
-                oos_data["position"] = position[oos_mask]
-                oos_data["strat_ret"] = strat_ret[oos_mask]
-                oos_data["cum_return"] = (1 + oos_data["strat_ret"].fillna(0)).cumprod()
-
-                trade_log = oos_data[["position", "strat_ret", "cum_return", "xlv"]].copy()
-                trade_log.index.name = "date"
-                trade_log_path = os.path.join(RESULTS_DIR, "winner_trade_log.csv")
-                trade_log.to_csv(trade_log_path)
-                print(f"  Winner trade log -> {trade_log_path}")
-        except Exception as e:
-            print(f"  Trade log generation failed: {e}")
+        # Winner positions straight from the tournament block
+        work = df_monthly.dropna(subset=["umcsent"])
+        oos_mask = work.index >= OOS_START
+
+        m = PIPE.metrics
+        hit = m[(m["signal"] == winner_summary["signal"])
+                & (m["threshold"] == winner_summary["threshold"])
+                & (m["lead_months"] == winner_summary["lead_months"])
+                & (m["strategy"].map(STRATEGY_NAMES) == winner_summary["strategy"])]
+        if len(hit):
+            position = PIPE.block.position_series(int(hit["column"].iloc[0])).reindex(work.index)
+            strat_ret = position.shift(1) * work["xlv_ret"]
+            oos_data = work[oos_mask].copy()
+            oos_data["position"] = position[oos_mask]
+            oos_data["strat_ret"] = strat_ret[oos_mask]
+            oos_data["cum_return"] = (1 + oos_data["strat_ret"].fillna(0)).cumprod()
+
+            trade_log = oos_data[["position", "strat_ret", "cum_return", "xlv"]].copy()
+            trade_log.index.name = "date"
+            trade_log_path = os.path.join(RESULTS_DIR, "winner_trade_log.csv")
+            trade_log.to_csv(trade_log_path)
+            print(f"  Winner trade log -> {trade_log_path}")
 
     # --- Pipeline Summary ---
     pipeline_elapsed = time.time() - pipeline_start
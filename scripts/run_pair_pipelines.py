@@ -0,0 +1,252 @@
+"""Run several pair pipelines concurrently with per-pipeline resource budgets.
+
+Each pair used to be re-run by hand, one `pair_pipeline_<pair>.py` after
+another. This runner takes a list of pair IDs and launches their pipelines
+side by side, one worker process per pipeline, at most ``--workers`` at a
+time, so re-running the roster is bounded by cores instead of by the sum of
+the pipelines' wall-clock times.
+
+Per-worker budgets
+------------------
+- Memory: the address space of every worker is capped with
+  ``RLIMIT_AS`` (``--mem-gb``; default = 80% of physical RAM split evenly
+  across workers). A pipeline that exceeds it fails with ``MemoryError``
+  inside its own process; the other pipelines keep running. The cap is set
+  by a small launcher interpreter that then ``exec``s the pipeline, not by
+  ``preexec_fn``, which is unsafe to use from the runner's threads.
+- Threads: ``OMP/OPENBLAS/MKL/NUMEXPR_NUM_THREADS`` are set to
+  ``--threads`` (default = cores // workers) so N concurrent pipelines do
+  not each spin up a full-width BLAS pool.
+- Time: ``--timeout`` minutes per pipeline (default: none).
+
+Every pipeline runs in a fresh interpreter (`python <script>`), exactly as
+when run by hand, so module-level state (STAGE_TIMES, caches) never leaks
+between pairs. The roster is every spec in `scripts/pair_specs/`: a spec that
+names its own "pipeline" script runs as `python <script>`, the rest as
+`python pair_pipeline.py <pair_id>`.
+
+Usage
+-----
+    python3 scripts/run_pair_pipelines.py                       # full roster
+    python3 scripts/run_pair_pipelines.py hy_ig_spy indpro_xlp  # subset
+    python3 scripts/run_pair_pipelines.py --workers 4 --mem-gb 6 --timeout 60
+
+Outputs
+-------
+Scratch (gitignored, under ``temp/<ts>_pair_runs/``):
+    <job>.log           – combined stdout/stderr of each pipeline
+    run_report.json     – per-pipeline status, return code, wall time, peak
+                          RSS, and the pipeline_timing_*.json it wrote
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from _pair_spec import available_specs, load_spec
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+RESULTS_ROOT = REPO_ROOT / "results"
+
+# ---------------------------------------------------------------------------
+# Pair roster: every spec in scripts/pair_specs/ -> (pipeline script, timing
+# JSON glob under results/). Specs that name their own "pipeline" run that
+# script; the rest run through the generic one.
+# ---------------------------------------------------------------------------
+SPEC_PIPELINE = "pair_pipeline.py"
+PIPELINES = {pid: (load_spec(pid).pipeline or SPEC_PIPELINE, f"{pid}/pipeline_timing_*.json")
+             for pid in available_specs()}
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+
+
+def _physical_memory_bytes() -> int | None:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def plan_jobs(pair_ids: list[str]) -> list[dict]:
+    """Group requested pairs by pipeline script (shared scripts run once)."""
+    unknown = [p for p in pair_ids if p not in PIPELINES]
+    if unknown:
+        raise SystemExit(f"Unknown pair_id(s): {', '.join(unknown)} "
+                         f"(known: {', '.join(PIPELINES)})")
+    jobs: dict[str, dict] = {}
+    for pid in pair_ids:
+        script, timing_glob = PIPELINES[pid]
+        if script == SPEC_PIPELINE:
+            name, args = f"{Path(script).stem}_{pid}", [pid]
+        else:
+            name, args = Path(script).stem, []
+        job = jobs.setdefault(name, {"name": name, "script": script, "args": args,
+                                     "pairs": [], "timing_glob": timing_glob})
+        job["pairs"].append(pid)
+    return list(jobs.values())
+
+
+# `python -c _LAUNCHER <mem_bytes> <script> [args...]`: cap the address space
+# (0 = uncapped), then replace itself with the pipeline; the limit survives exec
+_LAUNCHER = (
+    "import os, resource, sys\n"
+    "mem = int(sys.argv[1])\n"
+    "if mem:\n"
+    "    resource.setrlimit(resource.RLIMIT_AS, (mem, mem))\n"
+    "os.execv(sys.executable, [sys.executable, *sys.argv[2:]])\n"
+)
+
+
+def _collect_timing(timing_glob: str, since: float) -> dict | None:
+    """Newest timing JSON matching the glob that was written during this run."""
+    paths = [p for p in glob.glob(str(RESULTS_ROOT / timing_glob))
+             if os.path.getmtime(p) >= since]
+    if not paths:
+        return None
+    path = max(paths, key=os.path.getmtime)
+    with open(path) as f:
+        return {"path": os.path.relpath(path, REPO_ROOT), **json.load(f)}
+
+
+def run_job(job: dict, out_dir: str, *, mem_bytes: int | None, threads: int,
+            timeout_s: float | None) -> dict:
+    """Run one pipeline script in its own process and return its report entry."""
+    script = SCRIPTS_DIR / job["script"]
+    log_path = os.path.join(out_dir, f"{job['name']}.log")
+    env = {**os.environ, **{k: str(threads) for k in THREAD_ENV_VARS},
+           "PYTHONUNBUFFERED": "1"}
+
+    t0 = time.time()
+    timed_out = threading.Event()
+    exited = threading.Lock()
+    done = False
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-c", _LAUNCHER, str(mem_bytes or 0), str(script), *job["args"]],
+            cwd=str(REPO_ROOT), env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        timer = None
+        if timeout_s:
+            def _kill():
+                # Signal the pid only while it is still ours: the child is not
+                # reaped until `done` is set under the same lock. os.kill, not
+                # proc.kill, which polls and could reap it behind wait4's back.
+                with exited:
+                    if not done:
+                        timed_out.set()
+                        os.kill(proc.pid, signal.SIGKILL)
+            timer = threading.Timer(timeout_s, _kill)
+            timer.start()
+        # Wait for exit without reaping, retire the timer, then reap: wait4
+        # gives this child's own rusage (peak RSS), unlike RUSAGE_CHILDREN
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        with exited:
+            done = True
+        if timer:
+            timer.cancel()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.time() - t0
+
+    status_str = "timeout" if timed_out.is_set() else ("ok" if proc.returncode == 0 else "failed")
+    entry = {
+        "script": " ".join([job["script"], *job["args"]]),
+        "pairs": job["pairs"],
+        "status": status_str,
+        "returncode": proc.returncode,
+        "wall_seconds": round(wall, 1),
+        "max_rss_mb": round(rusage.ru_maxrss / 1024, 1),   # Linux: KiB
+        "log": os.path.relpath(log_path, REPO_ROOT),
+        "pipeline_timing": _collect_timing(job["timing_glob"], t0),
+    }
+    if status_str != "ok":
+        with open(log_path) as f:
+            entry["log_tail"] = f.readlines()[-20:]
+    return entry
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("pairs", nargs="*", default=list(PIPELINES),
+                    help="pair_ids to run (default: full roster)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="concurrent pipelines (default: all cores)")
+    ap.add_argument("--threads", type=int, default=None,
+                    help="BLAS/OpenMP threads per pipeline (default: cores // workers)")
+    ap.add_argument("--mem-gb", type=float, default=None,
+                    help="address-space cap per pipeline in GiB "
+                         "(default: 80%% of RAM / workers; 0 disables)")
+    ap.add_argument("--timeout", type=float, default=None,
+                    help="per-pipeline timeout in minutes")
+    ap.add_argument("--out", default=None, help="Output dir (default: temp/<ts>_pair_runs)")
+    args = ap.parse_args()
+
+    jobs = plan_jobs(args.pairs)
+    workers = max(1, min(args.workers, len(jobs)))
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+    if args.mem_gb is None:
+        phys = _physical_memory_bytes()
+        mem_bytes = int(phys * 0.8 / workers) if phys else None
+    else:
+        mem_bytes = int(args.mem_gb * 1024 ** 3) or None
+
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_dir = args.out or str(REPO_ROOT / "temp" / f"{ts}_pair_runs")
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"=== run_pair_pipelines — {ts} ===", flush=True)
+    print(f"  jobs: {len(jobs)} ({len(args.pairs)} pairs)  workers: {workers}  "
+          f"threads/worker: {threads}  "
+          f"mem/worker: {f'{mem_bytes / 1024 ** 3:.1f} GiB' if mem_bytes else 'uncapped'}",
+          flush=True)
+    print(f"  out: {out_dir}", flush=True)
+
+    t0 = time.time()
+    entries = []
+    timeout_s = args.timeout * 60 if args.timeout else None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, out_dir, mem_bytes=mem_bytes,
+                               threads=threads, timeout_s=timeout_s): job for job in jobs}
+        for fut in as_completed(futures):
+            entry = fut.result()
+            entries.append(entry)
+            print(f"  [{entry['status']:7s}] {entry['script']:40s} "
+                  f"{entry['wall_seconds']:7.1f}s  peak {entry['max_rss_mb']:.0f} MB", flush=True)
+    elapsed = time.time() - t0
+
+    serial = sum(e["wall_seconds"] for e in entries)
+    report = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "pairs": args.pairs,
+        "workers": workers,
+        "threads_per_worker": threads,
+        "mem_cap_bytes": mem_bytes,
+        "wall_seconds": round(elapsed, 1),
+        "sum_pipeline_seconds": round(serial, 1),
+        "n_failed": sum(e["status"] != "ok" for e in entries),
+        "runs": sorted(entries, key=lambda e: e["script"]),
+    }
+    with open(os.path.join(out_dir, "run_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n  {len(entries)} pipelines in {elapsed:.1f}s wall "
+          f"(sum of pipeline times {serial:.1f}s); {report['n_failed']} failed", flush=True)
+    print(f"  report: {os.path.join(out_dir, 'run_report.json')}", flush=True)
+    sys.exit(1 if report["n_failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
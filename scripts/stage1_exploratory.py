@@ -9,8 +9,11 @@ Date: 2026-02-28
 import numpy as np
 import pandas as pd
 from scipy import stats
-from scipy.spatial.distance import pdist, squareform
 import warnings
+
+from _ccf import ar_prewhiten, ccf_cube, ccf_frame
+from _distance_correlation import dcor_test, rolling_dcor
+
 warnings.filterwarnings('ignore')
 
 # ── Load data ────────────────────────────────────────────────────────────────
@@ -77,36 +80,24 @@ idx = roll_corr.index.get_level_values(1)
 rolling_pearson = roll_corr.loc[idx == 'hy_ig_spread_chg', 'spy_ret'].droplevel(1)
 rolling_pearson.name = 'rolling_252d_pearson'
 
-# Distance correlation (dcor) — full sample and rolling would be expensive, do full sample
-def distance_correlation(x, y):
-    n = len(x)
-    a = squareform(pdist(x.values.reshape(-1, 1), 'euclidean'))
-    b = squareform(pdist(y.values.reshape(-1, 1), 'euclidean'))
-    A = a - a.mean(axis=0) - a.mean(axis=1, keepdims=True) + a.mean()
-    B = b - b.mean(axis=0) - b.mean(axis=1, keepdims=True) + b.mean()
-    dcov2 = (A * B).mean()
-    dvar_x = (A * A).mean()
-    dvar_y = (B * B).mean()
-    if dvar_x * dvar_y == 0:
-        return 0.0
-    return np.sqrt(dcov2 / np.sqrt(dvar_x * dvar_y))
-
-# Subsample for distance correlation (expensive O(n^2))
-np.random.seed(42)
-mask_dcor = df[['hy_ig_spread_chg', 'spy_ret']].dropna().index
-sample_idx = np.random.choice(len(mask_dcor), min(3000, len(mask_dcor)), replace=False)
-sample_idx.sort()
-dcor_sub = df.loc[mask_dcor[sample_idx]]
-dcor_val = distance_correlation(dcor_sub['hy_ig_spread_chg'], dcor_sub['spy_ret'])
-print(f"Distance correlation (HY-IG chg vs SPY ret, n={len(sample_idx)}): {dcor_val:.4f}")
+# Distance correlation (dcor) — full sample with permutation p-value, plus rolling 252d
+dcor_pair = df[['hy_ig_spread_chg', 'spy_ret']].dropna()
+dcor_res = dcor_test(dcor_pair['hy_ig_spread_chg'], dcor_pair['spy_ret'], n_perm=1000, seed=42)
+dcor_val = dcor_res['dcor']
+print(f"Distance correlation (HY-IG chg vs SPY ret, n={dcor_res['n_obs']}): {dcor_val:.4f} "
+      f"(perm p={dcor_res['p_value']:.4f})")
+
+roll_dc = rolling_dcor(dcor_pair['hy_ig_spread_chg'], dcor_pair['spy_ret'], 252)
+rolling_dcor_252d = pd.Series(roll_dc['dcor'], index=dcor_pair.index[roll_dc['end'] - 1],
+                              name='rolling_252d_dcor')
 
 # Add distance correlation as a note row
 corr_rows.append({
     'signal': 'HY-IG Spread Change (dcor)',
     'signal_col': 'hy_ig_spread_chg',
     'forward_return': 'spy_ret (same day)',
-    'n_obs': len(sample_idx),
-    'pearson_r': dcor_val, 'pearson_p': np.nan,
+    'n_obs': dcor_res['n_obs'],
+    'pearson_r': dcor_val, 'pearson_p': dcor_res['p_value'],
     'spearman_r': np.nan, 'spearman_p': np.nan,
     'kendall_tau': np.nan, 'kendall_p': np.nan,
 })
@@ -114,7 +105,8 @@ corr_df = pd.DataFrame(corr_rows)
 corr_df.to_csv(f'{OUT}/correlations.csv', index=False)
 
 # Save rolling correlation
-rolling_pearson.to_csv(f'{OUT}/rolling_252d_correlation.csv', header=True)
+pd.concat([rolling_pearson, rolling_dcor_252d], axis=1).to_csv(
+    f'{OUT}/rolling_252d_correlation.csv', header=True)
 print(f"Correlations saved: {len(corr_df)} rows")
 
 # ── 2. Cross-Correlation Function (CCF) ─────────────────────────────────────
@@ -136,25 +128,25 @@ common = resid_spread.index.intersection(resid_spy.index)
 rs = resid_spread.loc[common].values
 ry = resid_spy.loc[common].values
 
-ccf_lags = range(-20, 21)
-ccf_vals = []
 n = len(rs)
-for lag in ccf_lags:
-    if lag >= 0:
-        c = np.corrcoef(rs[:n-lag] if lag > 0 else rs, ry[lag:] if lag > 0 else ry)[0, 1]
-    else:
-        c = np.corrcoef(rs[-lag:], ry[:n+lag])[0, 1]
-    ccf_vals.append(c)
-
+cube = ccf_cube(rs, ry, 20)
 ccf_df = pd.DataFrame({
-    'lag': list(ccf_lags),
-    'ccf': ccf_vals,
-    'se': 1 / np.sqrt(n)  # approximate SE
+    'lag': cube['lags'],
+    'ccf': cube['ccf'][:, 0, 0],
+    'se': cube['se'][:, 0, 0],  # 1/sqrt(overlap)
 })
-ccf_df['significant_95'] = np.abs(ccf_df['ccf']) > 1.96 / np.sqrt(n)
+ccf_df['significant_95'] = np.abs(ccf_df['ccf']) > 1.96 * ccf_df['se']
 ccf_df.to_csv(f'{OUT}/ccf.csv', index=False)
 print(f"CCF saved: lags -20 to +20, {ccf_df['significant_95'].sum()} significant at 95%")
 
+# Every derived spread signal vs SPY return, both AR(5)-prewhitened, lags -252..+252
+ccf_signals = [c for c in spread_signals if c in df.columns]
+pw = ar_prewhiten(df[ccf_signals + ['spy_ret']], lags=5)
+ccf_all = ccf_frame(pw[ccf_signals], pw[['spy_ret']], 252)
+ccf_all.to_csv(f'{OUT}/ccf_all_signals.csv', index=False)
+print(f"CCF (all signals, +/-252): {len(ccf_all)} rows, "
+      f"{ccf_all['significant_95'].sum()} significant at 95%")
+
 # ── 3. Descriptive Stats by Regime ───────────────────────────────────────────
 print("\n=== 3. Descriptive Stats by Regime ===")
 
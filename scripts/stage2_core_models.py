@@ -13,8 +13,21 @@ import statsmodels.api as sm
 from statsmodels.tsa.api import VAR
 from statsmodels.tsa.stattools import grangercausalitytests
 from statsmodels.tsa.vector_ar.vecm import coint_johansen
+import json
+import os
 import pickle
 import warnings
+
+from _bocpd import online_change_points
+from _cointegration import johansen_grid
+from _hmm_regimes import fit_hmm_grid
+from _local_projections import cumulative_paths, local_projections
+from _markov_switching import fit_markov_switching
+from _quantile_regression import quantile_grid
+from _rf_walk_forward import rf_walk_forward
+from _transfer_entropy import te_grid
+from _walk_forward import make_folds
+
 warnings.filterwarnings('ignore')
 
 OUT = '/workspaces/aig-rlic-plus/results/core_models_20260228'
@@ -121,72 +134,26 @@ print(granger_df[['direction', 'lag_order', 'regime', 'p_value', 'conclusion']].
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 2. Transfer Entropy ===")
 
-def transfer_entropy_binned(x, y, lag=1, n_bins=5):
-    """Compute TE(X->Y) using binning approach."""
-    x_lag = pd.Series(x[:-lag]).values
-    y_curr = pd.Series(y[lag:]).values
-    y_lag = pd.Series(y[:-lag]).values
-    # Discretize
-    x_d = pd.qcut(x_lag, n_bins, labels=False, duplicates='drop')
-    y_d = pd.qcut(y_curr, n_bins, labels=False, duplicates='drop')
-    yl_d = pd.qcut(y_lag, n_bins, labels=False, duplicates='drop')
-
-    # Joint distribution p(y_t, y_{t-1}, x_{t-1})
-    df_te = pd.DataFrame({'y': y_d, 'yl': yl_d, 'x': x_d}).dropna()
-    n = len(df_te)
-    if n < 100:
-        return np.nan
-
-    # TE = sum p(y,yl,x) * log[ p(y|yl,x) / p(y|yl) ]
-    # = sum p(y,yl,x) * log[ p(y,yl,x)*p(yl) / (p(yl,x)*p(y,yl)) ]
-    joint_yylx = df_te.groupby(['y', 'yl', 'x']).size() / n
-    joint_yyl = df_te.groupby(['y', 'yl']).size() / n
-    joint_ylx = df_te.groupby(['yl', 'x']).size() / n
-    marg_yl = df_te.groupby('yl').size() / n
-
-    te = 0.0
-    for (y_v, yl_v, x_v), p_yylx in joint_yylx.items():
-        p_yyl = joint_yyl.get((y_v, yl_v), 0)
-        p_ylx = joint_ylx.get((yl_v, x_v), 0)
-        p_yl = marg_yl.get(yl_v, 0)
-        if p_yyl > 0 and p_ylx > 0 and p_yl > 0:
-            te += p_yylx * np.log(p_yylx * p_yl / (p_ylx * p_yyl))
-    return te
-
 te_rows = []
 pair_clean = pair_data.dropna()
 x_spread = pair_clean['hy_ig_spread_chg'].values
 y_spy = pair_clean['spy_ret'].values
 
-for lag in [1, 5]:
-    te_c2e = transfer_entropy_binned(x_spread, y_spy, lag=lag)
-    te_e2c = transfer_entropy_binned(y_spy, x_spread, lag=lag)
-
-    # Bootstrap significance (1000 shuffles)
-    n_boot = 1000
-    te_c2e_null = []
-    te_e2c_null = []
-    rng = np.random.default_rng(42)
-    for _ in range(n_boot):
-        x_shuf = rng.permutation(x_spread)
-        te_c2e_null.append(transfer_entropy_binned(x_shuf, y_spy, lag=lag))
-        y_shuf = rng.permutation(y_spy)
-        te_e2c_null.append(transfer_entropy_binned(y_shuf, x_spread, lag=lag))
-
-    p_c2e = np.mean([t >= te_c2e for t in te_c2e_null if not np.isnan(t)])
-    p_e2c = np.mean([t >= te_e2c for t in te_e2c_null if not np.isnan(t)])
-
-    te_rows.append({'direction': 'Credit->Equity', 'lag': lag, 'transfer_entropy': te_c2e,
-                    'bootstrap_p': p_c2e, 'significant': p_c2e < 0.05})
-    te_rows.append({'direction': 'Equity->Credit', 'lag': lag, 'transfer_entropy': te_e2c,
-                    'bootstrap_p': p_e2c, 'significant': p_e2c < 0.05})
+# Permutation nulls (1000 shuffles per cell) run in batches across processes
+te_lags, te_bins = [1, 5, 10, 21], [3, 5, 8]
+for direction, src, tgt in [('Credit->Equity', x_spread, y_spy),
+                            ('Equity->Credit', y_spy, x_spread)]:
+    for r in te_grid(src, tgt, te_lags, te_bins, n_perm=1000, seed=42):
+        te_rows.append({'direction': direction, 'lag': r['lag'], 'n_bins': r['n_bins'],
+                        'transfer_entropy': r['te'], 'bootstrap_p': r['p_value'],
+                        'significant': r['p_value'] < 0.05})
 
 te_df = pd.DataFrame(te_rows)
 te_df.to_csv(f'{OUT}/transfer_entropy.csv', index=False)
 print(te_df.to_string(index=False))
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 3. JOHANSEN COINTEGRATION + VECM
+# 3. JOHANSEN COINTEGRATION (FULL SAMPLE + ROLLING) + VECM
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 3. Johansen Cointegration ===")
 
@@ -211,6 +178,14 @@ coint_df = pd.DataFrame(coint_rows)
 coint_df.to_csv(f'{OUT}/cointegration.csv', index=False)
 print(coint_df.to_string(index=False))
 
+# Rolling 5-year windows (1,260 days), every day: when does the equilibrium hold?
+roll_coint = johansen_grid({'log_spy~hy_ig_spread': coint_data}, 1260, det_order=0, k_ar_diff=5,
+                           cache_dir=f'{OUT}/coint_cache')
+roll_coint.to_csv(f'{OUT}/rolling_cointegration.csv', index=False)
+if len(roll_coint):
+    print(f"Rolling Johansen: {len(roll_coint)} windows, "
+          f"{(roll_coint['rank_trace'] >= 1).mean():.0%} reject r = 0 at 5% (trace)")
+
 coint_found = coint_df.iloc[0]['trace_reject']
 if coint_found:
     print("Cointegration FOUND — fitting VECM")
@@ -236,19 +211,26 @@ add_diag('Johansen Cointegration', 'Trace (r=0)', joh_result.lr1[0], np.nan,
 # 4. MARKOV-SWITCHING REGRESSION
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 4. Markov-Switching Regression ===")
-from statsmodels.tsa.regime_switching.markov_regression import MarkovRegression
 
 ms_data = df[['spy_ret', 'hy_ig_spread_chg']].dropna()
 
 for k_regimes in [2, 3]:
     try:
-        ms_model = MarkovRegression(
+        # EM on the full sample, warm-started from the previous run if present
+        start_path = f'{OUT}/markov_switching_{k_regimes}state_params.json'
+        ms_start = None
+        if os.path.exists(start_path):
+            with open(start_path) as f:
+                ms_start = json.load(f)
+        ms_fit = fit_markov_switching(
             ms_data['spy_ret'],
+            sm.add_constant(ms_data['hy_ig_spread_chg']),
             k_regimes=k_regimes,
-            exog=sm.add_constant(ms_data['hy_ig_spread_chg']),
-            switching_variance=True,
+            start=ms_start,
+            maxiter=1000,
         )
-        ms_fit = ms_model.fit(maxiter=500, em_iter=100)
+        with open(start_path, 'w') as f:
+            json.dump(ms_fit.start_params(), f, indent=2)
 
         # Save coefficients
         ms_params = pd.DataFrame({
@@ -259,7 +241,7 @@ for k_regimes in [2, 3]:
 
         # Save regime probabilities
         regime_probs = pd.DataFrame(
-            ms_fit.smoothed_marginal_probabilities,
+            ms_fit.smoothed,
             index=ms_data.index,
             columns=[f'regime_{i}_prob' for i in range(k_regimes)]
         )
@@ -267,7 +249,8 @@ for k_regimes in [2, 3]:
 
         print(f"\n{k_regimes}-State Markov-Switching:")
         print(ms_params.to_string(index=False))
-        print(f"Log-likelihood: {ms_fit.llf:.2f}, AIC: {ms_fit.aic:.2f}")
+        print(f"Log-likelihood: {ms_fit.llf:.2f}, AIC: {ms_fit.aic:.2f}, "
+              f"EM iterations: {ms_fit.n_iter}")
 
         add_diag(f'Markov-Switching {k_regimes}S', 'AIC', ms_fit.aic, np.nan,
                  f'{k_regimes}-state model AIC')
@@ -285,20 +268,26 @@ for k_regimes in [2, 3]:
 # 5. HMM REGIME DETECTION
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 5. HMM Regime Detection ===")
-from hmmlearn.hmm import GaussianHMM
-
 hmm_data = df[['hy_ig_spread_chg', 'vix']].dropna()
 
+# 2-5 states x 8 restarts in one parallel batch, BIC selection, cached on the inputs
+hmm_grid = fit_hmm_grid(
+    hmm_data.values,
+    states=(2, 3, 4, 5),
+    n_restarts=8,
+    seed=42,
+    n_iter=500,
+    tol=1e-4,
+    cache_dir=f'{OUT}/hmm_cache',
+)
+hmm_grid.table.to_csv(f'{OUT}/hmm_state_selection.csv', index=False)
+print(hmm_grid.table.to_string(index=False))
+print(f"BIC-selected states: {hmm_grid.best_n_states}"
+      f"{' (loaded from cache)' if hmm_grid.from_cache else ''}")
+
 for n_states in [2, 3]:
     try:
-        hmm = GaussianHMM(
-            n_components=n_states,
-            covariance_type='full',
-            n_iter=500,
-            random_state=42,
-            tol=1e-4,
-        )
-        hmm.fit(hmm_data.values)
+        hmm = hmm_grid.model(n_states)
         states = hmm.predict(hmm_data.values)
         probs = hmm.predict_proba(hmm_data.values)
 
@@ -333,28 +322,15 @@ for n_states in [2, 3]:
         print(f"{n_states}-State HMM failed: {e}")
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 6. CHANGE-POINT DETECTION (PELT)
+# 6. CHANGE-POINT DETECTION (BOCPD)
 # ══════════════════════════════════════════════════════════════════════════════
-print("\n=== 6. Change-Point Detection (PELT) ===")
-import ruptures
-
-spread_series = df['hy_ig_spread'].dropna().values
-algo = ruptures.Pelt(model="rbf").fit(spread_series)
-bkps = algo.predict(pen=10)
-
-cp_dates = df['hy_ig_spread'].dropna().index
-cp_rows = []
-for bp in bkps[:-1]:  # last breakpoint is the end
-    if bp < len(cp_dates):
-        cp_rows.append({
-            'breakpoint_index': bp,
-            'date': cp_dates[bp],
-            'spread_at_break': spread_series[bp] if bp < len(spread_series) else np.nan,
-        })
-
-cp_df = pd.DataFrame(cp_rows)
+print("\n=== 6. Change-Point Detection (online BOCPD) ===")
+# Run-length state persists between runs, so a refresh only consumes new days
+cp_df, _ = online_change_points(df['hy_ig_spread'], f'{OUT}/bocpd_state_hy_ig_spread.json',
+                                expected_run=250, confirm=21, warmup=63)
+cp_df = cp_df.rename(columns={'value_at_break': 'spread_at_break'})
 cp_df.to_csv(f'{OUT}/change_points.csv', index=False)
-print(f"PELT detected {len(cp_df)} change points:")
+print(f"BOCPD confirmed {len(cp_df)} change points:")
 print(cp_df.to_string(index=False))
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -399,28 +375,13 @@ with open(f'{OUT}/gjr_garch.pkl', 'wb') as f:
 # 8. QUANTILE REGRESSION
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 8. Quantile Regression ===")
-import statsmodels.formula.api as smf
-
 qr_data = df[['spy_fwd_21d', 'hy_ig_zscore_252d']].dropna()
 
-qr_rows = []
 taus = [0.05, 0.10, 0.25, 0.50, 0.75, 0.90]
-for tau in taus:
-    qr_model = smf.quantreg('spy_fwd_21d ~ hy_ig_zscore_252d', data=qr_data)
-    qr_fit = qr_model.fit(q=tau)
-    for var in qr_fit.params.index:
-        qr_rows.append({
-            'quantile': tau,
-            'variable': var,
-            'coef': qr_fit.params[var],
-            'se': qr_fit.bse[var],
-            't_stat': qr_fit.tvalues[var],
-            'p_value': qr_fit.pvalues[var],
-            'ci_lower': qr_fit.conf_int().loc[var, 0],
-            'ci_upper': qr_fit.conf_int().loc[var, 1],
-        })
-
-qr_df = pd.DataFrame(qr_rows)
+qr_df = (quantile_grid(qr_data, 'hy_ig_zscore_252d', ['spy_fwd_21d'], taus,
+                       n_boot=200, block_len=21, seed=42)
+         .rename(columns={'term': 'variable'})
+         [['quantile', 'variable', 'coef', 'se', 't_stat', 'p_value', 'ci_lower', 'ci_upper']])
 qr_df.to_csv(f'{OUT}/quantile_regression.csv', index=False)
 print(qr_df.to_string(index=False))
 
@@ -428,10 +389,6 @@ print(qr_df.to_string(index=False))
 # 9. RANDOM FOREST + SHAP
 # ══════════════════════════════════════════════════════════════════════════════
 print("\n=== 9. Random Forest + SHAP ===")
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, roc_auc_score
-import shap
-
 # Features
 feature_cols = [
     'hy_ig_spread', 'hy_ig_zscore_252d', 'hy_ig_zscore_504d',
@@ -447,62 +404,22 @@ target_col = 'spy_fwd_21d'
 rf_data = df[feature_cols + [target_col]].dropna()
 rf_data['target'] = (rf_data[target_col] > 0).astype(int)
 
-# Walk-forward: 5yr train, 1yr test
+# Walk-forward: 5yr train, 1yr test; folds run in parallel, cached per training window.
+# The label looks 21 days ahead, so the last 21 training rows (whose labels use
+# test-year returns) are purged from every fold
 train_years = 5
-test_years = 1
-start_year = rf_data.index.year.min()
-end_year = rf_data.index.year.max()
-
-wf_rows = []
-all_rf_probs = pd.Series(dtype=float)
-all_importances = []
-
-for test_start_year in range(start_year + train_years, end_year + 1, test_years):
-    train_end = pd.Timestamp(f'{test_start_year}-01-01')
-    test_end = pd.Timestamp(f'{test_start_year + test_years}-01-01')
-    train_start = pd.Timestamp(f'{test_start_year - train_years}-01-01')
-
-    train = rf_data.loc[train_start:train_end]
-    test = rf_data.loc[train_end:test_end]
-    if len(train) < 500 or len(test) < 50:
-        continue
+folds = make_folds(rf_data.index, test_freq='YS', train_span=pd.DateOffset(years=train_years),
+                   first_test=f'{rf_data.index.year.min() + train_years}-01-01', purge=21)
+rf_wf = rf_walk_forward(rf_data[feature_cols], rf_data['target'], folds,
+                        min_train=500, min_test=50, cache_dir=f'{OUT}/rf_cache')
 
-    X_train, y_train = train[feature_cols], train['target']
-    X_test, y_test = test[feature_cols], test['target']
-
-    rf = RandomForestClassifier(
-        n_estimators=200, max_depth=5, min_samples_leaf=20,
-        random_state=42, n_jobs=-1
-    )
-    rf.fit(X_train, y_train)
-    probs = rf.predict_proba(X_test)[:, 1]
-    preds = (probs > 0.5).astype(int)
-
-    acc = accuracy_score(y_test, preds)
-    try:
-        auc = roc_auc_score(y_test, probs)
-    except:
-        auc = np.nan
-
-    wf_rows.append({
-        'test_start': train_end.strftime('%Y-%m-%d'),
-        'test_end': test_end.strftime('%Y-%m-%d'),
-        'n_train': len(train), 'n_test': len(test),
-        'accuracy': acc, 'auc': auc,
-        'pos_rate_train': y_train.mean(), 'pos_rate_test': y_test.mean(),
-    })
-
-    all_rf_probs = pd.concat([all_rf_probs, pd.Series(probs, index=X_test.index)])
-    all_importances.append(
-        pd.Series(rf.feature_importances_, index=feature_cols)
-    )
-
-wf_df = pd.DataFrame(wf_rows)
+wf_df = rf_wf.folds
 wf_df.to_csv(f'{OUT}/rf_walk_forward.csv', index=False)
+print(f"RF folds: {len(wf_df)} ({int(wf_df['from_cache'].sum()) if len(wf_df) else 0} from cache)")
 
-# Average feature importance
-if all_importances:
-    avg_imp = pd.DataFrame(all_importances).mean().sort_values(ascending=False)
+# Average feature importance across folds
+if len(wf_df):
+    avg_imp = rf_wf.mean_importance()
     imp_df = pd.DataFrame({'feature': avg_imp.index, 'importance': avg_imp.values})
     imp_df.to_csv(f'{OUT}/rf_feature_importance.csv', index=False)
     print("RF Walk-Forward Results:")
@@ -511,27 +428,20 @@ if all_importances:
     print(imp_df.to_string(index=False))
 
 # Save RF probabilities for tournament
-all_rf_probs.name = 'rf_prob'
+all_rf_probs = rf_wf.probs.rename('rf_prob')
 all_rf_probs.to_csv(f'{OUT}/rf_probabilities.csv', header=True)
 
-# SHAP on last model
-if all_importances:
-    try:
-        explainer = shap.TreeExplainer(rf)
-        shap_values = explainer.shap_values(X_test)
-        if isinstance(shap_values, list):
-            shap_vals = shap_values[1]  # class 1
-        else:
-            shap_vals = shap_values
-        shap_imp = pd.DataFrame({
-            'feature': feature_cols,
-            'mean_abs_shap': np.abs(shap_vals).mean(axis=0),
-        }).sort_values('mean_abs_shap', ascending=False)
-        shap_imp.to_csv(f'{OUT}/rf_shap_importance.csv', index=False)
-        print("\nSHAP Importance (last window):")
-        print(shap_imp.to_string(index=False))
-    except Exception as e:
-        print(f"SHAP failed: {e}")
+# SHAP over every out-of-sample row, plus its fold-by-fold profile
+if len(rf_wf.shap):
+    mean_shap = rf_wf.mean_abs_shap()
+    shap_imp = pd.DataFrame({'feature': mean_shap.index, 'mean_abs_shap': mean_shap.values})
+    shap_imp.to_csv(f'{OUT}/rf_shap_importance.csv', index=False)
+    shap_by_fold = (rf_wf.shap.abs().groupby(rf_wf.shap.index.year).mean()
+                    .rename_axis('test_year').reset_index()
+                    .melt(id_vars='test_year', var_name='feature', value_name='mean_abs_shap'))
+    shap_by_fold.to_csv(f'{OUT}/rf_shap_by_fold.csv', index=False)
+    print("\nSHAP Importance (all folds):")
+    print(shap_imp.to_string(index=False))
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 10. LOCAL PROJECTIONS (Jordà)
@@ -544,51 +454,45 @@ lp_data = df[['spy_ret', 'hy_ig_spread_chg', 'hy_ig_zscore_252d',
 horizons = [1, 5, 10, 21, 42, 63]
 lp_rows = []
 
+# Every horizon 1..252 in one fit per specification: forward cumulative returns
+# share the design, its cross-products and the Newey–West lag products
+# (at least h lags at horizon h, since h-day cumulative returns overlap)
+lp_paths = cumulative_paths(lp_data['spy_ret'], range(1, 253))
+lp_base = local_projections(lp_data, 'hy_ig_spread_chg', lp_paths,
+                            ['vix', 'yield_spread_10y3m'], min_obs=100)
+# State-dependent: interact spread_chg with stress dummy
+lp_state = local_projections(lp_data, 'hy_ig_spread_chg', lp_paths,
+                             ['vix', 'yield_spread_10y3m'], regime='stress', min_obs=100)
+
+lp_irfs = {
+    'base': {v: lp_base.irf(v).set_index('horizon')
+             for v in ['hy_ig_spread_chg', 'vix', 'yield_spread_10y3m']},
+    'state_dependent': {v: lp_state.irf(v).set_index('horizon')
+                        for v in ['hy_ig_spread_chg', 'hy_ig_spread_chg_x_stress', 'stress']},
+}
 for h in horizons:
-    # Forward cumulative return
-    fwd_ret = lp_data['spy_ret'].rolling(h).sum().shift(-h)
-    lp_sub = lp_data.copy()
-    lp_sub['fwd_ret'] = fwd_ret
-    lp_sub = lp_sub.dropna()
-
-    if len(lp_sub) < 100:
-        continue
-
-    T = len(lp_sub)
-    nw_lags = int(0.75 * T**(1/3))
-
-    # Base model: SPY_fwd = a + b*spread_chg + controls
-    X = sm.add_constant(lp_sub[['hy_ig_spread_chg', 'vix', 'yield_spread_10y3m']])
-    y = lp_sub['fwd_ret']
-    ols = sm.OLS(y, X).fit(cov_type='HAC', cov_kwds={'maxlags': nw_lags})
-
-    for var in ['hy_ig_spread_chg', 'vix', 'yield_spread_10y3m']:
-        lp_rows.append({
-            'horizon': h, 'specification': 'base',
-            'variable': var,
-            'coef': ols.params[var], 'se': ols.bse[var],
-            't_stat': ols.tvalues[var], 'p_value': ols.pvalues[var],
-            'ci_lower': ols.conf_int().loc[var, 0],
-            'ci_upper': ols.conf_int().loc[var, 1],
-            'n_obs': len(lp_sub), 'r_squared': ols.rsquared,
-        })
+    for specification, irfs in lp_irfs.items():
+        for var, irf in irfs.items():
+            if irf.loc[h, 'n'] < 100:
+                continue
+            lp_rows.append({
+                'horizon': h, 'specification': specification,
+                'variable': var.replace('hy_ig_spread_chg_x_', 'spread_chg_x_'),
+                'coef': irf.loc[h, 'coef'], 'se': irf.loc[h, 'se'],
+                't_stat': irf.loc[h, 't_stat'], 'p_value': irf.loc[h, 'p_value'],
+                'ci_lower': irf.loc[h, 'ci_lower'],
+                'ci_upper': irf.loc[h, 'ci_upper'],
+                'n_obs': int(irf.loc[h, 'n']), 'r_squared': irf.loc[h, 'r_squared'],
+            })
 
-    # State-dependent: interact spread_chg with stress dummy
-    lp_sub['spread_chg_x_stress'] = lp_sub['hy_ig_spread_chg'] * lp_sub['stress']
-    X2 = sm.add_constant(lp_sub[['hy_ig_spread_chg', 'spread_chg_x_stress',
-                                  'stress', 'vix', 'yield_spread_10y3m']])
-    ols2 = sm.OLS(y, X2).fit(cov_type='HAC', cov_kwds={'maxlags': nw_lags})
-
-    for var in ['hy_ig_spread_chg', 'spread_chg_x_stress', 'stress']:
-        lp_rows.append({
-            'horizon': h, 'specification': 'state_dependent',
-            'variable': var,
-            'coef': ols2.params[var], 'se': ols2.bse[var],
-            't_stat': ols2.tvalues[var], 'p_value': ols2.pvalues[var],
-            'ci_lower': ols2.conf_int().loc[var, 0],
-            'ci_upper': ols2.conf_int().loc[var, 1],
-            'n_obs': len(lp_sub), 'r_squared': ols2.rsquared,
-        })
+# Full impulse-response curves: unconditional, then calm (stress=0) and stress (stress=1)
+irf_curves = pd.concat([
+    lp_base.irf().assign(specification='base', state=np.nan),
+    lp_state.state_irfs().assign(specification='state_dependent'),
+], ignore_index=True)
+irf_curves = irf_curves[irf_curves['n'] >= 100]
+irf_curves[['specification', 'state', 'horizon', 'coef', 'se', 't_stat', 'p_value',
+            'ci_lower', 'ci_upper', 'n', 'r_squared']].to_csv(f'{OUT}/lp_impulse_response.csv', index=False)
 
 lp_df = pd.DataFrame(lp_rows)
 lp_df.to_csv(f'{OUT}/local_projections.csv', index=False)
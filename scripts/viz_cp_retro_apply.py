@@ -233,7 +233,12 @@ def build_rolling_correlation(df: pd.DataFrame, pair_id: str) -> go.Figure:
 def build_structural_break(
     corr_df: pd.DataFrame, sb: dict, pair_id: str
 ) -> go.Figure:
-    """Structural break chart: rolling correlation background + break annotation."""
+    """Structural break chart: rolling correlation background + break annotation.
+
+    When the econ retro-apply wrote online BOCPD change points (`sb["bocpd"]`),
+    each confirmed change point is drawn as a thin vertical line at the date
+    its new regime starts.
+    """
     corr_df["date"] = pd.to_datetime(corr_df["date"])
     corr_df = corr_df.sort_values("date").dropna(subset=["rolling_corr_24m"])
     x_min, x_max = corr_df["date"].min(), corr_df["date"].max()
@@ -273,9 +278,33 @@ def build_structural_break(
             annotation_font=dict(size=10, color="rgba(213,94,0,1)"),
         )
 
+    # Online BOCPD change points (confirmed run-length drops)
+    bocpd = sb.get("bocpd") or {}
+    cp_dates = [pd.Timestamp(cp["date"]) for cp in bocpd.get("change_points", [])]
+    cp_dates = [d for d in cp_dates if x_min <= d <= x_max]
+    for d in cp_dates:
+        fig.add_vline(
+            x=d.timestamp() * 1000,
+            line_dash="dash",
+            line_color="rgba(0,158,115,0.7)",
+            line_width=1,
+        )
+    if cp_dates:
+        # Legend entry for the change-point lines (shapes have no legend)
+        fig.add_trace(
+            go.Scatter(
+                x=[None], y=[None], mode="lines",
+                line=dict(color="rgba(0,158,115,0.7)", width=1, dash="dash"),
+                name="BOCPD change point",
+            )
+        )
+
     # Text annotation for test result
     p_str = f"p={p_val:.3f}" if p_val is not None else "p=N/A"
     annot_text = f"Quandt-Andrews test: F={f_stat:.2f}, {p_str}"
+    if bocpd:
+        annot_text += (f"  |  BOCPD (online, expected run {bocpd.get('expected_run')}): "
+                       f"{len(cp_dates)} confirmed change points")
 
     fig.update_layout(
         title=dict(